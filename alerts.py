@@ -0,0 +1,206 @@
+# alerts.py
+"""
+Absence-alert rules engine.
+
+Instead of deciding on an email inside every attendance write, callers
+collect the absences from a batch and hand them to evaluate_absence_alerts()
+once. One pass reads the affected students, picks the escalation rule for
+each missed_count, renders the (precompiled) templates and queues at most
+one alert per student per absence day in Alert_Outbox. deliver_queued_alerts()
+sends what is queued.
+"""
+from string import Template
+from datetime import datetime
+
+import pymongo
+
+from students_db import connect_to_db
+from email_delivery import build_message
+from digests import notify_many
+from instructors_db import list_programs
+
+GOOGLE_FORM_LINK = "https://docs.google.com/forms/d/e/1FAIpQLSdeM6AUXXcCK3mNWaCQFrnoc-fmjFC615sh4cMGJ04iLGua1g/viewform?usp=dialog"  # Update your form link
+
+# Escalation rules, checked in order: the first whose [min, max] range holds
+# the student's missed_count wins (max=None means no upper bound).
+# Templates are compiled once here, not per email.
+ABSENCE_RULES = [
+    {
+        "name": "first_absence",
+        "min": 1, "max": 1,
+        "subject": Template("[1st Absence] $name missed $program on $date"),
+        "body": Template(
+            "Hello $name,\n\n"
+            "You missed our $program session on $date. "
+            "If you had a valid excuse, please submit it here:\n"
+            "\n$form_link\n\n"
+            "Thank you,\n"
+            "Club Stride Team"
+        ),
+    },
+    {
+        "name": "second_absence",
+        "min": 2, "max": 2,
+        "subject": Template("[2nd Absence] $name missed $program again on $date"),
+        "body": Template(
+            "Hello $name,\n\n"
+            "You've now missed two $program sessions. The latest absence was $date..."
+            "If you miss one more, you may be removed from the program. Please submit an excuse:\n"
+            "$form_link\n\n"
+            "Thank you,\n"
+            "Club Stride Team"
+        ),
+    },
+    {
+        "name": "third_absence",
+        "min": 3, "max": 3,
+        "subject": Template("3rd Absence: $name"),
+        "body": Template(
+            "Hello $name,\n\n"
+            "You have missed three $program sessions. The latest absence was $date..."
+            "We will contact you directly. "
+            "If you had a valid excuse, you can still submit it here:\n"
+            "$form_link\n\n"
+            "Thank you,\n"
+            "Club Stride Team"
+        ),
+    },
+    {
+        "name": "repeated_absence",
+        "min": 4, "max": None,
+        "subject": Template("$name has missed $count $program sessions"),
+        "body": Template(
+            "Hello $name,\n\n"
+            "You have missed $count sessions. Please contact us or "
+            "submit an excuse:\n$form_link\n\n"
+            "Thank you,\n"
+            "Club Stride Team"
+        ),
+    },
+]
+
+
+def match_rule(missed_count: int):
+    """The first rule whose range contains missed_count, or None."""
+    for rule in ABSENCE_RULES:
+        if missed_count >= rule["min"] and (rule["max"] is None or missed_count <= rule["max"]):
+            return rule
+    return None
+
+
+def _outbox():
+    return connect_to_db()["Alert_Outbox"]
+
+
+def evaluate_absence_alerts(absences) -> int:
+    """
+    One evaluation pass over the absences recorded by a batch write.
+
+    `absences` is an iterable of (student_id, absence_date) pairs. Students
+    are read in a single query and programs once; each student gets at most
+    one alert per absence day (the outbox _id is
+    "absence:<student_id>:<YYYY-MM-DD of the absence>", so re-evaluating the
+    same batch, e.g. after a replayed submit, or an absence recorded a day
+    late queues nothing new). When a batch holds several of a student's
+    absence days, the latest is alerted at the current missed_count and each
+    earlier one at one less.
+
+    Returns the number of alerts queued.
+    """
+    days = {}
+    for student_id, absence_date in absences:
+        absence_date = absence_date or datetime.utcnow()
+        # The latest absence recorded on each day
+        by_day = days.setdefault(student_id, {})
+        day = absence_date.strftime("%Y-%m-%d")
+        if day not in by_day or absence_date > by_day[day]:
+            by_day[day] = absence_date
+    if not days:
+        return 0
+
+    coll = connect_to_db()["Student_Records"]
+    students = coll.find(
+        {"student_id": {"$in": list(days)}, "contact_email": {"$nin": ["", None]}},
+        {"student_id": 1, "name": 1, "contact_email": 1, "program_id": 1, "missed_count": 1}
+    )
+    prog_map = {p["program_id"]: p["program_name"] for p in list_programs()}
+
+    queued = 0
+    for doc in students:
+        missed = doc.get("missed_count", 0) or 0
+        program_id = doc.get("program_id")
+        for back, (day, absence_date) in enumerate(sorted(days[doc["student_id"]].items(), reverse=True)):
+            count = missed - back
+            rule = match_rule(count)
+            if rule is None:
+                continue
+
+            values = {
+                "name": doc.get("name", ""),
+                "program": prog_map.get(program_id, f"Program ID={program_id}"),
+                "date": absence_date.strftime("%B %d, %Y"),
+                "count": count,
+                "form_link": GOOGLE_FORM_LINK,
+            }
+            try:
+                _outbox().insert_one({
+                    "_id": f"absence:{doc['student_id']}:{day}",
+                    "kind": "absence",
+                    "rule": rule["name"],
+                    "student_id": doc["student_id"],
+                    "absence_date": absence_date,
+                    "to": doc["contact_email"],
+                    "to_name": values["name"],
+                    "program_name": values["program"],
+                    "subject": rule["subject"].safe_substitute(values),
+                    "body": rule["body"].safe_substitute(values),
+                    "status": "queued",
+                    "created_at": datetime.utcnow(),
+                })
+                queued += 1
+            except pymongo.errors.DuplicateKeyError:
+                # Already alerted this student for this absence day
+                pass
+    return queued
+
+
+def deliver_queued_alerts(limit: int = 500) -> int:
+    """
+    Send queued alerts in one bulk request (or add them to the students'
+    digests) and mark each one sent, digest or failed (with the error).
+    Returns the number sent or digested.
+    """
+    outbox = _outbox()
+    claimed = []
+    for alert in outbox.find({"status": "queued"}).sort("created_at", pymongo.ASCENDING).limit(limit):
+        # Claim it first so two workers don't both send the same alert
+        result = outbox.update_one({"_id": alert["_id"], "status": "queued"}, {"$set": {"status": "sending"}})
+        if result.modified_count:
+            claimed.append(alert)
+    if not claimed:
+        return 0
+
+    results = notify_many([
+        build_message(a["to"], a["subject"], a["body"], to_name=a.get("to_name"))
+        for a in claimed
+    ], category="absence")
+    sent = 0
+    for alert, result in zip(claimed, results):
+        if result["status"] == "failed":
+            print(f"Error sending alert {alert['_id']}: {result['error']}")
+            outbox.update_one({"_id": alert["_id"]}, {"$set": {"status": "failed", "error": result["error"]}})
+        else:
+            outbox.update_one({"_id": alert["_id"]}, {"$set": {
+                "status": "digest" if result["status"] == "digest" else "sent",
+                "sent_at": datetime.utcnow(),
+                "bulk_email_id": result["bulk_email_id"],
+            }})
+            sent += 1
+    return sent
+
+
+def process_absence_alerts(absences) -> int:
+    """Evaluate a batch's absences and send the resulting alerts. Returns alerts sent."""
+    if evaluate_absence_alerts(absences):
+        return deliver_queued_alerts()
+    return 0
@@ -0,0 +1,344 @@
+# analytics_db.py
+import os
+import json
+import glob
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from students_db import read_collection
+from instructors_db import list_programs
+
+# Parquet snapshot lives next to the app; one folder per table.
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snapshot")
+META_FILE = os.path.join(SNAPSHOT_DIR, "meta.json")
+
+# Incremental refreshes only append new attendance rows. Edits to existing
+# rows are picked up by a periodic full rebuild (or an explicit stale mark).
+FULL_REFRESH_INTERVAL = timedelta(hours=6)
+
+ATTENDANCE_COLUMNS = ["student_id", "name", "program_id", "date", "status", "comment"]
+
+
+def _table_dir(table: str) -> str:
+    path = os.path.join(SNAPSHOT_DIR, table)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _load_meta() -> dict:
+    if not os.path.exists(META_FILE):
+        return {}
+    with open(META_FILE, "r") as f:
+        return json.load(f)
+
+
+def _save_meta(meta: dict):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = META_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, default=str)
+    os.replace(tmp_path, META_FILE)
+
+
+def _write_parquet(df, table: str, part_name: str = "part-0", replace: bool = True):
+    """
+    Write a DataFrame as one Parquet part file under data/snapshot/<table>/.
+    If replace is True, other parts are removed once the new one is in place,
+    so readers never see an empty table.
+    """
+    folder = _table_dir(table)
+    final_path = os.path.join(folder, f"{part_name}.parquet")
+    tmp_path = final_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, final_path)
+    if replace:
+        for old in glob.glob(os.path.join(folder, "*.parquet")):
+            if old != final_path:
+                os.remove(old)
+
+
+def _mongo_attendance_total() -> int:
+    """Number of attendance records currently stored in Mongo (both storage modes, plus the archive)."""
+    coll = read_collection("Student_Records", "analytics_snapshot")
+    result = list(coll.aggregate([
+        {"$project": {"n": {"$size": {"$ifNull": ["$attendance", []]}}}},
+        {"$unionWith": {"coll": "Attendance_Sessions", "pipeline": [
+            {"$project": {"n": {"$size": {"$objectToArray": {"$ifNull": ["$statuses", {}]}}}}}
+        ]}},
+        {"$unionWith": {"coll": "Attendance_Archive", "pipeline": [{"$project": {"n": 1}}]}},
+        {"$group": {"_id": None, "total": {"$sum": "$n"}}}
+    ]))
+    return result[0]["total"] if result else 0
+
+
+def _fetch_attendance_rows(after_date=None) -> list:
+    """
+    Flattened attendance rows from Student_Records (and Attendance_Sessions,
+    and Attendance_Archive if after_date reaches back into it).
+    If after_date is given, only rows with attendance.date > after_date.
+    """
+    from attendance_sessions_db import union_session_rows
+    from attendance_archive import archive_reaches, archived_rows
+
+    coll = read_collection("Student_Records", "analytics_snapshot")
+    pipeline = [{"$unwind": "$attendance"}]
+    if after_date is not None:
+        pipeline.append({"$match": {"attendance.date": {"$gt": after_date}}})
+    pipeline.append(union_session_rows(
+        {"session_datetime": {"$gt": after_date}} if after_date is not None else None
+    ))
+    pipeline.append({
+        "$project": {
+            "_id": 0,
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "date": "$attendance.date",
+            "status": "$attendance.status",
+            "comment": "$attendance.comment"
+        }
+    })
+    rows = list(coll.aggregate(pipeline))
+    if archive_reaches(after_date):
+        rows += [
+            {"student_id": r["student_id"], "name": r["name"], "program_id": r["program_id"], **r["attendance"]}
+            for r in archived_rows(start=after_date)
+            if after_date is None or r["attendance"]["date"] > after_date
+        ]
+    return rows
+
+
+def _attendance_frame(rows: list):
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=ATTENDANCE_COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["comment"] = df["comment"].fillna("").astype(str)
+    return df
+
+
+def refresh_snapshot(full: bool = False) -> dict:
+    """
+    Refresh the Parquet snapshot of programs, students and attendance.
+
+    Programs (Postgres) and students (Mongo, without the attendance array) are
+    small and always rewritten. Attendance is appended incrementally: only
+    rows newer than the last watermark are fetched and written as a new part.
+    If the Mongo row count no longer matches the snapshot afterwards (deletes,
+    back-dated entries), we fall back to a full rebuild.
+
+    Returns the updated snapshot metadata.
+    """
+    import pandas as pd
+
+    meta = _load_meta()
+    now = datetime.utcnow()
+
+    last_full = meta.get("last_full_refresh")
+    if last_full:
+        last_full = datetime.fromisoformat(last_full)
+    if (not last_full or meta.get("stale")
+            or now - last_full > FULL_REFRESH_INTERVAL):
+        full = True
+
+    # 1) Programs from Postgres
+    programs_df = pd.DataFrame(list_programs(), columns=["program_id", "program_name"])
+    _write_parquet(programs_df, "programs")
+
+    # 2) Students from Mongo (no attendance array)
+    coll = read_collection("Student_Records", "analytics_snapshot")
+    students = list(coll.find({}, {
+        "_id": 0, "student_id": 1, "name": 1, "program_id": 1,
+        "grade": 1, "school": 1, "missed_count": 1
+    }))
+    students_df = pd.DataFrame(
+        students,
+        columns=["student_id", "name", "program_id", "grade", "school", "missed_count"]
+    )
+    students_df["grade"] = students_df["grade"].astype(str)
+    students_df["school"] = students_df["school"].astype(str)
+    _write_parquet(students_df, "students")
+
+    # 3) Attendance, incrementally where possible
+    watermark = meta.get("attendance_watermark")
+    if not full and watermark:
+        new_rows = _fetch_attendance_rows(after_date=datetime.fromisoformat(watermark))
+        if new_rows:
+            new_df = _attendance_frame(new_rows)
+            _write_parquet(new_df, "attendance", part_name=f"part-{now:%Y%m%d%H%M%S%f}", replace=False)
+            meta["attendance_rows"] = meta.get("attendance_rows", 0) + len(new_df)
+            meta["attendance_watermark"] = new_df["date"].max().isoformat()
+
+        # Deletes or back-dated inserts leave the counts out of sync
+        if meta.get("attendance_rows", 0) != _mongo_attendance_total():
+            full = True
+
+    if full:
+        all_df = _attendance_frame(_fetch_attendance_rows())
+        _write_parquet(all_df, "attendance")
+        meta["attendance_rows"] = len(all_df)
+        meta["attendance_watermark"] = (
+            all_df["date"].max().isoformat() if not all_df.empty else datetime(1970, 1, 1).isoformat()
+        )
+        meta["last_full_refresh"] = now.isoformat()
+        meta["stale"] = False
+
+    meta["refreshed_at"] = now.isoformat()
+    _save_meta(meta)
+    return meta
+
+
+def mark_snapshot_stale():
+    """
+    Flag the snapshot so the next refresh does a full rebuild.
+    Call this after edits or deletes of existing attendance rows.
+    """
+    meta = _load_meta()
+    meta["stale"] = True
+    _save_meta(meta)
+
+
+def ensure_snapshot(max_age: timedelta = timedelta(minutes=5)) -> dict:
+    """
+    Refresh the snapshot if it is missing, stale or older than max_age.
+    Returns the snapshot metadata.
+    """
+    meta = _load_meta()
+    refreshed_at = meta.get("refreshed_at")
+    if (not refreshed_at or meta.get("stale")
+            or datetime.utcnow() - datetime.fromisoformat(refreshed_at) > max_age
+            or not glob.glob(os.path.join(SNAPSHOT_DIR, "attendance", "*.parquet"))):
+        meta = refresh_snapshot()
+    return meta
+
+
+@st.cache_resource
+def _duckdb_connection():
+    """
+    One embedded DuckDB database per process, with views over the snapshot.
+    The views re-read the Parquet glob on every query, so new parts show up
+    without recreating the connection.
+    """
+    import duckdb
+
+    con = duckdb.connect(database=":memory:")
+    for table in ("attendance", "students", "programs"):
+        pattern = os.path.join(_table_dir(table), "*.parquet").replace("'", "''")
+        con.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{pattern}')")
+    return con
+
+
+def _query(sql: str, params: list = None):
+    """Run a query on a per-call cursor and return a pandas DataFrame."""
+    cursor = _duckdb_connection().cursor()
+    try:
+        return cursor.execute(sql, params or []).df()
+    finally:
+        cursor.close()
+
+
+def _build_where(program_ids=None, names=None, statuses=None,
+                 start_date=None, end_date=None, text=None):
+    """
+    Translate explorer filters into a SQL WHERE clause plus parameters.
+    program_ids=None means no program restriction (admin).
+    """
+    clauses = ["1 = 1"]
+    params = []
+    if program_ids is not None:
+        clauses.append("list_contains(?, a.program_id)")
+        params.append(list(program_ids))
+    if names:
+        clauses.append("list_contains(?, a.name)")
+        params.append(list(names))
+    if statuses:
+        clauses.append("list_contains(?, a.status)")
+        params.append(list(statuses))
+    if start_date is not None:
+        clauses.append("a.date >= ?")
+        params.append(datetime.combine(start_date, datetime.min.time()))
+    if end_date is not None:
+        clauses.append("a.date < ?")
+        params.append(datetime.combine(end_date, datetime.min.time()) + timedelta(days=1))
+    if text:
+        clauses.append("(a.name ILIKE ? OR a.comment ILIKE ?)")
+        params += [f"%{text}%", f"%{text}%"]
+    return " AND ".join(clauses), params
+
+
+def get_filter_options(program_ids=None) -> dict:
+    """
+    Distinct names, statuses and the date range available to the caller,
+    used to populate the explorer filter widgets.
+    """
+    where, params = _build_where(program_ids)
+    names = _query(f"SELECT DISTINCT a.name FROM attendance a WHERE {where} ORDER BY 1", params)
+    statuses = _query(f"SELECT DISTINCT a.status FROM attendance a WHERE {where} ORDER BY 1", params)
+    bounds = _query(f"SELECT min(a.date) AS first, max(a.date) AS last FROM attendance a WHERE {where}", params)
+    return {
+        "names": names["name"].dropna().tolist(),
+        "statuses": statuses["status"].dropna().tolist(),
+        "first_date": bounds["first"].iloc[0],
+        "last_date": bounds["last"].iloc[0],
+    }
+
+
+def query_attendance(limit: int = None, **filters):
+    """
+    Filtered attendance rows joined with program names, newest first.
+    Accepts the same keyword filters as _build_where().
+    """
+    where, params = _build_where(**filters)
+    sql = f"""
+        SELECT a.student_id, a.name, a.program_id,
+               coalesce(p.program_name, 'Program ID=' || a.program_id) AS program_name,
+               a.date, a.status, a.comment
+        FROM attendance a
+        LEFT JOIN programs p ON p.program_id = a.program_id
+        WHERE {where}
+        ORDER BY a.date DESC
+    """
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return _query(sql, params)
+
+
+def count_attendance(**filters) -> int:
+    where, params = _build_where(**filters)
+    return int(_query(f"SELECT count(*) AS n FROM attendance a WHERE {where}", params)["n"].iloc[0])
+
+
+def status_counts(**filters):
+    """[status, count] for the filtered rows."""
+    where, params = _build_where(**filters)
+    return _query(f"""
+        SELECT a.status, count(*) AS count
+        FROM attendance a WHERE {where}
+        GROUP BY a.status ORDER BY count DESC
+    """, params)
+
+
+def daily_attendance_score(**filters):
+    """
+    [date, attendance_value] per calendar day, where Present=1, Late=0.5,
+    anything else 0 (same scoring as the report tabs).
+    """
+    where, params = _build_where(**filters)
+    return _query(f"""
+        SELECT CAST(a.date AS DATE) AS date,
+               avg(CASE a.status WHEN 'Present' THEN 1.0 WHEN 'Late' THEN 0.5 ELSE 0.0 END) AS attendance_value
+        FROM attendance a WHERE {where}
+        GROUP BY 1 ORDER BY 1
+    """, params)
+
+
+def student_status_counts(**filters):
+    """[name, status, count] for the filtered rows."""
+    where, params = _build_where(**filters)
+    return _query(f"""
+        SELECT a.name, a.status, count(*) AS count
+        FROM attendance a WHERE {where}
+        GROUP BY 1, 2 ORDER BY 1, 2
+    """, params)
@@ -0,0 +1,387 @@
+# attendance_archive.py
+"""
+Archive tier for attendance in closed terms.
+
+Student_Records keeps every attendance entry forever, so every full-document
+read of a student drags their whole history along. This job moves entries
+from closed terms (half-years, see attendance_codec) before a cutoff out of
+the attendance array into Attendance_Archive, one packed block per student
+per term:
+
+    {_id: "<student_id>:<term>", student_id, name, program_id, term,
+     term_start, term_end, n, offsets, codes, comments,
+     counts: {Present, Late, Absent, Excused}, updated_at}
+
+Reporting reads (students_db, analytics_db, the attendance cache) union the
+archive back in when the range they ask for reaches before the archived
+cutoff. missed_count is unchanged by archiving; reconcile counts archived
+absences too.
+
+Both directions are resumable batch jobs (progress is kept in
+Job_Checkpoints, and re-running one never duplicates entries). Each student
+or block moves in one transaction, writing the archive and Student_Records
+together, so a crash never leaves entries counted in both places; this
+needs a replica set (Atlas always is one; a single-node replica set does
+for development):
+
+    python attendance_archive.py archive                   # terms closed over a year ago
+    python attendance_archive.py archive --before 2025-07-01
+    python attendance_archive.py restore --student-id ab12cd34
+    python attendance_archive.py restore --from-term 2024H2
+"""
+import os
+import argparse
+from datetime import datetime, timedelta
+
+import pymongo
+
+from attendance_codec import STATUS_CODES, term_of, term_start, encode_term, decode_term
+from shared_cache import cached, invalidate
+from students_db import run_transaction, ATTENDANCE_VERSION
+
+ARCHIVE_JOB = "attendance_archive"
+RESTORE_JOB = "attendance_restore"
+
+# Default cutoff: terms that closed at least this long ago
+ARCHIVE_RETENTION = timedelta(days=365)
+
+DEFAULT_BATCH_SIZE = 200
+
+# Attempts per student when their record changes while it is being archived
+MAX_ATTEMPTS = 3
+
+# How long readers may go on using a cached archived_through() after an
+# archive run in another process (the jobs invalidate it themselves)
+ARCHIVE_STATE_TTL = 600
+
+
+class _RecordChanged(Exception):
+    """The student's record changed after it was read; the transaction is rolled back."""
+
+
+def _student_db(connection_string=None):
+    """The Student_Data database: from an explicit connection string, or the app's."""
+    if connection_string:
+        return pymongo.MongoClient(connection_string)["Student_Data"]
+    from students_db import connect_to_db
+    return connect_to_db()
+
+
+def _archive_collection(db):
+    coll = db["Attendance_Archive"]
+    coll.create_index([("student_id", pymongo.ASCENDING), ("term_start", pymongo.ASCENDING)])
+    coll.create_index([("program_id", pymongo.ASCENDING), ("term_start", pymongo.ASCENDING)])
+    coll.create_index([("term_start", pymongo.ASCENDING), ("term_end", pymongo.ASCENDING)])
+    coll.create_index("updated_at")
+    return coll
+
+
+def closed_term_cutoff(before: datetime) -> datetime:
+    """The start of the term containing `before`: everything earlier is in closed terms."""
+    return term_start(term_of(before))
+
+
+def term_end(term: str) -> datetime:
+    start = term_start(term)
+    return term_start(term_of(start + timedelta(days=200)))
+
+
+def _entry_key(entry: dict) -> tuple:
+    """What makes two entries the same session: full timestamp and status."""
+    return entry["date"], entry.get("status")
+
+
+def _archivable(cutoff: datetime) -> dict:
+    """Match for attendance entries that go to the archive."""
+    return {"date": {"$lt": cutoff}, "status": {"$in": list(STATUS_CODES)}}
+
+
+def _block(doc: dict, term: str, entries: list) -> dict:
+    block = encode_term(term, entries)
+    counts = dict.fromkeys(STATUS_CODES, 0)
+    for e in entries:
+        counts[e["status"]] += 1
+    return {
+        **block,
+        "_id": f"{doc['student_id']}:{term}",
+        "student_id": doc["student_id"],
+        "name": doc.get("name", ""),
+        "program_id": doc.get("program_id"),
+        "term_end": term_end(term),
+        "counts": counts,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _archive_student(db, doc: dict, cutoff: datetime) -> int:
+    """
+    Move one student's entries before `cutoff` into their term blocks and
+    pull them from the record, in one transaction that only commits if the
+    record hasn't changed since it was read (else re-read and retry).
+    Entries are merged with any existing block, skipping ones already there
+    (same timestamp and status), so a re-run never duplicates them.
+    Returns the number of entries moved.
+    """
+    archive = db["Attendance_Archive"]
+    students = db["Student_Records"]
+    for _ in range(MAX_ATTEMPTS):
+        old = [
+            e for e in doc.get("attendance") or []
+            if isinstance(e.get("date"), datetime) and e["date"] < cutoff and e.get("status") in STATUS_CODES
+        ]
+        if not old:
+            return 0
+
+        by_term = {}
+        for e in old:
+            by_term.setdefault(term_of(e["date"]), []).append(e)
+
+        def write(session):
+            existing = {
+                b["term"]: b
+                for b in archive.find({"_id": {"$in": [f"{doc['student_id']}:{t}" for t in by_term]}},
+                                      session=session)
+            }
+            ops = []
+            for term, entries in by_term.items():
+                merged = decode_term(existing[term]) if term in existing else []
+                archived = {_entry_key(e) for e in merged}
+                merged += [e for e in entries if _entry_key(e) not in archived]
+                block = _block(doc, term, merged)
+                ops.append(pymongo.ReplaceOne({"_id": block["_id"]}, block, upsert=True))
+            archive.bulk_write(ops, ordered=False, session=session)
+
+            result = students.update_one(
+                {"_id": doc["_id"], ATTENDANCE_VERSION: doc.get(ATTENDANCE_VERSION)},
+                {
+                    "$pull": {"attendance": _archivable(cutoff)},
+                    "$inc": {ATTENDANCE_VERSION: 1},
+                    "$currentDate": {"updated_at": True}
+                },
+                session=session
+            )
+            if not result.modified_count:
+                raise _RecordChanged()
+
+        try:
+            run_transaction(db, write)
+            return len(old)
+        except _RecordChanged:
+            doc = students.find_one({"_id": doc["_id"]}, {"student_id": 1, "name": 1, "program_id": 1,
+                                                          "attendance": 1, ATTENDANCE_VERSION: 1})
+            if doc is None:
+                return 0
+    print(f"Student {doc.get('student_id')} kept changing; left for the next run.")
+    return 0
+
+
+def archive_attendance(before: datetime = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       connection_string=None) -> dict:
+    """
+    Archive attendance in terms that closed before `before` (default:
+    ARCHIVE_RETENTION ago). Students are processed in _id order,
+    batch_size at a time, with the position checkpointed after each batch;
+    an interrupted run with the same cutoff resumes where it stopped.
+    Returns {cutoff, students, entries}.
+    """
+    db = _student_db(connection_string)
+    _archive_collection(db)
+    checkpoints = db["Job_Checkpoints"]
+    cutoff = closed_term_cutoff(before or datetime.utcnow() - ARCHIVE_RETENTION)
+
+    checkpoint = checkpoints.find_one({"_id": ARCHIVE_JOB}) or {}
+    last_id = None
+    if checkpoint.get("status") == "running" and checkpoint.get("cutoff") == cutoff:
+        last_id = checkpoint.get("last_id")
+    checkpoints.update_one(
+        {"_id": ARCHIVE_JOB},
+        {"$set": {"status": "running", "cutoff": cutoff, "last_id": last_id, "started_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+    query = {"attendance": {"$elemMatch": _archivable(cutoff)}}
+    students = entries = 0
+    while True:
+        page = {**query, "_id": {"$gt": last_id}} if last_id else query
+        batch = list(
+            db["Student_Records"]
+            .find(page, {"student_id": 1, "name": 1, "program_id": 1, "attendance": 1, ATTENDANCE_VERSION: 1})
+            .sort("_id", pymongo.ASCENDING)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+        for doc in batch:
+            moved = _archive_student(db, doc, cutoff)
+            students += 1 if moved else 0
+            entries += moved
+        last_id = batch[-1]["_id"]
+        checkpoints.update_one({"_id": ARCHIVE_JOB}, {"$set": {"last_id": last_id}})
+
+    checkpoints.update_one(
+        {"_id": ARCHIVE_JOB},
+        {"$set": {"status": "done", "finished_at": datetime.utcnow()},
+         "$max": {"archived_through": cutoff}}
+    )
+    invalidate("archive")
+    return {"cutoff": cutoff, "students": students, "entries": entries}
+
+
+def restore_attendance(student_id: str = None, from_term: str = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE, connection_string=None) -> dict:
+    """
+    Move archived blocks back into Student_Records: one student's, those
+    from `from_term` on, or all of them. Each block's entries are pushed
+    and the block deleted in one transaction, so an interrupted restore
+    can simply be run again. Entries already present (same timestamp and
+    status) are not pushed twice.
+    Returns {blocks, entries, skipped} (skipped: blocks whose student no
+    longer exists, which stay archived).
+    """
+    db = _student_db(connection_string)
+    archive = _archive_collection(db)
+    students = db["Student_Records"]
+    checkpoints = db["Job_Checkpoints"]
+
+    query = {}
+    if student_id:
+        query["student_id"] = student_id
+    if from_term:
+        query["term_start"] = {"$gte": term_start(from_term)}
+    checkpoints.update_one(
+        {"_id": RESTORE_JOB},
+        {"$set": {"status": "running", "query": {"student_id": student_id, "from_term": from_term},
+                  "started_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+    blocks = entries = skipped = 0
+    last_id = None
+    while True:
+        page = {**query, "_id": {"$gt": last_id}} if last_id else query
+        batch = list(archive.find(page).sort("_id", pymongo.ASCENDING).limit(batch_size))
+        if not batch:
+            break
+        for block in batch:
+            def write(session, block=block):
+                doc = students.find_one({"student_id": block["student_id"]},
+                                        {"attendance.date": 1, "attendance.status": 1}, session=session)
+                if doc is None:
+                    return None
+                present = {_entry_key(a) for a in doc.get("attendance") or []}
+                missing = [e for e in decode_term(block) if _entry_key(e) not in present]
+                if missing:
+                    # Archived entries predate everything live, so they go in front
+                    students.update_one(
+                        {"_id": doc["_id"]},
+                        {
+                            "$push": {"attendance": {"$each": missing, "$position": 0}},
+                            "$inc": {ATTENDANCE_VERSION: 1},
+                            "$currentDate": {"updated_at": True}
+                        },
+                        session=session
+                    )
+                archive.delete_one({"_id": block["_id"]}, session=session)
+                return len(missing)
+
+            restored = run_transaction(db, write)
+            if restored is None:
+                skipped += 1
+                continue
+            blocks += 1
+            entries += restored
+        last_id = batch[-1]["_id"]
+
+    checkpoints.update_one({"_id": RESTORE_JOB}, {"$set": {"status": "done", "finished_at": datetime.utcnow()}})
+    invalidate("archive")
+    return {"blocks": blocks, "entries": entries, "skipped": skipped}
+
+
+@cached("archive", ttl=ARCHIVE_STATE_TTL)
+def archived_through():
+    """
+    The latest cutoff any archive run completed (None if nothing was ever
+    archived). Cached, since every reporting read asks.
+    """
+    from students_db import connect_to_db
+    checkpoint = connect_to_db()["Job_Checkpoints"].find_one({"_id": ARCHIVE_JOB}, {"archived_through": 1})
+    return (checkpoint or {}).get("archived_through")
+
+
+def archive_reaches(start) -> bool:
+    """Whether a read starting at `start` (None: the beginning) needs the archive."""
+    through = archived_through()
+    return through is not None and (start is None or start < through)
+
+
+def union_archive_counts(match: dict = None) -> dict:
+    """
+    A $unionWith stage appending one row per archived block to an unwound
+    pipeline: {student_id, name, program_id, archived_counts: {status: n}}.
+    """
+    pipeline = [{"$match": match}] if match else []
+    pipeline.append({"$project": {"_id": 0, "student_id": 1, "name": 1, "program_id": 1,
+                                  "archived_counts": "$counts"}})
+    return {"$unionWith": {"coll": "Attendance_Archive", "pipeline": pipeline}}
+
+
+def archived_rows(start: datetime = None, end: datetime = None, program_ids=None) -> list:
+    """
+    Archived attendance with start <= date <= end, shaped like an unwound
+    Student_Records document: {student_id, name, program_id, attendance:
+    {date, status, comment}}.
+    """
+    from students_db import read_collection
+
+    query = {}
+    if start is not None:
+        query["term_end"] = {"$gt": start}
+    if end is not None:
+        query["term_start"] = {"$lte": end}
+    if program_ids:
+        query["program_id"] = {"$in": list(program_ids)}
+
+    rows = []
+    for block in read_collection("Attendance_Archive", "attendance_archive").find(query):
+        for entry in decode_term(block):
+            if (start is None or entry["date"] >= start) and (end is None or entry["date"] <= end):
+                rows.append({
+                    "student_id": block["student_id"],
+                    "name": block.get("name", ""),
+                    "program_id": block.get("program_id"),
+                    "attendance": entry,
+                })
+    return rows
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Archive or restore attendance in closed terms.")
+    arg_parser.add_argument("--connection-string", default=os.environ.get("CONNECTION_STRING"),
+                            help="MongoDB connection string (default: $CONNECTION_STRING, "
+                                 "else .streamlit/secrets.toml)")
+    arg_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    archive_cmd = commands.add_parser("archive", help="move closed terms into Attendance_Archive")
+    archive_cmd.add_argument("--before", type=datetime.fromisoformat,
+                             help="archive terms that closed before this date "
+                                  f"(default: {ARCHIVE_RETENTION.days} days ago)")
+
+    restore_cmd = commands.add_parser("restore", help="move archived terms back into Student_Records")
+    restore_cmd.add_argument("--student-id")
+    restore_cmd.add_argument("--from-term", help='e.g. "2024H2"')
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "archive":
+        result = archive_attendance(args.before, args.batch_size, args.connection_string)
+        print(f"Archived {result['entries']} entries for {result['students']} students "
+              f"(terms before {result['cutoff']:%Y-%m-%d}).")
+    else:
+        result = restore_attendance(args.student_id, args.from_term, args.batch_size, args.connection_string)
+        print(f"Restored {result['entries']} entries from {result['blocks']} blocks "
+              f"({result['skipped']} skipped: student no longer exists).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
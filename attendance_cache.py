@@ -0,0 +1,401 @@
+# attendance_cache.py
+"""
+Process-wide columnar cache of attendance, for the analytics pages.
+
+Every attendance entry (embedded in Student_Records, stored per session in
+Attendance_Sessions, or packed per term in Attendance_Archive) becomes one row of four parallel NumPy arrays:
+
+    student  int32   index into AttendanceCache.student_ids / names
+    program  int32   index into AttendanceCache.program_ids
+    day      int32   days since 1970-01-01
+    code     uint8   attendance_codec.STATUS_CODES
+
+plus the index of the document each row came from, for delta refreshes.
+
+The cache is built once per process (get_attendance_cache() is a
+cache_resource, so all sessions share it) and then refreshed by deltas:
+documents whose updated_at is newer than the last one seen have their rows
+replaced. If a collection's document count no longer matches (deletes), it
+is rebuilt in full. While a change-stream watcher is feeding it
+(change_streams.py) it is marked live and updated one document at a time
+instead. Queries are vectorized over the arrays and never touch Mongo.
+"""
+import threading
+from collections import namedtuple
+from datetime import datetime, date, timedelta
+
+import numpy as np
+import streamlit as st
+
+from students_db import read_collection
+from sessions_db import ATTENDED_STATUSES
+from attendance_codec import STATUS_CODES, CODE_STATUSES, decode_term
+
+# Rows are re-read for documents written this long before the watermark, in
+# case writes commit out of updated_at order or the secondary being read
+# (students_db.READ_WORKLOADS) lags; keep it above the staleness bound
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+# How stale attendance_cache() lets the data get before a delta refresh
+DEFAULT_MAX_AGE = timedelta(seconds=30)
+
+STATUSES = list(CODE_STATUSES)
+ATTENDED_CODES = [STATUS_CODES[s] for s in ATTENDED_STATUSES]
+ABSENT_CODE = STATUS_CODES["Absent"]
+# Same scoring as the report tabs: Present=1, Late=0.5, anything else 0
+SCORES = np.array([1.0, 0.5, 0.0, 0.0])
+
+_Columns = namedtuple("_Columns", ["student", "program", "day", "code", "source"])
+
+SOURCE_COLLECTIONS = ("Student_Records", "Attendance_Sessions", "Attendance_Archive")
+
+# Just the fields _document_rows() reads
+SOURCE_PROJECTIONS = {
+    "Student_Records": {
+        "student_id": 1, "name": 1, "program_id": 1, "updated_at": 1,
+        "attendance.date": 1, "attendance.status": 1
+    },
+    "Attendance_Sessions": {"program_id": 1, "session_datetime": 1, "statuses": 1, "updated_at": 1},
+    "Attendance_Archive": {
+        "student_id": 1, "name": 1, "program_id": 1, "updated_at": 1,
+        "term_start": 1, "n": 1, "offsets": 1, "codes": 1
+    },
+}
+
+
+def _empty_columns() -> _Columns:
+    return _Columns(
+        np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int32),
+        np.empty(0, np.uint8), np.empty(0, np.int32)
+    )
+
+
+EPOCH = date(1970, 1, 1)
+
+
+def _day(value) -> int:
+    """A date or datetime as days since 1970-01-01."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def _date(day: int) -> date:
+    return EPOCH + timedelta(days=int(day))
+
+
+class AttendanceCache:
+    """Attendance as NumPy columns, with vectorized counts, rates, streaks and pivots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cols = _empty_columns()
+        self.student_ids, self.names, self._student_index = [], [], {}
+        self.program_ids, self._program_index = [], {}
+        self._source_index = {}
+        self._next_source = 0
+        self._source_counts = dict.fromkeys(SOURCE_COLLECTIONS, 0)
+        self._watermark = None
+        self.refreshed_at = None
+        # Set by change_streams while it is applying changes as they happen
+        self.live = False
+        # Bumped on every change, so live views can tell when to redraw
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _student(self, student_id, name) -> int:
+        idx = self._student_index.get(student_id)
+        if idx is None:
+            idx = self._student_index[student_id] = len(self.student_ids)
+            self.student_ids.append(student_id)
+            self.names.append(name or "")
+        elif name:
+            self.names[idx] = name
+        return idx
+
+    def _program(self, program_id) -> int:
+        idx = self._program_index.get(program_id)
+        if idx is None:
+            idx = self._program_index[program_id] = len(self.program_ids)
+            self.program_ids.append(program_id)
+        return idx
+
+    def _source(self, collection: str, doc_id) -> int:
+        key = (collection, doc_id)
+        idx = self._source_index.get(key)
+        if idx is None:
+            idx = self._source_index[key] = self._next_source
+            self._next_source += 1
+            self._source_counts[collection] += 1
+        return idx
+
+    def _document_rows(self, collection: str, doc: dict) -> list:
+        """Rows (student, program, datetime, code, source) for one source document."""
+        src = self._source(collection, doc["_id"])
+        if collection == "Student_Records":
+            entries = [
+                (doc.get("student_id"), doc.get("name"), doc.get("program_id"), e.get("date"), e.get("status"))
+                for e in doc.get("attendance") or []
+            ]
+        elif collection == "Attendance_Archive":
+            entries = [
+                (doc.get("student_id"), doc.get("name"), doc.get("program_id"), e["date"], e["status"])
+                for e in decode_term(doc)
+            ]
+        else:
+            entries = [
+                (student_id, e.get("name"), doc.get("program_id"), doc.get("session_datetime"), e.get("status"))
+                for student_id, e in (doc.get("statuses") or {}).items()
+            ]
+        rows = []
+        for student_id, name, program_id, when, status in entries:
+            code = STATUS_CODES.get(status)
+            if code is not None and isinstance(when, datetime):
+                rows.append((self._student(student_id, name), self._program(program_id), when, code, src))
+        return rows
+
+    def _load(self, since=None):
+        """
+        Rows for documents written since `since` (all documents if None).
+        Returns (rows, source indexes read, newest updated_at).
+        """
+        match = {"updated_at": {"$gte": since - REFRESH_OVERLAP}} if since else {}
+        rows, sources, newest = [], [], since
+        for collection in SOURCE_COLLECTIONS:
+            coll = read_collection(collection, "attendance_cache")
+            for doc in coll.find(match, SOURCE_PROJECTIONS[collection]):
+                rows.extend(self._document_rows(collection, doc))
+                sources.append(self._source_index[(collection, doc["_id"])])
+                if doc.get("updated_at") and (newest is None or doc["updated_at"] > newest):
+                    newest = doc["updated_at"]
+        return rows, sources, newest
+
+    @staticmethod
+    def _columns(rows: list) -> _Columns:
+        if not rows:
+            return _empty_columns()
+        student, program, when, code, source = zip(*rows)
+        return _Columns(
+            np.array(student, np.int32),
+            np.array(program, np.int32),
+            np.array(when, dtype="datetime64[D]").astype(np.int32),
+            np.array(code, np.uint8),
+            np.array(source, np.int32),
+        )
+
+    def refresh(self, full: bool = False):
+        """
+        Bring the cache up to date: a delta refresh from the updated_at
+        watermark, or a full rebuild if asked, on first use, or when a
+        collection's document count shows something was deleted.
+        """
+        with self._lock:
+            full = full or self._watermark is None
+            if not full:
+                rows, sources, newest = self._load(self._watermark)
+                cols = self._cols
+                keep = ~np.isin(cols.source, np.array(sources, np.int32))
+                new = self._columns(rows)
+                self._cols = _Columns(*(np.concatenate([c[keep], n]) for c, n in zip(cols, new)))
+                self._watermark = newest
+                full = any(
+                    read_collection(c, "attendance_cache").estimated_document_count() != self._source_counts[c]
+                    for c in SOURCE_COLLECTIONS
+                )
+
+            if full:
+                self._source_index = {}
+                self._next_source = 0
+                self._source_counts = dict.fromkeys(SOURCE_COLLECTIONS, 0)
+                rows, _, newest = self._load()
+                self._cols = self._columns(rows)
+                self._watermark = newest or datetime(1970, 1, 1)
+            self.refreshed_at = datetime.utcnow()
+            self.version += 1
+
+    def apply_document(self, collection: str, doc_id, doc: dict = None):
+        """
+        Replace one source document's rows with those of `doc` (its current
+        full version), or drop them if doc is None (the document was
+        deleted). This is how change_streams keeps a live cache current.
+        """
+        with self._lock:
+            if self._watermark is None:
+                # Not built yet; the first refresh will read it anyway
+                return
+            key = (collection, doc_id)
+            src = self._source_index.get(key)
+            cols = self._cols
+            keep = cols.source != src if src is not None else np.ones(len(cols.source), dtype=bool)
+            if doc is None:
+                if src is not None:
+                    del self._source_index[key]
+                    self._source_counts[collection] -= 1
+                rows = []
+            else:
+                rows = self._document_rows(collection, doc)
+            new = self._columns(rows)
+            self._cols = _Columns(*(np.concatenate([c[keep], n]) for c, n in zip(cols, new)))
+            self.version += 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _select(self, start=None, end=None, program_ids=None) -> _Columns:
+        """Rows with start <= day < end (dates or datetimes), optionally in some programs."""
+        cols = self._cols
+        mask = np.ones(len(cols.day), dtype=bool)
+        if start is not None:
+            mask &= cols.day >= _day(start)
+        if end is not None:
+            mask &= cols.day < _day(end)
+        if program_ids is not None:
+            wanted = [self._program_index[p] for p in program_ids if p in self._program_index]
+            mask &= np.isin(cols.program, np.array(wanted, np.int32))
+        return _Columns(*(c[mask] for c in cols))
+
+    @staticmethod
+    def _by_status(keys, n_keys: int, codes):
+        """[n_keys, 4] matrix of row counts per (key, status)."""
+        flat = np.bincount(keys.astype(np.int64) * 4 + codes, minlength=n_keys * 4)
+        return flat.reshape(n_keys, 4)
+
+    def status_counts(self, **filters) -> dict:
+        """{status: count} over the selected rows (filters as for _select)."""
+        counts = np.bincount(self._select(**filters).code, minlength=4)
+        return {STATUSES[i]: int(counts[i]) for i in range(4)}
+
+    def student_status_counts(self, **filters) -> list:
+        """
+        One dict per student with rows in the selection: student_id, name,
+        program_id, a count per status, total, attended and rate
+        (attended / total).
+        """
+        rows = self._select(**filters)
+        counts = self._by_status(rows.student, len(self.student_ids), rows.code)
+        # A student's latest program in the selection
+        program = np.full(len(self.student_ids), -1, np.int64)
+        order = np.argsort(rows.day, kind="stable")
+        program[rows.student[order]] = rows.program[order]
+        return self._count_rows(
+            counts,
+            lambda i: {"student_id": self.student_ids[i], "name": self.names[i],
+                       "program_id": self.program_ids[program[i]]}
+        )
+
+    def program_status_counts(self, **filters) -> list:
+        """Like student_status_counts(), one dict per program."""
+        rows = self._select(**filters)
+        counts = self._by_status(rows.program, len(self.program_ids), rows.code)
+        return self._count_rows(counts, lambda i: {"program_id": self.program_ids[i]})
+
+    @staticmethod
+    def _count_rows(counts, label) -> list:
+        totals = counts.sum(axis=1)
+        attended = counts[:, ATTENDED_CODES].sum(axis=1)
+        return [
+            {**label(i), **{STATUSES[c]: int(counts[i, c]) for c in range(4)},
+             "total": int(totals[i]), "attended": int(attended[i]),
+             "rate": float(attended[i] / totals[i])}
+            for i in np.flatnonzero(totals)
+        ]
+
+    def daily_rates(self, **filters) -> list:
+        """[{date, total, attended, rate, score}] per day, oldest first. score uses SCORES."""
+        rows = self._select(**filters)
+        days, inverse = np.unique(rows.day, return_inverse=True)
+        totals = np.bincount(inverse, minlength=len(days))
+        attended = np.bincount(inverse, weights=np.isin(rows.code, ATTENDED_CODES), minlength=len(days))
+        scores = np.bincount(inverse, weights=SCORES[rows.code], minlength=len(days))
+        return [
+            {"date": _date(days[i]), "total": int(totals[i]), "attended": int(attended[i]),
+             "rate": float(attended[i] / totals[i]), "score": float(scores[i] / totals[i])}
+            for i in range(len(days))
+        ]
+
+    def absence_streaks(self, **filters) -> list:
+        """
+        Consecutive-absence streaks per student, in date order: current (the
+        run of Absent entries ending at their latest entry) and longest.
+        Students who were never absent are left out; worst current first.
+        """
+        rows = self._select(**filters)
+        if not len(rows.day):
+            return []
+        order = np.lexsort((rows.day, rows.student))
+        student = rows.student[order]
+        absent = rows.code[order] == ABSENT_CODE
+
+        pos = np.arange(len(student))
+        first = np.r_[True, student[1:] != student[:-1]]
+        reset = first | ~absent
+        # Position where each row's current run started (or was broken)
+        anchor = np.maximum.accumulate(np.where(reset, pos, 0))
+        run = np.where(absent, pos - anchor + absent[anchor], 0)
+
+        starts = np.flatnonzero(first)
+        ends = np.r_[starts[1:], len(student)] - 1
+        longest = np.maximum.reduceat(run, starts)
+        found = [
+            {"student_id": self.student_ids[student[s]], "name": self.names[student[s]],
+             "current": int(run[e]), "longest": int(m)}
+            for s, e, m in zip(starts, ends, longest) if m
+        ]
+        found.sort(key=lambda r: (-r["current"], -r["longest"], r["name"]))
+        return found
+
+    def pivot(self, index: str = "student", columns: str = "status", **filters):
+        """
+        A pandas pivot table. index is "student" or "program"; columns is
+        "status" (row counts) or "day" (mean attendance score, NaN where no
+        entries).
+        """
+        import pandas as pd
+
+        rows = self._select(**filters)
+        if index == "student":
+            keys, labels = rows.student, self.names
+        elif index == "program":
+            keys, labels = rows.program, self.program_ids
+        else:
+            raise ValueError(f"Unknown pivot index {index!r}")
+
+        row_keys, row_inv = np.unique(keys, return_inverse=True)
+        if columns == "status":
+            values = self._by_status(row_inv, len(row_keys), rows.code)
+            col_labels = STATUSES
+        elif columns == "day":
+            days, col_inv = np.unique(rows.day, return_inverse=True)
+            cell = row_inv.astype(np.int64) * len(days) + col_inv
+            size = len(row_keys) * len(days)
+            n = np.bincount(cell, minlength=size)
+            total = np.bincount(cell, weights=SCORES[rows.code], minlength=size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = (total / n).reshape(len(row_keys), len(days))
+            col_labels = [_date(d) for d in days]
+        else:
+            raise ValueError(f"Unknown pivot columns {columns!r}")
+        return pd.DataFrame(values, index=[labels[k] for k in row_keys], columns=col_labels)
+
+
+@st.cache_resource
+def get_attendance_cache() -> AttendanceCache:
+    """The process's shared AttendanceCache (empty until first refreshed)."""
+    return AttendanceCache()
+
+
+def attendance_cache(max_age: timedelta = DEFAULT_MAX_AGE) -> AttendanceCache:
+    """
+    The shared cache, delta-refreshed first if it is older than max_age
+    (unless a change-stream watcher is keeping it live).
+    """
+    from change_streams import start_change_watcher
+
+    start_change_watcher()
+    cache = get_attendance_cache()
+    if cache.refreshed_at is None or (
+            not cache.live and datetime.utcnow() - cache.refreshed_at > max_age):
+        cache.refresh()
+    return cache
@@ -0,0 +1,175 @@
+# attendance_codec.py
+"""
+Compact encoding of a student's attendance history, one block per term.
+
+The embedded layout repeats {"date": ..., "status": ..., "comment": ...}
+for every session. A packed term block stores instead:
+
+    {term, term_start,
+     n: number of sessions,
+     offsets: uint32 minutes since term_start, one per session (bytes;
+              dates are kept to the minute),
+     codes: 2-bit status codes, four per byte (bytes),
+     comments: {"<session index>": text} for the few sessions with one}
+
+Encoding and decoding are vectorized with NumPy. Run the storage benchmark
+(5 years of twice-weekly sessions by default) with:
+
+    python attendance_codec.py --benchmark
+"""
+import zlib
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+STATUS_CODES = {"Present": 0, "Late": 1, "Absent": 2, "Excused": 3}
+CODE_STATUSES = np.array(["Present", "Late", "Absent", "Excused"], dtype=object)
+
+# Terms are calendar half-years: "2025H1" (Jan-Jun), "2025H2" (Jul-Dec)
+TERM_MONTHS = 6
+
+
+def term_of(dt: datetime) -> str:
+    return f"{dt.year}H{(dt.month - 1) // TERM_MONTHS + 1}"
+
+
+def term_start(term: str) -> datetime:
+    year, half = term.split("H")
+    return datetime(int(year), (int(half) - 1) * TERM_MONTHS + 1, 1)
+
+
+def pack_codes(codes) -> bytes:
+    """2-bit codes (0..3) -> bytes, four per byte, first code in the high bits."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] << 6 | quads[:, 1] << 4 | quads[:, 2] << 2 | quads[:, 3]).astype(np.uint8).tobytes()
+
+
+def unpack_codes(packed: bytes, n: int):
+    """Inverse of pack_codes: a uint8 array of n codes."""
+    b = np.frombuffer(packed, dtype=np.uint8)
+    quads = np.stack([(b >> 6) & 3, (b >> 4) & 3, (b >> 2) & 3, b & 3], axis=1)
+    return quads.reshape(-1)[:n]
+
+
+def encode_term(term: str, entries: list) -> dict:
+    """
+    Pack one term's attendance entries ({date, status, comment}) into a term
+    block. Entries are sorted by date; unknown statuses raise ValueError.
+    """
+    start = np.datetime64(term_start(term), "m")
+    dates = np.array([e["date"] for e in entries], dtype="datetime64[m]")
+    order = np.argsort(dates, kind="stable")
+    offsets = (dates[order] - start).astype(np.uint32)
+
+    statuses = np.array([e.get("status") for e in entries], dtype=object)[order]
+    try:
+        codes = np.vectorize(STATUS_CODES.__getitem__, otypes=[np.uint8])(statuses) if len(statuses) else []
+    except KeyError as e:
+        raise ValueError(f"Unknown attendance status {e}") from None
+
+    comments = {
+        str(i): entries[j]["comment"]
+        for i, j in enumerate(order)
+        if entries[j].get("comment")
+    }
+    return {
+        "term": term,
+        "term_start": term_start(term),
+        "n": int(len(entries)),
+        "offsets": offsets.astype("<u4").tobytes(),
+        "codes": pack_codes(codes),
+        "comments": comments,
+    }
+
+
+def decode_term(block: dict) -> list:
+    """A term block back into [{date, status, comment}], in date order."""
+    n = block["n"]
+    offsets = np.frombuffer(block["offsets"], dtype="<u4")[:n].astype("timedelta64[m]")
+    dates = (np.datetime64(block["term_start"], "m") + offsets).astype("datetime64[ms]").tolist()
+    statuses = CODE_STATUSES[unpack_codes(block["codes"], n)]
+    comments = block.get("comments") or {}
+    return [
+        {"date": dates[i], "status": statuses[i], "comment": comments.get(str(i), "")}
+        for i in range(n)
+    ]
+
+
+def encode_history(attendance: list) -> list:
+    """Split an embedded attendance array into packed term blocks, oldest first."""
+    by_term = {}
+    for entry in attendance:
+        by_term.setdefault(term_of(entry["date"]), []).append(entry)
+    return [encode_term(term, by_term[term]) for term in sorted(by_term)]
+
+
+def decode_history(blocks: list) -> list:
+    return [entry for block in blocks for entry in decode_term(block)]
+
+
+def _synthetic_history(years: int, sessions_per_week: int, comment_rate: float, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    weeks = years * 52
+    start = datetime(2020, 1, 6, 16, 0)
+    weekdays = [0, 2, 4, 1, 3][:sessions_per_week]
+    statuses = rng.choice(list(STATUS_CODES), size=weeks * len(weekdays), p=[0.8, 0.08, 0.09, 0.03])
+    history = []
+    for w in range(weeks):
+        for k, wd in enumerate(weekdays):
+            i = w * len(weekdays) + k
+            history.append({
+                "date": start + timedelta(weeks=w, days=wd),
+                "status": str(statuses[i]),
+                "comment": "Parent called ahead" if rng.random() < comment_rate else "",
+            })
+    return history
+
+
+def benchmark(years: int = 5, sessions_per_week: int = 2, comment_rate: float = 0.05) -> dict:
+    """
+    BSON size of one student's history in the embedded layout vs packed term
+    blocks, plus the bytes on the wire with zlib network compression.
+    """
+    import bson
+
+    history = _synthetic_history(years, sessions_per_week, comment_rate)
+    base = {"student_id": "a1b2c3d4", "name": "Sample Student", "program_id": 101}
+
+    current = bson.encode({**base, "attendance": history})
+    packed = bson.encode({**base, "attendance_terms": encode_history(history)})
+    assert decode_history(bson.decode(packed)["attendance_terms"]) == [
+        {**e, "date": e["date"].replace(second=0, microsecond=0)} for e in history
+    ]
+    return {
+        "sessions": len(history),
+        "current_bytes": len(current),
+        "packed_bytes": len(packed),
+        "current_wire_zlib": len(zlib.compress(current)),
+        "packed_wire_zlib": len(zlib.compress(packed)),
+        "ratio": len(current) / len(packed),
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Packed attendance encoding.")
+    arg_parser.add_argument("--benchmark", action="store_true", help="compare storage size with the embedded layout")
+    arg_parser.add_argument("--years", type=int, default=5)
+    arg_parser.add_argument("--sessions-per-week", type=int, default=2)
+    args = arg_parser.parse_args(argv)
+
+    if args.benchmark:
+        r = benchmark(args.years, args.sessions_per_week)
+        print(f"{r['sessions']} sessions ({args.years} years, {args.sessions_per_week}/week)")
+        print(f"{'':>12} {'document':>10} {'wire (zlib)':>12}")
+        print(f"{'embedded':>12} {r['current_bytes']:>10,} {r['current_wire_zlib']:>12,}")
+        print(f"{'packed':>12} {r['packed_bytes']:>10,} {r['packed_wire_zlib']:>12,}")
+        print(f"Packed is {r['ratio']:.1f}x smaller.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+# attendance_sessions_db.py
+"""
+Session-centric attendance storage (optional).
+
+By default attendance is embedded per student (Student_Records.attendance),
+so taking attendance for a class of N students writes N documents. With
+
+    ATTENDANCE_STORAGE = "session"
+
+in .streamlit/secrets.toml, a class session is instead one document in
+Attendance_Sessions holding the whole roster's statuses:
+
+    {program_id, session_datetime,
+     statuses: {<student_id>: {name, status, comment}},
+     student_ids: [...], updated_at}
+
+written once per submit. It is unique on (program_id, session_datetime);
+student_ids carries a multikey index so per-student views are indexed.
+students_db's attendance read functions append these records through
+union_session_rows(), so existing pages see both storage modes.
+missed_count is still kept on Student_Records for the absence alerts.
+Edits that touch more than one document (moving an entry to another
+session, with its missed_count) run in a transaction, and renaming or
+deleting a student carries their entries along (students_db), so this
+mode needs a replica set.
+"""
+from datetime import datetime
+
+import pymongo
+import streamlit as st
+
+from students_db import connect_to_db, run_transaction
+
+
+def session_storage_enabled() -> bool:
+    try:
+        return st.secrets.get("ATTENDANCE_STORAGE", "student") == "session"
+    except Exception:
+        return False
+
+
+@st.cache_resource
+def _attendance_sessions():
+    """Attendance_Sessions collection, with its indexes created once per process."""
+    coll = connect_to_db()["Attendance_Sessions"]
+    coll.create_index(
+        [("program_id", pymongo.ASCENDING), ("session_datetime", pymongo.ASCENDING)],
+        unique=True, name="program_session"
+    )
+    coll.create_index([("student_ids", pymongo.ASCENDING), ("session_datetime", pymongo.ASCENDING)])
+    coll.create_index("session_datetime")
+    return coll
+
+
+def record_session_attendance(program_id, session_datetime: datetime, entries: list, session=None) -> dict:
+    """
+    Record (or overwrite) statuses for one class session in a single write.
+
+    `entries` is a list of {student_id, name, status, comment}. Returns
+    {"recorded": n, "new_absences": [student_id, ...]} -- the students who
+    weren't already marked Absent for this session. Pass a client session
+    to make it part of a caller's transaction.
+    """
+    if not entries:
+        return {"recorded": 0, "new_absences": []}
+    if session_datetime is None:
+        session_datetime = datetime.utcnow().replace(second=0, microsecond=0)
+
+    fields = {
+        f"statuses.{e['student_id']}": {
+            "name": e.get("name", ""),
+            "status": e["status"],
+            "comment": e.get("comment") or "",
+        }
+        for e in entries
+    }
+    coll = _attendance_sessions()
+    before = coll.find_one_and_update(
+        {"program_id": program_id, "session_datetime": session_datetime},
+        {
+            "$set": fields,
+            "$addToSet": {"student_ids": {"$each": [e["student_id"] for e in entries]}},
+            "$currentDate": {"updated_at": True},
+        },
+        projection={"statuses": 1},
+        upsert=True,
+        return_document=pymongo.ReturnDocument.BEFORE,
+        session=session
+    )
+
+    # Keep missed_count in step: +1 for new absences, -1 for absences changed away
+    previous = (before or {}).get("statuses", {})
+    was_absent = {sid for sid, v in previous.items() if v.get("status") == "Absent"}
+    now_absent = {e["student_id"] for e in entries if e["status"] == "Absent"}
+    entered = {e["student_id"] for e in entries}
+    new_absences = sorted(now_absent - was_absent)
+    cleared = sorted((was_absent & entered) - now_absent)
+
+    students = coll.database["Student_Records"]
+    for ids, step in ((new_absences, 1), (cleared, -1)):
+        if ids:
+            students.update_many(
+                {"student_id": {"$in": ids}},
+                {"$inc": {"missed_count": step}, "$currentDate": {"updated_at": True}},
+                session=session
+            )
+    return {"recorded": len(entries), "new_absences": new_absences}
+
+
+def _unwound_rows(pre_match: dict = None, row_match: dict = None) -> list:
+    """
+    Pipeline over Attendance_Sessions producing rows shaped like an unwound
+    Student_Records document: {student_id, name, program_id, attendance:
+    {date, status, comment}}, plus attendance_session_id.
+    """
+    pipeline = []
+    if pre_match:
+        pipeline.append({"$match": pre_match})
+    pipeline += [
+        {"$project": {"program_id": 1, "session_datetime": 1, "entry": {"$objectToArray": "$statuses"}}},
+        {"$unwind": "$entry"},
+        {"$project": {
+            "_id": 0,
+            "attendance_session_id": "$_id",
+            "student_id": "$entry.k",
+            "name": "$entry.v.name",
+            "program_id": 1,
+            "attendance": {
+                "date": "$session_datetime",
+                "status": "$entry.v.status",
+                "comment": "$entry.v.comment",
+            },
+        }},
+    ]
+    if row_match:
+        pipeline.append({"$match": row_match})
+    return pipeline
+
+
+def union_session_rows(pre_match: dict = None, row_match: dict = None) -> dict:
+    """A $unionWith stage appending session-stored attendance rows to an unwound pipeline."""
+    return {"$unionWith": {"coll": "Attendance_Sessions", "pipeline": _unwound_rows(pre_match, row_match)}}
+
+
+def get_student_session_attendance(student_id: str, start: datetime = None, end: datetime = None) -> list:
+    """One student's session-stored attendance, through the student_ids index."""
+    match = {"student_ids": student_id}
+    if start or end:
+        match["session_datetime"] = {k: v for k, v in (("$gte", start), ("$lte", end)) if v}
+    return list(_attendance_sessions().aggregate(
+        _unwound_rows(match, {"student_id": student_id}) + [{"$sort": {"attendance.date": 1}}]
+    ))
+
+
+def apply_session_change(change: dict) -> bool:
+    """
+    Edit or delete one student's entry in a session document. `change` has
+    the shape bulk_apply_attendance_changes() takes (student_id, date,
+    status, comment, and delete / new_date / new_status / new_comment) plus
+    attendance_session_id. Like the bulk path, it only applies if the entry
+    still has the status it was loaded with; returns False otherwise.
+    A new_date moves the entry to the program's session at that time.
+    The entry's writes and the missed_count change commit together or not
+    at all, so a failed change can simply be retried.
+    """
+    coll = _attendance_sessions()
+    sid = change["student_id"]
+    key = f"statuses.{sid}"
+    match = {"_id": change["attendance_session_id"], f"{key}.status": change["status"]}
+    students = coll.database["Student_Records"]
+
+    def move_or_delete(session):
+        before = coll.find_one_and_update(
+            match,
+            {"$unset": {key: ""}, "$pull": {"student_ids": sid}, "$currentDate": {"updated_at": True}},
+            projection={"program_id": 1, key: 1},
+            session=session
+        )
+        if before is None:
+            return False
+        if change["status"] == "Absent":
+            students.update_one({"student_id": sid},
+                                {"$inc": {"missed_count": -1}, "$currentDate": {"updated_at": True}},
+                                session=session)
+        if change.get("delete"):
+            return True
+        entry = before["statuses"][sid]
+        record_session_attendance(before["program_id"], change["new_date"], [{
+            "student_id": sid,
+            "name": entry.get("name", ""),
+            "status": change.get("new_status", change["status"]),
+            "comment": change.get("new_comment", change.get("comment")),
+        }], session=session)
+        return True
+
+    if change.get("delete") or change.get("new_date"):
+        return run_transaction(coll.database, move_or_delete)
+
+    updates = {}
+    if "new_status" in change:
+        updates[f"{key}.status"] = change["new_status"]
+    if "new_comment" in change:
+        updates[f"{key}.comment"] = change["new_comment"]
+    if not updates:
+        return True
+    new_status = change.get("new_status", change["status"])
+    step = (new_status == "Absent") - (change["status"] == "Absent")
+
+    def edit(session):
+        result = coll.update_one(match, {"$set": updates, "$currentDate": {"updated_at": True}}, session=session)
+        if result.matched_count == 0:
+            return False
+        if step:
+            students.update_one({"student_id": sid},
+                                {"$inc": {"missed_count": step}, "$currentDate": {"updated_at": True}},
+                                session=session)
+        return True
+
+    return run_transaction(coll.database, edit) if step else edit(None)
+
+
+def rename_session_student(old_student_id: str, new_student_id: str, name: str, session=None):
+    """Re-key a renamed student's entries in every session document they appear in."""
+    coll = _attendance_sessions()
+    coll.update_many(
+        {"student_ids": old_student_id},
+        {"$rename": {f"statuses.{old_student_id}": f"statuses.{new_student_id}"},
+         "$set": {"student_ids.$": new_student_id},
+         "$currentDate": {"updated_at": True}},
+        session=session
+    )
+    coll.update_many({"student_ids": new_student_id}, {"$set": {f"statuses.{new_student_id}.name": name}},
+                     session=session)
+
+
+def delete_session_student(student_id: str, session=None):
+    """Remove a deleted student's entries from every session document."""
+    _attendance_sessions().update_many(
+        {"student_ids": student_id},
+        {"$unset": {f"statuses.{student_id}": ""}, "$pull": {"student_ids": student_id},
+         "$currentDate": {"updated_at": True}},
+        session=session
+    )
@@ -0,0 +1,205 @@
+# change_streams.py
+"""
+Change-stream watcher that keeps caches current as other workers write.
+
+Watches Student_Records, Schedules, Attendance_Sessions and
+Attendance_Archive and, for each change:
+
+  - invalidates just the shared-cache namespaces it affects: the rosters
+    holding that student's program (students_db.roster_namespaces), or the
+    schedule lists;
+  - applies the changed document to this process's attendance cache
+    (attendance_cache.apply_document) and marks it live, so the dashboard's
+    live mode redraws from memory instead of re-querying Mongo.
+
+Change streams need a replica set; a local single-node one is enough:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0
+    mongosh --eval "rs.initiate()"
+
+Enable it in the app with CHANGE_STREAMS = true in .streamlit/secrets.toml
+(one daemon thread per process, started with the attendance cache), or run
+it in the foreground to invalidate a shared cache backend and print changes:
+
+    python change_streams.py --connection-string "mongodb://localhost:27017/?replicaSet=rs0"
+"""
+import time
+import argparse
+import threading
+
+import pymongo
+import streamlit as st
+from pymongo.errors import OperationFailure, PyMongoError
+
+from shared_cache import invalidate
+
+WATCHED_COLLECTIONS = ("Student_Records", "Schedules", "Attendance_Sessions", "Attendance_Archive")
+
+# Fields of Student_Records the attendance cache reads
+ATTENDANCE_FIELDS = ("attendance", "student_id", "name", "program_id")
+
+# Server error codes: not a replica set / resume token no longer in the oplog
+NOT_A_REPLICA_SET = 40573
+HISTORY_LOST = 286
+
+RETRY_DELAY = 5
+
+
+def _changed_fields(change: dict) -> list:
+    description = change.get("updateDescription") or {}
+    return list(description.get("updatedFields") or {}) + list(description.get("removedFields") or [])
+
+
+def affected_namespaces(change: dict) -> list:
+    """Shared-cache namespaces made stale by one change event."""
+    collection = change["ns"]["coll"]
+    if collection == "Schedules":
+        return ["schedules"]
+    if collection != "Student_Records":
+        return []
+
+    doc = change.get("fullDocument")
+    if (change["operationType"] in ("delete", "replace") or doc is None
+            or "program_id" in _changed_fields(change)):
+        # The student's previous program isn't in the event; drop every roster
+        return ["roster"]
+    return ["roster:all", f"roster:{doc.get('program_id')}"]
+
+
+def touches_attendance(change: dict) -> bool:
+    """Whether the change can alter rows in the attendance cache."""
+    collection = change["ns"]["coll"]
+    if collection in ("Attendance_Sessions", "Attendance_Archive"):
+        return True
+    if collection != "Student_Records":
+        return False
+    if change["operationType"] != "update":
+        return True
+    return any(f.split(".")[0] in ATTENDANCE_FIELDS for f in _changed_fields(change))
+
+
+def handle_change(change: dict, cache=None) -> list:
+    """Apply one change event. Returns the namespaces it invalidated."""
+    namespaces = affected_namespaces(change)
+    if namespaces:
+        invalidate(*namespaces)
+    if cache is not None and touches_attendance(change):
+        cache.apply_document(change["ns"]["coll"], change["documentKey"]["_id"], change.get("fullDocument"))
+    return namespaces
+
+
+class ChangeWatcher(threading.Thread):
+    """
+    Follows the change stream in a daemon thread, reconnecting (from the
+    last resume token) after errors. With a cache, it is fully rebuilt once
+    the stream is open, then kept live until the watcher stops.
+    """
+
+    def __init__(self, db, cache=None, on_change=None):
+        super().__init__(name="change-stream-watcher", daemon=True)
+        self.db = db
+        self.cache = cache
+        self.on_change = on_change
+        self.events = 0
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        token = None
+        pipeline = [{"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}}]
+        while not self._stop_event.is_set():
+            try:
+                with self.db.watch(pipeline, full_document="updateLookup",
+                                   resume_after=token, max_await_time_ms=1000) as stream:
+                    if self.cache is not None and token is None:
+                        # The stream is already open, so nothing written
+                        # during the rebuild is missed
+                        self.cache.refresh(full=True)
+                    if self.cache is not None:
+                        self.cache.live = True
+                    self.error = None
+                    while stream.alive and not self._stop_event.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        namespaces = handle_change(change, self.cache)
+                        token = stream.resume_token
+                        self.events += 1
+                        if self.on_change:
+                            self.on_change(change, namespaces)
+            except OperationFailure as e:
+                self.error = str(e)
+                if e.code == NOT_A_REPLICA_SET:
+                    print(f"Change streams unavailable (needs a replica set): {e}")
+                    break
+                if e.code == HISTORY_LOST:
+                    # Too far behind to resume: start over and resync everything
+                    token = None
+                    invalidate("roster", "schedules")
+                print(f"Change stream error, retrying: {e}")
+            except PyMongoError as e:
+                self.error = str(e)
+                print(f"Change stream error, retrying: {e}")
+            finally:
+                if self.cache is not None:
+                    self.cache.live = False
+            self._stop_event.wait(RETRY_DELAY)
+
+
+def change_streams_enabled() -> bool:
+    try:
+        return bool(st.secrets.get("CHANGE_STREAMS", False))
+    except Exception:
+        return False
+
+
+@st.cache_resource
+def _start_change_watcher():
+    from students_db import connect_to_db
+    from attendance_cache import get_attendance_cache
+
+    watcher = ChangeWatcher(connect_to_db(), cache=get_attendance_cache())
+    watcher.start()
+    return watcher
+
+
+def start_change_watcher():
+    """
+    Start this process's watcher (once) if CHANGE_STREAMS is enabled.
+    Returns the ChangeWatcher, or None.
+    """
+    if not change_streams_enabled():
+        return None
+    return _start_change_watcher()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Invalidate shared caches from the Mongo change stream.")
+    arg_parser.add_argument("--connection-string", help="MongoDB URI of a replica set (default: the app's secrets)")
+    args = arg_parser.parse_args(argv)
+
+    if args.connection_string:
+        db = pymongo.MongoClient(args.connection_string)["Student_Data"]
+    else:
+        from students_db import connect_to_db
+        db = connect_to_db()
+
+    def report(change, namespaces):
+        print(f"{change['operationType']} {change['ns']['coll']} "
+              f"{change['documentKey']['_id']} -> {', '.join(namespaces) or 'no cache keys'}")
+
+    watcher = ChangeWatcher(db, on_change=report)
+    watcher.start()
+    try:
+        while watcher.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0 if watcher.error is None else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
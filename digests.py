@@ -0,0 +1,192 @@
+# digests.py
+"""
+Per-recipient notification digests.
+
+Each recipient has a delivery mode in Notification_Preferences: "immediate"
+(the default: one email per notification, as before) or "digest". Digest
+notifications are parked in Notification_Digest and sent as one combined
+email once the recipient has DIGEST_THRESHOLD of them waiting, or when the
+oldest has waited DIGEST_MAX_AGE (flush_due_digests, run on a schedule):
+
+    python digests.py            # flush digests that are due
+    python digests.py --all      # flush every pending digest now
+"""
+import uuid
+import argparse
+from datetime import datetime, timedelta
+
+import pymongo
+
+from students_db import connect_to_db
+from email_delivery import MAIL_FROM, build_message, send_email, send_bulk
+
+NOTIFICATION_MODES = ("immediate", "digest")
+DEFAULT_MODE = "immediate"
+
+# Flush a recipient's digest as soon as this many notifications are waiting...
+DIGEST_THRESHOLD = 10
+# ...or once the oldest has waited this long
+DIGEST_MAX_AGE = timedelta(hours=24)
+
+
+def _preferences():
+    return connect_to_db()["Notification_Preferences"]
+
+
+def _digest():
+    return connect_to_db()["Notification_Digest"]
+
+
+def get_notification_mode(email: str) -> str:
+    doc = _preferences().find_one({"_id": email.strip().lower()})
+    return doc.get("mode", DEFAULT_MODE) if doc else DEFAULT_MODE
+
+
+def get_notification_modes(emails) -> dict:
+    """Delivery mode for each address, in one query. Keys are lower-cased."""
+    keys = list({e.strip().lower() for e in emails})
+    modes = {k: DEFAULT_MODE for k in keys}
+    for doc in _preferences().find({"_id": {"$in": keys}}):
+        modes[doc["_id"]] = doc.get("mode", DEFAULT_MODE)
+    return modes
+
+
+def set_notification_mode(email: str, mode: str) -> bool:
+    if mode not in NOTIFICATION_MODES:
+        return False
+    _preferences().update_one(
+        {"_id": email.strip().lower()},
+        {"$set": {"mode": mode, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if mode == "immediate":
+        # Don't leave anything stranded in a digest nobody will wait for
+        flush_digest(email)
+    return True
+
+
+def notify(message: dict, category: str) -> bool:
+    """
+    Deliver one message (see email_delivery.build_message) the way its
+    recipient prefers: now, or added to their digest.
+    Returns True if it was sent or queued.
+    """
+    return notify_many([message], category)[0]["status"] != "failed"
+
+
+def notify_many(messages: list, category: str) -> list:
+    """
+    notify() for a batch: preferences are read in one query, immediate
+    messages go out in one bulk send and digest messages are queued
+    together. Returns per-message results (status "digest" for queued ones),
+    in message order.
+    """
+    if not messages:
+        return []
+    emails = [m["to"][0]["email"] for m in messages]
+    modes = get_notification_modes(emails)
+
+    immediate = [i for i, e in enumerate(emails) if modes[e.strip().lower()] == "immediate"]
+    digest = [i for i, e in enumerate(emails) if modes[e.strip().lower()] == "digest"]
+
+    results = [None] * len(messages)
+    if len(immediate) == 1:
+        i = immediate[0]
+        ok = send_email(messages[i])
+        results[i] = {"email": emails[i], "status": "sent" if ok else "failed",
+                      "error": None if ok else "send failed", "bulk_email_id": None}
+    elif immediate:
+        for i, result in zip(immediate, send_bulk([messages[i] for i in immediate])):
+            results[i] = result
+
+    if digest:
+        now = datetime.utcnow()
+        _digest().insert_many([
+            {
+                "recipient": emails[i].strip().lower(),
+                "to_name": messages[i]["to"][0].get("name", ""),
+                "category": category,
+                "subject": messages[i]["subject"],
+                "text": messages[i]["text"],
+                "batch": None,
+                "created_at": now,
+            }
+            for i in digest
+        ])
+        for i in digest:
+            results[i] = {"email": emails[i], "status": "digest", "error": None, "bulk_email_id": None}
+
+        # Threshold flush, for the recipients that just got something
+        waiting = _digest().aggregate([
+            {"$match": {"recipient": {"$in": list({emails[i].strip().lower() for i in digest})}, "batch": None}},
+            {"$group": {"_id": "$recipient", "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gte": DIGEST_THRESHOLD}}},
+        ])
+        for w in waiting:
+            flush_digest(w["_id"])
+    return results
+
+
+def _digest_body(to_name: str, items: list) -> str:
+    lines = [
+        f"Hello {to_name or 'there'},\n",
+        f"Here is a summary of {len(items)} notifications from Club Stride:\n",
+    ]
+    for item in items:
+        lines.append(f"--- {item['subject']} ({item['created_at'].strftime('%b %d, %Y %H:%M')} UTC)")
+        lines.append(item["text"].strip() + "\n")
+    lines.append("Thank you,\nClub Stride Team")
+    return "\n".join(lines)
+
+
+def flush_digest(email: str) -> bool:
+    """
+    Send everything waiting in one recipient's digest as a single email.
+    Items are claimed with a batch id first, so two flushers never send the
+    same item; if the send fails the claim is released for the next flush.
+    Returns True if an email was sent.
+    """
+    coll = _digest()
+    recipient = email.strip().lower()
+    batch = uuid.uuid4().hex
+    coll.update_many({"recipient": recipient, "batch": None}, {"$set": {"batch": batch}})
+    items = list(coll.find({"batch": batch}).sort("created_at", pymongo.ASCENDING))
+    if not items:
+        return False
+
+    to_name = items[-1].get("to_name", "")
+    subject_line = (f"Club Stride: {items[0]['subject']}" if len(items) == 1
+                    else f"Club Stride: {len(items)} updates")
+    message = build_message(recipient, subject_line, _digest_body(to_name, items),
+                            to_name=to_name, mail_from=MAIL_FROM)
+    if send_email(message):
+        coll.delete_many({"batch": batch})
+        return True
+    coll.update_many({"batch": batch}, {"$set": {"batch": None}})
+    return False
+
+
+def flush_due_digests(max_age: timedelta = DIGEST_MAX_AGE) -> int:
+    """Flush every digest whose oldest waiting item is older than max_age. Returns emails sent."""
+    due = _digest().aggregate([
+        {"$match": {"batch": None}},
+        {"$group": {"_id": "$recipient", "oldest": {"$min": "$created_at"}}},
+        {"$match": {"oldest": {"$lte": datetime.utcnow() - max_age}}},
+    ])
+    return sum(1 for d in due if flush_digest(d["_id"]))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Send due notification digests.")
+    arg_parser.add_argument("--all", action="store_true",
+                            help="flush every pending digest, not just those older than "
+                                 f"{DIGEST_MAX_AGE}")
+    args = arg_parser.parse_args(argv)
+
+    sent = flush_due_digests(timedelta(0) if args.all else DIGEST_MAX_AGE)
+    print(f"Digests sent: {sent}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
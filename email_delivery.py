@@ -0,0 +1,294 @@
+# email_delivery.py
+"""
+Outgoing email through MailerSend.
+
+Every message goes to one recipient (nobody sees anyone else's address).
+Several messages go out through the bulk-email endpoint, in chunks that fit
+the provider limits; the chunks are posted from a small thread pool, and
+all requests (bulk or single) share one token bucket so we stay under the
+API rate limit. Every recipient's outcome is written to Email_Deliveries.
+
+Bulk recipients stay "queued" until MailerSend has processed the request;
+run the status refresh on a schedule to resolve them to "sent" or "failed":
+
+    python email_delivery.py --refresh-status
+
+Requests are made with `requests` directly (the SDK client supplies the API
+base and auth headers), since the SDK's methods drop the response headers
+and with them a 429's Retry-After. The API base URL can be pointed
+elsewhere (e.g. a local stub server) with the MAILERSEND_API_BASE secret.
+"""
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+
+from students_db import connect_to_db
+
+MAIL_FROM = {
+    "name": "Club Stride",
+    "email": "javier@clubstride.org"
+}
+
+# MailerSend limits: messages per bulk-email request, requests per minute
+BULK_CHUNK_SIZE = 500
+REQUESTS_PER_MINUTE = 60
+# Requests allowed back-to-back before the bucket starts pacing us
+RATE_BURST = 5
+
+SEND_WORKERS = 4
+MAX_ATTEMPTS = 3
+# Longest Retry-After we honour before trying again; seconds
+MAX_RETRY_WAIT = 60
+REQUEST_TIMEOUT = 30
+
+# Queued recipients older than this are no longer looked up
+STATUS_LOOKBACK = timedelta(days=7)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most
+    `capacity`. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# One bucket per process: every send in this app shares the account's limit
+_bucket = TokenBucket(REQUESTS_PER_MINUTE / 60.0, RATE_BURST)
+
+
+def _mailer():
+    from mailersend import emails
+
+    mailer = emails.NewEmail(st.secrets["MAILERSEND_API_KEY"])
+    api_base = st.secrets.get("MAILERSEND_API_BASE")
+    if api_base:
+        mailer.api_base = api_base
+    return mailer
+
+
+def build_message(to_email: str, subject_line: str, body_text: str,
+                  to_name: str = None, mail_from: dict = None) -> dict:
+    """A MailerSend message body for a single recipient."""
+    return {
+        "from": mail_from or MAIL_FROM,
+        "to": [{"name": to_name or to_email.split('@')[0], "email": to_email}],
+        "subject": subject_line,
+        "text": body_text,
+    }
+
+
+def _parse_body(text: str) -> dict:
+    try:
+        return json.loads(text) if text.strip() else {}
+    except ValueError:
+        return {"message": text}
+
+
+def _retry_after(value) -> float:
+    """A Retry-After header (seconds, or an HTTP date) as seconds to wait; None if absent or unreadable."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_WAIT)
+
+
+def _request(method: str, path: str, payload=None):
+    """One MailerSend API call. Returns (status, parsed body or {}, Retry-After seconds or None)."""
+    mailer = _mailer()
+    response = requests.request(method, f"{mailer.api_base}{path}", headers=mailer.headers_default,
+                                json=payload, timeout=REQUEST_TIMEOUT)
+    return response.status_code, _parse_body(response.text), _retry_after(response.headers.get("Retry-After"))
+
+
+def _post(path: str, payload):
+    """
+    POST through the rate limiter, retrying 429s and 5xx: after the
+    response's Retry-After if it has one, else with exponential backoff.
+    Returns (status, body) of the last attempt.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        _bucket.acquire()
+        try:
+            status, body, retry_after = _request("POST", path, payload)
+        except Exception as e:
+            status, body, retry_after = 0, {"message": str(e)}, None
+        if status < 500 and status not in (0, 429):
+            return status, body
+        if attempt + 1 < MAX_ATTEMPTS:
+            time.sleep(retry_after if retry_after is not None else 2 ** attempt)
+    return status, body
+
+
+def _log_deliveries(rows: list):
+    if rows:
+        connect_to_db()["Email_Deliveries"].insert_many(rows)
+
+
+def _result(message: dict, status: str, error: str = None, bulk_email_id: str = None) -> dict:
+    return {
+        "email": message["to"][0]["email"],
+        "subject": message.get("subject", ""),
+        "status": status,
+        "error": error,
+        "bulk_email_id": bulk_email_id,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def send_email(message: dict) -> bool:
+    """Send one message (see build_message). Returns True if MailerSend accepted it."""
+    status, body = _post("/email", message)
+    ok = 200 <= status < 300
+    _log_deliveries([_result(message, "sent" if ok else "failed",
+                             None if ok else body.get("message", f"HTTP {status}"))])
+    if not ok:
+        print(f"MailerSend error ({status}): {body}")
+    return ok
+
+
+def _send_chunk(chunk: list) -> list:
+    status, body = _post("/bulk-email", chunk)
+    if 200 <= status < 300:
+        bulk_id = body.get("bulk_email_id")
+        return [_result(m, "queued", bulk_email_id=bulk_id) for m in chunk]
+    error = body.get("message", f"HTTP {status}")
+    print(f"MailerSend bulk error ({status}): {body}")
+    return [_result(m, "failed", error) for m in chunk]
+
+
+def send_bulk(messages: list) -> list:
+    """
+    Send many single-recipient messages through the bulk endpoint.
+
+    Messages are chunked by BULK_CHUNK_SIZE and the chunks posted
+    concurrently. MailerSend accepts a bulk request and processes it
+    asynchronously, so accepted recipients are recorded as "queued" (with
+    the bulk_email_id) until refresh_bulk_status() resolves them.
+
+    Returns the per-recipient results, in message order.
+    """
+    if not messages:
+        return []
+    chunks = [messages[i:i + BULK_CHUNK_SIZE] for i in range(0, len(messages), BULK_CHUNK_SIZE)]
+    if len(chunks) == 1:
+        results = _send_chunk(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=SEND_WORKERS) as pool:
+            results = [r for chunk_results in pool.map(_send_chunk, chunks) for r in chunk_results]
+    _log_deliveries([dict(r) for r in results])
+    return results
+
+
+def refresh_bulk_status(bulk_email_id: str) -> dict:
+    """
+    Ask MailerSend how a bulk request went and update its recipients in
+    Email_Deliveries: "sent", or "failed" with the validation error for that
+    message. Returns the counts per status, or {} if it's still processing.
+    """
+    _bucket.acquire()
+    status, body, _ = _request("GET", f"/bulk-email/{bulk_email_id}")
+    if status != 200:
+        raise RuntimeError(body.get("message", f"HTTP {status}"))
+    data = body.get("data", {})
+    if data.get("state") != "completed":
+        return {}
+
+    coll = connect_to_db()["Email_Deliveries"]
+    rows = list(coll.find({"bulk_email_id": bulk_email_id}).sort("_id", 1))
+    # Errors are keyed "message.<index>.<field>", index into the chunk we sent
+    failed = {}
+    for field, errors in (data.get("validation_errors") or {}).items():
+        parts = field.split(".")
+        if len(parts) > 1 and parts[1].isdigit():
+            failed[int(parts[1])] = "; ".join(errors) if isinstance(errors, list) else str(errors)
+    suppressed = {r.get("recipient", {}).get("email") for r in data.get("suppressed_recipients") or []}
+
+    counts = {"sent": 0, "failed": 0}
+    for i, row in enumerate(rows):
+        error = failed.get(i) or ("suppressed" if row["email"] in suppressed else None)
+        status = "failed" if error else "sent"
+        coll.update_one({"_id": row["_id"]}, {"$set": {"status": status, "error": error}})
+        counts[status] += 1
+    return counts
+
+
+def refresh_queued_deliveries(max_age: timedelta = STATUS_LOOKBACK) -> dict:
+    """
+    refresh_bulk_status() for every bulk request sent in the last max_age
+    that still has "queued" recipients. Returns the recipient counts per
+    status, plus "pending": requests MailerSend hasn't finished (or that
+    couldn't be checked), left for the next run.
+    """
+    coll = connect_to_db()["Email_Deliveries"]
+    bulk_ids = coll.distinct("bulk_email_id", {
+        "status": "queued",
+        "bulk_email_id": {"$ne": None},
+        "created_at": {"$gte": datetime.utcnow() - max_age},
+    })
+    totals = {"sent": 0, "failed": 0, "pending": 0}
+    for bulk_email_id in bulk_ids:
+        try:
+            counts = refresh_bulk_status(bulk_email_id)
+        except Exception as e:
+            print(f"Error checking bulk email {bulk_email_id}: {e}")
+            counts = {}
+        if not counts:
+            totals["pending"] += 1
+        for status, n in counts.items():
+            totals[status] += n
+    return totals
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="MailerSend delivery tracking.")
+    arg_parser.add_argument("--refresh-status", action="store_true",
+                            help="resolve queued bulk recipients to sent or failed")
+    arg_parser.add_argument("--max-age-days", type=int, default=STATUS_LOOKBACK.days,
+                            help=f"only check bulk requests this recent (default {STATUS_LOOKBACK.days})")
+    args = arg_parser.parse_args(argv)
+
+    if not args.refresh_status:
+        arg_parser.print_help()
+        return 0
+    totals = refresh_queued_deliveries(timedelta(days=args.max_age_days))
+    print(f"Sent: {totals['sent']}  Failed: {totals['failed']}  Still processing: {totals['pending']} request(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
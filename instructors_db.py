@@ -7,15 +7,18 @@ import streamlit as st  # Only needed if you prefer st.cache_resource or st.secr
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+from shared_cache import cached, invalidate
 
-# DB_URL = os.environ.get("DB_URL")
-DB_URL= st.secrets["DB_URL"]
-if not DB_URL:
-    raise ValueError("DB_URL is not set in .env")
+load_dotenv()
 
 def get_connection():
     """Create and return a new database connection."""
+    # Read on first use rather than at import time, so importing this module
+    # (e.g. from a page that never touches Postgres) doesn't need secrets.
+    # DB_URL = os.environ.get("DB_URL")
+    DB_URL = st.secrets["DB_URL"]
+    if not DB_URL:
+        raise ValueError("DB_URL is not set in .env")
     return psycopg2.connect(DB_URL)
 
 ############################################
@@ -183,8 +186,6 @@ def get_instructor_email(instructor_id: int) -> str:
         cursor.close()
         conn.close()
 
-from mailersend import emails
-
 def notify_instructor_program_assignment(instructor_id: int, program_id: int, is_new_assignment=True):
     """
     Send an email notification to an instructor when they're assigned to a program.
@@ -251,29 +252,16 @@ Club Stride Administration
     
     # 5. Send email via MailerSend
     try:
-        MAILERSEND_API_KEY = st.secrets["MAILERSEND_API_KEY"]
-        
-        mailer = emails.NewEmail(MAILERSEND_API_KEY)
-        mail_body = {}
-        
+        from email_delivery import build_message
+        from digests import notify
+
         mail_from = {
             "name": "Club Stride Administration",
             "email": "javier@clubstride.org"
         }
-        
-        recipients = [{
-            "name": instructor_name,
-            "email": instructor_email
-        }]
-        
-        mailer.set_mail_from(mail_from, mail_body)
-        mailer.set_mail_to(recipients, mail_body)
-        mailer.set_subject(subject_line, mail_body)
-        mailer.set_plaintext_content(body_text, mail_body)
-        
-        response = mailer.send(mail_body)
-        print(f"MailerSend instructor notification response: {response}")
-        return True
+        return notify(build_message(instructor_email, subject_line, body_text,
+                                    to_name=instructor_name, mail_from=mail_from),
+                      category="assignment")
     except Exception as e:
         print(f"Error sending instructor notification: {e}")
         return False
@@ -409,6 +397,7 @@ def add_program(program_name: str) -> int:
         )
         new_id = cursor.fetchone()[0]
         conn.commit()
+        invalidate("programs")
         return new_id
     except psycopg2.errors.UniqueViolation:
         # This occurs when program_name is already in use
@@ -423,9 +412,11 @@ def add_program(program_name: str) -> int:
         cursor.close()
         conn.close()
 
+@cached("programs", ttl=600)
 def list_programs() -> list:
     """
     Returns a list of all programs: [{program_id, program_name}, ...]
+    Cached in the shared cache until a program is added, renamed or deleted.
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -462,6 +453,7 @@ def assign_instructor_to_program(instructor_id: int, program_id: int) -> bool:
         # Check if a row was actually inserted (not a duplicate)
         if cursor.rowcount > 0:
             conn.commit()
+            invalidate("instructor_programs")
             # Send notification email
             notify_instructor_program_assignment(instructor_id, program_id, is_new_assignment=True)
             return True
@@ -498,6 +490,7 @@ def remove_instructor_from_program(instructor_id: int, program_id: int) -> bool:
         conn.commit()
         
         if deleted:
+            invalidate("instructor_programs")
             # Send notification email
             notify_instructor_program_assignment(instructor_id, program_id, is_new_assignment=False)
         
@@ -560,10 +553,11 @@ def remove_instructor_from_program(instructor_id: int, program_id: int) -> bool:
 #     return deleted
 
 
+@cached("instructor_programs", ttl=600)
 def list_instructor_programs(instructor_id: int) -> list:
     """
     Return all program_ids (and names) linked to this instructor
-    via the instructor_programs pivot.
+    via the instructor_programs pivot (shared-cached until an assignment changes).
     Example return: [
       {"program_id": 101, "program_name": "Youth Leadership"},
       {"program_id": 202, "program_name": "STEM Robotics"}
@@ -609,6 +603,7 @@ def delete_program(program_id: int) -> bool:
         cursor.execute("DELETE FROM programs WHERE program_id = %s", (program_id,))
         
         conn.commit()
+        invalidate("programs", "instructor_programs")
         rows_affected = cursor.rowcount
         return rows_affected > 0
     except psycopg2.Error as e:
@@ -642,6 +637,7 @@ def update_program(program_id: int, new_program_name: str) -> bool:
             return False
 
         conn.commit()
+        invalidate("programs", "instructor_programs")
         return True
     except psycopg2.Error as e:
         print("Error updating program:", e)
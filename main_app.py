@@ -2,27 +2,27 @@
 
 import streamlit as st
 from streamlit_option_menu import option_menu
-import streamlit.components.v1 as components
 from PIL import Image
 # from . import page_manage_documents
-# Page imports (same as before)
-from pages import (
-    page_manage_instructors,
-    page_manage_students,
-    page_take_attendance,
-    # page_manage_documents,
-    page_review_attendance,
-    page_generate_reports,
-    page_help,
-    page_my_settings,
-    page_instructor_change_password,
-    page_manage_schedules,
-    page_unified_login,
-    page_dashboard
-)
-
-# Admin check
-from students_db import check_admin
+# Pages are imported on first render (see views/__init__.py), so a cold start
+# only loads the page being shown instead of every page and its libraries.
+from views import lazy_page
+
+page_manage_instructors = lazy_page("page_manage_instructors")
+page_manage_students = lazy_page("page_manage_students")
+page_take_attendance = lazy_page("page_take_attendance")
+# page_manage_documents = lazy_page("page_manage_documents")
+page_review_attendance = lazy_page("page_review_attendance")
+page_generate_reports = lazy_page("page_generate_reports")
+page_help = lazy_page("page_help")
+page_my_settings = lazy_page("page_my_settings")
+page_instructor_change_password = lazy_page("page_instructor_change_password")
+page_manage_schedules = lazy_page("page_manage_schedules")
+page_unified_login = lazy_page("page_unified_login")
+page_dashboard = lazy_page("page_dashboard")
+
+# Admin check (only used by the old admin_login below)
+# from students_db import check_admin
 # Create instructors table
 from instructors_db import create_instructors_table #authenticate_instructor, list_instructor_programs
 
@@ -45,6 +45,33 @@ from instructors_db import create_instructors_table #authenticate_instructor, li
 #             else:
 #                 st.error("Invalid connection string. Access denied.")
 
+# Sub-pages of the "Student Management Suite"
+SMS_SECTIONS = ["Manage Students", "Attendance & Scheduling", "Reports & Analytics"]
+ATTENDANCE_SECTIONS = ["Take Attendance", "Review Attendance", "Manage Schedules"]
+
+
+def section_picker(options, state_key):
+    """
+    Tab-like horizontal selector that only reports the active section, so the
+    caller runs just that page (st.tabs executes every tab body on each rerun).
+
+    The choice is mirrored into st.session_state[state_key], a plain (non-widget)
+    key, so it survives reruns and navigating away from the suite and back.
+    """
+    if st.session_state.get(state_key) not in options:
+        st.session_state[state_key] = options[0]
+
+    choice = st.radio(
+        "Section",
+        options,
+        index=options.index(st.session_state[state_key]),
+        horizontal=True,
+        key=f"{state_key}_picker",
+        label_visibility="collapsed"
+    )
+    st.session_state[state_key] = choice
+    return choice
+
 
 def main():
     st.set_page_config(layout='wide', page_title='Club Stride Software')
@@ -602,54 +629,51 @@ def main():
         # Show tabs for the four tools: Manage Students, Manage Attendance,
         # Manage Schedules, Generate Reports
         
-        SMStabs = st.tabs(["Manage Students", "Attendance & Scheduling", "Reports & Analytics"])#"Document Management"
+        # Only the selected sub-page runs (and hits the databases) on a rerun
+        sms_choice = section_picker(SMS_SECTIONS, "sms_section")
+        has_access = st.session_state.is_admin or st.session_state.instructor_logged_in
 
         # ----- TAB 1: Manage Students -----
-        with SMStabs[0]:
+        if sms_choice == "Manage Students":
             # st.header("Manage Students")
-            if st.session_state.is_admin or st.session_state.instructor_logged_in:
+            if has_access:
                 page_manage_students()
             else:
                 st.error("You do not have permission to access this feature.")
 
         # ----- TAB 2: Manage Attendance -----
-        with SMStabs[1]:
+        elif sms_choice == "Attendance & Scheduling":
             # col_left, col_center, col_right = st.columns([1, 5, 1])
 
             # with col_center:
             st.header("Manage Attendance & Scheduling")
-            # Reuse your existing radio approach inside the tab
-            tab_labels = ["Take Attendance", "Review Attendance", "Manage Schedules"]
-            tabs = st.tabs(tab_labels)
+            attendance_choice = section_picker(ATTENDANCE_SECTIONS, "sms_attendance_section")
 
-            # if Attendance_choice == "Take Attendance":
-            with tabs[0]:
-                if st.session_state.is_admin or st.session_state.instructor_logged_in:
+            if attendance_choice == "Take Attendance":
+                if has_access:
                     page_take_attendance()
                 else:
                     st.error("You do not have permission.")
-            # else:
-            with tabs[1]:
-                if st.session_state.is_admin or st.session_state.instructor_logged_in:
+            elif attendance_choice == "Review Attendance":
+                if has_access:
                     page_review_attendance()
                 else:
                     st.error("You do not have permission.")
-
-            with tabs[2]:
-                if st.session_state.is_admin or st.session_state.instructor_logged_in:
+            elif attendance_choice == "Manage Schedules":
+                if has_access:
                     page_manage_schedules()
                 else:
                     st.error("You do not have permission to access this feature.")
                     
-        # ----- TAB 3: Manage Schedules -----
-        with SMStabs[2]:
+        # ----- TAB 3: Generate Reports -----
+        elif sms_choice == "Reports & Analytics":
             # st.header("Generate Reports")
-            if st.session_state.is_admin or st.session_state.instructor_logged_in:
+            if has_access:
                 page_generate_reports()
             else:
                 st.error("You do not have permission to access this feature.")
 
-        # with SMStabs[3]:  # New tab for Document Management
+        # elif sms_choice == "Document Management":  # New tab for Document Management
         #     if st.session_state.is_admin or st.session_state.instructor_logged_in:
         #         page_manage_documents()
         #     else:
@@ -0,0 +1,231 @@
+# reconcile.py
+"""
+Recompute Student_Records.missed_count from the attendance array (plus
+session-stored and archived attendance).
+
+missed_count is bumped when an Absent is recorded, but edits and deletes
+of attendance entries don't always keep it in step, and the absence emails
+key off it. This job finds the drifted counters with one aggregation and
+fixes them with batched bulk_write calls.
+
+Run headless:
+    python reconcile.py                 # incremental (since last checkpoint)
+    python reconcile.py --full          # every student
+    python reconcile.py --dry-run       # report drift, change nothing
+"""
+import os
+import csv
+import argparse
+from datetime import datetime, timedelta
+
+import pymongo
+
+JOB_NAME = "missed_count_reconcile"
+
+# Re-check a little before the last checkpoint, in case of clock skew between
+# the app servers that stamp updated_at and the machine running this job.
+CHECKPOINT_OVERLAP = timedelta(minutes=5)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _student_db(connection_string=None):
+    """The Student_Data database: from an explicit connection string, or the app's."""
+    if connection_string:
+        return pymongo.MongoClient(connection_string)["Student_Data"]
+    from students_db import connect_to_db
+    return connect_to_db()
+
+
+def get_checkpoint(db) -> dict:
+    return db["Job_Checkpoints"].find_one({"_id": JOB_NAME}) or {}
+
+
+def _save_checkpoint(db, started_at: datetime, summary: dict):
+    db["Job_Checkpoints"].update_one(
+        {"_id": JOB_NAME},
+        {"$set": {
+            "last_run_started": started_at,
+            "last_run_finished": datetime.utcnow(),
+            "last_mode": summary["mode"],
+            "last_checked": summary["checked"],
+            "last_drifted": summary["drifted"],
+            "last_corrected": summary["corrected"],
+        }},
+        upsert=True
+    )
+
+
+def find_drift(db, since: datetime = None) -> list:
+    """
+    Students whose stored missed_count differs from the number of Absent
+    entries in their attendance array, sessions and archived terms. If `since` is given, only students
+    whose record was written at or after it (updated_at) are checked.
+
+    Returns dicts with _id, student_id, name, program_id, stored, actual.
+    """
+    match = {"updated_at": {"$gte": since}} if since else {}
+    pipeline = [
+        {"$match": match},
+        # Session-stored attendance (attendance_sessions_db), via the student_ids index
+        {"$lookup": {
+            "from": "Attendance_Sessions",
+            "localField": "student_id",
+            "foreignField": "student_ids",
+            "as": "sessions"
+        }},
+        # Archived terms (attendance_archive) keep per-status counts
+        {"$lookup": {
+            "from": "Attendance_Archive",
+            "localField": "student_id",
+            "foreignField": "student_id",
+            "pipeline": [{"$project": {"_id": 0, "counts.Absent": 1}}],
+            "as": "archived"
+        }},
+        {"$project": {
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "stored": "$missed_count",
+            "actual": {"$add": [
+                {"$size": {"$filter": {
+                    "input": {"$ifNull": ["$attendance", []]},
+                    "as": "a",
+                    "cond": {"$eq": ["$$a.status", "Absent"]}
+                }}},
+                {"$size": {"$filter": {
+                    "input": {"$reduce": {
+                        "input": "$sessions",
+                        "initialValue": [],
+                        "in": {"$concatArrays": ["$$value", {"$objectToArray": "$$this.statuses"}]}
+                    }},
+                    "as": "e",
+                    "cond": {"$and": [
+                        {"$eq": ["$$e.k", "$student_id"]},
+                        {"$eq": ["$$e.v.status", "Absent"]}
+                    ]}
+                }}},
+                {"$sum": "$archived.counts.Absent"}
+            ]}
+        }},
+        {"$match": {"$expr": {"$ne": [{"$ifNull": ["$stored", 0]}, "$actual"]}}},
+    ]
+    return list(db["Student_Records"].aggregate(pipeline, allowDiskUse=True))
+
+
+def apply_corrections(db, drifted: list, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Set missed_count to the recomputed value, batch_size students per
+    bulk_write. Each update is conditional on the counter still holding the
+    value we read, so an Absent recorded mid-run isn't lost (the next run
+    picks that student up again). Returns the number of students corrected.
+    """
+    coll = db["Student_Records"]
+    corrected = 0
+    for start in range(0, len(drifted), batch_size):
+        ops = [
+            pymongo.UpdateOne(
+                {"_id": d["_id"], "missed_count": d.get("stored")},
+                # Derived field: no _v bump, so editors' copies stay valid
+                {"$set": {"missed_count": d["actual"]}}
+            )
+            for d in drifted[start:start + batch_size]
+        ]
+        result = coll.bulk_write(ops, ordered=False)
+        corrected += result.modified_count
+    return corrected
+
+
+def reconcile_missed_counts(full: bool = False, dry_run: bool = False,
+                            batch_size: int = DEFAULT_BATCH_SIZE, connection_string=None) -> dict:
+    """
+    Run one reconciliation pass.
+
+    Incremental (the default) only checks students written since the last
+    checkpoint; it falls back to a full pass if there is no checkpoint yet.
+    Records written before updated_at existed are only covered by --full.
+
+    Returns a summary dict, including a `report` list of the drifted
+    students (stored vs actual count).
+    """
+    db = _student_db(connection_string)
+    started_at = datetime.utcnow()
+    # Keeps the incremental scan from reading the whole collection
+    db["Student_Records"].create_index("updated_at")
+
+    since = None
+    if not full:
+        last = get_checkpoint(db).get("last_run_started")
+        if last:
+            since = last - CHECKPOINT_OVERLAP
+
+    checked = db["Student_Records"].count_documents({"updated_at": {"$gte": since}} if since else {})
+    drifted = find_drift(db, since)
+    corrected = 0 if dry_run else apply_corrections(db, drifted, batch_size)
+
+    summary = {
+        "mode": "full" if since is None else "incremental",
+        "since": since,
+        "dry_run": dry_run,
+        "checked": checked,
+        "drifted": len(drifted),
+        "corrected": corrected,
+        "report": [
+            {
+                "student_id": d.get("student_id"),
+                "name": d.get("name", ""),
+                "program_id": d.get("program_id"),
+                "stored": d.get("stored"),
+                "actual": d["actual"],
+                "drift": (d.get("stored") or 0) - d["actual"],
+            }
+            for d in drifted
+        ],
+    }
+    if not dry_run:
+        _save_checkpoint(db, started_at, summary)
+    return summary
+
+
+def _write_report(path: str, report: list):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["student_id", "name", "program_id", "stored", "actual", "drift"])
+        writer.writeheader()
+        writer.writerows(report)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Reconcile Student_Records.missed_count with attendance.")
+    arg_parser.add_argument("--full", action="store_true",
+                            help="check every student, not just those changed since the last run")
+    arg_parser.add_argument("--dry-run", action="store_true",
+                            help="report drift without correcting it (and without moving the checkpoint)")
+    arg_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f"students per bulk_write (default {DEFAULT_BATCH_SIZE})")
+    arg_parser.add_argument("--report", metavar="CSV",
+                            help="also write the drift report to this CSV file")
+    arg_parser.add_argument("--connection-string", default=os.environ.get("CONNECTION_STRING"),
+                            help="MongoDB connection string (default: $CONNECTION_STRING, "
+                                 "else .streamlit/secrets.toml)")
+    args = arg_parser.parse_args(argv)
+
+    summary = reconcile_missed_counts(
+        full=args.full,
+        dry_run=args.dry_run,
+        batch_size=args.batch_size,
+        connection_string=args.connection_string
+    )
+
+    since = summary["since"].isoformat() if summary["since"] else "beginning"
+    print(f"Mode: {summary['mode']} (since {since}){' [dry run]' if summary['dry_run'] else ''}")
+    print(f"Checked: {summary['checked']}  Drifted: {summary['drifted']}  Corrected: {summary['corrected']}")
+    for row in summary["report"]:
+        print(f"  {row['student_id']}  {str(row['name']):<30}  stored={row['stored']}  actual={row['actual']}")
+    if args.report:
+        _write_report(args.report, summary["report"])
+        print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
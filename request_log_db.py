@@ -0,0 +1,85 @@
+# request_log_db.py
+import time
+from datetime import datetime, timedelta
+
+import pymongo
+import streamlit as st
+
+from students_db import connect_to_db
+
+# How long a submission's result is remembered. Replays after this run again.
+REQUEST_LOG_TTL = timedelta(hours=24)
+
+# How long a replay waits for the first submission (still running) to finish
+IN_FLIGHT_WAIT_SECONDS = 10
+
+
+@st.cache_resource
+def _request_log():
+    """Request_Log collection, with its TTL index created once per process."""
+    coll = connect_to_db()["Request_Log"]
+    coll.create_index(
+        "created_at",
+        expireAfterSeconds=int(REQUEST_LOG_TTL.total_seconds()),
+        name="created_at_ttl"
+    )
+    return coll
+
+
+def run_idempotent(key: str, action, *args, **kwargs):
+    """
+    Run action(*args, **kwargs) at most once per idempotency key.
+
+    The first call claims the key in Request_Log (its _id, so the claim is
+    atomic), runs the action and stores the result. Any later call with the
+    same key -- a double-submit, a browser retry, an automatic client retry --
+    gets the stored result back without writing or emailing again.
+    If the action raises, the claim is released so a retry can run it.
+    The result must be BSON-serialisable (the write paths return str/bool).
+
+    key=None runs the action unconditionally.
+    """
+    if not key:
+        return action(*args, **kwargs)
+
+    coll = _request_log()
+    try:
+        coll.insert_one({"_id": key, "status": "pending", "created_at": datetime.utcnow()})
+    except pymongo.errors.DuplicateKeyError:
+        released, result = _wait_for_result(coll, key)
+        if released:
+            # The original failed and gave the key back; this call gets to run it
+            return run_idempotent(key, action, *args, **kwargs)
+        return result
+
+    try:
+        result = action(*args, **kwargs)
+    except Exception:
+        coll.delete_one({"_id": key})
+        raise
+
+    coll.update_one(
+        {"_id": key},
+        {"$set": {"status": "done", "result": result, "completed_at": datetime.utcnow()}}
+    )
+    return result
+
+
+def _wait_for_result(coll, key: str):
+    """
+    A replay of a key we've already seen. If the original is still running
+    (two reruns racing), poll briefly for its result.
+    Returns (released, result): released is True if the key was given back
+    (the original raised); result is the original result, or None if it
+    hasn't finished in time.
+    """
+    deadline = time.monotonic() + IN_FLIGHT_WAIT_SECONDS
+    while True:
+        entry = coll.find_one({"_id": key})
+        if entry is None:
+            return True, None
+        if entry.get("status") == "done":
+            return False, entry.get("result")
+        if time.monotonic() >= deadline:
+            return False, None
+        time.sleep(0.25)
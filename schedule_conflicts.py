@@ -0,0 +1,147 @@
+# schedule_conflicts.py
+"""
+Double-booking checks for schedules.
+
+A proposed schedule is expanded into its sessions (sessions_db) and each
+one is checked against the existing sessions of the same instructor and of
+the same location, read with one indexed query per instructor and per
+location. Existing sessions are held in a sorted IntervalIndex,
+so each check is a binary search plus the overlaps it actually finds.
+"""
+from bisect import bisect_left
+from datetime import datetime
+
+from sessions_db import expand_occurrences, sessions_between, SESSION_HORIZON
+
+
+class ScheduleConflict(Exception):
+    """A schedule write was refused because it double-books an instructor or location."""
+
+    def __init__(self, conflicts: list):
+        self.conflicts = conflicts
+        first = conflicts[0]
+        more = f" (and {len(conflicts) - 1} more)" if len(conflicts) > 1 else ""
+        super().__init__(
+            f"This schedule double-books the {first['kind']} on "
+            f"{first['start'].strftime('%a %b %d, %Y %I:%M %p')} "
+            f"with \"{first['other_title']}\"{more}."
+        )
+
+
+class IntervalIndex:
+    """
+    Half-open [start, end) intervals sorted by start, with a running maximum
+    of end so overlapping() can stop scanning as soon as nothing earlier can
+    reach the query.
+    """
+
+    def __init__(self, items, start=lambda x: x["start"], end=lambda x: x["end"]):
+        self._items = sorted(items, key=start)
+        self._starts = [start(x) for x in self._items]
+        self._end = end
+        self._max_end = []
+        running = None
+        for item in self._items:
+            running = end(item) if running is None else max(running, end(item))
+            self._max_end.append(running)
+
+    def overlapping(self, start, end) -> list:
+        """Items overlapping [start, end): O(log n + matches)."""
+        i = bisect_left(self._starts, end) - 1
+        found = []
+        while i >= 0 and self._max_end[i] > start:
+            if self._end(self._items[i]) > start:
+                found.append(self._items[i])
+            i -= 1
+        found.reverse()
+        return found
+
+
+def _location_key(location) -> str:
+    return (location or "").strip().lower()
+
+
+def _conflict(kind: str, proposed: dict, other: dict) -> dict:
+    return {
+        "kind": kind,
+        "start": proposed["start"],
+        "end": proposed["end"],
+        "location": proposed.get("location", ""),
+        "other_schedule_id": other["schedule_id"],
+        "other_title": other.get("title", ""),
+        "other_start": other["start"],
+        "other_end": other["end"],
+    }
+
+
+def find_schedule_conflicts(schedule_doc: dict, from_dt: datetime = None) -> list:
+    """
+    Sessions of `schedule_doc` (from from_dt, default now, up to the session
+    horizon) that overlap an existing session of the same instructor or at
+    the same location. The schedule's own sessions are ignored, so this works
+    for a proposed update as well as a new schedule (pass the merged doc with
+    its _id).
+
+    Returns conflict dicts, in time order; an empty list means it's clear.
+    """
+    from_dt = from_dt or datetime.utcnow()
+    schedule_doc = {"_id": "proposed", **schedule_doc}
+    proposed = expand_occurrences(schedule_doc, from_dt, from_dt + SESSION_HORIZON)
+    if not proposed:
+        return []
+
+    own_id = str(schedule_doc["_id"])
+    window = (proposed[0]["start"], max(p["end"] for p in proposed))
+
+    def others(**filters):
+        return [s for s in sessions_between(*window, **filters) if s["schedule_id"] != own_id]
+
+    instructor_id = schedule_doc.get("instructor_id")
+    by_instructor = IntervalIndex(others(instructor_id=instructor_id) if instructor_id else [])
+    locations = {_location_key(p.get("location")): p["location"] for p in proposed if _location_key(p.get("location"))}
+    by_location = {key: IntervalIndex(others(location=location)) for key, location in locations.items()}
+
+    conflicts = []
+    for occ in proposed:
+        for other in by_instructor.overlapping(occ["start"], occ["end"]):
+            conflicts.append(_conflict("instructor", occ, other))
+        index = by_location.get(_location_key(occ.get("location")))
+        if index:
+            for other in index.overlapping(occ["start"], occ["end"]):
+                conflicts.append(_conflict("location", occ, other))
+    return conflicts
+
+
+def audit_conflicts(start: datetime = None, end: datetime = None, program_ids=None) -> list:
+    """
+    Every double-booking among existing sessions between start (default now)
+    and end (default the session horizon): one sweep per instructor and per
+    location over the start-sorted sessions.
+
+    Returns dicts with kind ("instructor"/"location"), key, and the two
+    overlapping sessions (first, second).
+    """
+    start = start or datetime.utcnow()
+    end = end or start + SESSION_HORIZON
+    sessions = sessions_between(start, end, program_ids=program_ids)
+
+    groups = {}
+    for s in sessions:
+        if s.get("instructor_id") is not None:
+            groups.setdefault(("instructor", s["instructor_id"]), []).append(s)
+        key = _location_key(s.get("location"))
+        if key:
+            groups.setdefault(("location", key), []).append(s)
+
+    found = []
+    for (kind, key), items in groups.items():
+        # Sessions arrive sorted by start; keep the ones still running
+        active = []
+        for s in items:
+            active = [a for a in active if a["end"] > s["start"]]
+            for a in active:
+                if a["schedule_id"] != s["schedule_id"]:
+                    found.append({"kind": kind, "key": key, "first": a, "second": s})
+            active.append(s)
+    found.sort(key=lambda c: c["second"]["start"])
+    return found
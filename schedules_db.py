@@ -4,13 +4,17 @@ from datetime import datetime
 from typing import List, Optional
 
 # If you already have a connect_to_db() from your existing code:
-from students_db import connect_to_db, list_programs
+from students_db import connect_to_db, list_programs, VersionConflict, version_filter, raise_if_stale
+from email_delivery import build_message
+from digests import notify, notify_many
+from sessions_db import sync_schedule_sessions, remove_schedule_sessions
+from schedule_conflicts import ScheduleConflict, find_schedule_conflicts
+from shared_cache import cached, invalidate
 import streamlit as st
 from bson import ObjectId
 
 from dotenv import load_dotenv
 
-from mailersend import emails  # so we can query the "Student_Records" collection
 import os
 load_dotenv()
 
@@ -63,26 +67,17 @@ def notify_schedule_change(program_id: int, schedule_doc: dict, event_type="crea
     )
 
 
-    # 4) Send the email via MailerSend
-    # MAILERSEND_API_KEY = os.environ.get("MAILERSEND_API_KEY")
-    MAILERSEND_API_KEY= st.secrets["MAILERSEND_API_KEY"]
-
-    mailer = emails.NewEmail(MAILERSEND_API_KEY)
-    mail_body = {}
-
-    mail_from = {
-        "name": "Club Stride",
-        "email": "javier@clubstride.org"
-    }
-
-    mailer.set_mail_from(mail_from, mail_body)
-    mailer.set_mail_to(recipients, mail_body)
-    mailer.set_subject(subject_line, mail_body)
-    mailer.set_plaintext_content(body_text, mail_body)
-
-    response = mailer.send(mail_body)
-    print("MailerSend schedule notification response:", response)
+    # 4) One message per student (no shared "to" list), sent in bulk or
+    # added to the digests of students who asked for one
+    results = notify_many([
+        build_message(r["email"], subject_line, body_text, to_name=r["name"])
+        for r in recipients
+    ], category="schedule")
+    failed = sum(1 for r in results if r["status"] == "failed")
+    print(f"Schedule notification for program_id={program_id}: "
+          f"{len(results) - failed} accepted, {failed} failed")
 
+@cached("schedules")
 def list_schedules(instructor_id: Optional[str] = None) -> List[dict]:
     """
     Retrieve all schedules or filter by instructor_id if provided.
@@ -100,6 +95,7 @@ def list_schedules(instructor_id: Optional[str] = None) -> List[dict]:
         d["_id"] = str(d["_id"])
     return docs
 
+@cached("schedules")
 def list_schedules_by_program(program_ids: List[int]) -> List[dict]:
     db = connect_to_db()
     coll = db["Schedules"]
@@ -111,6 +107,46 @@ def list_schedules_by_program(program_ids: List[int]) -> List[dict]:
     return list(coll.find(query))
 
 
+@cached("class_documents", ttl=600)
+def count_documents_for_schedules(schedule_ids: tuple) -> dict:
+    """
+    Number of class documents for each schedule id, from one grouped
+    aggregation over the shared client (class_documents lives in its own
+    database on the same cluster). Keys are the ids as strings.
+    Cached until invalidate_document_counts() (or 10 minutes, for documents
+    added from elsewhere).
+    """
+    ids = [str(sid) for sid in schedule_ids]
+    # Documents may reference the schedule by ObjectId or by its string form
+    match_ids = ids + [ObjectId(sid) for sid in ids if ObjectId.is_valid(sid)]
+    counts = {sid: 0 for sid in ids}
+    try:
+        coll = connect_to_db().client["class_documents"]["class_documents"]
+        for row in coll.aggregate([
+            {"$match": {"schedule_id": {"$in": match_ids}}},
+            {"$group": {"_id": "$schedule_id", "count": {"$sum": 1}}},
+        ]):
+            counts[str(row["_id"])] += row["count"]
+    except Exception as e:
+        print(f"Error counting documents: {str(e)}")
+    return counts
+
+
+def invalidate_document_counts():
+    """Call after a class document is added or removed."""
+    invalidate("class_documents")
+
+
+def get_schedule(schedule_id: str) -> Optional[dict]:
+    """
+    Retrieve a single schedule by _id (with _id kept as an ObjectId,
+    matching list_schedules_by_program), or None if it doesn't exist.
+    """
+    db = connect_to_db()
+    coll = db["Schedules"]
+    return coll.find_one({"_id": ObjectId(schedule_id)})
+
+
 def notify_instructor_schedule_change(instructor_id: int, schedule_doc: dict, event_type="created"):
     """
     Sends an email notification to the instructor about a schedule change.
@@ -213,38 +249,35 @@ Club Stride Administration
     
     # 5. Send email via MailerSend
     try:
-        MAILERSEND_API_KEY = st.secrets["MAILERSEND_API_KEY"]
-        
-        mailer = emails.NewEmail(MAILERSEND_API_KEY)
-        mail_body = {}
-        
         mail_from = {
             "name": "Club Stride Administration",
             "email": "javier@clubstride.org"
         }
-        
-        recipients = [{
-            "name": instructor_name,
-            "email": instructor_email
-        }]
-        
-        mailer.set_mail_from(mail_from, mail_body)
-        mailer.set_mail_to(recipients, mail_body)
-        mailer.set_subject(subject_line, mail_body)
-        mailer.set_plaintext_content(body_text, mail_body)
-        
-        response = mailer.send(mail_body)
-        print(f"MailerSend instructor schedule notification response: {response}")
-        return True
+        return notify(build_message(instructor_email, subject_line, body_text,
+                                    to_name=instructor_name, mail_from=mail_from),
+                      category="schedule")
     except Exception as e:
         print(f"Error sending instructor schedule notification: {e}")
         return False
 
 # Modify the create_schedule function to notify the instructor
-def create_schedule(schedule_doc) -> str:
+def create_schedule(schedule_doc, allow_conflicts: bool = False) -> str:
+    """
+    Insert a schedule and expand its sessions. Unless allow_conflicts is
+    set, ScheduleConflict is raised (and nothing written) if it would
+    double-book its instructor or a location.
+    """
+    if not allow_conflicts:
+        conflicts = find_schedule_conflicts(schedule_doc)
+        if conflicts:
+            raise ScheduleConflict(conflicts)
+
     db = connect_to_db()
     coll = db["Schedules"]
+    schedule_doc.setdefault("_v", 0)
     result = coll.insert_one(schedule_doc)
+    invalidate("schedules")
+    sync_schedule_sessions(schedule_doc)
     
     # Notify the instructor if an instructor_id is present
     instructor_id = schedule_doc.get("instructor_id")
@@ -253,27 +286,53 @@ def create_schedule(schedule_doc) -> str:
     
     return str(result.inserted_id)
 
+# Fields that decide when/where/with whom a schedule's sessions happen
+SLOT_FIELDS = {"recurrence", "start_datetime", "end_datetime", "days_times", "location", "instructor_id"}
+
 # Modify the update_schedule function to notify the instructor
-def update_schedule(schedule_id: str, updates: dict) -> bool:
+def update_schedule(schedule_id: str, updates: dict, expected_version: int = None,
+                    allow_conflicts: bool = False, current: dict = None) -> bool:
     """
     Update the schedule with the given _id using the keys in `updates`.
-    Return True if a document was modified, else False.
+    If expected_version is given, the update only applies while the schedule
+    is still at that `_v`; otherwise VersionConflict is raised.
+    If the update moves the schedule onto a slot its instructor or location
+    already has, ScheduleConflict is raised first (unless allow_conflicts).
+    Return True if the schedule was found and updated, else False.
+
+    The conflict check needs the whole schedule, not just `updates`. Pass
+    the copy the edit was made on as `current`, together with its
+    expected_version: the versioned write then guarantees that copy is what
+    gets updated, so no extra read is needed and a slot change costs one
+    round trip on Schedules (plus the Sessions reads of the check itself).
+    Without both, the schedule is read first: two round trips.
     """
     db = connect_to_db()
     coll = db["Schedules"]
+
+    if not allow_conflicts and SLOT_FIELDS.intersection(updates):
+        if current is None or expected_version is None:
+            current = get_schedule(schedule_id)
+        if current:
+            conflicts = find_schedule_conflicts({**current, **updates})
+            if conflicts:
+                raise ScheduleConflict(conflicts)
     
-    # First get the original document to extract instructor_id
-    original_doc = coll.find_one({"_id": ObjectId(schedule_id)})
-    
-    result = coll.update_one(
-        {"_id": ObjectId(schedule_id)},
-        {"$set": updates}
+    # One round trip: apply the update and get the original back (for the
+    # instructor_id and the notification email)
+    original_doc = coll.find_one_and_update(
+        {"_id": ObjectId(schedule_id), **version_filter(expected_version)},
+        {"$set": updates, "$inc": {"_v": 1}},
+        return_document=pymongo.ReturnDocument.BEFORE
     )
+    if original_doc is None:
+        raise_if_stale(coll, {"_id": ObjectId(schedule_id)}, expected_version, "schedule")
     
-    if result.modified_count > 0 and original_doc:
-        # Get the updated document
-        updated_doc = coll.find_one({"_id": ObjectId(schedule_id)})
-        
+    if original_doc:
+        invalidate("schedules")
+        # Re-expand upcoming sessions; past ones stay as they happened
+        sync_schedule_sessions({**original_doc, **updates}, from_dt=datetime.utcnow())
+
         # Check if there's an instructor_id
         instructor_id = original_doc.get("instructor_id")
         if instructor_id:
@@ -284,7 +343,7 @@ def update_schedule(schedule_id: str, updates: dict) -> bool:
             
             notify_instructor_schedule_change(instructor_id, merged_doc, event_type="updated")
     
-    return result.modified_count > 0
+    return original_doc is not None
 
 # Modify the delete_schedule function to notify the instructor
 def delete_schedule(schedule_id: str) -> bool:
@@ -295,12 +354,13 @@ def delete_schedule(schedule_id: str) -> bool:
     db = connect_to_db()
     coll = db["Schedules"]
     
-    # First get the document to extract instructor_id
-    schedule_doc = coll.find_one({"_id": ObjectId(schedule_id)})
+    # One round trip: delete and get the removed document back for the email
+    schedule_doc = coll.find_one_and_delete({"_id": ObjectId(schedule_id)})
     
-    result = coll.delete_one({"_id": ObjectId(schedule_id)})
-    
-    if result.deleted_count > 0 and schedule_doc:
+    if schedule_doc:
+        invalidate("schedules")
+        remove_schedule_sessions(schedule_id)
+
         # Check if there's an instructor_id
         instructor_id = schedule_doc.get("instructor_id")
         if instructor_id:
@@ -309,7 +369,7 @@ def delete_schedule(schedule_id: str) -> bool:
             
             notify_instructor_schedule_change(instructor_id, schedule_doc, event_type="deleted")
     
-    return result.deleted_count > 0
+    return schedule_doc is not None
 
 
 # schedules_db.py
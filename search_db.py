@@ -0,0 +1,223 @@
+# search_db.py
+"""
+Indexed search over student names and attendance comments.
+
+Names: every Student_Records document carries `name_terms`, its name
+case-folded and stripped of accents, as the whole name plus each word
+("José Smith-Lee" -> ["jose smith-lee", "jose", "smith", "lee"]). A search
+is a prefix range on that multikey array, so "smi", "SMITH" and "jose s"
+all hit the index, and with program_ids given the scan covers only those
+programs' matches:
+
+    {program_id: 1, name_terms: 1}     (plus {name_terms: 1} for admins)
+
+Comments: a text index on attendance.comment (stemmed words, any order)
+behind a program_id prefix, so each search runs once per program with an
+equality match and only reads that program's part of the index:
+
+    {program_id: 1, attendance.comment: "text"}
+
+Comments of session-stored or archived attendance are not indexed.
+
+The write paths in students_db keep name_terms current; documents written
+before this module existed are filled in by a resumable backfill (which also
+creates the indexes):
+
+    python search_db.py --backfill
+"""
+import os
+import re
+import argparse
+import unicodedata
+from datetime import datetime
+
+import pymongo
+import streamlit as st
+
+# Default and maximum number of typeahead suggestions
+TYPEAHEAD_LIMIT = 10
+MAX_RESULTS = 100
+
+DEFAULT_BATCH_SIZE = 500
+
+# Sorts after every other code point, to close a prefix range
+_MAX_CHAR = "\U0010ffff"
+
+COMMENT_INDEX = "program_comment_text"
+# Before it had the program_id prefix (a collection holds one text index)
+OLD_COMMENT_INDEX = "attendance_comment_text"
+
+# Endings dropped from search words so entries match the way the text
+# index's English stemmer matched their document ("walk" -> "walked")
+_SUFFIXES = ("ing", "ies", "es", "ed", "ly", "s", "y")
+
+
+def fold(text: str) -> str:
+    """Case-folded, accent-free, whitespace-collapsed form of a string."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def name_terms(name: str) -> list:
+    """The values stored in name_terms for a name (see the module docstring)."""
+    folded = fold(name)
+    if not folded:
+        return []
+    return sorted({folded, *re.findall(r"\w+", folded)})
+
+
+def name_search_fields(name: str) -> dict:
+    """Fields to $set alongside a student's name."""
+    return {"name_terms": name_terms(name)}
+
+
+def name_prefix_query(prefix: str) -> dict:
+    """Filter for students with a name, or a word of it, starting with `prefix` ({} if blank)."""
+    folded = fold(prefix)
+    if not folded:
+        return {}
+    return {"name_terms": {"$elemMatch": {"$gte": folded, "$lt": folded + _MAX_CHAR}}}
+
+
+def _student_db(connection_string=None):
+    """The Student_Data database: from an explicit connection string, or the app's."""
+    if connection_string:
+        return pymongo.MongoClient(connection_string)["Student_Data"]
+    from students_db import connect_to_db
+    return connect_to_db()
+
+
+def ensure_search_indexes(db):
+    coll = db["Student_Records"]
+    coll.create_index([("program_id", pymongo.ASCENDING), ("name_terms", pymongo.ASCENDING)])
+    coll.create_index("name_terms")
+    if OLD_COMMENT_INDEX in coll.index_information():
+        coll.drop_index(OLD_COMMENT_INDEX)
+    coll.create_index([("program_id", pymongo.ASCENDING), ("attendance.comment", pymongo.TEXT)],
+                      name=COMMENT_INDEX)
+    return coll
+
+
+@st.cache_resource
+def _student_records():
+    """Student_Records, with the search indexes created once per process."""
+    return ensure_search_indexes(_student_db())
+
+
+def typeahead(prefix: str, program_ids=None, limit: int = TYPEAHEAD_LIMIT) -> list:
+    """
+    Up to `limit` students whose name (or a word of it) starts with
+    `prefix`, sorted by name, restricted to program_ids if given.
+    Returns [{student_id, name, program_id}].
+    """
+    query = name_prefix_query(prefix)
+    if not query:
+        return []
+    if program_ids:
+        query["program_id"] = {"$in": list(program_ids)}
+    cursor = (
+        _student_records()
+        .find(query, {"_id": 0, "student_id": 1, "name": 1, "program_id": 1})
+        .sort("name", pymongo.ASCENDING)
+        .limit(max(1, min(int(limit), MAX_RESULTS)))
+    )
+    return list(cursor)
+
+
+def word_stem(word: str) -> str:
+    """`word` folded, without a common English ending (kept to at least 3 letters)."""
+    word = fold(word)
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word[-1] == word[-2]:
+        # "running" -> "runn" -> "run"
+        word = word[:-1]
+    return word
+
+
+def comment_entry_match(words: list) -> dict:
+    """Entries with a comment word starting with the stem of any of `words`."""
+    return {"$or": [
+        {"attendance.comment": {"$regex": r"\b" + re.escape(word_stem(w)), "$options": "i"}} for w in words
+    ]}
+
+
+def search_comments(text: str, program_ids=None, limit: int = MAX_RESULTS) -> list:
+    """
+    Attendance entries whose comment contains the words in `text` (or other
+    forms of them), newest first, in program_ids (default: every program).
+    Returns up to `limit` rows shaped like get_all_attendance_subdocs():
+    {student_id, name, program_id, attendance: {date, status, comment}}.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return []
+    coll = _student_records()
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    if program_ids is None:
+        program_ids = coll.distinct("program_id")
+
+    rows = []
+    # The text index needs an equality match on program_id: one search per program
+    for program_id in program_ids:
+        rows += coll.aggregate([
+            {"$match": {"program_id": program_id, "$text": {"$search": " ".join(words)}}},
+            {"$project": {"_id": 0, "student_id": 1, "name": 1, "program_id": 1, "attendance": 1}},
+            # The text index finds the students; this picks out their matching entries
+            {"$unwind": "$attendance"},
+            {"$match": comment_entry_match(words)},
+            {"$project": {
+                "student_id": 1, "name": 1, "program_id": 1,
+                "attendance.date": 1, "attendance.status": 1, "attendance.comment": 1
+            }},
+            {"$sort": {"attendance.date": pymongo.DESCENDING}},
+            {"$limit": limit},
+        ])
+    rows.sort(key=lambda r: r["attendance"].get("date") or datetime.min, reverse=True)
+    return rows[:limit]
+
+
+def backfill_name_terms(batch_size: int = DEFAULT_BATCH_SIZE, connection_string=None) -> int:
+    """
+    Set name_terms on every student that lacks it, batch_size at a time.
+    Finished students drop out of the query, so an interrupted run just
+    picks up the rest. Returns the number of students updated.
+    """
+    coll = ensure_search_indexes(_student_db(connection_string))
+
+    updated = 0
+    while True:
+        batch = list(coll.find({"name_terms": {"$exists": False}}, {"name": 1}).limit(batch_size))
+        if not batch:
+            break
+        coll.bulk_write([
+            pymongo.UpdateOne({"_id": doc["_id"]}, {"$set": name_search_fields(doc.get("name", ""))})
+            for doc in batch
+        ], ordered=False)
+        updated += len(batch)
+    return updated
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Create the search indexes and backfill name_terms.")
+    arg_parser.add_argument("--backfill", action="store_true",
+                            help="set name_terms on students written before search existed")
+    arg_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f"students per bulk_write (default {DEFAULT_BATCH_SIZE})")
+    arg_parser.add_argument("--connection-string", default=os.environ.get("CONNECTION_STRING"),
+                            help="MongoDB connection string (default: $CONNECTION_STRING, "
+                                 "else .streamlit/secrets.toml)")
+    args = arg_parser.parse_args(argv)
+
+    ensure_search_indexes(_student_db(args.connection_string))
+    print("Search indexes are in place.")
+    if args.backfill:
+        print(f"Backfilled name_terms for {backfill_name_terms(args.batch_size, args.connection_string)} students.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,441 @@
+# sessions_db.py
+"""
+Concrete class sessions, expanded from Schedules.
+
+A schedule is either one-time (start_datetime/end_datetime) or Weekly
+(days_times: [{day, start_time, end_time, location}]). Each occurrence is
+stored as its own document in Sessions:
+
+    {_id: "<schedule_id>:<YYYYmmddTHHMM>", schedule_id, program_id,
+     instructor_id, title, location, start, end}
+
+indexed on (start, end), so "what happens between X and Y" is a range
+query. Weekly schedules are expanded up to a rolling horizon, which
+sessions_between() pushes forward when asked about later dates.
+
+Schedules written before Sessions existed are materialized on first use
+(the horizon checkpoint records the backfill), or explicitly:
+
+    python sessions_db.py               # backfill whatever is missing
+    python sessions_db.py --rebuild     # drop Sessions and re-expand everything
+"""
+import argparse
+from datetime import datetime, date, time, timedelta
+
+import pymongo
+import streamlit as st
+
+from students_db import connect_to_db, read_collection
+
+WEEKDAYS = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+
+# How far ahead weekly schedules are materialized
+SESSION_HORIZON = timedelta(days=120)
+# Where a weekly schedule without created_at starts
+SESSION_LOOKBACK = timedelta(days=180)
+
+HORIZON_CHECKPOINT = "sessions_horizon"
+
+EARLIEST = datetime(1970, 1, 1)
+
+# Locations are matched ignoring case ("Gym" and "gym" are one room)
+LOCATION_COLLATION = {"locale": "en", "strength": 2}
+
+
+@st.cache_resource
+def _sessions():
+    """Sessions collection, with its indexes created once per process."""
+    coll = connect_to_db()["Sessions"]
+    coll.create_index([("start", pymongo.ASCENDING), ("end", pymongo.ASCENDING)], name="start_end")
+    coll.create_index([("schedule_id", pymongo.ASCENDING), ("start", pymongo.ASCENDING)])
+    coll.create_index([("program_id", pymongo.ASCENDING), ("start", pymongo.ASCENDING)])
+    coll.create_index([("instructor_id", pymongo.ASCENDING), ("start", pymongo.ASCENDING)])
+    coll.create_index([("location", pymongo.ASCENDING), ("start", pymongo.ASCENDING)],
+                      name="location_start_ci", collation=LOCATION_COLLATION)
+    return coll
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    from dateutil import parser
+    return parser.parse(value)
+
+
+def _to_time(value) -> time:
+    """days_times stores times as "HH:MM:SS" strings."""
+    if isinstance(value, time):
+        return value
+    parts = [int(p) for p in str(value).split(":")]
+    return time(*parts[:3])
+
+
+def _occurrence(schedule_doc: dict, start: datetime, end: datetime, location) -> dict:
+    schedule_id = str(schedule_doc["_id"])
+    return {
+        "_id": f"{schedule_id}:{start.strftime('%Y%m%dT%H%M')}",
+        "schedule_id": schedule_id,
+        "program_id": schedule_doc.get("program_id"),
+        "instructor_id": schedule_doc.get("instructor_id"),
+        "title": schedule_doc.get("title", ""),
+        "location": (location or "").strip(),
+        "start": start,
+        "end": end,
+    }
+
+
+def expand_occurrences(schedule_doc: dict, window_start: datetime, window_end: datetime) -> list:
+    """
+    The schedule's sessions that overlap [window_start, window_end), in
+    start order. Doesn't touch the database.
+    """
+    if schedule_doc.get("recurrence") != "Weekly":
+        start = _to_datetime(schedule_doc.get("start_datetime"))
+        end = _to_datetime(schedule_doc.get("end_datetime")) or start
+        if start and start < window_end and end > window_start:
+            return [_occurrence(schedule_doc, start, end, schedule_doc.get("location"))]
+        return []
+
+    # A weekly schedule runs from the day it was created
+    first_day = _to_datetime(schedule_doc.get("created_at"))
+    first_day = first_day.date() if first_day else (datetime.utcnow() - SESSION_LOOKBACK).date()
+    day = max(first_day, window_start.date() - timedelta(days=1))
+
+    by_weekday = {}
+    for slot in schedule_doc.get("days_times", []):
+        if slot.get("day") in WEEKDAYS:
+            by_weekday.setdefault(WEEKDAYS[slot["day"]], []).append(slot)
+
+    occurrences = []
+    while day < window_end.date() + timedelta(days=1):
+        for slot in by_weekday.get(day.weekday(), []):
+            start = datetime.combine(day, _to_time(slot["start_time"]))
+            end = datetime.combine(day, _to_time(slot["end_time"]))
+            if end <= start:
+                # Ends after midnight
+                end += timedelta(days=1)
+            if start < window_end and end > window_start:
+                occurrences.append(_occurrence(schedule_doc, start, end, slot.get("location")))
+        day += timedelta(days=1)
+    occurrences.sort(key=lambda o: o["start"])
+    return occurrences
+
+
+def _current_horizon() -> datetime:
+    """How far ahead sessions are materialized (SESSION_HORIZON from now if never set)."""
+    checkpoint = connect_to_db()["Job_Checkpoints"].find_one({"_id": HORIZON_CHECKPOINT}) or {}
+    return checkpoint.get("through") or (datetime.utcnow() + SESSION_HORIZON)
+
+
+def _upsert(occurrences: list):
+    if occurrences:
+        _sessions().bulk_write(
+            [pymongo.ReplaceOne({"_id": o["_id"]}, o, upsert=True) for o in occurrences],
+            ordered=False
+        )
+
+
+def sync_schedule_sessions(schedule_doc: dict, from_dt: datetime = None):
+    """
+    (Re)materialize one schedule's sessions. With from_dt, sessions before it
+    are left alone (a schedule edit doesn't rewrite the past); later ones are
+    replaced with the schedule's current occurrences.
+    """
+    schedule_id = str(schedule_doc["_id"])
+    window_start = from_dt or EARLIEST
+    stale = {"schedule_id": schedule_id}
+    if from_dt is not None:
+        stale["start"] = {"$gte": from_dt}
+    _sessions().delete_many(stale)
+    _upsert(expand_occurrences(schedule_doc, window_start, _current_horizon()))
+
+
+def remove_schedule_sessions(schedule_id: str):
+    _sessions().delete_many({"schedule_id": str(schedule_id)})
+
+
+def ensure_sessions_through(needed: datetime):
+    """
+    Make sure weekly schedules are materialized at least up to `needed`. If
+    they aren't, expand them from the current horizon to SESSION_HORIZON
+    past `needed` and move the horizon there. The first call backfills
+    every schedule, one-time ones included (backfill_sessions).
+    """
+    checkpoints = connect_to_db()["Job_Checkpoints"]
+    checkpoint = checkpoints.find_one({"_id": HORIZON_CHECKPOINT}) or {}
+    if not checkpoint.get("backfilled"):
+        backfill_sessions(max(needed, datetime.utcnow()) + SESSION_HORIZON)
+        return
+    current = checkpoint.get("through")
+    if current and current >= needed:
+        return
+    window_start = current or EARLIEST
+    through = needed + SESSION_HORIZON
+
+    occurrences = []
+    for schedule_doc in connect_to_db()["Schedules"].find({"recurrence": "Weekly"}):
+        occurrences.extend(expand_occurrences(schedule_doc, window_start, through))
+    _upsert(occurrences)
+
+    checkpoints.update_one(
+        {"_id": HORIZON_CHECKPOINT},
+        {"$set": {"through": through, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+def sessions_between(start: datetime, end: datetime, program_ids=None,
+                     instructor_id=None, location: str = None) -> list:
+    """
+    Sessions overlapping [start, end), in start order, optionally narrowed to
+    some programs, an instructor or a location (compared ignoring case).
+    """
+    if isinstance(start, date) and not isinstance(start, datetime):
+        start = datetime.combine(start, time.min)
+    if isinstance(end, date) and not isinstance(end, datetime):
+        end = datetime.combine(end, time.min)
+    ensure_sessions_through(max(end, datetime.utcnow()))
+
+    query = {"start": {"$lt": end}, "end": {"$gt": start}}
+    if program_ids is not None:
+        query["program_id"] = {"$in": list(program_ids)}
+    if instructor_id is not None:
+        query["instructor_id"] = instructor_id
+    if location:
+        query["location"] = location.strip()
+    cursor = _sessions().find(query).sort("start", pymongo.ASCENDING)
+    if location:
+        cursor = cursor.collation(LOCATION_COLLATION)
+    return list(cursor)
+
+
+def backfill_sessions(through: datetime = None) -> int:
+    """
+    Materialize every schedule (one-time and weekly) up to `through`
+    (default: SESSION_HORIZON from now), keeping sessions already stored,
+    and mark the backfill done. Returns the number of sessions written.
+    """
+    through = through or datetime.utcnow() + SESSION_HORIZON
+    written = 0
+    for schedule_doc in connect_to_db()["Schedules"].find({}):
+        occurrences = expand_occurrences(schedule_doc, EARLIEST, through)
+        _upsert(occurrences)
+        written += len(occurrences)
+    connect_to_db()["Job_Checkpoints"].update_one(
+        {"_id": HORIZON_CHECKPOINT},
+        {"$set": {"backfilled": True, "updated_at": datetime.utcnow()}, "$max": {"through": through}},
+        upsert=True
+    )
+    return written
+
+
+def rebuild_sessions() -> int:
+    """Re-expand every schedule from scratch. Returns the number of sessions stored."""
+    _sessions().delete_many({})
+    return backfill_sessions()
+
+
+# Statuses that count as having attended a session
+ATTENDED_STATUSES = ["Present", "Late"]
+
+
+def expected_vs_actual(start: datetime, end: datetime, program_ids=None) -> dict:
+    """
+    Expected-vs-actual attendance between start and end (capped at now), in
+    one aggregation: each student is expected at every session of their
+    program, and their attendance entries -- embedded, session-stored
+    (attendance_sessions_db) or archived (attendance_archive) -- are matched
+    to those sessions day by day, in time order: a day with two sessions and
+    one entry has one recorded and one unrecorded. Needs MongoDB 5.0 or
+    later ($dateTrunc).
+
+    Returns {"students": [...], "programs": [...]}; each row has expected,
+    attended (Present/Late), absent, excused, unrecorded and rate (attended
+    / expected, 0..1, None if nothing was expected).
+    """
+    from attendance_sessions_db import union_session_rows
+    from attendance_archive import archive_reaches, archived_rows
+
+    end = min(end, datetime.utcnow())
+    ensure_sessions_through(end)
+    _sessions()  # make sure the (program_id, start) index exists
+
+    match = {}
+    if program_ids is not None:
+        match["program_id"] = {"$in": list(program_ids)}
+
+    # Attendance on any day that has a session in range
+    first_day = datetime.combine(start.date(), time.min)
+    last_day = datetime.combine(end.date(), time.min) + timedelta(days=1)
+    in_range = {"$gte": first_day, "$lt": last_day}
+
+    # Archived entries are decoded here and passed in with the pipeline
+    archived = []
+    if archive_reaches(first_day):
+        archived = [
+            {"student_id": r["student_id"], "date": r["attendance"]["date"], "status": r["attendance"]["status"]}
+            for r in archived_rows(first_day, last_day, program_ids=program_ids)
+        ]
+
+    def count_status(statuses):
+        return {"$size": {"$filter": {"input": "$statuses", "as": "st", "cond": {"$in": ["$$st", statuses]}}}}
+
+    def with_rate():
+        return {"$addFields": {"rate": {"$cond": [
+            {"$gt": ["$expected", 0]}, {"$divide": ["$attended", "$expected"]}, None
+        ]}}}
+
+    def day_rank(items, order):
+        """Per item of $items: how many items on its day come before it (by `order`, a list of fields)."""
+        earlier = {"$or": [
+            {"$and": [
+                *[{"$eq": [f"$$o.{f}", f"$$x.{f}"]} for f in order[:i]],
+                {"$lt": [f"$$o.{order[i]}", f"$$x.{order[i]}"]},
+            ]}
+            for i in range(len(order))
+        ]}
+        return {"$map": {"input": f"${items}", "as": "x", "in": {"$mergeObjects": ["$$x", {"rank": {"$size": {
+            "$filter": {"input": f"${items}", "as": "o",
+                        "cond": {"$and": [{"$eq": ["$$o.day", "$$x.day"]}, earlier]}}
+        }}}]}}}
+
+    counters = ["expected", "attended", "absent", "excused", "unrecorded"]
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            "_id": 0,
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "is_student": {"$literal": True},
+            "attendance": {"$filter": {
+                "input": {"$ifNull": ["$attendance", []]},
+                "as": "a",
+                "cond": {"$and": [{"$gte": ["$$a.date", first_day]}, {"$lt": ["$$a.date", last_day]}]}
+            }},
+        }},
+        # Session-stored rows come in unwound; gather them back under their
+        # student, keeping only students that have a record
+        union_session_rows({**match, "session_datetime": in_range}),
+        {"$group": {
+            "_id": "$student_id",
+            "is_student": {"$max": "$is_student"},
+            "name": {"$max": {"$cond": ["$is_student", "$name", None]}},
+            "program_id": {"$max": {"$cond": ["$is_student", "$program_id", None]}},
+            "attendance": {"$push": {"$cond": [
+                {"$isArray": "$attendance"}, "$attendance", ["$attendance"]
+            ]}},
+        }},
+        {"$match": {"is_student": True}},
+        {"$project": {
+            "_id": 0,
+            "student_id": "$_id",
+            "name": 1,
+            "program_id": 1,
+            "attendance": {"$concatArrays": [
+                {"$reduce": {
+                    "input": "$attendance", "initialValue": [],
+                    "in": {"$concatArrays": ["$$value", "$$this"]}
+                }},
+                {"$filter": {"input": {"$literal": archived}, "as": "r",
+                             "cond": {"$eq": ["$$r.student_id", "$_id"]}}},
+            ]},
+        }},
+        {"$lookup": {
+            "from": "Sessions",
+            "let": {"pid": "$program_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$program_id", "$$pid"]},
+                    {"$gte": ["$start", start]},
+                    {"$lt": ["$start", end]},
+                ]}}},
+                {"$project": {"start": 1, "day": {"$dateTrunc": {"date": "$start", "unit": "day"}}}},
+            ],
+            "as": "sessions"
+        }},
+        # Number each day's sessions and entries in time order (index breaks
+        # ties between entries with the same time)
+        {"$project": {
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "sessions": 1,
+            "attendance": {"$map": {
+                "input": {"$range": [0, {"$size": "$attendance"}]},
+                "as": "i",
+                "in": {"$let": {"vars": {"a": {"$arrayElemAt": ["$attendance", "$$i"]}}, "in": {
+                    "i": "$$i",
+                    "date": "$$a.date",
+                    "status": "$$a.status",
+                    "day": {"$dateTrunc": {"date": "$$a.date", "unit": "day"}},
+                }}},
+            }},
+        }},
+        {"$project": {
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "sessions": day_rank("sessions", ["start", "_id"]),
+            "attendance": day_rank("attendance", ["date", "i"]),
+        }},
+        # The status of the entry matched to each session (null if none)
+        {"$project": {
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "statuses": {"$map": {
+                "input": "$sessions",
+                "as": "s",
+                "in": {"$first": {"$map": {
+                    "input": {"$filter": {
+                        "input": "$attendance",
+                        "as": "a",
+                        "cond": {"$and": [{"$eq": ["$$a.day", "$$s.day"]}, {"$eq": ["$$a.rank", "$$s.rank"]}]}
+                    }},
+                    "as": "a",
+                    "in": "$$a.status"
+                }}}
+            }}
+        }},
+        {"$project": {
+            "student_id": 1,
+            "name": 1,
+            "program_id": 1,
+            "expected": {"$size": "$statuses"},
+            "attended": count_status(ATTENDED_STATUSES),
+            "absent": count_status(["Absent"]),
+            "excused": count_status(["Excused"]),
+            "unrecorded": count_status([None]),
+        }},
+        {"$facet": {
+            "students": [with_rate(), {"$sort": {"program_id": 1, "name": 1}}, {"$project": {"_id": 0}}],
+            "programs": [
+                {"$group": {"_id": "$program_id", "students": {"$sum": 1},
+                            **{c: {"$sum": f"${c}"} for c in counters}}},
+                {"$project": {"_id": 0, "program_id": "$_id", "students": 1, **{c: 1 for c in counters}}},
+                with_rate(),
+                {"$sort": {"program_id": 1}},
+            ],
+        }},
+    ]
+    coll = read_collection("Student_Records", "expected_vs_actual")
+    result = list(coll.aggregate(pipeline, allowDiskUse=True))
+    return result[0] if result else {"students": [], "programs": []}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Materialize class sessions from Schedules.")
+    arg_parser.add_argument("--rebuild", action="store_true",
+                            help="drop every stored session and re-expand all schedules")
+    args = arg_parser.parse_args(argv)
+
+    if args.rebuild:
+        print(f"Rebuilt Sessions: {rebuild_sessions()} sessions.")
+    else:
+        print(f"Backfilled Sessions: {backfill_sessions()} sessions written.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
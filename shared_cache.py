@@ -0,0 +1,241 @@
+# shared_cache.py
+"""
+Cache for data-layer reads, shared between Streamlit workers.
+
+st.cache_data and st.cache_resource live inside one process, so each replica
+behind the load balancer keeps (and fills) its own copy. Functions decorated
+with @cached(namespace) store their results in a pluggable backend instead,
+chosen in .streamlit/secrets.toml:
+
+    CACHE_BACKEND = "memory"   # default: in-process LRU (one worker only)
+    CACHE_BACKEND = "disk"     # SQLite file, shared by workers on one host
+    CACHE_PATH = "data/cache.sqlite3"
+    CACHE_BACKEND = "redis"    # any Redis-protocol server, shared by all hosts
+    CACHE_URL = "redis://localhost:6379/0"
+
+Keys are "<CACHE_PREFIX>:<namespace>:<generation>:<function>:<args hash>".
+invalidate(namespace), called by the write paths, bumps the namespace's
+generation in the backend itself, so every worker reading that backend
+misses on the old entries straight away; they then age out by TTL.
+
+Values are pickled, so the backend must only be reachable by the app.
+"""
+import os
+import time
+import pickle
+import random
+import sqlite3
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+CACHE_PREFIX = "clubstride"
+DEFAULT_TTL = 300
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache.sqlite3")
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTLs. Not shared between processes."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int = None):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._entries.get(key, (b"0", None))[0]) + 1
+            self._entries[key] = (str(value).encode(), None)
+            return value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskBackend:
+    """
+    SQLite-backed cache in one file (WAL mode), shared by every worker
+    process on the host. Expired rows are purged now and then on writes.
+    """
+
+    PURGE_PROBABILITY = 0.01
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        # Counters written by older versions of incr() are stored as TEXT
+        return row[0].encode() if isinstance(row[0], str) else bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: int = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl if ttl else None)
+            )
+            if random.random() < self.PURGE_PROBABILITY:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache (key, value, expires_at) VALUES (?, CAST('1' AS BLOB), NULL) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(CAST(CAST(value AS TEXT) AS INTEGER) + 1 AS BLOB)",
+                (key,)
+            )
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return int(row[0])
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RedisBackend:
+    """
+    Any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...).
+    Pass `client` to use an existing client or a local stand-in such as
+    fakeredis; otherwise one is created from `url` with redis-py.
+    """
+
+    def __init__(self, url: str = None, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+
+    def get(self, key: str):
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int = None):
+        self._client.set(key, value, ex=ttl or None)
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+
+BACKENDS = {"memory": MemoryBackend, "disk": DiskBackend, "redis": RedisBackend}
+
+
+def _secret(name: str, default=None):
+    try:
+        return st.secrets.get(name, default)
+    except Exception:
+        return default
+
+
+@st.cache_resource
+def get_cache_backend():
+    """The configured backend, one per process (see the module docstring)."""
+    kind = _secret("CACHE_BACKEND", "memory")
+    if kind == "disk":
+        return DiskBackend(_secret("CACHE_PATH", DEFAULT_CACHE_PATH))
+    if kind == "redis":
+        return RedisBackend(_secret("CACHE_URL"))
+    if kind != "memory":
+        print(f"Unknown CACHE_BACKEND {kind!r}; using the in-process cache.")
+    return MemoryBackend()
+
+
+def _generation_key(namespace: str) -> str:
+    return f"{CACHE_PREFIX}:{namespace}:generation"
+
+
+def _generation(backend, namespace: str) -> int:
+    value = backend.get(_generation_key(namespace))
+    return int(value) if value else 0
+
+
+def invalidate(*namespaces: str):
+    """
+    Drop everything cached under these namespaces, for every worker sharing
+    the backend. Call after the write that made them stale.
+    """
+    try:
+        backend = get_cache_backend()
+        for namespace in namespaces:
+            backend.incr(_generation_key(namespace))
+    except Exception as e:
+        print(f"Error invalidating cache {namespaces}: {e}")
+
+
+def cached(namespace, ttl: int = DEFAULT_TTL):
+    """
+    Decorator: cache the function's result in the shared backend under
+    `namespace`, keyed by its arguments (which must have a stable repr).
+    `namespace` may also be a function of the call's arguments returning a
+    list of namespaces; invalidating any one of them drops the entry.
+    Results come back as fresh copies, so callers may mutate them. If the
+    backend is unavailable the function is simply called.
+    The undecorated function stays reachable as `.uncached`.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            args_hash = hashlib.sha1(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+            try:
+                backend = get_cache_backend()
+                namespaces = namespace(*args, **kwargs) if callable(namespace) else [namespace]
+                scope = ":".join(f"{ns}:{_generation(backend, ns)}" for ns in namespaces)
+                key = f"{CACHE_PREFIX}:{scope}:{name}:{args_hash}"
+                hit = backend.get(key)
+                if hit is not None:
+                    return pickle.loads(hit)
+            except Exception as e:
+                print(f"Cache read failed for {name}: {e}")
+                return func(*args, **kwargs)
+
+            result = func(*args, **kwargs)
+            try:
+                backend.set(key, pickle.dumps(result), ttl)
+            except Exception as e:
+                print(f"Cache write failed for {name}: {e}")
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -7,10 +7,12 @@ from datetime import datetime, timedelta
 
 import streamlit as st
 from dotenv import load_dotenv
-from mailersend import emails
 from bson import ObjectId
+from pymongo.read_preferences import ReadPreference, SecondaryPreferred
 
 from instructors_db import list_programs
+from shared_cache import cached, invalidate
+from search_db import name_search_fields, name_prefix_query
 
 # load_dotenv()
 
@@ -24,6 +26,114 @@ def connect_to_db():
     return db
 
 
+# Read routing. Each read is tagged with a workload: "oltp" reads (and all
+# writes) go to the primary; "analytical" reads -- the heavy reporting
+# aggregations -- go to a secondary that is at most
+# ANALYTICS_MAX_STALENESS_SECONDS behind, or the primary if there is none
+# (secondaryPreferred). Operations not listed here are "oltp". Override per
+# operation in .streamlit/secrets.toml:
+#
+#     ANALYTICS_MAX_STALENESS_SECONDS = 120
+#     [READ_WORKLOADS]
+#     fetch_all_attendance_records = "oltp"
+READ_WORKLOADS = {
+    "fetch_all_attendance_records": "analytical",
+    "get_missed_counts_for_all_students": "analytical",
+    "expected_vs_actual": "analytical",
+    "analytics_snapshot": "analytical",
+    "attendance_cache": "analytical",
+    "attendance_archive": "analytical",
+}
+# MongoDB won't accept a maxStalenessSeconds below 90
+ANALYTICS_MAX_STALENESS_SECONDS = 120
+
+
+def read_workload(operation: str) -> str:
+    """"oltp" or "analytical" for a named read operation."""
+    try:
+        overrides = st.secrets.get("READ_WORKLOADS", {})
+    except Exception:
+        overrides = {}
+    return overrides.get(operation, READ_WORKLOADS.get(operation, "oltp"))
+
+
+def read_preference_for(operation: str):
+    if read_workload(operation) != "analytical":
+        return ReadPreference.PRIMARY
+    try:
+        staleness = int(st.secrets.get("ANALYTICS_MAX_STALENESS_SECONDS", ANALYTICS_MAX_STALENESS_SECONDS))
+    except Exception:
+        staleness = ANALYTICS_MAX_STALENESS_SECONDS
+    return SecondaryPreferred(max_staleness=max(staleness, 90))
+
+
+def read_collection(name: str, operation: str):
+    """A Student_Data collection whose reads are routed for `operation` (see READ_WORKLOADS)."""
+    return connect_to_db()[name].with_options(read_preference=read_preference_for(operation))
+
+
+# Version field of a student's attendance array (see VersionConflict)
+ATTENDANCE_VERSION = "_av"
+
+
+class VersionConflict(Exception):
+    """
+    A write was made against a stale copy of a document: someone else saved
+    it after it was loaded, so its `_v` version field has moved on.
+    `current_version` is the version now stored (None if the doc is gone).
+
+    Student records carry two versions: `_v` for the profile fields and
+    ATTENDANCE_VERSION for the embedded attendance array, so editing one
+    doesn't make open copies of the other stale.
+    """
+    def __init__(self, message, current_version=None):
+        super().__init__(message)
+        self.current_version = current_version
+
+
+def version_filter(expected_version, field="_v") -> dict:
+    """
+    Extra filter terms making a write conditional on the document's `_v`
+    (or another version field).
+    Documents written before versioning have no `_v` and count as version 0.
+    expected_version=None means unconditional (no check).
+    """
+    if expected_version is None:
+        return {}
+    if expected_version == 0:
+        return {field: {"$in": [0, None]}}
+    return {field: expected_version}
+
+
+def raise_if_stale(coll, query: dict, expected_version, what="record", field="_v"):
+    """
+    Call after a conditional write matched nothing: raises VersionConflict if
+    the document still exists at a different version (or is gone).
+    """
+    if expected_version is None:
+        return
+    doc = coll.find_one(query, {field: 1})
+    current = doc.get(field, 0) if doc else None
+    if current != expected_version:
+        if doc is None:
+            raise VersionConflict(f"This {what} was deleted by someone else.", None)
+        raise VersionConflict(
+            f"This {what} was changed by someone else (version {expected_version} -> {current}). "
+            "Reload it and try again.",
+            current
+        )
+
+
+def run_transaction(db, write):
+    """
+    Run write(session) as one transaction on db's client (retried on
+    transient errors) and return its result. Every collection written must
+    come from that client. Transactions need a replica set.
+    """
+    with db.client.start_session() as session:
+        return session.with_transaction(write)
+
+
 def generate_student_id(name: str, program_id: str) -> str:
     composite_str = f"{name.strip().lower()}:{str(program_id).lower()}"
     full_hash = hashlib.md5(composite_str.encode('utf-8')).hexdigest()
@@ -33,8 +143,13 @@ def generate_student_id(name: str, program_id: str) -> str:
 def get_attendance_subdocs_in_range(start_date, end_date):
     """
     Returns all unwound attendance sub-docs from Student_Records
-    where attendance.date is between start_date and end_date (inclusive).
+    where attendance.date is between start_date and end_date (inclusive),
+    plus session-stored records in that range (attendance_sessions_db)
+    and archived ones if the range reaches back that far (attendance_archive).
     """
+    from attendance_sessions_db import union_session_rows
+    from attendance_archive import archive_reaches, archived_rows
+
     db = connect_to_db()
     coll = db["Student_Records"]
 
@@ -58,10 +173,14 @@ def get_attendance_subdocs_in_range(start_date, end_date):
                 "attendance.status": 1,
                 "attendance.comment": 1
             }
-        }
+        },
+        union_session_rows({"session_datetime": {"$gte": start_date, "$lte": end_date}})
     ]
 
-    return list(coll.aggregate(pipeline))
+    rows = list(coll.aggregate(pipeline))
+    if archive_reaches(start_date):
+        rows += archived_rows(start_date, end_date)
+    return rows
 
 
 def get_attendance_subdocs_last_week():
@@ -93,47 +212,46 @@ def store_student_record(name, phone, contact_email, program_id, grade="", schoo
     coll = db["Student_Records"]
     student_id = generate_student_id(name, program_id)
 
-    existing = coll.find_one({"student_id": student_id})
-    if existing:
-        coll.update_one(
-            {"_id": existing["_id"]},
-            {"$set": {
+    # One round trip: update the student if they exist, create them if not
+    result = coll.update_one(
+        {"student_id": student_id},
+        {
+            "$set": {
                 "name": name,
                 "phone": phone,
                 "contact_email": contact_email,
                 # "parent_email": parent_email,
                 "program_id": program_id,
                 "grade": grade,
-                "school": school
-            }}
-        )
+                "school": school,
+                **name_search_fields(name)
+            },
+            "$setOnInsert": {
+                "attendance": [],
+                "missed_count": 0
+            },
+            "$inc": {"_v": 1},
+            "$currentDate": {"updated_at": True}
+        },
+        upsert=True
+    )
+    invalidate_roster(program_id)
+    if result.upserted_id is None:
         return f"Student record updated for {name} (ID={student_id})."
-    else:
-        doc = {
-            "student_id": student_id,
-            "name": name,
-            "phone": phone,
-            "contact_email": contact_email,
-            # "parent_email": parent_email,
-            "program_id": program_id,
-            "attendance": [],
-            "missed_count": 0,
-            "grade": grade,
-            "school": school
-        }
-        coll.insert_one(doc)
-        return f"New student record added for {name} (ID={student_id})!"
+    return f"New student record added for {name} (ID={student_id})!"
 
 
 # def get_all_students():
 #     db = connect_to_db()
 #     coll = db["Student_Records"]
 #     return list(coll.find())
-def get_all_students(program_ids=None):
+def get_all_students(program_ids=None, projection=None):
     """
     Returns a list of student records.
     If 'program_ids' is provided (list of numeric IDs),
     only returns those records where 'program_id' is in that list.
+    'projection' is passed through to find(), e.g. ROSTER_PROJECTION to
+    skip the attendance array.
     """
     db = connect_to_db()
     coll = db["Student_Records"]
@@ -143,10 +261,83 @@ def get_all_students(program_ids=None):
     else:
         query = {}
     
-    return list(coll.find(query))
+    return list(coll.find(query, projection))
+
+
+# Roster views don't need the (unbounded) attendance history
+ROSTER_PROJECTION = {"attendance": 0}
+
+# Backstop for roster changes nobody invalidated (missed_count moves with
+# every absence); change_streams.py invalidates precisely when it runs
+ROSTER_TTL = 60
+
+
+def roster_namespaces(program_ids=None) -> list:
+    """Shared-cache namespaces of a get_roster() call (see invalidate_roster)."""
+    if not program_ids:
+        return ["roster", "roster:all"]
+    return ["roster"] + [f"roster:{pid}" for pid in program_ids]
+
+
+def invalidate_roster(*program_ids):
+    """
+    Drop the cached rosters that include any of these programs (and the
+    all-programs roster). With no program_ids, drop every roster.
+    """
+    if program_ids:
+        invalidate("roster:all", *[f"roster:{pid}" for pid in program_ids])
+    else:
+        invalidate("roster")
+
+
+@cached(roster_namespaces, ttl=ROSTER_TTL)
+def get_roster(program_ids=None):
+    """
+    get_all_students() without the attendance arrays, from the shared cache.
+    For the attendance-taking and summary pages.
+    """
+    return get_all_students(program_ids=program_ids, projection=ROSTER_PROJECTION)
+
+
+def get_students_page(program_ids=None, search=None, skip=0, limit=25, projection=ROSTER_PROJECTION):
+    """
+    One page of student records, sorted by name, plus the total number of
+    matches so the caller can render pager controls.
+    'search' matches names, or words of them, starting with it, ignoring case
+    and accents (search_db), through an index, so only the visible slice is
+    ever read.
+
+    Returns (students, total).
+    """
+    db = connect_to_db()
+    coll = db["Student_Records"]
+
+    query = {}
+    if program_ids:
+        query["program_id"] = {"$in": program_ids}
+    if search:
+        query.update(name_prefix_query(search))
+
+    total = coll.count_documents(query)
+    cursor = coll.find(query, projection).sort("name", pymongo.ASCENDING).skip(int(skip)).limit(int(limit))
+    return list(cursor), total
+
+
+def get_student_record(object_id):
+    """
+    Returns a single student document by its Mongo _id, or None.
+    Used to refresh one record after an edit instead of re-reading the roster.
+    """
+    db = connect_to_db()
+    coll = db["Student_Records"]
+    if isinstance(object_id, str):
+        object_id = ObjectId(object_id)
+    return coll.find_one({"_id": object_id})
 
 
 def get_all_attendance_subdocs():
+    from attendance_sessions_db import union_session_rows
+
     db = connect_to_db()
     coll = db["Student_Records"]
     pipeline = [
@@ -158,11 +349,13 @@ def get_all_attendance_subdocs():
                 "name": 1,
                 "program_id": 1,
                 "phone": 1,
+                ATTENDANCE_VERSION: 1,
                 "attendance.date": 1,
                 "attendance.status": 1,
                 "attendance.comment": 1
             }
-        }
+        },
+        union_session_rows()
     ]
     return list(coll.aggregate(pipeline))
 
@@ -170,32 +363,38 @@ def get_missed_counts_for_all_students(program_ids=None):
     """
     Returns a list of {student_id, name, phone, program_id, sum_missed}
     Optionally filters by a list of program_ids if provided.
+    Session-stored and archived attendance (attendance_sessions_db,
+    attendance_archive) is counted too.
     """
-    db = connect_to_db()
-    coll = db["Student_Records"]
+    from attendance_sessions_db import union_session_rows
+    from attendance_archive import union_archive_counts
+
+    coll = read_collection("Student_Records", "get_missed_counts_for_all_students")
     
     pipeline = []
+    session_match = None
     
     # Only match certain program IDs if given (i.e., instructor scenario)
     if program_ids:
         pipeline.append({"$match": {"program_id": {"$in": program_ids}}})
+        session_match = {"program_id": {"$in": program_ids}}
     
     pipeline += [
         {"$unwind": "$attendance"},
+        union_session_rows(session_match),
+        union_archive_counts(session_match),
         {
             "$group": {
-                "_id": {
-                    "student_id": "$student_id",
-                    "name": "$name",
-                    "phone": "$phone",
-                    "program_id": "$program_id"
-                },
+                "_id": "$student_id",
+                "name": {"$first": "$name"},
+                # Session rows carry no phone; take it from the student record
+                "phone": {"$max": "$phone"},
+                "program_id": {"$first": "$program_id"},
                 "sum_missed": {
                     "$sum": {
-                        "$cond": [
-                            {"$eq": ["$attendance.status", "Absent"]},
-                            1,
-                            0
+                        "$add": [
+                            {"$cond": [{"$eq": ["$attendance.status", "Absent"]}, 1, 0]},
+                            {"$ifNull": ["$archived_counts.Absent", 0]}
                         ]
                     }
                 }
@@ -204,10 +403,10 @@ def get_missed_counts_for_all_students(program_ids=None):
         {
             "$project": {
                 "_id": 0,
-                "student_id": "$_id.student_id",
-                "name": "$_id.name",
-                "phone": "$_id.phone",
-                "program_id": "$_id.program_id",
+                "student_id": "$_id",
+                "name": 1,
+                "phone": 1,
+                "program_id": 1,
                 "sum_missed": 1
             }
         }
@@ -232,14 +431,26 @@ def check_admin(connection_string):
 
 def delete_student_record(student_id: str) -> bool:
     """
-    Delete a student document from 'Student_Records' by student_id.
+    Delete a student document from 'Student_Records' by student_id, and
+    their entries in session-stored attendance, in one transaction.
     Returns True if a doc was actually deleted, False otherwise.
     """
     db = connect_to_db()
     coll = db["Student_Records"]
 
-    result = coll.delete_one({"student_id": student_id})
-    return result.deleted_count > 0
+    def write(session):
+        from attendance_sessions_db import delete_session_student
+        deleted = coll.find_one_and_delete({"student_id": student_id}, projection={"program_id": 1},
+                                           session=session)
+        # Their session-stored attendance goes with them
+        if deleted:
+            delete_session_student(student_id, session=session)
+        return deleted
+
+    deleted = run_transaction(db, write)
+    if deleted:
+        invalidate_roster(deleted.get("program_id"))
+    return deleted is not None
 
 
 def fetch_all_attendance_records():
@@ -250,9 +461,13 @@ def fetch_all_attendance_records():
         student_id, name, program_id,
         attendance: { date, status, comment }
       }
+    Includes session-stored and archived records (attendance_sessions_db,
+    attendance_archive).
     """
-    db = connect_to_db()
-    coll = db["Student_Records"]
+    from attendance_sessions_db import union_session_rows
+    from attendance_archive import archive_reaches, archived_rows
+
+    coll = read_collection("Student_Records", "fetch_all_attendance_records")
     pipeline = [
         {"$unwind": "$attendance"},
         {
@@ -265,9 +480,13 @@ def fetch_all_attendance_records():
                 "attendance.status": 1,
                 "attendance.comment": 1
             }
-        }
+        },
+        union_session_rows()
     ]
-    return list(coll.aggregate(pipeline))
+    rows = list(coll.aggregate(pipeline))
+    if archive_reaches(None):
+        rows += archived_rows()
+    return rows
 
 from datetime import timedelta
 
@@ -299,7 +518,9 @@ def update_attendance_subdoc(student_id: str, old_date, new_status: str, new_com
             "$set": {
                 "attendance.$.status": new_status,
                 "attendance.$.comment": new_comment
-            }
+            },
+            "$inc": {ATTENDANCE_VERSION: 1},
+            "$currentDate": {"updated_at": True}
         }
     )
     return result.modified_count > 0
@@ -307,67 +528,81 @@ def update_attendance_subdoc(student_id: str, old_date, new_status: str, new_com
 # Option 1: Modify the update_student_info function to also update the student_id
 def update_student_info(student_id: str, new_name: str, new_phone: str,
                        new_contact_email: str, new_grade: str, new_school: str,
-                       program_id: int = None) -> str:
+                       program_id: int = None, expected_version: int = None) -> str:
     """
     Update fields of an existing student document by student_id.
     If the name changes, also updates the student_id.
+    If expected_version is given, the update only applies if the record is
+    still at that `_v`; otherwise VersionConflict is raised.
     Returns message about the update status.
+
+    The write is a single pipeline update (it also returns the old values, so
+    we can tell whether anything changed). Passing program_id saves the read
+    needed to derive the student_id; a rename adds one duplicate-ID check.
     """
     db = connect_to_db()
     coll = db["Student_Records"]
-    
-    # First, fetch the current record to get the program_id if not provided
-    current_record = coll.find_one({"student_id": student_id})
-    if not current_record:
-        return "Error: Student record not found"
-        
+
     if program_id is None:
+        current_record = coll.find_one({"student_id": student_id}, {"program_id": 1})
+        if not current_record:
+            if expected_version is not None:
+                raise VersionConflict("This student was deleted by someone else.", None)
+            return "Error: Student record not found"
         program_id = current_record.get("program_id")
-    
-    # Check if the name is changing
-    if new_name.strip() != current_record.get("name", "").strip():
-        # Generate the new student_id based on the new name
-        new_student_id = generate_student_id(new_name, program_id)
-        
+
+    # The student_id is derived from (name, program), so a rename changes it
+    new_student_id = generate_student_id(new_name, program_id)
+    if new_student_id != student_id:
         # Check if a record with this new ID already exists (avoid duplicates)
-        existing_with_new_id = coll.find_one({"student_id": new_student_id})
-        if existing_with_new_id and existing_with_new_id["_id"] != current_record["_id"]:
+        if coll.find_one({"student_id": new_student_id}, {"_id": 1}):
             return f"Error: Cannot update name as it would conflict with an existing student ID"
-        
-        # Update the document with both new fields and new student_id
-        update_query = {
-            "$set": {
-                "student_id": new_student_id,
-                "name": new_name,
-                "phone": new_phone,
-                "contact_email": new_contact_email,
-                "grade": new_grade,
-                "school": new_school
-            }
-        }
-        
-        result = coll.update_one({"student_id": student_id}, update_query)
-        if result.modified_count > 0:
-            return f"Updated student record. ID changed from {student_id} to {new_student_id}"
-        else:
-            return "Error: Failed to update student record"
-    else:
-        # Name hasn't changed, just update the other fields
-        update_query = {
-            "$set": {
-                "name": new_name,
-                "phone": new_phone,
-                "contact_email": new_contact_email,
-                "grade": new_grade,
-                "school": new_school
-            }
-        }
-        
-        result = coll.update_one({"student_id": student_id}, update_query)
-        if result.modified_count > 0:
-            return f"Updated student record for {new_name} (ID={student_id})"
-        else:
-            return "No changes made to the student record"
+
+    fields = {
+        "student_id": new_student_id,
+        "name": new_name,
+        "phone": new_phone,
+        "contact_email": new_contact_email,
+        "grade": new_grade,
+        "school": new_school
+    }
+    # Bump _v only if some field actually differs, so a no-op save doesn't
+    # invalidate other editors' copies
+    unchanged = {"$and": [{"$eq": [f"${k}", {"$literal": v}]} for k, v in fields.items()]}
+    current_v = {"$ifNull": ["$_v", 0]}
+
+    def write(session=None):
+        before = coll.find_one_and_update(
+            {"student_id": student_id, **version_filter(expected_version)},
+            [
+                {"$set": {
+                    "_v": {"$cond": [unchanged, current_v, {"$add": [current_v, 1]}]},
+                    "updated_at": {"$cond": [unchanged, "$updated_at", "$$NOW"]}
+                }},
+                {"$set": {k: {"$literal": v} for k, v in {**fields, **name_search_fields(new_name)}.items()}}
+            ],
+            projection={k: 1 for k in fields},
+            return_document=pymongo.ReturnDocument.BEFORE,
+            session=session
+        )
+        if before is not None and new_student_id != student_id:
+            # Session-stored attendance is keyed by student_id too
+            from attendance_sessions_db import rename_session_student
+            rename_session_student(student_id, new_student_id, new_name, session=session)
+        return before
+
+    # A rename re-keys the student's session entries in the same transaction
+    before = run_transaction(db, write) if new_student_id != student_id else write()
+    if before is None:
+        raise_if_stale(coll, {"student_id": student_id}, expected_version, "student")
+        return "Error: Student record not found"
+    invalidate_roster(program_id)
+
+    if new_student_id != student_id:
+        return f"Updated student record. ID changed from {student_id} to {new_student_id}"
+    if all(before.get(k) == v for k, v in fields.items()):
+        return "No changes made to the student record"
+    return f"Updated student record for {new_name} (ID={student_id})"
 # def update_student_info(student_id: str, new_name: str, new_phone: str,
 #                         new_contact_email: str, new_grade: str, new_school: str) -> bool:
 #     # new_parent_email: str
@@ -508,7 +743,8 @@ def update_student_info(student_id: str, new_name: str, new_phone: str,
 #         )
 
 #     return f"Updated attendance for student_id={student_id} (status={status})"
-def record_student_attendance_in_array(name, program_id, status, comment=None, attendance_date=None, student_id=None):
+def record_student_attendance_in_array(name, program_id, status, comment=None, attendance_date=None, student_id=None,
+                                      defer_alerts=False):
     db = connect_to_db()
     coll = db["Student_Records"]
     
@@ -527,7 +763,7 @@ def record_student_attendance_in_array(name, program_id, status, comment=None, a
     missed_inc = 1 if status == "Absent" else 0
 
     # 2) Upsert in case doc doesn't exist
-    coll.update_one(
+    created = coll.update_one(
         {"student_id": student_id},
         {
             "$setOnInsert": {
@@ -538,33 +774,19 @@ def record_student_attendance_in_array(name, program_id, status, comment=None, a
                 # "parent_email": "",   # (unused now, but left for reference)
                 "missed_count": 0,
                 "grade": "",        # Optionally you can default them too
-                "school": ""
+                "school": "",
+                "_v": 0,
+                **name_search_fields(name)
             }
         },
         upsert=True
     )
+    if created.upserted_id is not None:
+        invalidate_roster(program_id)
     
     if attendance_date is None:
         attendance_date = datetime.utcnow()
 
-    # --- NEW STEP: Block duplicates if there's already an attendance record for this day ---
-    day_start = attendance_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    day_end = day_start + timedelta(days=1)
-
-    existing_for_day = coll.find_one({
-        "student_id": student_id,
-        "attendance": {
-            "$elemMatch": {
-                "date": {
-                    "$gte": day_start,
-                    "$lt": day_end
-                }
-            }
-        }
-    })
-    if existing_for_day:
-        return f"❌ Attendance for {name} is already recorded on {day_start.strftime('%Y-%m-%d')}."
-
     # 3) Build attendance sub-doc
     attendance_entry = {
         "date": attendance_date,
@@ -572,83 +794,29 @@ def record_student_attendance_in_array(name, program_id, status, comment=None, a
         "comment": comment
     }
 
-    # 4) Push + inc missed_count if absent
-    coll.update_one(
-        {"student_id": student_id},
+    # 4) Push + inc missed_count if absent, unless this exact session is
+    # already recorded. Several sessions on one day are fine; resubmits of the
+    # same form are caught by the idempotency key (request_log_db).
+    session_match = {"$gte": attendance_date, "$lt": attendance_date + timedelta(milliseconds=1)}
+    result = coll.update_one(
+        {
+            "student_id": student_id,
+            "attendance": {"$not": {"$elemMatch": {"date": session_match}}}
+        },
         {
             "$push": {"attendance": attendance_entry},
-            "$inc": {"missed_count": missed_inc}
+            "$inc": {"missed_count": missed_inc, ATTENDANCE_VERSION: 1},
+            "$currentDate": {"updated_at": True}
         }
     )
+    if result.matched_count == 0:
+        return f"❌ Attendance for {name} is already recorded for {attendance_date.strftime('%Y-%m-%d %H:%M')}."
 
-    # 5) Retrieve updated doc, possibly send email
-    doc = coll.find_one(
-        {"student_id": student_id},
-        # Now fetch contact_email, not parent_email
-        {"missed_count": 1, "contact_email": 1, "name": 1}
-    )
-    new_missed = doc.get("missed_count", 0)
-    student_email = doc.get("contact_email", "")
-    student_name = doc.get("name", "")
-
-    # 6) If absent, maybe send email to the student
-    if missed_inc == 1 and student_email:
-        program_list = list_programs()
-        prog_map = {p["program_id"]: p["program_name"] for p in program_list}
-        program_name = prog_map.get(program_id, f"Program ID={program_id}")
-        absent_date_str = attendance_date.strftime("%B %d, %Y")  
-        google_form_link = "https://docs.google.com/forms/d/e/1FAIpQLSdeM6AUXXcCK3mNWaCQFrnoc-fmjFC615sh4cMGJ04iLGua1g/viewform?usp=dialog"  # Update your form link
-
-        # Customize the subject/body text as you see fit
-        if new_missed == 1:
-            subject = f"[1st Absence] {student_name} missed {program_name} on {absent_date_str}"
-            body = (
-                f"Hello {student_name},\n\n"
-                f"You missed our {program_name} session on {absent_date_str}. "
-                "If you had a valid excuse, please submit it here:\n"
-                f"\n{google_form_link}\n\n"
-                "Thank you,\n"
-                "Club Stride Team"
-            )
-        elif new_missed == 2:
-            subject = f"[2nd Absence] {student_name} missed {program_name} again on {absent_date_str}"
-            body = (
-                f"Hello {student_name},\n\n"
-                f"You've now missed two {program_name} sessions. The latest absence was {absent_date_str}..."
-                "If you miss one more, you may be removed from the program. Please submit an excuse:\n"
-                f"{google_form_link}\n\n"
-                "Thank you,\n"
-                "Club Stride Team"
-            )
-        elif new_missed == 3:
-            subject = f"3rd Absence: {student_name}"
-            body = (
-                f"Hello {student_name},\n\n"
-                f"You have missed three {program_name} sessions. The latest absence was {absent_date_str}..."
-                "We will contact you directly. "
-                "If you had a valid excuse, you can still submit it here:\n"
-                f"{google_form_link}\n\n"
-                "Thank you,\n"
-                "Club Stride Team"
-            )
-        else:
-            subject = f"{student_name} has missed {new_missed} {program_name} sessions"
-            body = (
-                f"Hello {student_name},\n\n"
-                f"You have missed {new_missed} sessions. Please contact us or "
-                f"submit an excuse:\n{google_form_link}\n\n"
-                "Thank you,\n"
-                "Club Stride Team"
-            )
-
-        # Now call the email function with the student's email
-        send_missed_alert_email(
-            student_email=student_email,
-            student_name=student_name,
-            program_name=program_id,
-            subject_line=subject,
-            body_text=body
-        )
+    # 5) Absences go through the alert rules (alerts.py). Batch callers pass
+    # defer_alerts=True and evaluate all their absences in one pass afterwards.
+    if missed_inc == 1 and not defer_alerts:
+        from alerts import process_absence_alerts
+        process_absence_alerts([(student_id, attendance_date)])
 
     return f"Updated attendance for student_id={student_id} (status={status})"
 # def record_student_attendance_in_array(name, program_id, status, comment=None, attendance_date=None):
@@ -791,33 +959,20 @@ def send_missed_alert_email(student_email: str,
                             subject_line: str,
                             body_text: str):
     """
-    Sends an absence alert via MailerSend to the student's email.
+    Sends an absence alert via MailerSend to the student's email (or adds
+    it to their digest). Returns True if it was sent or queued.
     """
-    # MAILERSEND_API_KEY = os.environ.get("MAILERSEND_API_KEY")
-    MAILERSEND_API_KEY= st.secrets["MAILERSEND_API_KEY"]
-
-    mailer = emails.NewEmail(MAILERSEND_API_KEY)
-    mail_body = {}
-
-    mail_from = {
-        "name": "Club Stride",
-        "email": "javier@clubstride.org"
-    }
+    from email_delivery import build_message
+    from digests import notify
 
     # Single recipient is the student
-    recipients = [{"name": student_email.split('@')[0], "email": student_email}]
+    return notify(build_message(student_email, subject_line, body_text), category="absence")
 
-    mailer.set_mail_from(mail_from, mail_body)
-    mailer.set_mail_to(recipients, mail_body)
-    mailer.set_subject(subject_line, mail_body)
-    mailer.set_plaintext_content(body_text, mail_body)
-
-    response = mailer.send(mail_body)
-    print("MailerSend response:", response)
-
-def delete_attendance_subdoc(student_id: str, target_date) -> bool:
+def delete_attendance_subdoc(student_id: str, target_date, expected_version: int = None) -> bool:
     """
     Remove an attendance sub-document that matches a specific date.
+    If expected_version is given and the student's attendance has moved past
+    it (ATTENDANCE_VERSION), VersionConflict is raised instead.
     Returns True if a sub-document was actually removed, False otherwise.
     """
     db = connect_to_db()
@@ -829,7 +984,11 @@ def delete_attendance_subdoc(student_id: str, target_date) -> bool:
         target_date = parser.parse(target_date)
     
     result = coll.update_one(
-        {"student_id": student_id},
+        {
+            "student_id": student_id,
+            "attendance.date": {"$gte": target_date, "$lt": target_date + timedelta(milliseconds=1)},
+            **version_filter(expected_version, ATTENDANCE_VERSION)
+        },
         {
             # $pull removes array elements that match the query
             "$pull": {
@@ -841,18 +1000,30 @@ def delete_attendance_subdoc(student_id: str, target_date) -> bool:
                         "$lt": target_date + timedelta(milliseconds=1)
                     }
                 }
-            }
+            },
+            "$inc": {ATTENDANCE_VERSION: 1},
+            "$currentDate": {"updated_at": True}
         }
     )
+    if result.matched_count == 0:
+        raise_if_stale(coll, {"student_id": student_id}, expected_version, field=ATTENDANCE_VERSION)
     return result.modified_count > 0
 
-def upsert_attendance_subdoc(student_id: str, target_date, new_status: str, new_comment: str = "", old_date=None) -> bool:
+def upsert_attendance_subdoc(student_id: str, target_date, new_status: str, new_comment: str = "",
+                             old_date=None, expected_version: int = None) -> bool:
     """
     Upsert an attendance record on a specific date for this student_id.
     If the date already exists, we update it. If old_date is provided and different from target_date,
-    delete the old record first and create a new one.
+    the old record is moved to the new date.
+
+    Update-or-append is a single pipeline update, so there is no window where
+    the old entry is gone and the new one isn't there yet.
+
+    If expected_version is given, the write is conditional on the student's
+    attendance still being at that ATTENDANCE_VERSION; otherwise
+    VersionConflict is raised.
     
-    Returns True if a sub-document was created or updated, False if nothing changed.
+    Returns True if a sub-document was created or updated, False if the student wasn't found.
     """
     db = connect_to_db()
     coll = db["Student_Records"]
@@ -861,56 +1032,142 @@ def upsert_attendance_subdoc(student_id: str, target_date, new_status: str, new_
     if isinstance(target_date, str):
         from dateutil import parser
         target_date = parser.parse(target_date)
-    
-    # If old_date is provided and different from target_date, we need to delete the old record first
-    if old_date and old_date != target_date:
-        # Delete the old record
-        delete_result = delete_attendance_subdoc(student_id, old_date)
-        # Now we'll always insert a new record
-        attendance_entry = {
-            "date": target_date,
-            "status": new_status,
-            "comment": new_comment
-        }
-        result_push = coll.update_one(
-            {"student_id": student_id},
-            {"$push": {"attendance": attendance_entry}}
-        )
-        return result_push.modified_count > 0
-    else:
-        # Try to update an existing sub-doc (no date change)
-        result = coll.update_one(
-            {
-                "student_id": student_id,
-                "attendance.date": {
-                    "$gte": target_date,
-                    "$lt": target_date + timedelta(milliseconds=1)
-                }
-            },
-            {
-                "$set": {
-                    "attendance.$.status": new_status,
-                    "attendance.$.comment": new_comment
-                }
+
+    # Match the existing sub-doc on old_date when moving, else on target_date
+    match_date = old_date if old_date and old_date != target_date else target_date
+    is_match = {"$and": [
+        {"$gte": ["$$a.date", match_date]},
+        {"$lt": ["$$a.date", match_date + timedelta(milliseconds=1)]}
+    ]}
+    entry = {"$literal": {"date": target_date, "status": new_status, "comment": new_comment}}
+    attendance = {"$ifNull": ["$attendance", []]}
+
+    result = coll.update_one(
+        {"student_id": student_id, **version_filter(expected_version, ATTENDANCE_VERSION)},
+        [
+            {"$set": {
+                "attendance": {"$cond": [
+                    {"$anyElementTrue": [{"$map": {"input": attendance, "as": "a", "in": is_match}}]},
+                    # Replace the matching entry in place...
+                    {"$map": {"input": attendance, "as": "a", "in": {"$cond": [is_match, entry, "$$a"]}}},
+                    # ...or append a new one
+                    {"$concatArrays": [attendance, [entry]]}
+                ]},
+                ATTENDANCE_VERSION: {"$add": [{"$ifNull": [f"${ATTENDANCE_VERSION}", 0]}, 1]},
+                "updated_at": "$$NOW"
+            }}
+        ]
+    )
+    if result.matched_count == 0:
+        raise_if_stale(coll, {"student_id": student_id}, expected_version, field=ATTENDANCE_VERSION)
+    return result.modified_count > 0
+
+
+def _attendance_elem_filter(change: dict) -> dict:
+    """
+    Filter matching a student's attendance element exactly as it was loaded
+    (date to the millisecond, status and comment). If someone else edited or
+    removed the element since, this matches nothing.
+    """
+    target_date = change["date"]
+    return {
+        "student_id": change["student_id"],
+        "attendance": {
+            "$elemMatch": {
+                "date": {"$gte": target_date, "$lt": target_date + timedelta(milliseconds=1)},
+                "status": change.get("status"),
+                "comment": change.get("comment"),
             }
-        )
+        },
+    }
+
+
+def bulk_apply_attendance_changes(changes: list) -> dict:
+    """
+    Apply a batch of attendance edits (e.g. from the review grid) in a
+    single bulk_write.
+
+    Each change carries the row as it was loaded -- student_id, date, status,
+    comment -- plus either delete=True or any of new_date / new_status /
+    new_comment. Every operation is conditional on the loaded values, so a
+    row another user changed in the meantime is left alone and returned as
+    a conflict rather than silently overwritten. missed_count follows any
+    change into or out of "Absent". Each applied change bumps the student's
+    ATTENDANCE_VERSION (not `_v`, so open record-card edits stay valid).
+
+    Returns {"applied": <int>, "conflicts": [<change>, ...]}.
+    """
+    if not changes:
+        return {"applied": 0, "conflicts": []}
+
+    db = connect_to_db()
+    coll = db["Student_Records"]
 
-        if result.matched_count > 0:
-            # We found and updated an existing sub-document
-            return result.modified_count > 0
+    for change in changes:
+        if isinstance(change["date"], str):
+            from dateutil import parser
+            change["date"] = parser.parse(change["date"])
+
+    ops = []
+    for change in changes:
+        elem_filter = _attendance_elem_filter(change)
+        was_absent = change.get("status") == "Absent"
+
+        if change.get("delete"):
+            date_match = elem_filter["attendance"]["$elemMatch"]["date"]
+            update = {"$pull": {"attendance": {"date": date_match}}}
+            if was_absent:
+                update["$inc"] = {"missed_count": -1}
         else:
-            # If no match, we push a new attendance sub-document
-            attendance_entry = {
-                "date": target_date,
-                "status": new_status,
-                "comment": new_comment
-            }
-            result_push = coll.update_one(
-                {"student_id": student_id},
-                {"$push": {"attendance": attendance_entry}}
+            new_status = change.get("new_status", change.get("status"))
+            update = {"$set": {
+                "attendance.$.status": new_status,
+                "attendance.$.comment": change.get("new_comment", change.get("comment")),
+            }}
+            if change.get("new_date") is not None:
+                # Date moves are a positional $set too; no delete + re-insert
+                update["$set"]["attendance.$.date"] = change["new_date"]
+            missed_delta = int(new_status == "Absent") - int(was_absent)
+            if missed_delta:
+                update["$inc"] = {"missed_count": missed_delta}
+        update.setdefault("$inc", {})[ATTENDANCE_VERSION] = 1
+        update["$currentDate"] = {"updated_at": True}
+        ops.append(pymongo.UpdateOne(elem_filter, update))
+
+    coll.bulk_write(ops, ordered=False)
+
+    # bulk_write only reports totals, so check the end state of each change
+    # with one read to tell which ones lost the race.
+    student_ids = list({c["student_id"] for c in changes})
+    current = {
+        doc["student_id"]: doc.get("attendance", [])
+        for doc in coll.find({"student_id": {"$in": student_ids}}, {"student_id": 1, "attendance": 1})
+    }
+
+    def _same_ms(a, b):
+        return a is not None and b is not None and abs((a - b).total_seconds()) < 0.001
+
+    conflicts = []
+    for change in changes:
+        entries = current.get(change["student_id"], [])
+        if change.get("delete"):
+            ok = not any(_same_ms(e.get("date"), change["date"]) for e in entries)
+        else:
+            want_date = change.get("new_date") or change["date"]
+            want_status = change.get("new_status", change.get("status"))
+            want_comment = change.get("new_comment", change.get("comment"))
+            ok = any(
+                _same_ms(e.get("date"), want_date)
+                and e.get("status") == want_status
+                and e.get("comment") == want_comment
+                for e in entries
             )
-            return result_push.modified_count > 0
-        
+        if not ok:
+            conflicts.append(change)
+
+    return {"applied": len(changes) - len(conflicts), "conflicts": conflicts}
+
+
 # def upsert_attendance_subdoc(student_id: str, target_date, new_status: str, new_comment: str = "") -> bool:
 #     """
 #     Upsert an attendance record on a specific date for this student_id.
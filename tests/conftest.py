@@ -0,0 +1,75 @@
+# tests/conftest.py
+import os
+import sys
+import uuid
+
+import pytest
+from pymongo import monitoring
+
+# The app's modules live at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MONGO_URI = os.environ.get("MONGO_URI")
+
+
+class CommandLog(monitoring.CommandListener):
+    """Records every command a client sends: one entry per round trip."""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.command.get(event.command_name), event.connection_id))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def on(self, collection: str) -> list:
+        """Names of the commands sent to one collection."""
+        return [name for name, target, _ in self.commands if target == collection]
+
+    def servers(self, collection: str, command: str) -> list:
+        """Addresses the given command on a collection was sent to."""
+        return [address for name, target, address in self.commands if (name, target) == (command, collection)]
+
+    def clear(self):
+        self.commands.clear()
+
+
+def _scratch_db(**client_options):
+    if not MONGO_URI:
+        pytest.skip("set MONGO_URI to run the MongoDB-backed tests")
+    import pymongo
+
+    client = pymongo.MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, **client_options)
+    return client, client[f"clubstride_test_{uuid.uuid4().hex[:8]}"]
+
+
+@pytest.fixture
+def mongo_db():
+    """A scratch database on $MONGO_URI, dropped afterwards. Skips without one."""
+    client, db = _scratch_db()
+    yield db
+    client.drop_database(db.name)
+    client.close()
+
+
+@pytest.fixture
+def counted_db():
+    """(scratch database, CommandLog of every command sent through it)."""
+    log = CommandLog()
+    client, db = _scratch_db(event_listeners=[log])
+    yield db, log
+    client.drop_database(db.name)
+    client.close()
+
+
+@pytest.fixture
+def txn_db(mongo_db):
+    """mongo_db, on a server that supports transactions (a replica set). Skips otherwise."""
+    if not mongo_db.client.admin.command("hello").get("setName"):
+        pytest.skip("transactions need MONGO_URI to point at a replica set")
+    return mongo_db
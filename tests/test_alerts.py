@@ -0,0 +1,41 @@
+# tests/test_alerts.py
+from datetime import datetime
+
+import pytest
+
+import alerts
+from alerts import evaluate_absence_alerts, match_rule
+
+
+@pytest.mark.parametrize("count, rule", [
+    (0, None), (1, "first_absence"), (2, "second_absence"), (3, "third_absence"), (9, "repeated_absence"),
+])
+def test_match_rule(count, rule):
+    assert (match_rule(count) or {}).get("name") == rule
+
+
+@pytest.fixture
+def db(mongo_db, monkeypatch):
+    monkeypatch.setattr(alerts, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(alerts, "list_programs", lambda: [{"program_id": 1, "program_name": "Robotics"}])
+    mongo_db["Student_Records"].insert_one({
+        "student_id": "s1", "name": "Ada", "contact_email": "ada@example.com", "program_id": 1, "missed_count": 2,
+    })
+    return mongo_db
+
+
+def test_one_alert_per_absence_day(db):
+    # Two past sessions recorded in one batch, on the same check day
+    queued = evaluate_absence_alerts([("s1", datetime(2026, 3, 2, 9)), ("s1", datetime(2026, 3, 4, 9))])
+    assert queued == 2
+    outbox = {a["_id"]: a for a in db["Alert_Outbox"].find()}
+    assert set(outbox) == {"absence:s1:2026-03-02", "absence:s1:2026-03-04"}
+    assert outbox["absence:s1:2026-03-04"]["rule"] == "second_absence"
+    assert outbox["absence:s1:2026-03-02"]["rule"] == "first_absence"
+
+
+def test_a_day_already_alerted_is_not_alerted_again(db):
+    assert evaluate_absence_alerts([("s1", datetime(2026, 3, 2, 9))]) == 1
+    # The same absence recorded again later (a late entry or a replayed submit)
+    assert evaluate_absence_alerts([("s1", datetime(2026, 3, 2, 16))]) == 0
+    assert db["Alert_Outbox"].count_documents({}) == 1
@@ -0,0 +1,101 @@
+# tests/test_attendance_archive.py
+from datetime import datetime
+
+import pytest
+
+import shared_cache
+import students_db
+import attendance_archive
+from attendance_archive import archive_attendance, restore_attendance, archived_rows, archive_reaches
+
+CUTOFF = datetime(2025, 1, 1)
+
+HISTORY = [
+    {"date": datetime(2024, 3, 5, 16, 0, 10), "status": "Present", "comment": ""},
+    # Two separate entries in the same minute
+    {"date": datetime(2024, 3, 7, 16, 0, 0), "status": "Absent", "comment": "sick"},
+    {"date": datetime(2024, 3, 7, 16, 0, 40), "status": "Late", "comment": ""},
+    {"date": datetime(2024, 9, 3, 16, 0), "status": "Excused", "comment": ""},
+    {"date": datetime(2025, 2, 4, 16, 0), "status": "Present", "comment": ""},
+]
+
+
+def _minutes(entries):
+    return sorted((e["date"].replace(second=0, microsecond=0), e["status"], e.get("comment") or "")
+                  for e in entries)
+
+
+@pytest.fixture
+def db(txn_db, monkeypatch):
+    monkeypatch.setattr(attendance_archive, "_student_db", lambda connection_string=None: txn_db)
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: txn_db)
+    monkeypatch.setattr(shared_cache, "get_cache_backend", lambda: backend)
+    backend = shared_cache.MemoryBackend()
+    txn_db["Student_Records"].insert_one({
+        "student_id": "s1", "name": "Ada", "program_id": 1, "_v": 1, "attendance": [dict(e) for e in HISTORY],
+    })
+    return txn_db
+
+
+def test_archive_moves_closed_terms_into_blocks(db):
+    result = archive_attendance(before=datetime(2025, 3, 1))
+    assert result == {"cutoff": CUTOFF, "students": 1, "entries": 4}
+
+    live = db["Student_Records"].find_one({"student_id": "s1"})
+    assert [e["date"] for e in live["attendance"]] == [datetime(2025, 2, 4, 16, 0)]
+    # Attendance moved, the profile didn't: only the attendance version moves on
+    assert (live["_v"], live["_av"]) == (1, 1)
+    blocks = {b["_id"]: b for b in db["Attendance_Archive"].find()}
+    assert set(blocks) == {"s1:2024H1", "s1:2024H2"}
+    assert blocks["s1:2024H1"]["counts"] == {"Present": 1, "Late": 1, "Absent": 1, "Excused": 0}
+    assert _minutes(r["attendance"] for r in archived_rows()) == _minutes(HISTORY[:4])
+
+
+def test_rerunning_the_archive_adds_nothing(db):
+    archive_attendance(before=datetime(2025, 3, 1))
+    # An entry recorded late into an archived term joins its block
+    late = {"date": datetime(2024, 3, 12, 16, 0), "status": "Present", "comment": ""}
+    db["Student_Records"].update_one({"student_id": "s1"}, {"$push": {"attendance": late}})
+    assert archive_attendance(before=datetime(2025, 3, 1))["entries"] == 1
+    assert db["Attendance_Archive"].find_one({"_id": "s1:2024H1"})["n"] == 4
+
+
+def test_restore_round_trip(db):
+    archive_attendance(before=datetime(2025, 3, 1))
+    result = restore_attendance(student_id="s1")
+    assert result == {"blocks": 2, "entries": 4, "skipped": 0}
+    assert db["Attendance_Archive"].count_documents({}) == 0
+    live = db["Student_Records"].find_one({"student_id": "s1"})
+    assert _minutes(live["attendance"]) == _minutes(HISTORY)
+
+
+def test_restore_skips_entries_already_live(db):
+    archive_attendance(before=datetime(2025, 3, 1))
+    # The same session re-entered by hand while archived
+    again = {"date": datetime(2024, 9, 3, 16, 0), "status": "Excused", "comment": ""}
+    db["Student_Records"].update_one({"student_id": "s1"}, {"$push": {"attendance": again}})
+    assert restore_attendance()["entries"] == 3
+    assert len(db["Student_Records"].find_one({"student_id": "s1"})["attendance"]) == 5
+
+
+def test_restore_leaves_blocks_of_deleted_students(db):
+    archive_attendance(before=datetime(2025, 3, 1))
+    db["Student_Records"].delete_one({"student_id": "s1"})
+    assert restore_attendance() == {"blocks": 0, "entries": 0, "skipped": 2}
+    assert db["Attendance_Archive"].count_documents({}) == 2
+
+
+def test_archive_reaches_reads_the_checkpoint_once(db, monkeypatch):
+    reads = []
+    checkpoints = db["Job_Checkpoints"]
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: reads.append(1) or db)
+    assert archive_reaches(datetime(2024, 1, 1)) is False
+    assert archive_reaches(None) is False
+    assert len(reads) == 1
+
+    archive_attendance(before=datetime(2025, 3, 1))
+    assert checkpoints.find_one({"_id": "attendance_archive"})["archived_through"] == CUTOFF
+    # The archive run invalidated the cached cutoff
+    assert archive_reaches(datetime(2024, 1, 1)) is True
+    assert archive_reaches(datetime(2025, 2, 1)) is False
+    assert len(reads) == 2
@@ -0,0 +1,148 @@
+# tests/test_attendance_cache.py
+from datetime import datetime, date, timedelta
+
+import pytest
+
+import attendance_cache
+from attendance_cache import AttendanceCache, REFRESH_OVERLAP
+from attendance_codec import encode_term
+
+T0 = datetime(2025, 3, 10, 12, 0)
+
+
+class FakeCollection:
+    """The two reads the cache makes: find() by updated_at, and a document count."""
+
+    def __init__(self, docs=()):
+        self.docs = {d["_id"]: d for d in docs}
+
+    def find(self, match, projection=None):
+        since = match.get("updated_at", {}).get("$gte")
+        return [dict(d) for d in self.docs.values() if since is None or d["updated_at"] >= since]
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+
+def _student(_id, student_id, name, program_id, statuses, start=date(2025, 3, 3), updated_at=T0):
+    return {
+        "_id": _id, "student_id": student_id, "name": name, "program_id": program_id, "updated_at": updated_at,
+        "attendance": [
+            {"date": datetime.combine(start + timedelta(days=i), datetime.min.time()) + timedelta(hours=16),
+             "status": s}
+            for i, s in enumerate(statuses)
+        ],
+    }
+
+
+@pytest.fixture
+def source(monkeypatch):
+    collections = {
+        "Student_Records": FakeCollection([
+            _student(1, "s1", "Ada", 10, ["Present", "Absent", "Absent", "Present", "Absent", "Absent", "Absent"]),
+            _student(2, "s2", "Bo", 10, ["Present", "Late", "Present"]),
+        ]),
+        "Attendance_Sessions": FakeCollection([{
+            "_id": "sess", "program_id": 20, "session_datetime": datetime(2025, 3, 4, 18), "updated_at": T0,
+            "statuses": {"s3": {"name": "Cy", "status": "Absent"}, "s2": {"name": "Bo", "status": "Excused"}},
+        }]),
+        "Attendance_Archive": FakeCollection([{
+            "_id": "s3:2024H2", "student_id": "s3", "name": "Cy", "program_id": 20, "updated_at": T0,
+            **encode_term("2024H2", [{"date": datetime(2024, 9, 2, 18), "status": "Present"},
+                                     {"date": datetime(2024, 9, 9, 18), "status": "Absent"}]),
+        }]),
+    }
+    monkeypatch.setattr(attendance_cache, "read_collection", lambda name, operation: collections[name])
+    return collections
+
+
+@pytest.fixture
+def cache(source):
+    cache = AttendanceCache()
+    cache.refresh()
+    return cache
+
+
+def test_counts_over_all_three_storage_modes(cache):
+    assert cache.status_counts() == {"Present": 5, "Late": 1, "Absent": 7, "Excused": 1}
+    assert cache.status_counts(start=date(2025, 1, 1), program_ids=[20]) == {
+        "Present": 0, "Late": 0, "Absent": 1, "Excused": 1}
+
+    by_student = {r["student_id"]: r for r in cache.student_status_counts()}
+    assert by_student["s2"]["total"] == 4 and by_student["s2"]["attended"] == 3
+    assert by_student["s2"]["program_id"] == 10
+    assert by_student["s3"]["total"] == 3 and by_student["s3"]["attended"] == 1
+    by_program = {r["program_id"]: r["total"] for r in cache.program_status_counts()}
+    assert by_program == {10: 10, 20: 4}
+
+
+def test_daily_rates(cache):
+    [day] = cache.daily_rates(start=date(2025, 3, 4), end=date(2025, 3, 5))
+    # Ada absent, Bo late (scores 0.5), Cy absent, Bo excused
+    assert day == {"date": date(2025, 3, 4), "total": 4, "attended": 1, "rate": 0.25, "score": 0.125}
+
+
+def test_absence_streaks(cache):
+    streaks = cache.absence_streaks()
+    assert streaks[0] == {"student_id": "s1", "name": "Ada", "current": 3, "longest": 3}
+    assert {r["student_id"] for r in streaks} == {"s1", "s3"}
+    # Cy: absent in 2024, then absent again in March
+    assert [r for r in streaks if r["student_id"] == "s3"][0]["current"] == 2
+    # Before Ada's last run, her longest was the two in a row
+    assert cache.absence_streaks(end=date(2025, 3, 7))[0]["longest"] == 2
+
+
+def test_pivots(cache):
+    by_status = cache.pivot("student", "status")
+    assert list(by_status.columns) == ["Present", "Late", "Absent", "Excused"]
+    assert by_status.loc["Bo"].tolist() == [2, 1, 0, 1]
+
+    by_day = cache.pivot("program", "day", start=date(2025, 3, 3), end=date(2025, 3, 5))
+    assert by_day.loc[10, date(2025, 3, 3)] == 1.0
+    assert by_day.loc[10, date(2025, 3, 4)] == 0.25
+    assert by_day.loc[20, date(2025, 3, 4)] == 0.0
+    # No program 20 entries on the 3rd
+    assert by_day.isna().loc[20, date(2025, 3, 3)]
+
+    with pytest.raises(ValueError):
+        cache.pivot("day")
+
+
+def test_delta_refresh_rereads_documents_inside_the_overlap(cache, source):
+    records = source["Student_Records"].docs
+    # Committed late, stamped just before the watermark: picked up
+    records[2] = _student(2, "s2", "Bo", 10, ["Absent"] * 3, updated_at=T0 - REFRESH_OVERLAP / 2)
+    # Stamped further back than the overlap: not re-read by a delta
+    records[1] = _student(1, "s1", "Ada", 10, ["Present"] * 7, updated_at=T0 - 2 * REFRESH_OVERLAP)
+    cache.refresh()
+    counts = {r["student_id"]: r for r in cache.student_status_counts()}
+    assert counts["s2"]["Absent"] == 3 and counts["s2"]["total"] == 4
+    assert counts["s1"]["Absent"] == 5
+
+    cache.refresh(full=True)
+    assert {r["student_id"]: r["Absent"] for r in cache.student_status_counts()}["s1"] == 0
+
+
+def test_delta_refresh_rebuilds_after_a_delete(cache, source):
+    del source["Attendance_Sessions"].docs["sess"]
+    cache.refresh()
+    assert cache.status_counts()["Excused"] == 0
+
+
+def test_apply_document_edit_and_delete(cache):
+    version = cache.version
+    cache.apply_document("Student_Records", 2, _student(2, "s2", "Bo B.", 10, ["Absent"]))
+    counts = {r["student_id"]: r for r in cache.student_status_counts()}
+    assert counts["s2"]["total"] == 2 and counts["s2"]["Absent"] == 1
+    assert counts["s2"]["name"] == "Bo B."
+
+    cache.apply_document("Attendance_Sessions", "sess", None)
+    assert cache.status_counts() == {"Present": 3, "Late": 0, "Absent": 7, "Excused": 0}
+    assert cache._source_counts["Attendance_Sessions"] == 0
+    assert cache.version == version + 2
+
+
+def test_apply_document_waits_for_the_first_refresh(source):
+    cache = AttendanceCache()
+    cache.apply_document("Student_Records", 1, None)
+    assert cache.status_counts() == {"Present": 0, "Late": 0, "Absent": 0, "Excused": 0}
@@ -0,0 +1,83 @@
+# tests/test_attendance_codec.py
+from datetime import datetime, timedelta
+
+import bson
+import numpy as np
+import pytest
+
+from attendance_codec import (
+    STATUS_CODES, term_of, term_start, pack_codes, unpack_codes, encode_term, decode_term,
+    encode_history, decode_history,
+)
+
+
+def test_terms_are_half_years():
+    assert term_of(datetime(2025, 6, 30, 23, 59)) == "2025H1"
+    assert term_of(datetime(2025, 7, 1)) == "2025H2"
+    assert term_start("2025H2") == datetime(2025, 7, 1)
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 4, 5, 7, 8, 9])
+def test_pack_unpack_round_trip(n):
+    codes = np.arange(n, dtype=np.uint8) % 4
+    packed = pack_codes(codes)
+    assert len(packed) == -(-n // 4)
+    assert unpack_codes(packed, n).tolist() == codes.tolist()
+
+
+def test_first_code_goes_in_the_high_bits():
+    assert pack_codes([3, 0, 1, 2]) == bytes([0b11000110])
+    assert pack_codes([2]) == bytes([0b10000000])
+
+
+def test_every_status_round_trips():
+    entries = [
+        {"date": datetime(2025, 2, 3 + i, 16, 30), "status": status, "comment": f"note {i}" if i % 2 else ""}
+        for i, status in enumerate(STATUS_CODES)
+    ]
+    block = encode_term("2025H1", entries)
+    assert block["n"] == 4
+    assert block["comments"] == {"1": "note 1", "3": "note 3"}
+    assert decode_term(block) == entries
+
+
+def test_odd_length_term_survives_bson():
+    start = datetime(2024, 7, 1, 9)
+    entries = [
+        {"date": start + timedelta(days=3 * i, minutes=i), "status": list(STATUS_CODES)[i % 4], "comment": ""}
+        for i in range(7)
+    ]
+    block = bson.decode(bson.encode(encode_term("2024H2", list(reversed(entries)))))
+    # Entries come back in date order whatever order they went in
+    assert decode_term(block) == entries
+
+
+def test_dates_are_kept_to_the_minute():
+    entry = {"date": datetime(2025, 1, 6, 16, 0, 45, 123000), "status": "Late", "comment": ""}
+    [decoded] = decode_term(encode_term("2025H1", [entry]))
+    assert decoded["date"] == datetime(2025, 1, 6, 16, 0)
+
+
+def test_empty_term():
+    block = encode_term("2025H1", [])
+    assert block["n"] == 0 and block["offsets"] == b"" and block["codes"] == b"" and block["comments"] == {}
+    assert decode_term(block) == []
+
+
+def test_unknown_status_is_rejected():
+    with pytest.raises(ValueError, match="Unknown attendance status"):
+        encode_term("2025H1", [{"date": datetime(2025, 1, 6), "status": "Present"},
+                               {"date": datetime(2025, 1, 8), "status": "Tardy"}])
+    with pytest.raises(ValueError):
+        encode_term("2025H1", [{"date": datetime(2025, 1, 6)}])
+
+
+def test_history_splits_by_term():
+    history = [
+        {"date": datetime(2024, 12, 30, 16), "status": "Present", "comment": ""},
+        {"date": datetime(2025, 1, 6, 16), "status": "Absent", "comment": "flu"},
+        {"date": datetime(2025, 7, 7, 16), "status": "Excused", "comment": ""},
+    ]
+    blocks = encode_history(history)
+    assert [b["term"] for b in blocks] == ["2024H2", "2025H1", "2025H2"]
+    assert decode_history(blocks) == history
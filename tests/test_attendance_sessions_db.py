@@ -0,0 +1,103 @@
+# tests/test_attendance_sessions_db.py
+from datetime import datetime
+
+import pytest
+
+import students_db
+import attendance_sessions_db
+from attendance_sessions_db import (
+    record_session_attendance, apply_session_change, get_student_session_attendance,
+)
+
+MON = datetime(2025, 3, 3, 17)
+WED = datetime(2025, 3, 5, 17)
+
+
+@pytest.fixture
+def db(txn_db, monkeypatch):
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: txn_db)
+    monkeypatch.setattr(students_db, "invalidate_roster", lambda *program_ids: None)
+    monkeypatch.setattr(attendance_sessions_db, "_attendance_sessions", lambda: txn_db["Attendance_Sessions"])
+    for name in ("Ana", "Ben"):
+        students_db.store_student_record(name, "555", f"{name.lower()}@example.org", 1)
+    return txn_db
+
+
+def _sid(name):
+    return students_db.generate_student_id(name, 1)
+
+
+def _missed(db, name):
+    return db["Student_Records"].find_one({"student_id": _sid(name)}).get("missed_count", 0)
+
+
+def _record(db, when, **statuses):
+    return record_session_attendance(1, when, [
+        {"student_id": _sid(name), "name": name, "status": status, "comment": ""} for name, status in statuses.items()
+    ])
+
+
+def _session(db, when):
+    return db["Attendance_Sessions"].find_one({"program_id": 1, "session_datetime": when})
+
+
+def test_record_keeps_missed_count_in_step(db):
+    assert _record(db, MON, Ana="Absent", Ben="Present") == {"recorded": 2, "new_absences": [_sid("Ana")]}
+    # Re-submitting the same session: no new absence
+    assert _record(db, MON, Ana="Absent", Ben="Present")["new_absences"] == []
+    _record(db, MON, Ana="Present")
+    assert _missed(db, "Ana") == 0
+    assert sorted(_session(db, MON)["student_ids"]) == sorted([_sid("Ana"), _sid("Ben")])
+
+
+def test_status_edit_applies_once(db):
+    _record(db, MON, Ana="Present")
+    change = {"student_id": _sid("Ana"), "attendance_session_id": _session(db, MON)["_id"],
+              "date": MON, "status": "Present", "new_status": "Absent"}
+    assert apply_session_change(change) is True
+    assert _missed(db, "Ana") == 1
+    # Loaded as Present, but it is Absent now: stale, nothing written
+    assert apply_session_change(change) is False
+    assert _missed(db, "Ana") == 1
+
+
+def test_move_to_another_session(db):
+    _record(db, MON, Ana="Absent", Ben="Present")
+    change = {"student_id": _sid("Ana"), "attendance_session_id": _session(db, MON)["_id"],
+              "date": MON, "status": "Absent", "new_date": WED, "new_status": "Late"}
+    assert apply_session_change(change) is True
+
+    assert _sid("Ana") not in _session(db, MON)["statuses"]
+    assert _session(db, MON)["student_ids"] == [_sid("Ben")]
+    assert _session(db, WED)["statuses"][_sid("Ana")]["status"] == "Late"
+    assert _missed(db, "Ana") == 0
+    # Retrying the same change finds nothing to move
+    assert apply_session_change(change) is False
+    assert _session(db, WED)["student_ids"] == [_sid("Ana")]
+
+
+def test_delete_entry(db):
+    _record(db, MON, Ana="Absent")
+    assert apply_session_change({"student_id": _sid("Ana"), "attendance_session_id": _session(db, MON)["_id"],
+                                 "date": MON, "status": "Absent", "delete": True})
+    assert _session(db, MON)["statuses"] == {}
+    assert _missed(db, "Ana") == 0
+
+
+def test_rename_carries_session_entries(db):
+    _record(db, MON, Ana="Absent", Ben="Present")
+    old, new = _sid("Ana"), students_db.generate_student_id("Anna", 1)
+    students_db.update_student_info(old, "Anna", "555", "ana@example.org", "", "", program_id=1)
+
+    doc = _session(db, MON)
+    assert old not in doc["statuses"] and old not in doc["student_ids"]
+    assert doc["statuses"][new] == {"name": "Anna", "status": "Absent", "comment": ""}
+    assert [r["attendance"]["status"] for r in get_student_session_attendance(new)] == ["Absent"]
+
+
+def test_delete_student_removes_session_entries(db):
+    _record(db, MON, Ana="Absent", Ben="Present")
+    assert students_db.delete_student_record(_sid("Ana"))
+    doc = _session(db, MON)
+    assert list(doc["statuses"]) == [_sid("Ben")]
+    assert doc["student_ids"] == [_sid("Ben")]
@@ -0,0 +1,114 @@
+# tests/test_change_streams.py
+import time
+
+import pytest
+
+import change_streams
+from change_streams import affected_namespaces, touches_attendance, handle_change, ChangeWatcher
+
+
+def _change(coll, op="update", doc=None, updated=None, removed=None, doc_id="d1"):
+    change = {"operationType": op, "ns": {"db": "Student_Data", "coll": coll}, "documentKey": {"_id": doc_id}}
+    if doc is not None:
+        change["fullDocument"] = doc
+    if op == "update":
+        change["updateDescription"] = {"updatedFields": updated or {}, "removedFields": removed or []}
+    return change
+
+
+class FakeCache:
+    def __init__(self):
+        self.live = False
+        self.applied = []
+        self.refreshed = 0
+
+    def refresh(self, full=False):
+        self.refreshed += 1
+
+    def apply_document(self, collection, doc_id, doc=None):
+        self.applied.append((collection, doc_id, doc))
+
+
+def test_schedule_changes_drop_schedule_lists():
+    assert affected_namespaces(_change("Schedules", "insert", {"_id": "s"})) == ["schedules"]
+
+
+def test_student_update_drops_only_its_programs_rosters():
+    change = _change("Student_Records", doc={"program_id": 3}, updated={"phone": "555"})
+    assert affected_namespaces(change) == ["roster:all", "roster:3"]
+
+
+@pytest.mark.parametrize("change", [
+    _change("Student_Records", doc={"program_id": 4}, updated={"program_id": 4}),
+    _change("Student_Records", "delete"),
+    _change("Student_Records", "replace", {"program_id": 3}),
+    _change("Student_Records", doc=None, updated={"name": "X"}),
+], ids=["program moved", "delete", "replace", "document gone"])
+def test_unknown_previous_program_drops_every_roster(change):
+    assert affected_namespaces(change) == ["roster"]
+
+
+def test_attendance_storage_changes_drop_no_rosters():
+    assert affected_namespaces(_change("Attendance_Sessions", "insert", {})) == []
+    assert affected_namespaces(_change("Attendance_Archive", "insert", {})) == []
+
+
+@pytest.mark.parametrize("change, expected", [
+    (_change("Attendance_Sessions", "insert", {}), True),
+    (_change("Attendance_Archive", "delete"), True),
+    (_change("Schedules", "insert", {}), False),
+    (_change("Student_Records", "insert", {}), True),
+    (_change("Student_Records", updated={"attendance.3.status": "Late"}), True),
+    (_change("Student_Records", updated={"name": "New"}), True),
+    (_change("Student_Records", updated={"phone": "555", "missed_count": 2}), False),
+    (_change("Student_Records", removed=["attendance"]), True),
+])
+def test_touches_attendance(change, expected):
+    assert touches_attendance(change) is expected
+
+
+def test_handle_change_invalidates_and_applies(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(change_streams, "invalidate", lambda *ns: invalidated.extend(ns))
+    cache = FakeCache()
+    doc = {"program_id": 3, "attendance": []}
+
+    assert handle_change(_change("Student_Records", doc=doc, updated={"attendance": []}), cache) == \
+        ["roster:all", "roster:3"]
+    assert invalidated == ["roster:all", "roster:3"]
+    assert cache.applied == [("Student_Records", "d1", doc)]
+
+    handle_change(_change("Student_Records", doc=doc, updated={"phone": "1"}), cache)
+    assert len(cache.applied) == 1
+
+
+def test_watcher_follows_a_replica_set(mongo_db, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(change_streams, "invalidate", lambda *ns: invalidated.extend(ns))
+    monkeypatch.setattr(change_streams, "RETRY_DELAY", 0.1)
+    events = []
+    cache = FakeCache()
+    mongo_db.create_collection("Student_Records")
+    watcher = ChangeWatcher(mongo_db, cache=cache, on_change=lambda change, ns: events.append((change, ns)))
+    watcher.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not cache.live and watcher.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not watcher.is_alive():
+            pytest.skip(f"change streams unavailable: {watcher.error}")
+        assert cache.live and cache.refreshed == 1
+
+        mongo_db["Student_Records"].insert_one({"_id": "a", "student_id": "a", "program_id": 7, "attendance": []})
+        mongo_db["Student_Records"].update_one({"_id": "a"}, {"$set": {"phone": "555"}})
+        mongo_db["Schedules"].insert_one({"_id": "s"})
+        while len(events) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+        watcher.join(5)
+
+    assert [ns for _, ns in events] == [["roster:all", "roster:7"], ["roster:all", "roster:7"], ["schedules"]]
+    # The phone-only update didn't touch attendance rows
+    assert [c for c, doc_id, _ in cache.applied] == ["Student_Records"]
+    assert not cache.live
@@ -0,0 +1,105 @@
+# tests/test_digests.py
+from datetime import datetime, timedelta
+
+import pytest
+
+import digests
+from digests import (
+    DIGEST_THRESHOLD, notify, notify_many, set_notification_mode, flush_digest, flush_due_digests,
+)
+from email_delivery import build_message
+
+
+@pytest.fixture
+def sent(mongo_db, monkeypatch):
+    """Every message handed to MailerSend, single or bulk, in order."""
+    outbox = []
+
+    def send_email(message):
+        outbox.append(message)
+        return True
+
+    def send_bulk(messages):
+        outbox.extend(messages)
+        return [{"email": m["to"][0]["email"], "status": "queued", "error": None, "bulk_email_id": "b1"}
+                for m in messages]
+
+    monkeypatch.setattr(digests, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(digests, "send_email", send_email)
+    monkeypatch.setattr(digests, "send_bulk", send_bulk)
+    mongo_db["Notification_Preferences"].insert_many([
+        {"_id": "ada@example.com", "mode": "digest"},
+        {"_id": "bo@example.com", "mode": "digest"},
+    ])
+    return outbox
+
+
+def _msg(email, subject="Absence", text="You missed a session."):
+    return build_message(email, subject, text, to_name=email.split("@")[0].title())
+
+
+def _waiting(db, email):
+    return db["Notification_Digest"].count_documents({"recipient": email, "batch": None})
+
+
+def test_routing_follows_each_recipients_preference(mongo_db, sent):
+    results = notify_many([_msg("Ada@Example.com"), _msg("cy@example.com"), _msg("dee@example.com")], "absence")
+    assert [r["status"] for r in results] == ["digest", "queued", "queued"]
+    # Immediate recipients (the default) went out in one bulk send
+    assert [m["to"][0]["email"] for m in sent] == ["cy@example.com", "dee@example.com"]
+    assert _waiting(mongo_db, "ada@example.com") == 1
+
+    # A lone immediate message is a plain send
+    assert notify(_msg("cy@example.com"), "schedule") is True
+    assert len(sent) == 3
+
+
+def test_digests_accumulate_per_recipient(mongo_db, sent):
+    for i in range(3):
+        notify_many([_msg("ada@example.com", f"Update {i}"), _msg("bo@example.com", f"Note {i}")], "schedule")
+    assert sent == []
+    assert (_waiting(mongo_db, "ada@example.com"), _waiting(mongo_db, "bo@example.com")) == (3, 3)
+
+    assert flush_digest("ADA@example.com") is True
+    [email] = sent
+    assert email["to"][0]["email"] == "ada@example.com"
+    assert email["subject"] == "Club Stride: 3 updates"
+    assert all(f"Update {i}" in email["text"] for i in range(3)) and "Note" not in email["text"]
+    assert mongo_db["Notification_Digest"].count_documents({"recipient": "ada@example.com"}) == 0
+    assert _waiting(mongo_db, "bo@example.com") == 3
+    # Nothing left to send
+    assert flush_digest("ada@example.com") is False
+
+
+def test_threshold_flushes_only_that_recipient(mongo_db, sent):
+    notify_many([_msg("bo@example.com")], "absence")
+    notify_many([_msg("ada@example.com", f"Update {i}") for i in range(DIGEST_THRESHOLD - 1)], "schedule")
+    assert sent == []
+
+    notify(_msg("ada@example.com", "One more"), "schedule")
+    [email] = sent
+    assert email["subject"] == f"Club Stride: {DIGEST_THRESHOLD} updates"
+    assert _waiting(mongo_db, "ada@example.com") == 0
+    assert _waiting(mongo_db, "bo@example.com") == 1
+
+
+def test_failed_flush_keeps_the_items(mongo_db, sent, monkeypatch):
+    notify(_msg("ada@example.com"), "absence")
+    monkeypatch.setattr(digests, "send_email", lambda message: False)
+    assert flush_digest("ada@example.com") is False
+    assert _waiting(mongo_db, "ada@example.com") == 1
+
+
+def test_due_digests_and_switching_back_to_immediate(mongo_db, sent):
+    notify(_msg("ada@example.com"), "absence")
+    notify(_msg("bo@example.com"), "absence")
+    mongo_db["Notification_Digest"].update_one(
+        {"recipient": "bo@example.com"}, {"$set": {"created_at": datetime.utcnow() - timedelta(days=2)}})
+    assert flush_due_digests() == 1
+    assert [m["to"][0]["email"] for m in sent] == ["bo@example.com"]
+
+    # Ada goes back to immediate: her waiting item is sent rather than stranded
+    assert set_notification_mode("ada@example.com", "immediate") is True
+    assert [m["to"][0]["email"] for m in sent] == ["bo@example.com", "ada@example.com"]
+    assert notify_many([_msg("ada@example.com")], "absence")[0]["status"] == "sent"
+    assert set_notification_mode("ada@example.com", "weekly") is False
@@ -0,0 +1,211 @@
+# tests/test_email_delivery.py
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import email_delivery
+from email_delivery import TokenBucket, build_message, send_bulk, send_email, BULK_CHUNK_SIZE
+
+
+class StubMailerSend(ThreadingHTTPServer):
+    """
+    A local stand-in for the MailerSend API. Records every request as
+    (method, path, headers, JSON body) and answers from `responses`
+    ((status, body, headers) tuples, in order), else with a 202.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.requests = []
+        self.responses = []
+        self.bulk_status = {}
+        self.lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def posts(self, path):
+        return [body for method, p, _, body in self.requests if (method, p) == ("POST", path)]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests.append(("POST", self.path, dict(self.headers), body))
+            status, reply, headers = (self.server.responses.pop(0) if self.server.responses
+                                      else (202, {"bulk_email_id": "bulk-1"}, {}))
+        self._reply(status, reply, headers)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(("GET", self.path, dict(self.headers), None))
+        self._reply(200, {"data": self.server.bulk_status})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mailer(monkeypatch):
+    server = StubMailerSend()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    sleeps = []
+    logged = []
+    monkeypatch.setattr(email_delivery.st, "secrets",
+                        {"MAILERSEND_API_KEY": "test-key", "MAILERSEND_API_BASE": server.api_base})
+    monkeypatch.setattr(email_delivery, "_bucket", TokenBucket(rate=1e6, capacity=1000))
+    monkeypatch.setattr(email_delivery.time, "sleep", sleeps.append)
+    monkeypatch.setattr(email_delivery, "_log_deliveries", logged.extend)
+    server.sleeps, server.logged = sleeps, logged
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _messages(n):
+    return [build_message(f"user{i}@example.org", "Hello", "Body") for i in range(n)]
+
+
+def test_token_bucket_paces_after_burst(monkeypatch):
+    clock = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(email_delivery.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(email_delivery.time, "sleep", sleep)
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    for _ in range(5):
+        bucket.acquire()
+    # Three tokens up front, then one every half second
+    assert sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert clock[0] == pytest.approx(1.0)
+
+
+def test_send_posts_the_message_with_auth(mailer):
+    message = build_message("a@example.org", "Hi", "Body", to_name="Ada")
+    assert send_email(message)
+    [(method, path, headers, body)] = mailer.requests
+    assert (method, path) == ("POST", "/v1/email")
+    assert headers["Authorization"] == "Bearer test-key"
+    assert headers["Content-Type"] == "application/json"
+    assert body == message
+    assert body["to"] == [{"name": "Ada", "email": "a@example.org"}]
+    assert mailer.logged[0]["status"] == "sent"
+
+
+def test_send_retries_429_and_5xx_then_succeeds(mailer):
+    mailer.responses = [(429, {"message": "slow down"}, {}), (503, {}, {}), (202, {}, {})]
+    assert send_email(build_message("a@example.org", "Hi", "Body"))
+    assert len(mailer.posts("/v1/email")) == 3
+    # No Retry-After: exponential backoff
+    assert mailer.sleeps == [1, 2]
+    assert mailer.logged[0]["status"] == "sent"
+
+
+@pytest.mark.parametrize("retry_after, wait", [
+    ("7", 7),
+    ("0.5", 0.5),
+    ("3600", email_delivery.MAX_RETRY_WAIT),
+    ("soon", 1),
+])
+def test_429_waits_for_retry_after_seconds(mailer, retry_after, wait):
+    mailer.responses = [(429, {"message": "slow down"}, {"Retry-After": retry_after}), (202, {}, {})]
+    assert send_email(build_message("a@example.org", "Hi", "Body"))
+    assert mailer.sleeps == [wait]
+
+
+def test_429_waits_until_retry_after_date(mailer):
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    mailer.responses = [(429, {}, {"Retry-After": format_datetime(when, usegmt=True)}), (202, {}, {})]
+    assert send_email(build_message("a@example.org", "Hi", "Body"))
+    [wait] = mailer.sleeps
+    assert 25 < wait <= 30
+
+
+def test_send_gives_up_after_max_attempts(mailer):
+    mailer.responses = [(500, {"message": "boom"}, {})] * email_delivery.MAX_ATTEMPTS
+    assert not send_email(build_message("a@example.org", "Hi", "Body"))
+    assert len(mailer.posts("/v1/email")) == email_delivery.MAX_ATTEMPTS
+    # No wait after the last attempt
+    assert len(mailer.sleeps) == email_delivery.MAX_ATTEMPTS - 1
+    assert mailer.logged[0]["status"] == "failed"
+    assert mailer.logged[0]["error"] == "boom"
+
+
+def test_client_errors_are_not_retried(mailer):
+    mailer.responses = [(422, {"message": "invalid"}, {})]
+    assert not send_email(build_message("a@example.org", "Hi", "Body"))
+    assert len(mailer.requests) == 1
+
+
+def test_bulk_is_chunked_by_limit_and_keeps_order(mailer):
+    messages = _messages(2 * BULK_CHUNK_SIZE + 1)
+    results = send_bulk(messages)
+
+    chunks = mailer.posts("/v1/bulk-email")
+    assert sorted(len(chunk) for chunk in chunks) == [1, BULK_CHUNK_SIZE, BULK_CHUNK_SIZE]
+    # Every message went out exactly once, each to a single recipient
+    sent = sorted(m["to"][0]["email"] for chunk in chunks for m in chunk)
+    assert sent == sorted(m["to"][0]["email"] for m in messages)
+    assert all(len(m["to"]) == 1 for chunk in chunks for m in chunk)
+    assert [r["email"] for r in results] == [m["to"][0]["email"] for m in messages]
+    assert {r["status"] for r in results} == {"queued"}
+    assert {r["bulk_email_id"] for r in results} == {"bulk-1"}
+    assert len(mailer.logged) == len(messages)
+
+
+def test_failed_chunk_marks_only_its_recipients(mailer):
+    mailer.responses = [(422, {"message": "bad chunk"}, {})]
+    results = send_bulk(_messages(3))
+    assert [r["status"] for r in results] == ["failed"] * 3
+    assert results[0]["error"] == "bad chunk"
+
+
+def test_refresh_resolves_queued_recipients(mailer, mongo_db, monkeypatch):
+    monkeypatch.setattr(email_delivery, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(email_delivery, "_log_deliveries", lambda rows: mongo_db["Email_Deliveries"].insert_many(rows))
+    send_bulk(_messages(3))
+    mailer.bulk_status = {
+        "state": "completed",
+        "validation_errors": {"message.1.to.0.email": ["The email is invalid."]},
+        "suppressed_recipients": [{"recipient": {"email": "user2@example.org"}}],
+    }
+
+    assert email_delivery.refresh_queued_deliveries() == {"sent": 1, "failed": 2, "pending": 0}
+    assert ("GET", "/v1/bulk-email/bulk-1") in [(m, p) for m, p, _, _ in mailer.requests]
+    rows = {r["email"]: r for r in mongo_db["Email_Deliveries"].find()}
+    assert rows["user0@example.org"]["status"] == "sent"
+    assert rows["user1@example.org"]["error"] == "The email is invalid."
+    assert rows["user2@example.org"]["error"] == "suppressed"
+    # Nothing left queued, so nothing to check next time
+    assert email_delivery.refresh_queued_deliveries() == {"sent": 0, "failed": 0, "pending": 0}
+
+
+def test_refresh_leaves_processing_requests_queued(mailer, mongo_db, monkeypatch):
+    monkeypatch.setattr(email_delivery, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(email_delivery, "_log_deliveries", lambda rows: mongo_db["Email_Deliveries"].insert_many(rows))
+    send_bulk(_messages(2))
+    mailer.bulk_status = {"state": "processing"}
+
+    assert email_delivery.refresh_queued_deliveries() == {"sent": 0, "failed": 0, "pending": 1}
+    assert mongo_db["Email_Deliveries"].count_documents({"status": "queued"}) == 2
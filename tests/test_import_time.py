@@ -0,0 +1,57 @@
+# tests/test_import_time.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("streamlit_option_menu")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first render of the page that needs them, never at startup
+DEFERRED = [
+    "views.dashboard", "views.settings", "views.help", "views.login", "views.instructors",
+    "views.students", "views.attendance", "views.review", "views.schedules", "views.reports",
+    "pandas", "plotly.express", "streamlit_extras", "mailersend",
+]
+
+# Self time (ms) any one of the app's own modules may take to import
+SELF_BUDGET_MS = 50
+
+
+@pytest.fixture(scope="module")
+def import_times():
+    """{module: (self ms, cumulative ms)} for `import main_app` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main_app"],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def test_startup_imports_the_app(import_times):
+    assert {"main_app", "views", "instructors_db"} <= set(import_times)
+
+
+@pytest.mark.parametrize("module", DEFERRED)
+def test_page_modules_and_heavy_libraries_are_deferred(import_times, module):
+    assert module not in import_times
+
+
+def test_app_modules_stay_within_budget(import_times):
+    app_modules = {
+        name for name in import_times
+        if os.path.exists(os.path.join(REPO_ROOT, name.replace(".", os.sep) + ".py"))
+        or os.path.exists(os.path.join(REPO_ROOT, name, "__init__.py"))
+    }
+    slow = {name: import_times[name][0] for name in app_modules if import_times[name][0] > SELF_BUDGET_MS}
+    assert not slow, f"over {SELF_BUDGET_MS} ms self import time: {slow}"
@@ -0,0 +1,58 @@
+# tests/test_read_routing.py
+import pymongo
+import pytest
+from pymongo.read_preferences import ReadPreference, SecondaryPreferred
+
+import students_db
+from students_db import read_workload, read_preference_for, read_collection
+
+
+@pytest.fixture
+def secrets(monkeypatch):
+    values = {}
+    monkeypatch.setattr(students_db.st, "secrets", values)
+    return values
+
+
+def test_reporting_reads_are_analytical(secrets):
+    assert read_workload("fetch_all_attendance_records") == "analytical"
+    assert read_workload("get_missed_counts_for_all_students") == "analytical"
+    assert read_workload("store_student_record") == "oltp"
+
+
+def test_workloads_can_be_overridden_per_operation(secrets):
+    secrets["READ_WORKLOADS"] = {"fetch_all_attendance_records": "oltp", "get_roster": "analytical"}
+    assert read_workload("fetch_all_attendance_records") == "oltp"
+    assert read_workload("get_roster") == "analytical"
+    assert read_preference_for("fetch_all_attendance_records") == ReadPreference.PRIMARY
+
+
+def test_analytical_reads_prefer_secondaries_with_bounded_staleness(secrets):
+    assert read_preference_for("attendance_cache") == SecondaryPreferred(max_staleness=120)
+    secrets["ANALYTICS_MAX_STALENESS_SECONDS"] = 30
+    # MongoDB rejects anything under 90 seconds
+    assert read_preference_for("attendance_cache") == SecondaryPreferred(max_staleness=90)
+    assert read_preference_for("anything_else") == ReadPreference.PRIMARY
+
+
+def test_read_collection_applies_the_preference(secrets, monkeypatch):
+    client = pymongo.MongoClient("mongodb://localhost:1", connect=False)
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: client["Student_Data"])
+    assert read_collection("Student_Records", "analytics_snapshot").read_preference == \
+        SecondaryPreferred(max_staleness=120)
+    assert read_collection("Student_Records", "get_roster").read_preference == ReadPreference.PRIMARY
+
+
+def test_reports_are_served_by_a_secondary(counted_db, secrets, monkeypatch):
+    db, log = counted_db
+    db.client.admin.command("ping")
+    if not db.client.secondaries:
+        pytest.skip("needs a replica set with a secondary")
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: db)
+    db["Student_Records"].insert_one({"student_id": "a", "name": "Ana", "program_id": 1, "attendance": []})
+
+    students_db.fetch_all_attendance_records()
+    students_db.get_roster.uncached()
+    [report] = log.servers("Student_Records", "aggregate")
+    assert report in db.client.secondaries
+    assert set(log.servers("Student_Records", "find")) == {db.client.primary}
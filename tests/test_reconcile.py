@@ -0,0 +1,94 @@
+# tests/test_reconcile.py
+from datetime import datetime, timedelta
+
+import pytest
+
+import reconcile
+from reconcile import find_drift, apply_corrections, reconcile_missed_counts, CHECKPOINT_OVERLAP, JOB_NAME
+from attendance_codec import encode_term
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def _absent(n, start=datetime(2025, 3, 3, 17)):
+    return [{"date": start + timedelta(days=7 * i), "status": "Absent", "comment": ""} for i in range(n)]
+
+
+@pytest.fixture
+def db(mongo_db, monkeypatch):
+    monkeypatch.setattr(reconcile, "_student_db", lambda connection_string=None: mongo_db)
+    mongo_db["Student_Records"].insert_many([
+        # In step: two Absent entries in the array
+        {"student_id": "ok", "name": "Ok", "program_id": 1, "missed_count": 2, "attendance": _absent(2),
+         "updated_at": NOW},
+        # Array storage: one Absent too many counted
+        {"student_id": "arr", "name": "Arr", "program_id": 1, "missed_count": 3, "attendance": _absent(2),
+         "updated_at": NOW},
+        # Session storage: an absence that was never counted, and no counter at all
+        {"student_id": "ses", "name": "Ses", "program_id": 1, "updated_at": NOW},
+        # Archive storage: two archived absences plus one live
+        {"student_id": "arc", "name": "Arc", "program_id": 1, "missed_count": 1,
+         "attendance": _absent(1, datetime(2025, 3, 3, 17)), "updated_at": NOW},
+    ])
+    mongo_db["Attendance_Sessions"].insert_one({
+        "program_id": 1, "session_datetime": datetime(2025, 3, 4, 17), "student_ids": ["ses", "ok"],
+        "statuses": {"ses": {"name": "Ses", "status": "Absent"}, "ok": {"name": "Ok", "status": "Present"}},
+    })
+    block = encode_term("2024H2", _absent(2, datetime(2024, 9, 2, 17)))
+    counts = {"Present": 0, "Late": 0, "Absent": 2, "Excused": 0}
+    mongo_db["Attendance_Archive"].insert_one({"_id": "arc:2024H2", "student_id": "arc", **block, "counts": counts})
+    return mongo_db
+
+
+def test_find_drift_across_storage_modes(db):
+    drift = {d["student_id"]: (d.get("stored"), d["actual"]) for d in find_drift(db)}
+    assert drift == {"arr": (3, 2), "ses": (None, 1), "arc": (1, 3)}
+
+
+def test_apply_corrections(db):
+    assert apply_corrections(db, find_drift(db), batch_size=2) == 3
+    assert find_drift(db) == []
+    stored = {d["student_id"]: d.get("missed_count") for d in db["Student_Records"].find()}
+    assert stored == {"ok": 2, "arr": 2, "ses": 1, "arc": 3}
+
+
+def test_counter_changed_mid_run_is_left_alone(db):
+    drifted = find_drift(db)
+    # An Absent recorded between the read and the write
+    db["Student_Records"].update_one({"student_id": "arr"}, {"$inc": {"missed_count": 1},
+                                                             "$push": {"attendance": _absent(1)[0]}})
+    assert apply_corrections(db, drifted) == 2
+    assert db["Student_Records"].find_one({"student_id": "arr"})["missed_count"] == 4
+    # The next pass picks it up again
+    assert {d["student_id"] for d in find_drift(db)} == {"arr"}
+
+
+def test_dry_run_changes_nothing(db):
+    summary = reconcile_missed_counts(dry_run=True)
+    assert (summary["mode"], summary["drifted"], summary["corrected"]) == ("full", 3, 0)
+    assert db["Job_Checkpoints"].find_one({"_id": JOB_NAME}) is None
+    assert db["Student_Records"].find_one({"student_id": "arr"})["missed_count"] == 3
+
+
+def test_incremental_checks_since_checkpoint_with_overlap(db):
+    last_run = NOW - timedelta(hours=1)
+    db["Job_Checkpoints"].insert_one({"_id": JOB_NAME, "last_run_started": last_run})
+    records = db["Student_Records"]
+    # Written just before the last run started: inside the overlap, re-checked
+    records.update_one({"student_id": "arr"}, {"$set": {"updated_at": last_run - CHECKPOINT_OVERLAP / 2}})
+    # Written well before it: assumed already reconciled
+    records.update_one({"student_id": "ses"}, {"$set": {"updated_at": last_run - 2 * CHECKPOINT_OVERLAP}})
+
+    summary = reconcile_missed_counts()
+    assert summary["mode"] == "incremental"
+    assert summary["since"] == last_run - CHECKPOINT_OVERLAP
+    assert summary["checked"] == 3
+    assert {r["student_id"] for r in summary["report"]} == {"arr", "arc"}
+    assert records.find_one({"student_id": "ses"}).get("missed_count") is None
+
+    checkpoint = db["Job_Checkpoints"].find_one({"_id": JOB_NAME})
+    assert checkpoint["last_run_started"] > last_run
+    assert (checkpoint["last_mode"], checkpoint["last_corrected"]) == ("incremental", 2)
+
+    # --full still finds the one the incremental pass skipped
+    assert [r["student_id"] for r in reconcile_missed_counts(full=True)["report"]] == ["ses"]
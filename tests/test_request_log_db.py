@@ -0,0 +1,95 @@
+# tests/test_request_log_db.py
+from types import SimpleNamespace
+
+import pytest
+
+import request_log_db
+from request_log_db import run_idempotent
+from views import common
+from views.common import form_token
+
+
+def test_no_key_always_runs():
+    calls = []
+    assert run_idempotent(None, calls.append, 1) is None
+    run_idempotent("", calls.append, 2)
+    assert calls == [1, 2]
+
+
+@pytest.fixture
+def request_log(mongo_db, monkeypatch):
+    monkeypatch.setattr(request_log_db, "_request_log", lambda: mongo_db["Request_Log"])
+    monkeypatch.setattr(request_log_db, "IN_FLIGHT_WAIT_SECONDS", 0.5)
+    return mongo_db["Request_Log"]
+
+
+def test_replays_return_the_first_result(request_log):
+    calls = []
+
+    def save(value):
+        calls.append(value)
+        return f"saved {value}"
+
+    assert run_idempotent("form-1", save, "a") == "saved a"
+    assert run_idempotent("form-1", save, "b") == "saved a"
+    assert calls == ["a"]
+    assert request_log.find_one({"_id": "form-1"})["status"] == "done"
+
+
+def test_failure_releases_the_key(request_log):
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        run_idempotent("form-2", fail)
+    assert request_log.find_one({"_id": "form-2"}) is None
+    assert run_idempotent("form-2", lambda: True) is True
+
+
+def test_replay_of_a_running_submission_gets_no_result(request_log):
+    request_log.insert_one({"_id": "form-3", "status": "pending"})
+    calls = []
+    assert run_idempotent("form-3", calls.append, 1) is None
+    assert calls == []
+
+
+@pytest.fixture
+def session_state(monkeypatch):
+    state = {}
+    monkeypatch.setattr(common, "st", SimpleNamespace(session_state=state))
+    return state
+
+
+def test_form_token_is_stable_across_reruns_of_one_submission(session_state):
+    shown = form_token("f", False)
+    first = form_token("f", True, {"s1": "Present"})
+    assert first == shown
+    assert form_token("f", True, {"s1": "Present"}) == first
+    # Shown again without submitting: the next submission is a new one
+    assert form_token("f", False) != first
+
+
+def test_form_token_rotates_when_a_submission_carries_new_values(session_state):
+    first = form_token("f", True, {"s1": "Present"})
+    second = form_token("f", True, {"s1": "Absent"})
+    assert second != first
+    # Back to the first values is a third submission, not a replay of the first
+    assert form_token("f", True, {"s1": "Present"}) not in (first, second)
+
+
+def test_two_submissions_from_one_form_both_persist(request_log, session_state):
+    saved = {}
+
+    def save(sid, status):
+        saved[sid] = status
+        return f"{sid} {status}"
+
+    form_token("attendance", False)
+    for status in ("Present", "Absent"):
+        payload = {"s1": status}
+        # Each submission is processed twice, as a double click would
+        for _ in range(2):
+            token = form_token("attendance", True, payload)
+            assert run_idempotent(f"{token}:s1", save, "s1", status) == f"s1 {status}"
+        assert saved == {"s1": status}
+    assert request_log.count_documents({}) == 2
@@ -0,0 +1,97 @@
+# tests/test_round_trips.py
+"""Round-trip budgets of the write paths (one command each against their collection)."""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import students_db
+import schedules_db
+import sessions_db
+import attendance_sessions_db
+
+
+@pytest.fixture
+def db(counted_db, monkeypatch):
+    db, log = counted_db
+    for module in (students_db, schedules_db, sessions_db):
+        monkeypatch.setattr(module, "connect_to_db", lambda: db)
+    monkeypatch.setattr(sessions_db, "_sessions", lambda: db["Sessions"])
+    monkeypatch.setattr(attendance_sessions_db, "_attendance_sessions", lambda: db["Attendance_Sessions"])
+    return db
+
+
+@pytest.fixture
+def log(counted_db):
+    return counted_db[1]
+
+
+def test_store_student_record_is_one_round_trip(db, log):
+    students_db.store_student_record("Ana Smith", "555", "ana@example.org", 1)
+    students_db.store_student_record("Ana Smith", "556", "ana@example.org", 1)
+    assert log.on("Student_Records") == ["update", "update"]
+    assert db["Student_Records"].count_documents({}) == 1
+
+
+def test_update_student_info_is_one_round_trip_with_program_id(db, log):
+    students_db.store_student_record("Ana Smith", "555", "ana@example.org", 1)
+    student_id = students_db.generate_student_id("Ana Smith", 1)
+    log.clear()
+
+    students_db.update_student_info(student_id, "Ana Smith", "999", "ana@example.org", "5", "Elm", program_id=1)
+    assert log.on("Student_Records") == ["findAndModify"]
+
+    # A rename adds one duplicate-ID check (and re-keys session-stored
+    # attendance in the same transaction, on Attendance_Sessions)
+    log.clear()
+    students_db.update_student_info(student_id, "Ana Smyth", "999", "ana@example.org", "5", "Elm", program_id=1)
+    assert log.on("Student_Records") == ["find", "findAndModify"]
+
+
+def test_upsert_attendance_subdoc_is_one_round_trip(db, log):
+    students_db.store_student_record("Ana Smith", "555", "ana@example.org", 1)
+    student_id = students_db.generate_student_id("Ana Smith", 1)
+    log.clear()
+
+    students_db.upsert_attendance_subdoc(student_id, datetime(2025, 3, 4, 17), "Present")
+    students_db.upsert_attendance_subdoc(student_id, datetime(2025, 3, 5, 17), "Late",
+                                         old_date=datetime(2025, 3, 4, 17))
+    assert log.on("Student_Records") == ["update", "update"]
+    [entry] = db["Student_Records"].find_one({"student_id": student_id})["attendance"]
+    assert (entry["date"], entry["status"]) == (datetime(2025, 3, 5, 17), "Late")
+
+
+def test_update_and_delete_schedule_are_one_round_trip_each(db, log):
+    schedule_id = db["Schedules"].insert_one({
+        "title": "Practice", "program_id": 1, "start_datetime": datetime(2030, 3, 4, 17),
+        "end_datetime": datetime(2030, 3, 4, 18), "_v": 0,
+    }).inserted_id
+    log.clear()
+
+    assert schedules_db.update_schedule(str(schedule_id), {"title": "Practice (moved)"})
+    assert log.on("Schedules") == ["findAndModify"]
+
+    log.clear()
+    assert schedules_db.delete_schedule(str(schedule_id))
+    assert log.on("Schedules") == ["findAndModify"]
+    assert db["Schedules"].find_one({"_id": ObjectId(schedule_id)}) is None
+
+
+def test_slot_change_reads_the_schedule_only_without_the_loaded_copy(db, log):
+    start = (datetime.utcnow() + timedelta(days=7)).replace(hour=17, minute=0, second=0, microsecond=0)
+    doc = {"title": "Practice", "program_id": 1, "recurrence": "None", "location": "Gym",
+           "start_datetime": start, "end_datetime": start + timedelta(hours=1), "_v": 0}
+    doc["_id"] = db["Schedules"].insert_one(dict(doc)).inserted_id
+    log.clear()
+
+    # The copy the edit was made on, checked by its version: one round trip
+    moved = {"start_datetime": start + timedelta(hours=2), "end_datetime": start + timedelta(hours=3)}
+    assert schedules_db.update_schedule(str(doc["_id"]), moved, expected_version=0, current=doc)
+    assert log.on("Schedules") == ["findAndModify"]
+
+    # No loaded copy: the conflict check reads the schedule first
+    log.clear()
+    assert schedules_db.update_schedule(str(doc["_id"]), {"location": "Field"})
+    assert log.on("Schedules") == ["find", "findAndModify"]
+    stored = db["Schedules"].find_one({"_id": doc["_id"]})
+    assert (stored["start_datetime"], stored["location"], stored["_v"]) == (moved["start_datetime"], "Field", 2)
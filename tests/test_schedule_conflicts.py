@@ -0,0 +1,52 @@
+# tests/test_schedule_conflicts.py
+from datetime import datetime
+
+import schedule_conflicts
+from schedule_conflicts import IntervalIndex, find_schedule_conflicts
+
+
+def _session(schedule_id, start_hour, end_hour, instructor_id=None, location="", day=4):
+    return {
+        "schedule_id": schedule_id, "title": schedule_id, "instructor_id": instructor_id, "location": location,
+        "start": datetime(2030, 3, day, start_hour), "end": datetime(2030, 3, day, end_hour),
+    }
+
+
+def test_interval_index_finds_only_overlaps():
+    index = IntervalIndex([_session("a", 9, 17), _session("b", 10, 11), _session("c", 12, 13)])
+    assert [s["schedule_id"] for s in index.overlapping(datetime(2030, 3, 4, 11), datetime(2030, 3, 4, 12))] == ["a"]
+    assert [s["schedule_id"] for s in index.overlapping(datetime(2030, 3, 4, 10, 30),
+                                                        datetime(2030, 3, 4, 12, 30))] == ["a", "b", "c"]
+    assert index.overlapping(datetime(2030, 3, 4, 17), datetime(2030, 3, 4, 18)) == []
+
+
+def test_conflicts_query_only_this_instructor_and_location(monkeypatch):
+    calls = []
+    stored = {
+        ("instructor_id", "i1"): [_session("teach", 17, 18, instructor_id="i1", location="Field")],
+        ("location", "GYM"): [_session("room", 17, 19, instructor_id="i9", location="gym"),
+                              _session("proposed-self", 17, 18, location="Gym")],
+    }
+
+    def sessions_between(start, end, **filters):
+        calls.append(filters)
+        [(field, value)] = filters.items()
+        return stored.get((field, value), [])
+
+    monkeypatch.setattr(schedule_conflicts, "sessions_between", sessions_between)
+    schedule = {
+        "_id": "proposed-self", "title": "New", "instructor_id": "i1", "location": "GYM",
+        "start_datetime": datetime(2030, 3, 4, 17, 30), "end_datetime": datetime(2030, 3, 4, 18, 30),
+    }
+
+    conflicts = find_schedule_conflicts(schedule, from_dt=datetime(2030, 3, 1))
+    assert sorted(calls, key=str) == [{"instructor_id": "i1"}, {"location": "GYM"}]
+    assert [(c["kind"], c["other_schedule_id"]) for c in conflicts] == [("instructor", "teach"), ("location", "room")]
+
+
+def test_no_instructor_or_location_means_no_queries(monkeypatch):
+    calls = []
+    monkeypatch.setattr(schedule_conflicts, "sessions_between", lambda *a, **k: calls.append(k) or [])
+    schedule = {"start_datetime": datetime(2030, 3, 4, 17), "end_datetime": datetime(2030, 3, 4, 18)}
+    assert find_schedule_conflicts(schedule, from_dt=datetime(2030, 3, 1)) == []
+    assert calls == []
@@ -0,0 +1,76 @@
+# tests/test_search_db.py
+import re
+from datetime import datetime
+
+import pytest
+
+import search_db
+from search_db import fold, name_terms, name_prefix_query, word_stem, comment_entry_match
+
+
+def test_names_fold_case_and_accents():
+    assert fold("  José   SMITH ") == "jose smith"
+    assert name_terms("José Smith-Lee") == ["jose", "jose smith-lee", "lee", "smith"]
+    assert name_terms("   ") == []
+
+
+def test_prefix_query_is_an_index_range():
+    query = name_prefix_query("SMI")
+    bounds = query["name_terms"]["$elemMatch"]
+    assert bounds["$gte"] == "smi"
+    assert bounds["$gte"] <= "smith" < bounds["$lt"]
+    assert not ("smi" <= "sma" < bounds["$lt"])
+    assert name_prefix_query("  ") == {}
+
+
+@pytest.mark.parametrize("query, comment", [
+    ("walk", "Walked in late"),
+    ("walked", "walks home"),
+    ("running", "ran off, then ran back; running late"),
+    ("studies", "needs to study more"),
+    ("classes", "missed class"),
+])
+def test_entry_filter_keeps_stemmed_matches(query, comment):
+    [clause] = comment_entry_match([query])["$or"]
+    pattern = clause["attendance.comment"]["$regex"]
+    assert re.search(pattern, comment, re.IGNORECASE)
+
+
+def test_entry_filter_matches_word_starts_only():
+    [clause] = comment_entry_match(["art"])["$or"]
+    assert not re.search(clause["attendance.comment"]["$regex"], "left early", re.IGNORECASE)
+    assert word_stem("art") == "art"
+
+
+@pytest.fixture
+def records(mongo_db, monkeypatch):
+    coll = search_db.ensure_search_indexes(mongo_db)
+    monkeypatch.setattr(search_db, "_student_records", lambda: coll)
+    return coll
+
+
+def test_typeahead_respects_programs_and_limit(records):
+    records.insert_many([
+        {"student_id": f"s{i}", "name": name, "program_id": pid, **search_db.name_search_fields(name)}
+        for i, (name, pid) in enumerate([("Ana Smith", 1), ("Ben Smyth", 1), ("Cara Smith", 2), ("Dan Jones", 1)])
+    ])
+    assert [s["name"] for s in search_db.typeahead("sm", program_ids=[1])] == ["Ana Smith", "Ben Smyth"]
+    assert [s["name"] for s in search_db.typeahead("SMITH")] == ["Ana Smith", "Cara Smith"]
+    assert len(search_db.typeahead("s", limit=1)) == 1
+
+
+def test_comment_search_is_per_program_and_stemmed(records):
+    records.insert_many([
+        {"student_id": "a", "name": "Ana", "program_id": 1, "attendance": [
+            {"date": datetime(2025, 3, 4), "status": "Late", "comment": "Walked in late"},
+            {"date": datetime(2025, 3, 5), "status": "Present", "comment": "on time"},
+        ]},
+        {"student_id": "b", "name": "Ben", "program_id": 2, "attendance": [
+            {"date": datetime(2025, 3, 6), "status": "Late", "comment": "walking slowly"},
+        ]},
+    ])
+    rows = search_db.search_comments("walk")
+    assert [(r["student_id"], r["attendance"]["comment"]) for r in rows] == [
+        ("b", "walking slowly"), ("a", "Walked in late")
+    ]
+    assert [r["student_id"] for r in search_db.search_comments("walk", program_ids=[1])] == ["a"]
@@ -0,0 +1,112 @@
+# tests/test_sessions_db.py
+from datetime import datetime, timedelta
+
+import pytest
+
+import sessions_db
+from sessions_db import expand_occurrences
+
+
+ONE_TIME = {
+    "_id": "s1", "program_id": 1, "instructor_id": "i1", "title": "Open day",
+    "start_datetime": datetime(2025, 3, 4, 17, 0), "end_datetime": datetime(2025, 3, 4, 18, 0),
+    "location": " Gym ",
+}
+WEEKLY = {
+    "_id": "s2", "program_id": 2, "instructor_id": "i2", "title": "Practice", "recurrence": "Weekly",
+    "created_at": datetime(2025, 3, 1),
+    "days_times": [{"day": "Tue", "start_time": "17:00:00", "end_time": "18:30:00", "location": "Field"}],
+}
+
+
+def test_one_time_schedule_expands_to_one_session():
+    [session] = expand_occurrences(ONE_TIME, datetime(2025, 3, 1), datetime(2025, 4, 1))
+    assert session["_id"] == "s1:20250304T1700"
+    assert session["location"] == "Gym"
+    assert expand_occurrences(ONE_TIME, datetime(2025, 4, 1), datetime(2025, 5, 1)) == []
+
+
+def test_weekly_schedule_expands_each_week_from_creation():
+    sessions = expand_occurrences(WEEKLY, datetime(2025, 2, 1), datetime(2025, 3, 19))
+    assert [s["start"] for s in sessions] == [datetime(2025, 3, 4, 17), datetime(2025, 3, 11, 17),
+                                             datetime(2025, 3, 18, 17)]
+    assert sessions[0]["end"] == datetime(2025, 3, 4, 18, 30)
+
+
+@pytest.fixture
+def sessions_on(mongo_db, monkeypatch):
+    monkeypatch.setattr(sessions_db, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(sessions_db, "_sessions", lambda: mongo_db["Sessions"])
+    return mongo_db
+
+
+def test_first_use_backfills_one_time_schedules(sessions_on):
+    sessions_on["Schedules"].insert_many([dict(ONE_TIME), dict(WEEKLY)])
+    found = sessions_db.sessions_between(datetime(2025, 3, 4), datetime(2025, 3, 5))
+    assert {s["schedule_id"] for s in found} == {"s1", "s2"}
+
+    checkpoint = sessions_on["Job_Checkpoints"].find_one({"_id": sessions_db.HORIZON_CHECKPOINT})
+    assert checkpoint["backfilled"] is True
+    assert checkpoint["through"] >= datetime.utcnow() + sessions_db.SESSION_HORIZON - timedelta(minutes=1)
+
+
+def test_backfill_keeps_stored_sessions(sessions_on):
+    sessions_on["Schedules"].insert_one(dict(ONE_TIME))
+    sessions_on["Sessions"].insert_one({"_id": "other:1", "schedule_id": "other",
+                                        "start": datetime(2025, 1, 1), "end": datetime(2025, 1, 1, 1)})
+    assert sessions_db.backfill_sessions() == 1
+    assert sessions_on["Sessions"].count_documents({}) == 2
+
+
+@pytest.fixture
+def reads_on(sessions_on, monkeypatch):
+    import students_db
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: sessions_on)
+    monkeypatch.setattr(sessions_db, "read_collection", lambda name, operation: sessions_on[name])
+    return sessions_on
+
+
+def test_expected_vs_actual_counts_session_stored_attendance(reads_on):
+    reads_on["Schedules"].insert_one(dict(WEEKLY))
+    reads_on["Student_Records"].insert_many([
+        {"student_id": "a", "name": "Ana", "program_id": 2,
+         "attendance": [{"date": datetime(2025, 3, 4, 17, 5), "status": "Present"}]},
+        {"student_id": "b", "name": "Ben", "program_id": 2, "attendance": []},
+        {"student_id": "c", "name": "Cy", "program_id": 2, "attendance": []},
+    ])
+    reads_on["Attendance_Sessions"].insert_one({
+        "program_id": 2, "session_datetime": datetime(2025, 3, 4, 17), "student_ids": ["b", "gone"],
+        "statuses": {"b": {"name": "Ben", "status": "Absent"}, "gone": {"name": "Left", "status": "Present"}},
+    })
+
+    result = sessions_db.expected_vs_actual(datetime(2025, 3, 4), datetime(2025, 3, 5), program_ids=[2])
+    by_student = {s["student_id"]: s for s in result["students"]}
+    assert set(by_student) == {"a", "b", "c"}
+    assert (by_student["a"]["attended"], by_student["b"]["absent"], by_student["c"]["unrecorded"]) == (1, 1, 1)
+    [program] = result["programs"]
+    assert (program["expected"], program["unrecorded"]) == (3, 1)
+
+
+def test_expected_vs_actual_matches_two_sessions_on_one_day(reads_on):
+    day = datetime(2025, 3, 6)
+    reads_on["Schedules"].insert_many([
+        {**ONE_TIME, "_id": f"t{hour}", "program_id": 3,
+         "start_datetime": day.replace(hour=hour), "end_datetime": day.replace(hour=hour + 1)}
+        for hour in (9, 17)
+    ])
+    reads_on["Student_Records"].insert_many([
+        # One entry for the two sessions: one recorded, one not
+        {"student_id": "d", "name": "Dee", "program_id": 3,
+         "attendance": [{"date": day.replace(hour=17, minute=5), "status": "Present"}]},
+        # Two entries, stored out of order: one per session
+        {"student_id": "e", "name": "Eve", "program_id": 3,
+         "attendance": [{"date": day.replace(hour=17, minute=3), "status": "Present"},
+                        {"date": day.replace(hour=9, minute=2), "status": "Absent"}]},
+    ])
+
+    result = sessions_db.expected_vs_actual(day, day + timedelta(days=1), program_ids=[3])
+    by_student = {s["student_id"]: s for s in result["students"]}
+    assert {k: by_student["d"][k] for k in ("expected", "attended", "unrecorded")} == {
+        "expected": 2, "attended": 1, "unrecorded": 1}
+    assert {k: by_student["e"][k] for k in ("expected", "attended", "absent", "unrecorded")} == {
+        "expected": 2, "attended": 1, "absent": 1, "unrecorded": 0}
@@ -0,0 +1,82 @@
+# tests/test_shared_cache.py
+import pytest
+
+import shared_cache
+from shared_cache import MemoryBackend, DiskBackend, RedisBackend, cached, invalidate
+
+
+def _memory(tmp_path):
+    return MemoryBackend()
+
+
+def _disk(tmp_path):
+    return DiskBackend(str(tmp_path / "cache.sqlite3"))
+
+
+def _redis(tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisBackend(client=fakeredis.FakeRedis())
+
+
+@pytest.fixture(params=[_memory, _disk, _redis], ids=["memory", "disk", "redis"])
+def backend(request, tmp_path, monkeypatch):
+    backend = request.param(tmp_path)
+    monkeypatch.setattr(shared_cache, "get_cache_backend", lambda: backend)
+    return backend
+
+
+def test_incr_counts_from_one(backend):
+    assert backend.incr("counter") == 1
+    assert backend.incr("counter") == 2
+    assert int(backend.get("counter")) == 2
+
+
+def test_invalidate_then_hit(backend):
+    calls = []
+
+    @cached("ns")
+    def load(x):
+        calls.append(x)
+        return {"x": x}
+
+    assert load(1) == {"x": 1}
+    assert load(1) == {"x": 1}
+    assert calls == [1]
+
+    invalidate("ns")
+    assert load(1) == {"x": 1}
+    assert calls == [1, 1]
+    # Cached again under the new generation
+    assert load(1) == {"x": 1}
+    assert calls == [1, 1]
+
+
+def test_invalidate_leaves_other_namespaces(backend):
+    calls = []
+
+    @cached(lambda pid: ["roster", f"roster:{pid}"])
+    def roster(pid):
+        calls.append(pid)
+        return [pid]
+
+    roster(1), roster(2)
+    invalidate("roster:1")
+    roster(1), roster(2)
+    assert calls == [1, 2, 1]
+
+
+def test_disk_reads_counters_stored_as_text(tmp_path):
+    backend = _disk(tmp_path)
+    backend._conn.execute("INSERT INTO cache (key, value, expires_at) VALUES ('g', '3', NULL)")
+    assert backend.get("g") == b"3"
+    assert backend.incr("g") == 4
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
@@ -0,0 +1,103 @@
+# tests/test_students_db.py
+from datetime import datetime
+
+import pytest
+
+import students_db
+from students_db import (
+    bulk_apply_attendance_changes, upsert_attendance_subdoc, update_student_info, VersionConflict,
+    ATTENDANCE_VERSION,
+)
+
+MON = datetime(2025, 3, 3, 17)
+WED = datetime(2025, 3, 5, 17)
+FRI = datetime(2025, 3, 7, 17)
+
+ANA = students_db.generate_student_id("Ana", 1)
+BEN = students_db.generate_student_id("Ben", 1)
+
+
+@pytest.fixture
+def db(mongo_db, monkeypatch):
+    monkeypatch.setattr(students_db, "connect_to_db", lambda: mongo_db)
+    monkeypatch.setattr(students_db, "invalidate_roster", lambda *program_ids: None)
+    mongo_db["Student_Records"].insert_many([
+        {"student_id": ANA, "name": "Ana", "program_id": 1, "phone": "", "contact_email": "", "grade": "",
+         "school": "", "_v": 3, "missed_count": 1, "attendance": [
+             {"date": MON, "status": "Present", "comment": ""},
+             {"date": WED, "status": "Absent", "comment": "sick"},
+         ]},
+        {"student_id": BEN, "name": "Ben", "program_id": 1, "_v": 0, "missed_count": 0, "attendance": [
+            {"date": MON, "status": "Late", "comment": ""},
+        ]},
+    ])
+    return mongo_db
+
+
+def _loaded(student_id, date, status, comment="", **edit):
+    return {"student_id": student_id, "date": date, "status": status, "comment": comment, **edit}
+
+
+def _student(db, student_id):
+    return db["Student_Records"].find_one({"student_id": student_id})
+
+
+def test_clean_save(db):
+    result = bulk_apply_attendance_changes([
+        _loaded(ANA, MON, "Present", new_status="Absent", new_comment="no show"),
+        _loaded(ANA, WED, "Absent", "sick", new_date=FRI),
+        _loaded(BEN, MON, "Late", delete=True),
+    ])
+    assert result == {"applied": 3, "conflicts": []}
+
+    ana = _student(db, ANA)
+    assert [(e["date"], e["status"], e["comment"]) for e in ana["attendance"]] == [
+        (MON, "Absent", "no show"), (FRI, "Absent", "sick")]
+    assert ana["missed_count"] == 2
+    # Two attendance edits; the profile version is untouched
+    assert (ana["_v"], ana[ATTENDANCE_VERSION]) == (3, 2)
+    assert _student(db, BEN)["attendance"] == []
+
+
+def test_stale_save_is_returned_as_a_conflict(db):
+    # Someone else marked Ana's Monday Late after the grid loaded it
+    db["Student_Records"].update_one({"student_id": ANA, "attendance.date": MON},
+                                     {"$set": {"attendance.$.status": "Late"}})
+    stale = _loaded(ANA, MON, "Present", new_status="Absent")
+    assert bulk_apply_attendance_changes([stale]) == {"applied": 0, "conflicts": [stale]}
+
+    ana = _student(db, ANA)
+    assert ana["attendance"][0]["status"] == "Late"
+    assert ana["missed_count"] == 1
+    assert ATTENDANCE_VERSION not in ana
+
+
+def test_mixed_save_applies_the_rest(db):
+    # Ben's entry was deleted since the grid loaded
+    db["Student_Records"].update_one({"student_id": BEN}, {"$set": {"attendance": []}})
+    gone = _loaded(BEN, MON, "Late", new_comment="bus")
+    result = bulk_apply_attendance_changes([
+        _loaded(ANA, WED, "Absent", "sick", new_status="Excused"),
+        gone,
+        _loaded(ANA, MON, "Present", delete=True),
+    ])
+    assert result == {"applied": 2, "conflicts": [gone]}
+
+    ana = _student(db, ANA)
+    assert [(e["date"], e["status"]) for e in ana["attendance"]] == [(WED, "Excused")]
+    assert ana["missed_count"] == 0
+    assert _student(db, BEN)["attendance"] == []
+
+
+def test_profile_and_attendance_versions_are_separate(db):
+    # An attendance save doesn't make an open record-card copy stale...
+    assert bulk_apply_attendance_changes([_loaded(ANA, MON, "Present", new_status="Late")])["applied"] == 1
+    update_student_info(ANA, "Ana", "555", "", "", "", program_id=1, expected_version=3)
+    ana = _student(db, ANA)
+    assert (ana["phone"], ana["_v"]) == ("555", 4)
+
+    # ...and a profile save doesn't make an open attendance row stale
+    assert upsert_attendance_subdoc(ANA, WED, "Present", old_date=WED, expected_version=1)
+    with pytest.raises(VersionConflict) as err:
+        upsert_attendance_subdoc(ANA, WED, "Late", old_date=WED, expected_version=1)
+    assert err.value.current_version == 2
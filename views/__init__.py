@@ -0,0 +1,48 @@
+# views/__init__.py
+"""
+One module per page. Nothing here imports the pages themselves: a page module
+(and whatever heavy libraries it needs, e.g. plotly/pandas for reports) is only
+imported the first time that page is rendered, so a cold start pays just for
+the page being shown.
+"""
+import importlib
+
+# function name -> module (relative to this package) that defines it
+PAGE_MODULES = {
+    "page_dashboard": ".dashboard",
+    "page_my_settings": ".settings",
+    "page_instructor_change_password": ".settings",
+    "page_help": ".help",
+    "page_unified_login": ".login",
+    "page_manage_instructors": ".instructors",
+    "page_manage_students": ".students",
+    "handle_mark_attendance_today": ".students",
+    "handle_mark_attendance_past": ".students",
+    "page_take_attendance": ".attendance",
+    "page_review_attendance": ".review",
+    "show_attendance_logs": ".review",
+    "show_missed_counts": ".review",
+    "show_last_week_attendance": ".review",
+    "page_manage_schedules": ".schedules",
+    "count_documents_for_schedule": ".schedules",
+    "page_generate_reports": ".reports",
+    "highlight_high_absences": ".reports",
+}
+
+
+def load_page(name: str):
+    """Import the module that defines `name` (once) and return the function."""
+    module = importlib.import_module(PAGE_MODULES[name], __name__)
+    return getattr(module, name)
+
+
+def lazy_page(name: str):
+    """
+    Stand-in for a page function that defers importing its module until the
+    page is actually called.
+    """
+    def _render(*args, **kwargs):
+        return load_page(name)(*args, **kwargs)
+
+    _render.__name__ = name
+    return _render
@@ -0,0 +1,693 @@
+# views/attendance.py
+
+from datetime import datetime, time, date, timedelta
+
+import streamlit as st
+
+from instructors_db import list_programs
+from students_db import (
+    get_roster, record_student_attendance_in_array, get_attendance_subdocs_in_range,
+    upsert_attendance_subdoc
+)
+from analytics_db import mark_snapshot_stale
+from request_log_db import run_idempotent
+from alerts import process_absence_alerts
+from attendance_sessions_db import session_storage_enabled, record_session_attendance
+from views.common import paginate, form_token
+
+
+def page_take_attendance():
+    st.header("📋 Take Attendance")
+    
+    # Help expander
+    with st.expander("ℹ️ How to take attendance", expanded=False):
+        st.markdown("""
+        ### Taking Attendance:
+        - **Today's Attendance**: Record attendance for the current day
+        - **Past Session**: Record attendance for a previous date and time
+        - Select status (Present, Late, Absent, or Excused) for each student
+        - Add optional comments as needed
+        - Submit all attendance records at once with the button at the bottom
+        """)
+
+    # -----------------------------------------------------------------
+    # 1) Determine if user is admin or instructor; filter programs
+    # -----------------------------------------------------------------
+    is_admin = st.session_state.get("is_admin", False)
+    all_programs = list_programs()  # e.g. from instructors_db
+    prog_map = {p["program_id"]: p["program_name"] for p in all_programs}
+    
+    st.markdown("### 🔍 Select Program")
+
+    if is_admin:
+        # Admin can pick any program or "All"
+        program_choices = [(None, "All Programs")] + [(p["program_id"], p["program_name"]) for p in all_programs]
+        selected_prog_id = st.selectbox(
+            "Select Program:",
+            options=[pc[0] for pc in program_choices],
+            format_func=lambda pid: "All Programs" if pid is None else f"{prog_map[pid]} (ID: {pid})",
+            help="Choose which program's students to display",
+            key="take_attendance_program_selector"  # Add this unique key
+
+        )
+
+        if selected_prog_id is None:
+            # Admin sees all students
+            students = get_roster()
+            st.success(f"Showing all students from all programs")
+        else:
+            # Admin sees only students in the chosen program
+            students = get_roster(program_ids=[selected_prog_id])
+            program_name = prog_map.get(selected_prog_id, f"Program ID: {selected_prog_id}")
+            st.success(f"Showing students from: {program_name}")
+
+    else:
+        # Instructor sees only their assigned programs
+        permitted_ids = st.session_state.get("instructor_program_ids", [])
+        if not permitted_ids:
+            st.warning("⚠️ No assigned programs found. Contact an admin for access.")
+            return
+            
+        # Show a filter for instructors with multiple programs
+        if len(permitted_ids) > 1:
+            program_choices = [(None, "All My Programs")] + [
+                (pid, prog_map.get(pid, f"Program ID: {pid}")) for pid in permitted_ids
+            ]
+            
+            selected_prog_id = st.selectbox(
+                "Filter by Program:",
+                options=[pc[0] for pc in program_choices],
+                key="attendance_program_selector",  # Add a unique key here
+
+                format_func=lambda pid: "All My Programs" if pid is None else f"{prog_map.get(pid, f'Program ID: {pid}')}",
+                help="Select a specific program or view all your assigned programs"
+            )
+            
+            if selected_prog_id is None:
+                # Instructor sees all their permitted programs
+                students = get_roster(program_ids=permitted_ids)
+                program_names = [prog_map.get(pid, f"Program {pid}") for pid in permitted_ids]
+                st.success(f"Showing students from all your assigned programs: {', '.join(program_names)}")
+            else:
+                # Instructor sees only the selected program
+                students = get_roster(program_ids=[selected_prog_id])
+                program_name = prog_map.get(selected_prog_id, f"Program ID: {selected_prog_id}")
+                st.success(f"Showing students from: {program_name}")
+        else:
+            # Instructor has only one program
+            students = get_roster(program_ids=permitted_ids)
+            program_name = prog_map.get(permitted_ids[0], f"Program {permitted_ids[0]}")
+            st.success(f"Showing students from your assigned program: {program_name}")
+
+    if not students:
+        st.info("📌 No students found. (Check whether you have assigned programs or student data.)")
+        return
+        
+    st.write(f"Total students: {len(students)}")
+
+    entry_mode = st.radio(
+        "Entry mode:",
+        ["📊 Grid", "📝 Form"],
+        horizontal=True,
+        key="take_attendance_entry_mode",
+        help="Grid: edit the whole roster like a spreadsheet; only changed rows are saved. "
+             "Form: one row of buttons per student, shown a page at a time."
+    )
+    st.write("---")
+
+    if entry_mode == "📊 Grid":
+        _take_attendance_grid(students, prog_map)
+        return
+
+    # The form builds a radio and a text box per student, so only render a page of them
+    skip, limit = paginate(len(students), key="take_attendance")
+    students = students[skip:skip + limit]
+
+    # -----------------------------------------------------------------
+    # 2) Create Tabs: [ "Attendance (Today)" | "Record Past Session" ]
+    # -----------------------------------------------------------------
+    tab_labels = ["📅 Today's Attendance", "🗓️ Past Session"]
+    tabs = st.tabs(tab_labels)
+
+    # --------------- TAB 1: Attendance (Today) ---------------
+    with tabs[0]:
+        st.subheader("Today's Attendance")
+        st.write(f"**Date**: {datetime.now().strftime('%A, %B %d, %Y')}")
+        st.write(f"**Time**: {datetime.now().strftime('%I:%M %p')}")
+
+        # We'll use a color-coded or emoji-labeled radio for statuses
+        status_options_today = ["✅ Present", "🕑 Late", "🚫 Absent"]
+        status_map_today = {
+            "✅ Present": "Present",
+            "🕑 Late": "Late",
+            "🚫 Absent": "Absent"
+        }
+
+        # Quick selection tools
+        quick_select = st.radio(
+            "Quick Select:",
+            ["Set Individually", "Mark All Present", "Mark All Absent"],
+            horizontal=True,
+            help="Quickly set all students to the same status, or set individually"
+        )
+        
+        # Initialize session state for default selections
+        if "today_defaults" not in st.session_state:
+            st.session_state["today_defaults"] = {}
+            
+        # Apply quick selections
+        if quick_select == "Mark All Present":
+            for s in students:
+                st.session_state["today_defaults"][s["student_id"]] = "✅ Present"
+        elif quick_select == "Mark All Absent":
+            for s in students:
+                st.session_state["today_defaults"][s["student_id"]] = "🚫 Absent"
+
+        # Build a form to handle all students at once
+        with st.form("attendance_today_form"):
+            attendance_dict = {}
+            
+            # Group students by program for better organization
+            students_by_program = {}
+            for s in students:
+                pid = s.get("program_id", 0)
+                if pid not in students_by_program:
+                    students_by_program[pid] = []
+                students_by_program[pid].append(s)
+            
+            # For each program, show students in that program
+            for pid, program_students in students_by_program.items():
+                prog_name = prog_map.get(pid, f"Program ID={pid}")
+                st.markdown(f"### Program: {prog_name}")
+                
+                # Create a table-like layout with columns
+                cols = st.columns([3, 2, 3])
+                cols[0].markdown("**Student Name**")
+                cols[1].markdown("**Status**")
+                cols[2].markdown("**Comment**")
+                
+                for s in program_students:
+                    sid = s.get("student_id")
+                    name = s.get("name", "")
+                    
+                    # Get default from session state or use "Present"
+                    default_status = st.session_state["today_defaults"].get(sid, "✅ Present")
+                    default_index = status_options_today.index(default_status)
+                    
+                    cols = st.columns([3, 2, 3])
+                    
+                    # Column 1: Student name
+                    cols[0].write(f"**{name}**")
+                    
+                    # Column 2: Status selection
+                    chosen_emoji_label = cols[1].radio(
+                        "Status:",
+                        options=status_options_today,
+                        index=default_index,
+                        key=f"{sid}_radio_today",
+                        label_visibility="collapsed"
+                    )
+                    
+                    # Column 3: Comment field
+                    comment = cols[2].text_input(
+                        "Comment (Optional)", 
+                        key=f"{sid}_comment_today",
+                        label_visibility="collapsed",
+                        placeholder="Add comment..."
+                    )
+
+                    # Convert from emoji-labeled to DB status
+                    final_status = status_map_today[chosen_emoji_label]
+
+                    attendance_dict[sid] = {
+                        "name": name,
+                        "program_id": pid,
+                        "status": final_status,
+                        "comment": comment
+                    }
+                
+                # Add separator between programs
+                st.write("---")
+
+            col1, col2 = st.columns([4, 1])
+            with col2:
+                submitted_today = st.form_submit_button("📝 Submit Attendance")
+
+        # Same key for every rerun caused by this one submission
+        today_token = form_token("attendance_today_form", submitted_today, attendance_dict)
+
+        if submitted_today and session_storage_enabled():
+            _submit_session_attendance(today_token, attendance_dict, None, prog_map)
+            st.session_state["today_defaults"] = {}
+        elif submitted_today:
+            # Process each student's chosen status
+            success_count = 0
+            error_count = 0
+            
+            # Create progress bar
+            progress_text = st.empty()
+            progress_bar = st.progress(0)
+            total_students = len(attendance_dict)
+            
+            # Result containers
+            success_container = st.empty()
+            error_container = st.empty()
+            success_messages = []
+            error_messages = []
+            
+            absences = []
+            for i, (sid, data) in enumerate(attendance_dict.items()):
+                name = data["name"]
+                prog_id = data["program_id"]
+                status = data["status"]
+                comment = data["comment"]
+                
+                # Update progress
+                progress = int((i + 1) / total_students * 100)
+                progress_bar.progress(progress)
+                progress_text.text(f"Processing {i+1} of {total_students} students...")
+
+                try:
+                    result_msg = run_idempotent(
+                        f"{today_token}:{sid}",
+                        record_student_attendance_in_array, name, prog_id, status, comment,
+                        defer_alerts=True
+                    )
+                    success_count += 1
+                    if status == "Absent":
+                        absences.append((sid, None))
+                    status_emoji = "✅" if status == "Present" else "🕑" if status == "Late" else "🚫"
+                    success_messages.append(f"{status_emoji} {name} – Marked {status}")
+                except Exception as e:
+                    error_count += 1
+                    error_messages.append(f"Error for {name}: {e}")
+            
+            # One alert pass for the whole submission
+            if absences:
+                try:
+                    process_absence_alerts(absences)
+                except Exception as e:
+                    st.warning(f"⚠️ Attendance saved, but absence alerts could not be sent: {e}")
+
+            # Final progress update and summary
+            progress_bar.progress(100)
+            progress_text.text("Processing complete!")
+            
+            if success_count > 0:
+                success_container.success(f"✅ Recorded attendance for {success_count} students!")
+                
+                # Show success details in expander
+                with st.expander("View submission details", expanded=False):
+                    for msg in success_messages:
+                        st.write(msg)
+            
+            if error_count > 0:
+                error_container.error(f"❌ Failed to record attendance for {error_count} students.")
+                
+                # Show error details
+                with st.expander("View errors", expanded=True):
+                    for msg in error_messages:
+                        st.error(msg)
+            
+            # Clear defaults after submission
+            st.session_state["today_defaults"] = {}
+
+    # --------------- TAB 2: Record Past Session ---------------
+    with tabs[1]:
+        st.subheader("Record Past Session")
+        
+        # Help text
+        st.markdown("""
+        Use this form to record attendance for a previous session. First select the date and time,
+        then mark each student's status and any comments.
+        """)
+
+        # Let user pick date/time
+        col1, col2 = st.columns(2)
+        with col1:
+            session_date = st.date_input("Session Date", value=date.today())
+        with col2:
+            session_time = st.time_input("Session Start Time", value=time(9, 0))
+        chosen_datetime = datetime.combine(session_date, session_time)
+
+        st.write(f"**Selected Date/Time**: {session_date.strftime('%A, %B %d, %Y')} at {session_time.strftime('%I:%M %p')}")
+
+        # Past statuses can include "Excused" as well
+        status_options_past = ["✅ Present", "🕑 Late", "🚫 Absent", "🤝 Excused"]
+        status_map_past = {
+            "✅ Present": "Present",
+            "🕑 Late": "Late",
+            "🚫 Absent": "Absent",
+            "🤝 Excused": "Excused"
+        }
+
+        # Optional "Mark All..." tools
+        if "past_defaults" not in st.session_state:
+            st.session_state["past_defaults"] = {}
+
+        quick_past = st.radio(
+            "Quick Select:",
+            ["Set Individually", "Mark All Present", "Mark All Absent", "Mark All Excused"],
+            horizontal=True,
+            help="Quickly set all students to the same status, or set individually"
+        )
+        
+        # Apply quick selections
+        if quick_past == "Mark All Present":
+            for s in students:
+                st.session_state["past_defaults"][s["student_id"]] = "✅ Present"
+            st.success("All students marked Present - you can adjust individual statuses below")
+        elif quick_past == "Mark All Absent":
+            for s in students:
+                st.session_state["past_defaults"][s["student_id"]] = "🚫 Absent"
+            st.info("All students marked Absent - you can adjust individual statuses below")
+        elif quick_past == "Mark All Excused":
+            for s in students:
+                st.session_state["past_defaults"][s["student_id"]] = "🤝 Excused"
+            st.info("All students marked Excused - you can adjust individual statuses below")
+
+        # Build a form to finalize each student's status
+        with st.form("past_attendance_form_attendance"):
+            past_data = {}
+            
+            # Group students by program for better organization
+            students_by_program = {}
+            for s in students:
+                pid = s.get("program_id", 0)
+                if pid not in students_by_program:
+                    students_by_program[pid] = []
+                students_by_program[pid].append(s)
+            
+            # For each program, show students in that program
+            for pid, program_students in students_by_program.items():
+                prog_name = prog_map.get(pid, f"Program ID={pid}")
+                st.markdown(f"### Program: {prog_name}")
+                
+                # Create a table-like layout with columns
+                cols = st.columns([3, 2, 3])
+                cols[0].markdown("**Student Name**")
+                cols[1].markdown("**Status**")
+                cols[2].markdown("**Comment**")
+                
+                for s in program_students:
+                    sid = s.get("student_id")
+                    name = s.get("name", "")
+                    
+                    # Get default from session state or use "Absent"
+                    default_status = st.session_state["past_defaults"].get(sid, "🚫 Absent")
+                    default_index = status_options_past.index(default_status)
+                    
+                    cols = st.columns([3, 2, 3])
+                    
+                    # Column 1: Student name
+                    cols[0].write(f"**{name}**")
+                    
+                    # Column 2: Status selection
+                    chosen_emoji_label = cols[1].radio(
+                        "Status",
+                        options=status_options_past,
+                        index=default_index,
+                        key=f"past_{sid}_radio",
+                        label_visibility="collapsed"
+                    )
+                    
+                    # Column 3: Comment field
+                    comment_val = cols[2].text_input(
+                        "Comment (Optional)", 
+                        key=f"past_comment_{sid}",
+                        label_visibility="collapsed",
+                        placeholder="Add comment..."
+                    )
+
+                    final_status = status_map_past[chosen_emoji_label]
+                    past_data[sid] = {
+                        "name": name,
+                        "program_id": pid,
+                        "status": final_status,
+                        "comment": comment_val
+                    }
+                
+                # Add separator between programs
+                st.write("---")
+
+            col1, col2 = st.columns([4, 1])
+            with col2:
+                submitted_past = st.form_submit_button("📝 Submit Past Attendance")
+
+        past_token = form_token("past_attendance_form_attendance", submitted_past, [chosen_datetime, past_data])
+
+        if submitted_past and session_storage_enabled():
+            _submit_session_attendance(past_token, past_data, chosen_datetime, prog_map)
+            st.session_state["past_defaults"] = {}
+        elif submitted_past:
+            # Process each student's chosen status for the selected datetime
+            success_count = 0
+            error_count = 0
+            
+            # Create progress bar
+            progress_text = st.empty()
+            progress_bar = st.progress(0)
+            total_students = len(past_data)
+            
+            # Result containers
+            success_container = st.empty()
+            error_container = st.empty()
+            success_messages = []
+            error_messages = []
+            
+            absences = []
+            for i, (sid, data) in enumerate(past_data.items()):
+                # Update progress
+                progress = int((i + 1) / total_students * 100)
+                progress_bar.progress(progress)
+                progress_text.text(f"Processing {i+1} of {total_students} students...")
+                
+                try:
+                    result_msg = run_idempotent(
+                        f"{past_token}:{sid}",
+                        record_student_attendance_in_array,
+                        name=data["name"],
+                        program_id=data["program_id"],
+                        status=data["status"],
+                        comment=data["comment"],
+                        attendance_date=chosen_datetime,
+                        defer_alerts=True
+                    )
+                    success_count += 1
+                    if data["status"] == "Absent":
+                        absences.append((sid, chosen_datetime))
+                    status_emoji = "✅" if data["status"] == "Present" else "🕑" if data["status"] == "Late" else "🚫" if data["status"] == "Absent" else "🤝"
+                    success_messages.append(f"{status_emoji} {data['name']} – Marked {data['status']}")
+                except Exception as e:
+                    error_count += 1
+                    error_messages.append(f"Error for {data['name']}: {e}")
+            
+            # One alert pass for the whole submission
+            if absences:
+                try:
+                    process_absence_alerts(absences)
+                except Exception as e:
+                    st.warning(f"⚠️ Attendance saved, but absence alerts could not be sent: {e}")
+
+            # Final progress update and summary
+            progress_bar.progress(100)
+            progress_text.text("Processing complete!")
+            
+            if success_count > 0:
+                success_container.success(f"✅ Recorded past attendance for {success_count} students on {chosen_datetime.strftime('%Y-%m-%d %H:%M')}!")
+                
+                # Show success details in expander
+                with st.expander("View submission details", expanded=False):
+                    for msg in success_messages:
+                        st.write(msg)
+            
+            if error_count > 0:
+                error_container.error(f"❌ Failed to record attendance for {error_count} students.")
+                
+                # Show error details
+                with st.expander("View errors", expanded=True):
+                    for msg in error_messages:
+                        st.error(msg)
+            
+            # Clear defaults after submission
+            st.session_state["past_defaults"] = {}
+
+
+def _submit_session_attendance(token, entries_by_student, session_dt, prog_map):
+    """
+    Session storage mode (attendance_sessions_db): the whole submit is one
+    write per program instead of one per student.
+    """
+    by_program = {}
+    for sid, data in entries_by_student.items():
+        by_program.setdefault(data["program_id"], []).append({"student_id": sid, **data})
+
+    recorded = 0
+    absences = []
+    errors = []
+    with st.spinner(f"Saving attendance for {len(entries_by_student)} students..."):
+        for pid, entries in by_program.items():
+            try:
+                result = run_idempotent(f"{token}:program:{pid}", record_session_attendance, pid, session_dt, entries)
+                recorded += result["recorded"]
+                absences += [(sid, session_dt) for sid in result["new_absences"]]
+            except Exception as e:
+                errors.append(f"Error for {prog_map.get(pid, f'Program ID={pid}')}: {e}")
+        if absences:
+            try:
+                process_absence_alerts(absences)
+            except Exception as e:
+                st.warning(f"⚠️ Attendance saved, but absence alerts could not be sent: {e}")
+
+    if recorded:
+        st.success(f"✅ Recorded attendance for {recorded} students!")
+    for msg in errors:
+        st.error(msg)
+
+
+def _take_attendance_grid(students, prog_map):
+    """Today / Past Session tabs backed by a single st.data_editor each."""
+    tabs = st.tabs(["📅 Today's Attendance", "🗓️ Past Session"])
+
+    with tabs[0]:
+        st.subheader("Today's Attendance")
+        st.write(f"**Date**: {datetime.now().strftime('%A, %B %d, %Y')}")
+        _attendance_grid(students, prog_map, None, ["Present", "Late", "Absent"], "grid_today")
+
+    with tabs[1]:
+        st.subheader("Record Past Session")
+        col1, col2 = st.columns(2)
+        with col1:
+            session_date = st.date_input("Session Date", value=date.today(), key="grid_past_date")
+        with col2:
+            session_time = st.time_input("Session Start Time", value=time(9, 0), key="grid_past_time")
+        chosen_datetime = datetime.combine(session_date, session_time)
+        _attendance_grid(students, prog_map, chosen_datetime,
+                         ["Present", "Late", "Absent", "Excused"], "grid_past")
+
+
+def _attendance_grid(students, prog_map, session_dt, statuses, key):
+    """
+    Spreadsheet-style attendance entry for a whole roster.
+
+    Rows already recorded for the session day are pre-filled from the DB and
+    that loaded state is what we diff against on save: new statuses are
+    recorded, edited ones updated, and untouched rows cost no writes at all.
+    session_dt=None means "now" (today's attendance).
+    """
+    import pandas as pd
+
+    day = (session_dt or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    existing = {}
+    # Rows stored in a class-session document: student_id -> its session's _id
+    session_rows = {}
+    for d in get_attendance_subdocs_in_range(day, day + timedelta(days=1) - timedelta(microseconds=1)):
+        existing[d["student_id"]] = d["attendance"]
+        if d.get("attendance_session_id"):
+            session_rows[d["student_id"]] = d["attendance_session_id"]
+
+    loaded = pd.DataFrame([{
+        "student_id": s.get("student_id"),
+        "Name": s.get("name", ""),
+        "Program": prog_map.get(s.get("program_id"), f"Program ID={s.get('program_id')}"),
+        "Status": existing.get(s.get("student_id"), {}).get("status"),
+        "Comment": existing.get(s.get("student_id"), {}).get("comment") or "",
+    } for s in students]).set_index("student_id")
+
+    quick = st.radio(
+        "Fill blank statuses with:",
+        ["Leave blank"] + statuses,
+        horizontal=True,
+        key=f"{key}_fill",
+        help="Only students without a status for this day are filled in; recorded rows are left alone"
+    )
+    shown = loaded.copy()
+    if quick != "Leave blank":
+        shown["Status"] = shown["Status"].fillna(quick)
+
+    recorded = int(loaded["Status"].notna().sum())
+    st.caption(f"{recorded} of {len(loaded)} students already have a record for {day.strftime('%Y-%m-%d')}.")
+
+    with st.form(f"{key}_form"):
+        edited = st.data_editor(
+            shown,
+            key=f"{key}_editor",
+            use_container_width=True,
+            hide_index=True,
+            disabled=["Name", "Program"],
+            column_config={
+                "Status": st.column_config.SelectboxColumn("Status", options=statuses),
+                "Comment": st.column_config.TextColumn("Comment"),
+            },
+        )
+        submitted = st.form_submit_button("📝 Save Changes")
+
+    token = form_token(f"{key}_form", submitted, edited.to_dict() if submitted else None)
+    if not submitted:
+        return
+
+    students_by_id = {s.get("student_id"): s for s in students}
+    changed = edited[
+        edited["Status"].notna()
+        & ((edited["Status"] != loaded["Status"]) | (edited["Comment"].fillna("") != loaded["Comment"]))
+    ]
+    if changed.empty:
+        st.info("No changes to save.")
+        return
+
+    errors = []
+    absences = []
+    # Session-stored rows (and, in session mode, new rows) are grouped into
+    # one write per (program, session time)
+    session_writes = {}
+    use_sessions = session_storage_enabled()
+    with st.spinner(f"Saving {len(changed)} changed row(s)..."):
+        for sid, row in changed.iterrows():
+            stud = students_by_id[sid]
+            if sid in session_rows or (use_sessions and sid not in existing):
+                when = existing[sid]["date"] if sid in existing else session_dt
+                session_writes.setdefault((stud.get("program_id"), when), []).append({
+                    "student_id": sid,
+                    "name": stud.get("name", ""),
+                    "status": row["Status"],
+                    "comment": row["Comment"] or "",
+                })
+                continue
+            try:
+                if sid in existing:
+                    run_idempotent(
+                        f"{token}:{sid}", upsert_attendance_subdoc,
+                        sid, existing[sid]["date"], row["Status"], row["Comment"] or ""
+                    )
+                else:
+                    run_idempotent(
+                        f"{token}:{sid}", record_student_attendance_in_array,
+                        stud.get("name", ""), stud.get("program_id"), row["Status"],
+                        row["Comment"] or "", attendance_date=session_dt, student_id=sid,
+                        defer_alerts=True
+                    )
+                    if row["Status"] == "Absent":
+                        absences.append((sid, session_dt))
+            except Exception as e:
+                errors.append(f"Error for {stud.get('name', sid)}: {e}")
+        for (pid, when), entries in session_writes.items():
+            try:
+                result = run_idempotent(
+                    f"{token}:program:{pid}:{when}", record_session_attendance, pid, when, entries
+                )
+                absences += [(sid, when) for sid in result["new_absences"]]
+            except Exception as e:
+                errors += [f"Error for {entry['name'] or entry['student_id']}: {e}" for entry in entries]
+        if absences:
+            try:
+                process_absence_alerts(absences)
+            except Exception as e:
+                errors.append(f"Error sending absence alerts: {e}")
+
+    if any(sid in existing for sid in changed.index):
+        mark_snapshot_stale()
+    saved = len(changed) - len(errors)
+    if saved:
+        st.success(f"✅ Saved {saved} changed row(s).")
+    for msg in errors:
+        st.error(msg)
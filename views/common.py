@@ -0,0 +1,60 @@
+# views/common.py
+
+import json
+import math
+import uuid
+import hashlib
+
+import streamlit as st
+
+
+def paginate(total: int, key: str, page_sizes=(25, 50, 100)):
+    """
+    Rows-per-page picker and page number for a long list.
+    Returns (skip, limit) for the page the user is on; callers should fetch
+    and render only that slice.
+    """
+    if total <= page_sizes[0]:
+        return 0, page_sizes[0]
+
+    col_size, col_page, col_info = st.columns([1, 1, 2])
+    page_size = col_size.selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+    pages = max(1, math.ceil(total / page_size))
+
+    # A narrower search (or bigger pages) can leave us past the last page
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = col_page.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    skip = (int(page) - 1) * page_size
+    col_info.caption(f"Showing {skip + 1}–{min(skip + page_size, total)} of {total} (page {page} of {pages})")
+    return skip, page_size
+
+
+def form_token(form_key: str, submitted: bool, payload=None) -> str:
+    """
+    Idempotency key for one filled-in instance of a form; call it after the
+    submit button with what is being submitted. Every rerun triggered by the
+    same submission (a double click, a browser retry) sees the same key.
+    A fresh key is issued once the form is shown again without being
+    submitted, and as soon as a submit carries a different payload: editing a
+    form doesn't rerun the script, so a second save can arrive without an
+    unsubmitted rerun in between.
+    """
+    state_key = f"_form_token_{form_key}"
+    token = st.session_state.get(state_key)
+    digest = _payload_digest(payload) if submitted else None
+    if token is None or (token["used"] and (not submitted or digest != token["digest"])):
+        token = {"key": uuid.uuid4().hex, "used": False, "digest": None}
+        st.session_state[state_key] = token
+    if submitted:
+        token["used"] = True
+        token["digest"] = digest
+    return token["key"]
+
+
+def _payload_digest(payload) -> str:
+    """Stable hash of a submitted payload (dicts, lists, dates, DataFrame records)."""
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
@@ -0,0 +1,203 @@
+# views/dashboard.py
+
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from students_db import get_roster
+from sessions_db import expected_vs_actual
+from attendance_cache import attendance_cache
+
+# How often the dashboard redraws in live mode
+LIVE_REFRESH_SECONDS = 5
+
+
+def page_dashboard():
+    st.header("Program Dashboard")
+
+    # --------------------------------------------------------
+    # 1) Ensure user is logged in (admin or instructor)
+    # --------------------------------------------------------
+    is_admin = st.session_state.get("is_admin", False)
+    instructor_logged_in = st.session_state.get("instructor_logged_in", False)
+    if not (is_admin or instructor_logged_in):
+        st.error("You must be logged in to view the Dashboard.")
+        return
+
+    # --------------------------------------------------------
+    # 2) Determine permitted program IDs if instructor
+    # --------------------------------------------------------
+    if is_admin:
+        permitted_ids = None  # Admin sees all
+    else:
+        permitted_ids = st.session_state.get("instructor_program_ids", [])
+        if not permitted_ids:
+            st.warning("No assigned programs found. Please contact an admin.")
+            return
+
+    # --------------------------------------------------------
+    # 3) Load students (admin = all, instructor = assigned)
+    # --------------------------------------------------------
+    students = get_roster(program_ids=permitted_ids)
+    total_students = len(students)
+
+    # --------------------------------------------------------
+    # 4) Attendance sections, from the shared attendance cache. In live mode
+    # (change streams running) they redraw on a timer from memory.
+    # --------------------------------------------------------
+    cache = attendance_cache()
+    live = cache.live and st.toggle(
+        "Live updates", key="dashboard_live",
+        help=f"Refresh these figures every {LIVE_REFRESH_SECONDS} seconds as attendance is recorded."
+    )
+    if live:
+        st.fragment(run_every=LIVE_REFRESH_SECONDS)(_render_attendance_sections)(
+            cache, permitted_ids, total_students
+        )
+    else:
+        _render_attendance_sections(cache, permitted_ids, total_students)
+
+    # --------------------------------------------------------
+    # 5) Expected vs. Actual, from the class schedules
+    # --------------------------------------------------------
+    now = datetime.utcnow()
+    expected = expected_vs_actual(now - timedelta(days=7), now, program_ids=permitted_ids)
+    programs_expected = [p for p in expected["programs"] if p["expected"]]
+    if programs_expected:
+        st.write("### Scheduled Sessions (Last 7 Days)")
+        total_expected = sum(p["expected"] for p in programs_expected)
+        total_attended = sum(p["attended"] for p in programs_expected)
+        total_unrecorded = sum(p["unrecorded"] for p in programs_expected)
+        colE, colF, colG = st.columns(3)
+        colE.metric("Expected Attendances", total_expected)
+        colF.metric("Scheduled Attendance Rate", f"{total_attended / total_expected * 100:.1f}%")
+        colG.metric("Not Recorded", total_unrecorded)
+        if total_unrecorded:
+            st.caption("“Not Recorded” counts scheduled sessions with no attendance entry for a student on that day.")
+
+    
+    st.write("---")
+    st.info("Use the sidebar for additional navigation and tools.")
+
+
+def _render_attendance_sections(cache, permitted_ids, total_students):
+    """This week vs. last week: metrics, at-risk students, top absences and the status chart."""
+    # --------------------------------------------------------
+    # 1) Compute "This Week" vs. "Last Week" attendance
+    #    (the last 7 calendar days, including today, vs. the 7 before)
+    # --------------------------------------------------------
+    tomorrow = datetime.utcnow().date() + timedelta(days=1)
+    week_start = tomorrow - timedelta(days=7)
+    prev_week_start = week_start - timedelta(days=7)
+
+    this_week = cache.status_counts(start=week_start, end=tomorrow, program_ids=permitted_ids)
+    last_week = cache.status_counts(start=prev_week_start, end=week_start, program_ids=permitted_ids)
+    students_this_week = cache.student_status_counts(start=week_start, end=tomorrow, program_ids=permitted_ids)
+
+    # Total attendance records each week
+    total_this_week = sum(this_week.values())
+    total_last_week = sum(last_week.values())
+    attendance_delta = total_this_week - total_last_week
+
+    # --------------------------------------------------------
+    # 2) Absences This Week & Attendance Rate
+    # --------------------------------------------------------
+    absences_this_week = this_week["Absent"]
+
+    # This week’s possible vs. attended
+    possible_this_week = total_this_week
+    attended_this_week = this_week["Present"] + this_week["Late"]
+    rate_this_week = (attended_this_week / possible_this_week * 100) if possible_this_week else 0
+
+    # Last week’s possible vs. attended
+    possible_last_week = total_last_week
+    attended_last_week = last_week["Present"] + last_week["Late"]
+    rate_last_week = (attended_last_week / possible_last_week * 100) if possible_last_week else 0
+
+    # Compare rates
+    rate_delta = rate_this_week - rate_last_week
+
+    # --------------------------------------------------------
+    # 3) Display Attendance Rate metric
+    # --------------------------------------------------------
+
+    # --------------------------------------------------------
+    # 4) Mark At-Risk Students (≥ 2 absences this week)
+    # --------------------------------------------------------
+    st.subheader("Absences & At-Risk Alerts")
+    at_risk_threshold = 2
+    at_risk_students = [s for s in students_this_week if s["Absent"] >= at_risk_threshold]
+
+    if at_risk_students:
+        st.warning(f"{len(at_risk_students)} student(s) have ≥ {at_risk_threshold} absences this week!")
+        st.write("**At-Risk Student IDs**:")
+        for s in at_risk_students:
+            st.write(f"- ID: {s['student_id']} (Absences = {s['Absent']})")
+    else:
+        st.success("No students reached the at-risk absence threshold this week.")
+
+    # --------------------------------------------------------
+    # 5) Display Key Metrics Row
+    # --------------------------------------------------------
+    st.write("### Key Metrics")
+    colA, colB, colC, colD = st.columns(4)
+    with colA:
+        st.metric(
+            label="Attendance This Week",
+            value=total_this_week,
+            delta=f"{attendance_delta} vs. last week"
+        )
+    with colD:
+        st.metric("Total Students", total_students)
+    with colC:
+        st.metric("Absences This Week", absences_this_week)
+    with colB:
+            # st.subheader("Attendance Rate & Comparison")
+        st.metric(
+            label="Attendance Rate (This Week)",
+            value=f"{rate_this_week:.1f}%",
+            delta=f"{rate_delta:+.1f}% vs. last week"
+        )
+
+
+    # --------------------------------------------------------
+    # 6) Top Absent Students (This Week)
+    # --------------------------------------------------------
+    absent_students = sorted(
+        (s for s in students_this_week if s["Absent"]), key=lambda s: s["Absent"], reverse=True
+    )
+
+    if absent_students:
+        st.write("### Top Absent Students (This Week)")
+        for s in absent_students[:5]:
+            st.write(f"- **{s['name']}**: {s['Absent']} absence(s)")
+    else:
+        st.info("No absences so far this week.")
+
+    # --------------------------------------------------------
+    # 7) Quick Chart of Status Distribution (Last 7 Days)
+    # --------------------------------------------------------
+    if total_this_week:
+        import plotly.express as px
+
+        group_data = (
+            cache.pivot(index="student", columns="status", start=week_start, end=tomorrow,
+                        program_ids=permitted_ids)
+            .rename_axis(index="name", columns="status")
+            .stack().reset_index(name="count")
+        )
+        group_data = group_data[group_data["count"] > 0]
+
+            # 2) Plot a grouped bar chart
+        fig_bar = px.bar(
+                group_data,
+                x="name",
+                y="count",
+                color="status",
+                barmode="group",  # or "stack" if you prefer a stacked bar
+                title="Attendance Distribution by Student (Last 7 Days)"
+            )
+
+        st.plotly_chart(fig_bar, use_container_width=True)
+    else:
+        st.info("No attendance records found for this week.")
@@ -0,0 +1,555 @@
+# views/help.py
+
+import streamlit as st
+
+
+def page_help():
+    """
+    A comprehensive "Help / User Guide" page that explains how to use the 
+    Club Stride Attendance System. It references major workflows found 
+    elsewhere in the code: logging in, managing students, taking attendance, 
+    schedules, instructors, reports, etc.
+    """
+    st.header("📚 Help & User Guide")
+    
+    # Update the welcome banner with better contrast
+    st.markdown("""
+    <div style="padding: 15px; border-radius: 5px; border-left: 5px solid #4682B4; 
+         background-color: #e6f3ff; margin-bottom: 20px; border: 1px solid #c0d8f0;">
+    <h3 style="color: #2c5282; margin-top: 0;">Welcome to the Club Stride Attendance System</h3>
+    <p style="color: #2d3748;">This guide will help you navigate and use all features of the system effectively. 
+    Select any topic below to learn more about that feature.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### 📋 Guide Contents")
+    
+    # Create a table of contents with icons - add background for better visibility
+    st.markdown("""
+    <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+    <table style="width: 100%; color: #2d3748;">
+    <thead>
+    <tr>
+        <th>Section</th>
+        <th>Description</th>
+    </tr>
+    </thead>
+    <tbody>
+    <tr>
+        <td>🔑 <a href="#login" style="color: #3182ce;">Login</a></td>
+        <td>How to access the system as an Admin or Instructor</td>
+    </tr>
+    <tr>
+        <td>📊 <a href="#dashboard" style="color: #3182ce;">Dashboard</a></td>
+        <td>Navigating the main dashboard and viewing metrics</td>
+    </tr>
+    <tr>
+        <td>👨‍🎓 <a href="#students" style="color: #3182ce;">Students</a></td>
+        <td>Adding, editing, and managing student records</td>
+    </tr>
+    <tr>
+        <td>📝 <a href="#attendance" style="color: #3182ce;">Attendance</a></td>
+        <td>Recording daily attendance and past sessions</td>
+    </tr>
+    <tr>
+        <td>📋 <a href="#review" style="color: #3182ce;">Review</a></td>
+        <td>Reviewing past attendance and identifying missed sessions</td>
+    </tr>
+    <tr>
+        <td>📅 <a href="#schedules" style="color: #3182ce;">Schedules</a></td>
+        <td>Creating and managing class schedules</td>
+    </tr>
+    <tr>
+        <td>📈 <a href="#reports" style="color: #3182ce;">Reports</a></td>
+        <td>Generating attendance reports and analysis</td>
+    </tr>
+    <tr>
+        <td>🔒 <a href="#password" style="color: #3182ce;">Password</a></td>
+        <td>Changing your login credentials</td>
+    </tr>
+    <tr>
+        <td>👨‍🏫 <a href="#instructors" style="color: #3182ce;">Instructors</a></td>
+        <td>Managing instructor accounts (Admin only)</td>
+    </tr>
+    <tr>
+        <td>🚪 <a href="#logout" style="color: #3182ce;">Logout</a></td>
+        <td>Securely exiting the system</td>
+    </tr>
+    </tbody>
+    </table>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.write("---")
+
+    # Update all expanders with better contrast
+    # 1) Logging In
+    st.markdown('<a name="login"></a>', unsafe_allow_html=True)
+    with st.expander("🔑 Logging In (Admin or Instructor)"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">🔐</h1>
+                <p style="color: #2d3748;"><strong>System Access</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Admin Login</h3>
+            <ol style="color: #2d3748;">
+                <li>From the sidebar, select <strong>Login</strong></li>
+                <li>Choose the radio option <strong>Admin</strong></li>
+                <li>Enter your MongoDB connection string</li>
+                <li>If valid, you'll see "Admin access granted"</li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Instructor Login</h3>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>From the sidebar, select <strong>Login</strong></li>
+                <li>Choose the radio option <strong>Instructor</strong></li>
+                <li>Enter your <strong>Username</strong> and <strong>Password</strong></li>
+                <li>If correct, you'll see "Welcome, [username]!" and be redirected to the Dashboard</li>
+            </ol>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.info("💡 **Tip**: Only Administrators can create instructor accounts or assign programs.")
+
+    # 2) Navigating the Dashboard
+    st.markdown('<a name="dashboard"></a>', unsafe_allow_html=True)
+    with st.expander("📊 Navigating the Dashboard"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">📈</h1>
+                <p style="color: #2d3748;"><strong>Key Metrics</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Dashboard Overview</h3>
+            <p style="color: #2d3748;">After logging in, click on <strong>Dashboard</strong> in the sidebar menu to see:</p>
+            
+            <ul style="color: #2d3748; margin-bottom: 0;">
+                <li><strong>This Week's Attendance</strong> - Total attendance records for the current week</li>
+                <li><strong>Absences</strong> - Number of absence records in the current week</li>
+                <li><strong>At-Risk Students</strong> - Students with excessive absences (≥ 2 absences)</li>
+                <li><strong>Attendance Distribution</strong> - Chart showing attendance patterns in the last 7 days</li>
+            </ul>
+            
+            <p style="color: #2d3748; margin-top: 10px; margin-bottom: 0;">The Dashboard provides a quick overview of critical attendance statistics without replacing the detailed reporting features.</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # 3) Managing Students
+    st.markdown('<a name="students"></a>', unsafe_allow_html=True)
+    with st.expander("👨‍🎓 Managing Students"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">👩‍🎓</h1>
+                <p style="color: #2d3748;"><strong>Student Records</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Viewing & Managing Students</h3>
+            <ol style="color: #2d3748;">
+                <li>Go to <strong>Student Management Suite</strong> → <strong>Manage Students</strong></li>
+                <li>You'll see a list of current students with these actions:
+                   <ul>
+                       <li><strong>Edit</strong> ✏️ - Update student information</li>
+                       <li><strong>Delete</strong> 🗑️ - Remove the student from the database</li>
+                       <li><strong>Mark Attendance</strong> ✅ - Record today's attendance</li>
+                       <li><strong>Mark Past</strong> 📆 - Record attendance for a previous date</li>
+                   </ul>
+                </li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Adding New Students</h3>
+            <p style="color: #2d3748;">Click the <strong>Add or Update Students</strong> tab to create new records:</p>
+            
+            <h4 style="color: #2c5282; margin-top: 10px;">Single Student Entry</h4>
+            <p style="color: #2d3748;">Fill out the form with name, contact info, program, etc.</p>
+            
+            <h4 style="color: #2c5282; margin-top: 10px;">Bulk CSV Upload</h4>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>Prepare a CSV with these columns:
+                   <ul>
+                       <li>First Name, Last Name, Number, Email, Grade, School</li>
+                   </ul>
+                </li>
+                <li>Select the Program for these students</li>
+                <li>Upload your CSV file</li>
+                <li>Review and process the data</li>
+            </ol>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.warning("⚠️ **Note**: Instructors will only see students from programs assigned to them.")
+
+    # 4) Taking Attendance
+    st.markdown('<a name="attendance"></a>', unsafe_allow_html=True)
+    with st.expander("📝 Taking Attendance"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">📋</h1>
+                <p style="color: #2d3748;"><strong>Daily Records</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Recording Today's Attendance</h3>
+            <ol style="color: #2d3748;">
+                <li>Go to <strong>Student Management Suite</strong> → <strong>Attendance & Scheduling</strong> → <strong>Take Attendance</strong></li>
+                <li>Select the program (Admin) or view your assigned programs (Instructor)</li>
+                <li>For each student, select their status:
+                   <ul>
+                       <li>✅ <strong>Present</strong> - Student attended class</li>
+                       <li>🕒 <strong>Late</strong> - Student arrived late</li>
+                       <li>❌ <strong>Absent</strong> - Student did not attend</li>
+                       <li>🤝 <strong>Excused</strong> (if available) - Absence with valid reason</li>
+                   </ul>
+                </li>
+                <li>Add any comments as needed</li>
+                <li>Click <strong>Submit Attendance</strong></li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Recording Past Attendance</h3>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>Select the <strong>Past Session</strong> tab</li>
+                <li>Choose the date and time of the session</li>
+                <li>Mark each student's status and add comments</li>
+                <li>Click <strong>Submit Past Attendance</strong></li>
+            </ol>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.info("💡 **Tip**: You can use the Quick Select options to mark all students as Present or Absent at once.")
+        st.warning("⚠️ **Duplicate Check**: If you've already recorded attendance for the same day, the system will show a warning.")
+
+    # 5) Reviewing Attendance & Missed Counts
+    st.markdown('<a name="review"></a>', unsafe_allow_html=True)
+    with st.expander("📋 Reviewing Attendance & Missed Counts"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">🔍</h1>
+                <p style="color: #2d3748;"><strong>Review Records</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Attendance Records</h3>
+            <ol style="color: #2d3748;">
+                <li>Go to <strong>Student Management Suite</strong> → <strong>Attendance & Scheduling</strong> → <strong>Review Attendance</strong></li>
+                <li>View summary metrics:
+                   <ul>
+                       <li>Attendance This Week</li>
+                       <li>Absences This Week</li>
+                       <li>Active Students</li>
+                   </ul>
+                </li>
+                <li>The <strong>All Attendance Records</strong> tab shows a complete attendance history
+                   <ul>
+                       <li>Filter by Program or Student Name</li>
+                       <li>Sort records by date, student, or status</li>
+                       <li>Edit or delete individual records</li>
+                   </ul>
+                </li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Missed Sessions</h3>
+            <p style="color: #2d3748;">The <strong>Missed Sessions</strong> tab shows absence patterns:</p>
+            <ul style="color: #2d3748; margin-bottom: 0;">
+                <li>See which students have the most absences</li>
+                <li>Identify attendance trends</li>
+                <li>Highlight students who may need intervention</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.success("✅ **Pro Tip**: Use filters to focus on specific programs or students when reviewing records.")
+
+    # 6) Managing Schedules
+    st.markdown('<a name="schedules"></a>', unsafe_allow_html=True)
+    with st.expander("📅 Managing Schedules"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">🗓️</h1>
+                <p style="color: #2d3748;"><strong>Class Schedules</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Creating New Schedules</h3>
+            <ol style="color: #2d3748;">
+                <li>Navigate to <strong>Student Management Suite</strong> → <strong>Attendance & Scheduling</strong> → <strong>Manage Schedules</strong></li>
+                <li>Click <strong>Create a New Schedule</strong></li>
+                <li>Enter the Title and select a Program</li>
+                <li>Choose a Recurrence Pattern:
+                   <ul>
+                       <li><strong>One-Time</strong> - Single class session on a specific date</li>
+                       <li><strong>Weekly</strong> - Regular sessions on certain days each week</li>
+                   </ul>
+                </li>
+                <li>For One-Time sessions:
+                   <ul>
+                       <li>Select the date, start time, end time, and location</li>
+                   </ul>
+                </li>
+                <li>For Weekly sessions:
+                   <ul>
+                       <li>Select which days of the week (Mon, Tue, Wed, etc.)</li>
+                       <li>Set start time, end time, and location for each day</li>
+                   </ul>
+                </li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Managing Existing Schedules</h3>
+            <ul style="color: #2d3748; margin-bottom: 0;">
+                <li>View all schedules for your assigned programs</li>
+                <li>Edit any schedule you created (or any schedule if you're an Admin)</li>
+                <li>Delete schedules that are no longer needed</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.info("💡 **Notification**: The system can email students in the associated program about new or changed schedules.")
+
+    # 7) Generating Reports
+    st.markdown('<a name="reports"></a>', unsafe_allow_html=True)
+    with st.expander("📈 Generating Reports"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">📊</h1>
+                <p style="color: #2d3748;"><strong>Data Analysis</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Visualizations</h3>
+            <ol style="color: #2d3748;">
+                <li>Go to <strong>Student Management Suite</strong> → <strong>Generate Reports</strong></li>
+                <li>The <strong>Visualizations</strong> tab shows:
+                   <ul>
+                       <li>Overall attendance rates</li>
+                       <li>Present/absent percentages</li>
+                       <li>Program rankings</li>
+                       <li>Attendance trends over time</li>
+                   </ul>
+                </li>
+            </ol>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Data Explorer</h3>
+            <p style="color: #2d3748;">The <strong>Data Explorer</strong> tab lets you:</p>
+            <ul style="color: #2d3748;">
+                <li>Filter data by various criteria</li>
+                <li>Create custom visualizations</li>
+                <li>Export filtered data as CSV</li>
+            </ul>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Report Generator</h3>
+            <p style="color: #2d3748;">The <strong>Generate Reports</strong> tab allows you to:</p>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>Select a specific program</li>
+                <li>Generate a pivot table showing attendance by student and date</li>
+                <li>Identify students with excessive absences</li>
+                <li>Download a complete Excel report with summary statistics</li>
+            </ol>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.success("✅ **Pro Tip**: Regular reporting helps identify attendance patterns early and enables timely interventions for at-risk students.")
+
+    # 8) Changing Your Password
+    st.markdown('<a name="password"></a>', unsafe_allow_html=True)
+    with st.expander("🔒 Changing Your Password (Instructors)"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">🔑</h1>
+                <p style="color: #2d3748;"><strong>Account Security</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Password Management</h3>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>If you're logged in as an Instructor, click <strong>Change My Password</strong> in the sidebar</li>
+                <li>Enter your current password</li>
+                <li>Enter your new password twice (for confirmation)</li>
+                <li>Click <strong>Update Password</strong></li>
+            </ol>
+            
+            <p style="color: #2d3748; margin-top: 10px; margin-bottom: 0;">The system will verify your current password and then securely update your credentials.</p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.warning("⚠️ **Security Tip**: Choose a strong password with at least 8 characters, including numbers, letters, and special characters.")
+
+    # 9) Managing Instructors (Admin Only)
+    st.markdown('<a name="instructors"></a>', unsafe_allow_html=True)
+    with st.expander("👨‍🏫 Managing Instructors (Admin Only)"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">👩‍🏫</h1>
+                <p style="color: #2d3748;"><strong>Staff Management</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Instructor Management (Admins Only)</h3>
+            <ol style="color: #2d3748;">
+                <li>Log in as an Admin</li>
+                <li>Click <strong>Manage Instructors</strong> in the sidebar</li>
+                <li>From this page, you can:</li>
+            </ol>
+            
+            <h4 style="color: #2c5282; margin-top: 10px;">Create New Instructors</h4>
+            <ul style="color: #2d3748;">
+                <li>Set username, password, and role (Instructor, Manager, or Admin)</li>
+            </ul>
+            
+            <h4 style="color: #2c5282; margin-top: 10px;">Manage Existing Instructors</h4>
+            <ul style="color: #2d3748;">
+                <li>Edit roles and permissions</li>
+                <li>Reset passwords</li>
+                <li>Delete instructor accounts</li>
+            </ul>
+            
+            <h4 style="color: #2c5282; margin-top: 10px;">Program Assignment</h4>
+            <ul style="color: #2d3748; margin-bottom: 0;">
+                <li>Link instructors to specific programs</li>
+                <li>Determine which students and attendance data they can access</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.error("⛔ **Warning**: Deleting instructors or programs cannot be easily undone. Proceed with caution.")
+
+    # 10) Logging Out
+    st.markdown('<a name="logout"></a>', unsafe_allow_html=True)
+    with st.expander("🚪 Logging Out"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">🔓</h1>
+                <p style="color: #2d3748;"><strong>Exit System</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">Secure Logout</h3>
+            <ol style="color: #2d3748; margin-bottom: 0;">
+                <li>Click the <strong>Logout</strong> button in the sidebar menu</li>
+                <li>The system will clear your session data including:
+                   <ul>
+                       <li>Your user role</li>
+                       <li>Assigned programs</li>
+                       <li>Authentication status</li>
+                   </ul>
+                </li>
+                <li>You'll be returned to the Home screen</li>
+            </ol>
+            
+            <p style="color: #2d3748; margin-top: 10px; margin-bottom: 0;">Always log out when you're finished using the system, especially on shared computers.</p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.info("💡 **Security Tip**: For maximum security, close your browser after logging out.")
+
+    # 11) Additional Admin Tools (Optional)
+    with st.expander("🛠️ Additional Admin Tools"):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div style="text-align: center; background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+                <h1 style="font-size: 48px; color: #2c5282;">⚙️</h1>
+                <p style="color: #2d3748;"><strong>Advanced Options</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        with col2:
+            st.markdown("""
+            <div style="background-color: #e2e8f0; padding: 15px; border-radius: 5px; border: 1px solid #cbd5e0;">
+            <h3 style="color: #2c5282; margin-top: 0;">MongoDB Connection</h3>
+            <ul style="color: #2d3748;">
+                <li>When logging in as Admin, you provide the connection string for the database</li>
+                <li>This connection enables all Admin-level operations</li>
+            </ul>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Program Management</h3>
+            <ul style="color: #2d3748;">
+                <li>Create new programs for different classes or locations</li>
+                <li>Delete programs that are no longer active</li>
+                <li>Reassign programs between instructors</li>
+            </ul>
+            
+            <h3 style="color: #2c5282; margin-top: 15px;">Data Administration</h3>
+            <ul style="color: #2d3748; margin-bottom: 0;">
+                <li>Monitor system usage and performance</li>
+                <li>Perform database maintenance tasks</li>
+                <li>Manage backups and data integrity</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+            
+        st.error("⛔ **Warning**: Advanced admin tools should only be used by users with proper training and authorization.")
+
+    st.write("---")
+    
+    # Contact Information and Footer - update with better contrast
+    st.markdown("""
+    <div style="padding: 15px; border-radius: 5px; background-color: #e2e8f0; border: 1px solid #cbd5e0; text-align: center;">
+    <h3 style="color: #2c5282; margin-top: 0;">Need Additional Help?</h3>
+    <p style="color: #2d3748;">If you have any questions or need assistance, please contact:</p>
+    <p style="color: #2d3748;"><strong>✉️ Email:</strong> <a href="mailto:javier@clubstride.org" style="color: #3182ce;">javier@clubstride.org</a></p>
+    <p style="color: #4a5568; font-style: italic; margin-bottom: 0;">Club Stride Attendance System • Version 1.0</p>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,196 @@
+# views/login.py
+
+import streamlit as st
+
+from instructors_db import list_instructor_programs, authenticate_instructor
+from students_db import check_admin
+
+
+def page_unified_login():
+    st.header("🔑 Login")
+    
+    # Create a nice info card for the login page with better visibility
+    st.markdown("""
+    <div style="padding: 15px; border-radius: 5px; border-left: 5px solid #4682B4; 
+         background-color: #e6f3ff; margin-bottom: 20px; border: 1px solid #c0d8f0;">
+    <h3 style="color: #2c5282; margin-top: 0;">Welcome to Club Stride</h3>
+    <p style="color: #2d3748;">Please select your role and enter your credentials to access the system.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # If either admin or instructor is already logged in, block re-login
+    if st.session_state.get("is_admin", False) or st.session_state.get("instructor_logged_in", False):
+        st.info("✅ You are already logged in. You can use the navigation menu to access features.")
+        return
+
+    # Create columns for better layout
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        # Provide a role selection with better styling
+        st.markdown("### Select Role:")
+        role_choice = st.radio(
+            "",  # Empty label as we already have the markdown header
+            ("Admin", "Instructor"),
+            horizontal=True,
+            index=1,  # Default to Instructor as it's more common
+            help="Choose your role to see the appropriate login form"
+        )
+        
+        # Add role descriptions with better background colors
+        if role_choice == "Admin":
+            st.markdown("""
+            <div style="padding: 10px; background-color: #e2e8f0; border-radius: 5px; margin-top: 10px; 
+                 border: 1px solid #cbd5e0; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+                <p style="color: #2d3748;"><strong>👑 Administrator</strong></p>
+                <p style="font-size: 0.9em; margin-bottom: 0; color: #4a5568;">
+                    Full access to system features including user management and program administration.
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div style="padding: 10px; background-color: #e2e8f0; border-radius: 5px; margin-top: 10px; 
+                 border: 1px solid #cbd5e0; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+                <p style="color: #2d3748;"><strong>👤 Instructor</strong></p>
+                <p style="font-size: 0.9em; margin-bottom: 0; color: #4a5568;">
+                    Access to attendance tracking, student management, and reporting for assigned programs.
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    with col2:
+        # Add a visual separator
+        st.markdown('<div style="border-left: 1px solid #a0aec0; height: 100%;"></div>', unsafe_allow_html=True)
+        
+        # If user chooses Admin
+        if role_choice == "Admin":
+            st.subheader("👑 Admin Login")
+            conn_str = st.text_input(
+                "MongoDB Connection String", 
+                type="password",
+                help="Enter your database connection credentials"
+            )
+            if st.button("🔐 Login as Admin", use_container_width=True):
+                with st.spinner("Verifying credentials..."):
+                    if check_admin(conn_str):
+                        st.session_state.is_admin = True
+                        st.session_state.instructor_logged_in = False
+                        st.success("✅ Admin access granted!")
+                        # Optionally set a default menu choice so the user sees the admin page
+                        st.session_state.menu_choice = "Dashboard"
+                        st.rerun()
+                    else:
+                        st.error("❌ Invalid connection string. Access denied.")
+                        
+            # Add some guidance for admin login with better styling
+            with st.expander("Need Help?"):
+                st.markdown("""
+                <div style="background-color: #e2e8f0; padding: 10px; border-radius: 5px; margin-top: 5px;">
+                <ul style="margin-bottom: 0; padding-left: 20px; color: #2d3748;">
+                    <li>Admin login requires a valid MongoDB connection string</li>
+                    <li>If you don't have admin credentials, please use instructor login</li>
+                    <li>For assistance, contact the system administrator</li>
+                </ul>
+                </div>
+                """, unsafe_allow_html=True)
+
+        # If user chooses Instructor
+        else:
+            st.subheader("👤 Instructor Login")
+            
+            # Create a card-like container for the login form with better contrast
+            st.markdown("""
+            <div style="padding: 15px; background-color: #e2e8f0; border-radius: 5px; margin-bottom: 15px; 
+                 border: 1px solid #cbd5e0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+            """, unsafe_allow_html=True)
+            
+            username = st.text_input(
+                "Username", 
+                placeholder="Enter your username",
+                help="Your assigned username for the Club Stride system"
+            )
+            password = st.text_input(
+                "Password", 
+                type="password", 
+                placeholder="Enter your password",
+                help="Your account password"
+            )
+            
+            # Add remember me checkbox (for visual design - not functional in this implementation)
+            remember_me = st.checkbox("Remember me", value=False, help="Keep me logged in on this device")
+            
+            login_col1, login_col2 = st.columns([2, 1])
+            with login_col2:
+                login_button = st.button("🔑 Login", use_container_width=True)
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+            
+            if login_button:
+                if not username or not password:
+                    st.warning("⚠️ Please enter both username and password")
+                else:
+                    with st.spinner("Authenticating..."):
+                        result = authenticate_instructor(username, password)
+                        if result:
+                            st.session_state.instructor_logged_in = True
+                            st.session_state.is_admin = False
+                            st.session_state.instructor_id = result["instructor_id"]
+                            st.session_state.instructor_username = username
+                            st.session_state.instructor_role = result["role"]
+                            
+                            # GET assigned programs from pivot
+                            assigned_progs = list_instructor_programs(result["instructor_id"])
+                            st.session_state.instructor_program_ids = [p["program_id"] for p in assigned_progs]
+                            
+                            st.success(f"✅ Welcome, {username}! You are logged in as: {result['role']}")
+                            
+                            # Provide immediate guidance
+                            st.info(f"🔍 You have access to {len(assigned_progs)} assigned programs.")
+                            
+                            # Optionally set a default menu choice
+                            st.session_state.menu_choice = "Dashboard"
+                            st.rerun()
+                        else:
+                            st.error("❌ Invalid username or password.")
+            
+            # Add some guidance for instructor login with better styling
+            with st.expander("Forgot Password?"):
+                st.markdown("""
+                <div style="background-color: #e2e8f0; padding: 10px; border-radius: 5px;">
+                <p style="color: #2d3748; margin-top: 0;">If you've forgotten your password:</p>
+                <ol style="margin-bottom: 0; padding-left: 20px; color: #2d3748;">
+                    <li>Contact your administrator</li>
+                    <li>They can reset your password in the system</li>
+                    <li>You'll receive temporary credentials to log in</li>
+                </ol>
+                <p style="color: #2d3748; margin-top: 10px; margin-bottom: 0;">
+                    Alternatively, email support at <a href="mailto:javier@clubstride.org" style="color: #3182ce;">javier@clubstride.org</a>
+                </p>
+                </div>
+                """, unsafe_allow_html=True)
+
+    # Add a helpful footer with better contrast
+    st.markdown("---")
+    st.markdown("""
+    <div style="text-align: center; background-color: #e2e8f0; padding: 10px; border-radius: 5px; 
+         border: 1px solid #cbd5e0;">
+        <p style="color: #4a5568; margin-bottom: 0;">
+            Having trouble logging in? Contact 
+            <a href="mailto:javier@clubstride.org" style="color: #3182ce;">javier@clubstride.org</a> 
+            for assistance.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Add security notice with better contrast
+    st.markdown("""
+    <div style="background-color: #fef3c7; padding: 10px; border-radius: 5px; margin-top: 20px; 
+         border-left: 4px solid #f59e0b; border: 1px solid #fcd34d;">
+        <h4 style="color: #92400e; margin-top: 0;">🔒 Security Notice</h4>
+        <p style="color: #92400e; margin-bottom: 0; font-size: 0.9em;">
+            Always log out when you're finished using the system, especially on shared computers.
+            Never share your password with others.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,639 @@
+# views/reports.py
+
+import io
+from datetime import datetime, date, time, timedelta
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from instructors_db import list_programs
+from students_db import fetch_all_attendance_records
+from sessions_db import expected_vs_actual
+from analytics_db import (
+    ensure_snapshot, refresh_snapshot, get_filter_options, query_attendance,
+    count_attendance, status_counts, daily_attendance_score, student_status_counts
+)
+
+
+def highlight_high_absences(row):
+    """
+    Called by df.style.apply() to highlight entire row if "Total Absences" > threshold.
+    Returns a list of style strings or '' for each cell in the row.
+    """
+    threshold = 3
+    if row.get("Total Absences", 0) > threshold:
+        return ["background-color: #ffcccc"] * len(row)
+    else:
+        return [""] * len(row)
+
+def _render_expected_vs_actual(program_id):
+    """Per-student expected sessions (from the schedules) vs. what was recorded."""
+    if program_id is None:
+        return
+    st.markdown("#### Expected vs. Actual Attendance")
+    st.write("Every scheduled session counts as expected for each student in the program.")
+    today = date.today()
+    date_range = st.date_input(
+        "Sessions between",
+        value=(today - timedelta(days=30), today),
+        key="expected_vs_actual_range"
+    )
+    if not isinstance(date_range, tuple) or len(date_range) != 2:
+        return
+    start = datetime.combine(date_range[0], time.min)
+    end = datetime.combine(date_range[1] + timedelta(days=1), time.min)
+
+    with st.spinner("Comparing schedules with attendance..."):
+        result = expected_vs_actual(start, end, program_ids=[program_id])
+    rows = result["students"]
+    if not rows or not any(r["expected"] for r in rows):
+        st.info("No scheduled sessions in that range for this program.")
+        return
+
+    program = result["programs"][0]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Expected", program["expected"])
+    col2.metric("Attended", program["attended"])
+    col3.metric("Unrecorded", program["unrecorded"])
+    col4.metric("Attendance Rate", f"{(program['rate'] or 0) * 100:.1f}%")
+
+    st.dataframe(
+        pd.DataFrame(rows)[["name", "expected", "attended", "absent", "excused", "unrecorded", "rate"]]
+        .rename(columns=str.title),
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Rate": st.column_config.ProgressColumn("Rate", min_value=0, max_value=1, format="%.2f")}
+    )
+
+
+def page_generate_reports():
+    # -------------------------------------------------------------------------
+    # Page Header with Description
+    # -------------------------------------------------------------------------
+    st.header("📊 Attendance Reports & Analytics")
+    st.write("Generate insights, visualizations, and downloadable reports from attendance data.")
+    
+    # Progress indicator for initial data loading
+    with st.spinner("Loading attendance data..."):
+        # 1) Admin or Instructor check
+        is_admin = st.session_state.get("is_admin", False)
+        user_type = "Admin" if is_admin else "Instructor"
+        
+        # 2) Build program map from Postgres
+        all_programs = list_programs()  # e.g. [{"program_id":1,"program_name":"STEM"}, ...]
+        prog_map = {p["program_id"]: p["program_name"] for p in all_programs}
+        
+        # 3) Determine permitted program IDs
+        if is_admin:
+            program_id_options = [p["program_id"] for p in all_programs]  # admin sees all
+        else:
+            program_id_options = st.session_state.get("instructor_program_ids", [])
+            if not program_id_options:
+                st.warning("⚠️ You have no assigned programs. Contact an admin for access.")
+                return
+        
+        # 4) Fetch attendance records from Mongo
+        records = fetch_all_attendance_records()
+        if not records:
+            st.info("ℹ️ No attendance data found.")
+            return
+        
+        # 5) Filter by permitted program IDs
+        filtered_records = [r for r in records if r.get("program_id") in program_id_options]
+        if not filtered_records:
+            st.info("ℹ️ No attendance data found for your assigned programs.")
+            return
+        
+        # 6) Flatten records
+        flattened = []
+        for r in filtered_records:
+            att = r["attendance"]
+            pid = r.get("program_id", 0)
+            flattened.append({
+                "student_id": r.get("student_id"),
+                "name": r.get("name"),
+                "program_id": pid,
+                "program_name": prog_map.get(pid, f"Program ID={pid}"),
+                "date": att.get("date"),
+                "status": att.get("status"),
+                "comment": att.get("comment", "")
+            })
+        
+        if not flattened:
+            st.info("ℹ️ No valid attendance data to display.")
+            return
+        
+        df = pd.DataFrame(flattened)
+        if df.empty:
+            st.info("ℹ️ No valid attendance data to display.")
+            return
+
+    # Display data summary
+    st.success(f"✅ Loaded attendance data for {len(df['name'].unique())} students across {len(df['program_id'].unique())} programs.")
+    
+    # Create tabs for better organization - REMOVED THE 4th TAB
+    tab1, tab2, tab3 = st.tabs(["📈 Visualizations", "🔍 Data Explorer", "📑 Attendance Report Generator"])
+    
+    with tab1:
+        # [TAB 1 CONTENT UNCHANGED]
+        # -------------------------------------------------------------------------
+        # A) Admin-Only Visualizations (Overview)
+        # -------------------------------------------------------------------------
+        if is_admin:
+            st.subheader("📊 Admin Overview Dashboard")
+            st.write("These visualizations provide a high-level overview of attendance across all programs.")
+            
+            with st.expander("Admin Visualizations of Full Attendance Data", expanded=True):
+                def status_to_numeric(s):
+                    if s == "Present":
+                        return 1
+                    elif s == "Late":
+                        return 0.5
+                    else:
+                        return 0
+                
+                df["attendance_value"] = df["status"].apply(status_to_numeric)
+                
+                # Add a metric summary at the top
+                col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
+                with col_metrics1:
+                    avg_attendance = df["attendance_value"].mean() * 100
+                    st.metric("Overall Attendance Rate", f"{avg_attendance:.1f}%")
+                
+                with col_metrics2:
+                    present_rate = (df["status"] == "Present").mean() * 100
+                    st.metric("Present Rate", f"{present_rate:.1f}%")
+                
+                with col_metrics3:
+                    absent_rate = (df["status"] == "Absent").mean() * 100
+                    st.metric("Absence Rate", f"{absent_rate:.1f}%")
+                
+                # Ranking by average attendance
+                ranking_df = df.groupby("program_name", as_index=False)["attendance_value"].mean()
+                ranking_df.rename(columns={"attendance_value": "avg_attendance_score"}, inplace=True)
+                ranking_df.sort_values("avg_attendance_score", ascending=False, inplace=True)
+                
+                st.subheader("Program Ranking by Average Attendance")
+                st.dataframe(ranking_df.style.highlight_max(subset=["avg_attendance_score"]), use_container_width=True)
+                
+                # Bar chart: average attendance score
+                fig_bar = px.bar(
+                    ranking_df,
+                    x="program_name",
+                    y="avg_attendance_score",
+                    title="Average Attendance Score by Program",
+                    color="avg_attendance_score",
+                    color_continuous_scale="blues"
+                )
+                fig_bar.update_layout(xaxis_title="Program", yaxis_title="Average Attendance Score")
+                
+                # Pie chart: overall status distribution
+                status_counts = df["status"].value_counts().reset_index()
+                status_counts.columns = ["status", "count"]
+                fig_pie = px.pie(
+                    status_counts,
+                    values="count",
+                    names="status",
+                    title="Distribution of Attendance Statuses",
+                    hole=0.4,
+                    color="status",
+                    color_discrete_map={
+                        "Present": "#28a745", 
+                        "Late": "#ffc107", 
+                        "Absent": "#dc3545", 
+                        "Excused": "#6c757d"
+                    }
+                )
+                
+                # Time-series
+                df["date"] = pd.to_datetime(df["date"], errors="coerce")
+                daily_df = df.groupby("date", as_index=False)["attendance_value"].mean()
+                fig_line = px.line(
+                    daily_df,
+                    x="date",
+                    y="attendance_value",
+                    title="Average Attendance Over Time (All Programs)",
+                    markers=True
+                )
+                fig_line.update_layout(xaxis_title="Date", yaxis_title="Attendance Score")
+                
+                # Multi-line by program
+                multi_df = df.groupby(["date", "program_name"], as_index=False)["attendance_value"].mean()
+                fig_multi = px.line(
+                    multi_df,
+                    x="date",
+                    y="attendance_value",
+                    color="program_name",
+                    title="Attendance Over Time by Program",
+                    markers=True
+                )
+                fig_multi.update_layout(xaxis_title="Date", yaxis_title="Attendance Score", legend_title="Program")
+                
+                colA, colB = st.columns(2)
+                with colA:
+                    st.plotly_chart(fig_bar, use_container_width=True)
+                
+                with colB:
+                    st.plotly_chart(fig_pie, use_container_width=True)
+                
+                st.write("---")
+                
+                st.plotly_chart(fig_line, use_container_width=True)
+                st.plotly_chart(fig_multi, use_container_width=True)
+                
+                # Download buttons for visualizations
+                st.download_button(
+                    label="📥 Download Attendance Summary CSV",
+                    data=ranking_df.to_csv(index=False).encode('utf-8'),
+                    file_name="attendance_summary.csv",
+                    mime="text/csv"
+                )
+        else:
+            # For instructors, show a simpler view
+            st.subheader("📊 Attendance Overview")
+            # Get instructor's programs
+            instructor_programs = [prog_map.get(pid, f"Program {pid}") for pid in program_id_options]
+            st.write(f"You have access to the following programs: {', '.join(instructor_programs)}")
+            
+            # Simple metrics for instructor
+            instructor_df = df.copy()
+            
+            def status_to_numeric(s):
+                if s == "Present":
+                    return 1
+                elif s == "Late":
+                    return 0.5
+                else:
+                    return 0
+            
+            instructor_df["attendance_value"] = instructor_df["status"].apply(status_to_numeric)
+            
+            # Add metrics
+            col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
+            with col_metrics1:
+                avg_attendance = instructor_df["attendance_value"].mean() * 100
+                st.metric("Overall Attendance Rate", f"{avg_attendance:.1f}%")
+            
+            with col_metrics2:
+                present_rate = (instructor_df["status"] == "Present").mean() * 100
+                st.metric("Present Rate", f"{present_rate:.1f}%")
+            
+            with col_metrics3:
+                absent_rate = (instructor_df["status"] == "Absent").mean() * 100
+                st.metric("Absence Rate", f"{absent_rate:.1f}%")
+            
+            # Simple charts for instructor
+            status_counts = instructor_df["status"].value_counts().reset_index()
+            status_counts.columns = ["status", "count"]
+            fig_pie = px.pie(
+                status_counts,
+                values="count",
+                names="status",
+                title="Distribution of Attendance Statuses",
+                hole=0.4,
+                color="status",
+                color_discrete_map={
+                    "Present": "#28a745", 
+                    "Late": "#ffc107", 
+                    "Absent": "#dc3545", 
+                    "Excused": "#6c757d"
+                }
+            )
+            st.plotly_chart(fig_pie, use_container_width=True)
+    
+    with tab2:
+        # -------------------------------------------------------------------------
+        # B) Data Explorer + Chart Building from Filtered Data
+        #    Filters and aggregations run in DuckDB over the Parquet snapshot.
+        # -------------------------------------------------------------------------
+        st.subheader("🔍 Data Explorer & Custom Charts")
+        st.write("Filter and visualize attendance data using various criteria.")
+        
+        with st.expander("How to use the Data Explorer", expanded=False):
+            st.write("""
+            1. Use the filter controls below to select specific data
+            2. The table will update to show only matching records
+            3. Choose a chart type to visualize the filtered data
+            4. The chart will update automatically based on your selection
+            """)
+
+        snap_col1, snap_col2 = st.columns([3, 1])
+        with snap_col2:
+            if st.button("🔄 Rebuild Snapshot", help="Reload the analytics snapshot from the databases"):
+                with st.spinner("Rebuilding analytics snapshot..."):
+                    refresh_snapshot(full=True)
+        with st.spinner("Refreshing analytics snapshot..."):
+            snapshot_meta = ensure_snapshot()
+        with snap_col1:
+            st.caption(f"Snapshot refreshed at {snapshot_meta.get('refreshed_at', 'N/A')} UTC "
+                       f"({snapshot_meta.get('attendance_rows', 0)} attendance rows)")
+
+        # Admin queries every program; instructors are limited to theirs
+        explorer_program_ids = None if is_admin else program_id_options
+        filter_options = get_filter_options(program_ids=explorer_program_ids)
+
+        f_col1, f_col2 = st.columns(2)
+        with f_col1:
+            explorer_programs = st.multiselect(
+                "Programs",
+                options=program_id_options,
+                format_func=lambda pid: prog_map.get(pid, f"Program ID={pid}"),
+                help="Leave empty to include all of your programs"
+            )
+            explorer_statuses = st.multiselect("Status", options=filter_options["statuses"])
+        with f_col2:
+            explorer_names = st.multiselect("Students", options=filter_options["names"])
+            explorer_text = st.text_input("Search name or comment", "")
+
+        first_date = filter_options["first_date"]
+        last_date = filter_options["last_date"]
+        if pd.notna(first_date) and pd.notna(last_date):
+            date_range = st.date_input(
+                "Date range",
+                value=(first_date.date(), last_date.date()),
+                min_value=first_date.date(),
+                max_value=last_date.date()
+            )
+        else:
+            date_range = ()
+
+        explorer_filters = {
+            "program_ids": explorer_programs or explorer_program_ids,
+            "names": explorer_names,
+            "statuses": explorer_statuses,
+            "text": explorer_text.strip() or None,
+            "start_date": date_range[0] if len(date_range) > 0 else None,
+            "end_date": date_range[1] if len(date_range) > 1 else None,
+        }
+
+        explorer_total = count_attendance(**explorer_filters)
+        
+        if explorer_total == 0:
+            st.info("ℹ️ No data matches your filter criteria. Try adjusting the filters.")
+        else:
+            display_limit = 1000
+            explorer_df = query_attendance(limit=display_limit, **explorer_filters)
+            st.write(f"**Showing {len(explorer_df)} of {explorer_total} records that match your criteria**")
+            st.dataframe(explorer_df, use_container_width=True)
+            
+            # Add download button for filtered data (full result, not just the preview)
+            st.download_button(
+                label="📥 Download Filtered Data CSV",
+                data=query_attendance(**explorer_filters).to_csv(index=False).encode('utf-8'),
+                file_name="filtered_attendance_data.csv",
+                mime="text/csv"
+            )
+            
+            st.markdown("### 📈 Build a Custom Chart")
+            st.write("Create visualizations from your filtered data")
+            
+            chart_type = st.selectbox(
+                "Select Chart Type",
+                [
+                    "Bar - Status Counts",
+                    "Line - Attendance Over Time",
+                    "Bar - Student Attendance",
+                    "Pie - Status Distribution",
+                ],
+                help="Choose the type of chart you want to create from your filtered data"
+            )
+            
+            # Chart container with loading indicator
+            chart_container = st.container()
+            with chart_container:
+                with st.spinner("Generating chart..."):
+                    if chart_type == "Bar - Status Counts":
+                        status_counts_df = status_counts(**explorer_filters)
+                        fig_bar_filter = px.bar(
+                            status_counts_df,
+                            x="status",
+                            y="count",
+                            title="Status Counts in Filtered Data",
+                            color="status",
+                            color_discrete_map={
+                                "Present": "#28a745", 
+                                "Late": "#ffc107", 
+                                "Absent": "#dc3545", 
+                                "Excused": "#6c757d"
+                            }
+                        )
+                        st.plotly_chart(fig_bar_filter, use_container_width=True)
+                    
+                    elif chart_type == "Line - Attendance Over Time":
+                        daily_mean = daily_attendance_score(**explorer_filters)
+                        fig_line_filter = px.line(
+                            daily_mean,
+                            x="date",
+                            y="attendance_value",
+                            title="Average Attendance Over Time (Filtered Data)",
+                            markers=True
+                        )
+                        fig_line_filter.update_layout(xaxis_title="Date", yaxis_title="Attendance Score")
+                        st.plotly_chart(fig_line_filter, use_container_width=True)
+                    
+                    elif chart_type == "Bar - Student Attendance":
+                        group_data = student_status_counts(**explorer_filters)
+                        fig_bar_student = px.bar(
+                            group_data,
+                            x="name",
+                            y="count",
+                            color="status",
+                            barmode="group",
+                            title="Attendance by Student (Filtered Data)",
+                            color_discrete_map={
+                                "Present": "#28a745", 
+                                "Late": "#ffc107", 
+                                "Absent": "#dc3545", 
+                                "Excused": "#6c757d"
+                            }
+                        )
+                        fig_bar_student.update_layout(xaxis_title="Student Name", yaxis_title="Count")
+                        st.plotly_chart(fig_bar_student, use_container_width=True)
+                    
+                    elif chart_type == "Pie - Status Distribution":
+                        status_counts_df = status_counts(**explorer_filters)
+                        fig_pie_filter = px.pie(
+                            status_counts_df,
+                            values="count",
+                            names="status",
+                            title="Status Distribution (Filtered Data)",
+                            hole=0.4,
+                            color="status",
+                            color_discrete_map={
+                                "Present": "#28a745", 
+                                "Late": "#ffc107", 
+                                "Absent": "#dc3545", 
+                                "Excused": "#6c757d"
+                            }
+                        )
+                        st.plotly_chart(fig_pie_filter, use_container_width=True)
+    
+    with tab3:
+        # -------------------------------------------------------------------------
+        # C) Program-Specific XLSX (with advanced insights)
+        # -------------------------------------------------------------------------
+        st.subheader("📑 Program Attendance Report Generator")
+        st.write("Create detailed attendance reports with insights and export to Excel.")
+        
+        # Instructions expander
+        with st.expander("How to Create Reports", expanded=False):
+            st.write("""
+            1. Select a program from the dropdown
+            2. Click "Create Pivot + Insights" to generate the report
+            3. Review the report summary and pivot table
+            4. Click "Create Downloadable XLSX" to download the Excel file
+            """)
+        
+        # Program selection card
+        st.markdown("### 1️⃣ Select Program")
+        
+        # Let user pick a program from df
+        selectable_pids = sorted(df["program_id"].unique())
+        selected_pid = st.selectbox(
+            "Select a Program to Export/Analyze",
+            options=selectable_pids,
+            format_func=lambda pid: prog_map.get(pid, f"Program ID={pid}"),
+            help="Choose which program's attendance data to analyze"
+        )
+        
+        # Initialize session state for pivot data
+        if "pivot_df" not in st.session_state:
+            st.session_state["pivot_df"] = None
+        
+        # Create a nice card-like container for the report generation button
+        st.markdown("### 2️⃣ Generate Report")
+        if st.button("🔄 Create Pivot + Insights", help="Click to generate the attendance report"):
+            with st.spinner("Generating report..."):
+                # Filter DF to chosen program
+                sub_df = df[df["program_id"] == selected_pid].copy()
+                if sub_df.empty:
+                    st.warning("⚠️ No attendance data for that program!")
+                    return
+                
+                program_name = prog_map.get(selected_pid, f"Program ID={selected_pid}")
+                st.session_state["selected_program_name"] = program_name
+                st.session_state["selected_program_id"] = selected_pid
+                
+                sub_df["date"] = pd.to_datetime(sub_df["date"], errors="coerce").dt.date
+                pivot_df = sub_df.pivot(index="name", columns="date", values="status").fillna("Missed")
+                
+                # Count absences
+                def count_absences(row):
+                    return sum(x in ["Absent", "Missed"] for x in row)
+                pivot_df["Total Absences"] = pivot_df.apply(count_absences, axis=1)
+                
+                date_columns = [col for col in pivot_df.columns if col != "Total Absences"]
+                # Create new column order with "Total Absences" as the second column
+                new_column_order = ["Total Absences"] + date_columns
+                # Reindex the DataFrame with the new column order
+                pivot_df = pivot_df[new_column_order]
+                st.session_state["pivot_df"] = pivot_df
+                
+                # Success message after report generation
+                st.success(f"✅ Report generated successfully for {program_name}")
+        
+        # Only show insights if pivot data exists
+        if st.session_state["pivot_df"] is not None:
+            st.markdown("### 3️⃣ Report Summary")
+            
+            # Get program name from session state
+            program_name = st.session_state.get("selected_program_name", "Selected Program")
+            
+            pivot_df = st.session_state["pivot_df"]
+            
+            # ---- Additional Summaries/Insights ----
+            total_students = len(pivot_df.index)
+            average_absences = pivot_df["Total Absences"].mean()
+            max_absences = pivot_df["Total Absences"].max()
+            
+            # Use columns for a nicer layout of metrics
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Program", program_name)
+            with col2:
+                st.metric("Total Students", total_students)
+            with col3:
+                st.metric("Avg. Absences", f"{average_absences:.2f}")
+            
+            # "High-risk" threshold with a visual indicator
+            absence_threshold = 3
+            high_risk_count = len(pivot_df[pivot_df["Total Absences"] > absence_threshold])
+            
+            # Progress bar to visualize attendance health
+            if high_risk_count > 0:
+                risk_percent = (high_risk_count / total_students) * 100
+                st.warning(f"⚠️ {high_risk_count} of {total_students} students ({risk_percent:.1f}%) have excessive absences")
+                
+                # Show detailed high risk information
+                high_risk_students = pivot_df[pivot_df["Total Absences"] > absence_threshold].index.tolist()
+                with st.expander(f"View {high_risk_count} Students with Excessive Absences", expanded=True):
+                    for s in high_risk_students:
+                        st.write(f"- **{s}**: {pivot_df.loc[s, 'Total Absences']} absences")
+            else:
+                st.success(f"✅ No students have more than {absence_threshold} absences. Great job!")
+            
+            st.markdown("### 4️⃣ Attendance Pivot Table")
+            st.write("The table below shows attendance status for each student by date, with high absence counts highlighted in red.")
+            
+            # highlight rows above threshold
+            pivot_styled = st.session_state["pivot_df"].style.apply(
+                highlight_high_absences, axis=1
+            )
+            st.dataframe(pivot_styled, use_container_width=True)
+
+            _render_expected_vs_actual(st.session_state.get("selected_program_id"))
+            
+            # Add a nice download button with icon
+            excel_button_container = st.container()
+            with excel_button_container:
+                download_col1, download_col2 = st.columns([3, 1])
+                with download_col1:
+                    st.markdown("### 5️⃣ Export Report")
+                    st.write("Download the complete report as an Excel file.")
+                
+                with download_col2:
+                    if st.button("📥 Create XLSX", help="Generate an Excel file with the attendance data"):
+                        with st.spinner("Creating Excel file..."):
+                            output = io.BytesIO()
+                            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+                                st.session_state["pivot_df"].to_excel(writer, sheet_name="Attendance Pivot")
+                                
+                                workbook = writer.book
+                                worksheet = writer.sheets["Attendance Pivot"]
+                                red_format = workbook.add_format({"font_color": "red"})
+                                row_count, col_count = st.session_state["pivot_df"].shape
+                                worksheet.conditional_format(
+                                    1, 1, row_count, col_count,
+                                    {
+                                        "type": "text",
+                                        "criteria": "containing",
+                                        "value": "Missed",
+                                        "format": red_format
+                                    }
+                                )
+                                
+                                # Add a summary sheet
+                                summary_df = pd.DataFrame({
+                                    "Metric": ["Program", "Total Students", "Average Absences", "Max Absences", "Students with Excessive Absences"],
+                                    "Value": [
+                                        program_name, 
+                                        total_students, 
+                                        f"{average_absences:.2f}", 
+                                        max_absences,
+                                        high_risk_count
+                                    ]
+                                })
+                                summary_df.to_excel(writer, sheet_name="Summary", index=False)
+                            
+                            excel_data = output.getvalue()
+                            
+                            file_name = f"{program_name.replace(' ', '_').lower()}_attendance.xlsx"
+                            st.download_button(
+                                label="💾 Download Excel Report",
+                                data=excel_data,
+                                file_name=file_name,
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                            )
+                            
+                            st.success("✅ Excel file created successfully!")
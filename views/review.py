@@ -0,0 +1,782 @@
+# views/review.py
+
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from instructors_db import list_programs
+from students_db import (
+    get_roster, get_all_attendance_subdocs, delete_attendance_subdoc, VersionConflict,
+    upsert_attendance_subdoc, get_missed_counts_for_all_students,
+    get_student_count_as_of_last_week, get_attendance_subdocs_last_week,
+    bulk_apply_attendance_changes, ATTENDANCE_VERSION
+)
+from analytics_db import mark_snapshot_stale
+from attendance_cache import attendance_cache
+from attendance_sessions_db import apply_session_change
+from search_db import typeahead, search_comments
+from views.common import paginate
+
+# Most comment matches the logs filter looks at
+COMMENT_SEARCH_LIMIT = 100
+
+
+#####################
+# PAGE: Review Attendance
+#####################
+
+
+def page_review_attendance():
+    st.header("📊 Review Attendance Logs")
+    
+    # Help expander
+    with st.expander("ℹ️ How to review attendance", expanded=False):
+        st.markdown("""
+        ### Reviewing Attendance:
+        - **Attendance Records**: View, edit, or delete individual attendance records
+        - **Missed Counts**: See a summary of absent/missed sessions by student
+        - Use the filters to narrow down records by program or student name
+
+        You can edit any record by clicking the Edit button in its panel.
+        """)
+
+    # -------------------------------------------------------------
+    # A) Show summary metrics: This Week vs. Last Week
+    #    (the last 7 calendar days, including today, vs. the 7 before)
+    # -------------------------------------------------------------
+    tomorrow = datetime.utcnow().date() + timedelta(days=1)
+    week_start = tomorrow - timedelta(days=7)
+    cache = attendance_cache()
+
+    # 1) "This Week" status counts
+    counts_this_week = cache.status_counts(start=week_start, end=tomorrow)
+    total_this_week = sum(counts_this_week.values())
+
+    # 2) "Last Week" status counts
+    counts_last_week = cache.status_counts(start=week_start - timedelta(days=7), end=week_start)
+    total_last_week = sum(counts_last_week.values())
+    attendance_delta = total_this_week - total_last_week
+
+    # Admin vs. Instructor logic
+    is_admin = st.session_state.get("is_admin", False)
+    if is_admin:
+        all_students = get_roster()  # Admin sees all
+    else:
+        # Instructors see only assigned programs
+        program_ids = st.session_state.get("instructor_program_ids", [])
+        all_students = get_roster(program_ids=program_ids)
+
+    total_students = len(all_students)
+
+    # Get last week's student count from your custom logic
+    last_week_count = get_student_count_as_of_last_week()
+    student_delta = total_students - last_week_count
+
+    # Compare absences this vs. last week
+    absent_this_week = counts_this_week["Absent"]
+    absent_last_week = counts_last_week["Absent"]
+    delta_absent = absent_this_week - absent_last_week
+
+    # -------------------------------------------------------------
+    # B) Display top-level metrics
+    # -------------------------------------------------------------
+    st.markdown("### Summary Metrics")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.metric(
+            label="Attendance Records This Week",
+            value=total_this_week,
+            delta=f"{attendance_delta}" if attendance_delta != 0 else None,
+            delta_color="normal" if attendance_delta >= 0 else "inverse"
+        )
+    with c2:
+        st.metric(
+            label="Absences This Week",
+            value=absent_this_week,
+            delta=f"{delta_absent}" if delta_absent != 0 else None,
+            delta_color="inverse"  # Fewer absences is good (green)
+        )
+    with c3:
+        st.metric(
+            label="Total Active Students",
+            value=total_students,
+            delta=f"{student_delta}" if student_delta != 0 else None,
+            delta_color="normal" if student_delta >= 0 else "inverse"
+        )
+
+    st.write("---")
+
+    # -------------------------------------------------------------
+    # C) Show tabs: [All Attendance], [Missed Sessions]
+    # -------------------------------------------------------------
+    tab1, tab2 = st.tabs(["📋 All Attendance Records", "🚫 Missed Sessions"])
+    
+    with tab1:
+        st.subheader("Attendance Records")
+        show_attendance_logs()  # Detailed logic below
+
+    with tab2:
+        st.subheader("Students with Missed Sessions")
+        show_missed_counts()    # Provided by your code elsewhere
+
+
+def show_attendance_logs():
+    conflict_msg = st.session_state.pop("attendance_conflict", None)
+    if conflict_msg:
+        st.error(f"⚠️ {conflict_msg} Your change was not saved; the records below have been reloaded.")
+
+    # Track which record is in edit mode
+    if "edit_record_key" not in st.session_state:
+        st.session_state["edit_record_key"] = None
+
+    # Track which record is pending deletion
+    if "delete_candidate" not in st.session_state:
+        st.session_state["delete_candidate"] = None
+
+    # ---------------------------------------------------------
+    # 1) Load or refresh attendance records from DB
+    # ---------------------------------------------------------
+    if "attendance_records" not in st.session_state or st.session_state["attendance_records"] is None:
+        try:
+            with st.spinner("Loading attendance records..."):
+                records = get_all_attendance_subdocs()
+                st.session_state["attendance_records"] = records
+        except Exception as e:
+            st.error(f"❌ Error fetching attendance logs: {e}")
+            st.session_state["attendance_records"] = []
+            return
+
+    logs = st.session_state["attendance_records"]
+    if not logs:
+        st.info("📌 No attendance records found.")
+        return
+
+    # ---------------------------------------------------------
+    # 2) Program-based filtering
+    # ---------------------------------------------------------
+    st.markdown("### 🔍 Filter Records")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        all_programs = list_programs()
+        prog_map = {p["program_id"]: p["program_name"] for p in all_programs}
+        is_admin = st.session_state.get("is_admin", False)
+        # Programs the name and comment searches below are limited to
+        search_program_ids = None
+
+        if is_admin:
+            # Admin sees a program filter
+            program_choices = [(None, "All Programs")] + [
+                (p["program_id"], p["program_name"]) for p in all_programs
+            ]
+            selected_prog_id = st.selectbox(
+                "Filter by Program:",
+                options=[pc[0] for pc in program_choices],
+                format_func=lambda pid: "All Programs" if pid is None else f"{prog_map[pid]} (ID: {pid})",
+                help="Select a program to filter attendance records"
+            )
+            if selected_prog_id is not None:
+                search_program_ids = [selected_prog_id]
+                logs = [
+                    r for r in logs
+                    if (r["program_id"] == selected_prog_id or selected_prog_id is None)
+                ]
+        else:
+            # Instructor sees only assigned programs
+            permitted_ids = st.session_state.get("instructor_program_ids", [])
+            search_program_ids = permitted_ids
+            logs = [r for r in logs if r.get("program_id") in permitted_ids]
+            
+            # If multiple programs, allow a filter
+            if len(permitted_ids) > 1:
+                program_choices = [(None, "All My Programs")] + [
+                    (pid, prog_map.get(pid, f"Program ID: {pid}")) for pid in permitted_ids
+                ]
+                selected_prog_id = st.selectbox(
+                    "Filter by Program:",
+                    options=[pc[0] for pc in program_choices],
+                    format_func=lambda pid: "All My Programs" if pid is None else f"{prog_map.get(pid, f'Program ID: {pid}')}"
+                )
+                if selected_prog_id is not None:
+                    search_program_ids = [selected_prog_id]
+                    logs = [
+                        r for r in logs
+                        if (r["program_id"] == selected_prog_id or selected_prog_id is None)
+                    ]
+
+    # ---------------------------------------------------------
+    # 3) Student Name filter: indexed typeahead (search_db) over the
+    #    selected programs
+    # ---------------------------------------------------------
+    with col2:
+        name_prefix = st.text_input(
+            "Filter by Student:",
+            placeholder="Start typing a name",
+            help="Type the start of a student's first or last name"
+        )
+        if name_prefix:
+            suggestions = typeahead(name_prefix, program_ids=search_program_ids)
+            if suggestions:
+                student_choice = st.selectbox(
+                    "Matching students:",
+                    options=suggestions,
+                    format_func=lambda s: s.get("name", "Unknown"),
+                    help="Select a student to view only their attendance records"
+                )
+                logs = [doc for doc in logs if doc.get("student_id") == student_choice["student_id"]]
+            else:
+                st.info(f"No students found matching '{name_prefix}'")
+                logs = []
+
+    # Comment search, through the text index on attendance comments
+    comment_query = st.text_input(
+        "Search comments:",
+        help=f"Show records whose comment contains these words (newest {COMMENT_SEARCH_LIMIT})"
+    )
+    if comment_query:
+        hits = {
+            (h["student_id"], h["attendance"]["date"])
+            for h in search_comments(comment_query, program_ids=search_program_ids, limit=COMMENT_SEARCH_LIMIT)
+        }
+        logs = [doc for doc in logs if (doc.get("student_id"), doc["attendance"].get("date")) in hits]
+
+    if not logs:
+        st.info("📌 No attendance records found for that filter.")
+        return
+
+    st.success(f"Showing {len(logs)} attendance records")
+
+    # ---------------------------------------------------------
+    # 4) Sorting
+    # ---------------------------------------------------------
+    sort_options = [
+        "Date (Newest First)",
+        "Date (Oldest First)",
+        "Student Name",
+        "Program",
+        "Status",
+    ]
+    sort_choice = st.selectbox(
+        "Sort by:",
+        options=sort_options,
+        index=0,
+        help="Choose how to sort the attendance records"
+    )
+    
+    # Apply sorting
+    def get_date_str(record):
+        """Return date as a string for sorting."""
+        att_date = record.get("attendance", {}).get("date", "")
+        # If it's a datetime, convert to iso. If string, just use it
+        if isinstance(att_date, datetime):
+            return att_date.isoformat()
+        else:
+            return str(att_date)
+
+    if sort_choice == "Date (Newest First)":
+        logs = sorted(logs, key=lambda x: get_date_str(x), reverse=True)
+    elif sort_choice == "Date (Oldest First)":
+        logs = sorted(logs, key=lambda x: get_date_str(x))
+    elif sort_choice == "Student Name":
+        logs = sorted(logs, key=lambda x: x.get("name", ""))
+    elif sort_choice == "Program":
+        logs = sorted(logs, key=lambda x: prog_map.get(x.get("program_id", 0), ""))
+    elif sort_choice == "Status":
+        logs = sorted(logs, key=lambda x: x.get("attendance", {}).get("status", ""))
+
+    view_mode = st.radio(
+        "View:",
+        ["🗂️ Cards", "📊 Grid"],
+        horizontal=True,
+        key="attendance_logs_view",
+        help="Grid: edit a page of records at once; all changes are saved together"
+    )
+
+    st.write("---")
+
+    if view_mode == "📊 Grid":
+        _attendance_edit_grid(logs, prog_map, key="attendance_logs_grid")
+        return
+
+    # ---------------------------------------------------------
+    # 5) Display each record in an expander
+    # ---------------------------------------------------------
+    emoji_map = {
+        "Present": "✅ Present",
+        "Late": "🕑 Late",
+        "Absent": "🚫 Absent",
+        "Excused": "🤝 Excused"
+    }
+
+    skip, limit = paginate(len(logs), key="attendance_logs")
+    for idx, doc in enumerate(logs[skip:skip + limit], start=skip):
+        _render_attendance_record(doc, idx, prog_map, emoji_map)
+
+
+@st.fragment
+def _render_attendance_record(doc, idx, prog_map, emoji_map):
+    """
+    One attendance record (view / edit / delete) as an isolated fragment.
+    Edits update `doc` in place, so only this record re-renders; the full
+    page (and its DB reads) is not re-executed.
+    """
+    if doc.get("_deleted"):
+        return
+
+    att = doc.get("attendance", {})
+    raw_date = att.get("date", "")
+    status_val = att.get("status", "")
+    comment_val = att.get("comment", "")
+
+    # 1) Convert the date to a stable string for the record key
+    if isinstance(raw_date, datetime):
+        date_str = raw_date.isoformat()
+    else:
+        date_str = str(raw_date)  # fallback if it's already a string or empty
+
+    s_name = doc.get("name", "")
+    p_id = doc.get("program_id", 0)
+    student_id = doc.get("student_id", "?")
+
+    program_name = prog_map.get(p_id, f"Program ID={p_id}")
+    display_status = emoji_map.get(status_val, status_val)
+
+    # Build a stable record_key from (student_id + iso_date_str)
+    record_key = f"{student_id}_{date_str}"
+    is_editing = (st.session_state["edit_record_key"] == record_key)
+
+    # Prepare the label for the expander
+    expander_label = f"{s_name} | {program_name} | {date_str} | {display_status}"
+    
+    with st.expander(expander_label, expanded=is_editing):
+        # Check if this record is the same as the "delete candidate"
+        # for two-step deletion
+        if st.session_state["delete_candidate"] == record_key:
+            st.warning(f"⚠️ Are you sure you want to delete {s_name}'s record on {date_str}?")
+
+            # Confirm or Cancel
+            if st.button("Cancel Delete", key=f"cancel_delete_{idx}"):
+                st.session_state["delete_candidate"] = None
+                st.rerun(scope="fragment")
+            if st.button("Confirm Delete", key=f"confirm_delete_{idx}"):
+                with st.spinner("Deleting record..."):
+                    try:
+                        if doc.get("attendance_session_id"):
+                            # Stored in a class-session document (attendance_sessions_db)
+                            deleted = apply_session_change({**_session_change_base(doc), "delete": True})
+                        else:
+                            deleted = delete_attendance_subdoc(student_id, date_str, expected_version=doc.get(ATTENDANCE_VERSION, 0))
+                    except VersionConflict as e:
+                        st.session_state["delete_candidate"] = None
+                        _reload_after_conflict(e)
+                    if deleted:
+                        # Drop it locally instead of re-fetching every record
+                        doc["_deleted"] = True
+                        records = st.session_state.get("attendance_records") or []
+                        st.session_state["attendance_records"] = [r for r in records if r is not doc]
+                        _bump_cached_version(student_id, doc.get(ATTENDANCE_VERSION, 0) + 1)
+                        mark_snapshot_stale()
+                    else:
+                        st.warning("⚠️ No matching record found.")
+                    st.session_state["delete_candidate"] = None
+                    st.rerun(scope="fragment")
+            # Skip the rest of the expander if we’re in delete confirm mode
+            return
+
+        # If not editing:
+        if not is_editing:
+            # Normal view mode
+            c1, c2 = st.columns([3, 1])
+            with c1:
+                st.markdown(f"""
+                <div style="padding: 10px; border-radius: 5px;">
+                    <strong>Student:</strong> {s_name} (ID: {student_id})<br>
+                    <strong>Program:</strong> {program_name}<br>
+                    <strong>Date:</strong> {date_str}<br>
+                    <strong>Status:</strong> {display_status}<br>
+                    { f"**Comment:** {comment_val}" if comment_val else "" }
+                </div>
+                """, unsafe_allow_html=True)
+
+            with c2:
+                st.write("**Actions:**")
+                
+                # Edit Button
+                if st.button("✏️ Edit", key=f"edit_btn_{idx}"):
+                    # Store info in session for the next run
+                    st.session_state["edit_record_key"] = record_key
+                    st.session_state["edit_student_id"] = student_id
+                    st.session_state["edit_student_name"] = s_name
+                    st.session_state["edit_date"] = date_str
+                    st.session_state["edit_status"] = status_val
+                    st.session_state["edit_comment"] = comment_val
+                    st.rerun(scope="fragment")
+
+                # Delete Button (two-step approach)
+                if st.button("🗑️ Delete", key=f"delete_btn_{idx}"):
+                    # Mark this record as the "delete candidate"
+                    st.session_state["delete_candidate"] = record_key
+                    st.rerun(scope="fragment")
+
+        else:
+            # Edit mode
+            st.subheader("✏️ Edit Attendance Record")
+
+            # Parse the date string back into a datetime (if possible)
+            default_dt_str = st.session_state["edit_date"]
+            try:
+                default_dt = datetime.fromisoformat(default_dt_str)
+            except ValueError:
+                # fallback if it's not parseable
+                default_dt = None
+
+            with st.form(f"edit_form_{idx}"):
+                left_col, right_col = st.columns(2)
+                with left_col:
+                    st.write(f"**Student Name**: {st.session_state['edit_student_name']}")
+                    st.write(f"**Student ID**: {st.session_state['edit_student_id']}")
+                    st.write(f"**Original Date**: {default_dt_str}")
+
+                with right_col:
+                    new_date = st.date_input("New Date", value=(default_dt or datetime.now()).date())
+                    new_time = st.time_input("New Time", value=(default_dt or datetime.now()).time())
+
+                combined_dt = datetime.combine(new_date, new_time)
+
+                status_opts = ["Present", "Late", "Absent", "Excused"]
+                status_icons = ["✅", "🕒", "🚫", "🤝"]
+                status_options_with_icons = [f"{icon} {status}" for icon, status in zip(status_icons, status_opts)]
+                
+                # figure out the default index
+                try:
+                    default_idx = status_opts.index(st.session_state["edit_status"])
+                except ValueError:
+                    default_idx = 0
+
+                selected_status_idx = st.selectbox(
+                    "Status:", 
+                    options=range(len(status_opts)),
+                    format_func=lambda i: status_options_with_icons[i],
+                    index=default_idx
+                )
+                new_status = status_opts[selected_status_idx]
+
+                new_comment = st.text_area(
+                    "Comment",
+                    value=st.session_state["edit_comment"],
+                    height=100
+                )
+
+                c1, c2 = st.columns([1, 1])
+                with c1:
+                    cancel_btn = st.form_submit_button("Cancel")
+                with c2:
+                    save_btn = st.form_submit_button("Save Changes")
+                
+                if save_btn:
+                    with st.spinner("Updating attendance record..."):
+                        # upsert_attendance_subdoc moves the record when the date changed
+                        try:
+                            if doc.get("attendance_session_id"):
+                                change = {**_session_change_base(doc), "new_status": new_status,
+                                          "new_comment": new_comment}
+                                if combined_dt != default_dt:
+                                    change["new_date"] = combined_dt
+                                success = apply_session_change(change)
+                            else:
+                                success = upsert_attendance_subdoc(
+                                    student_id=st.session_state["edit_student_id"],
+                                    target_date=combined_dt,
+                                    new_status=new_status,
+                                    new_comment=new_comment,
+                                    old_date=default_dt,
+                                    expected_version=doc.get(ATTENDANCE_VERSION, 0)
+                                )
+                        except VersionConflict as e:
+                            st.session_state["edit_record_key"] = None
+                            _reload_after_conflict(e)
+                
+                        if success:
+                            st.success("✅ Attendance updated successfully.")
+
+                            # Update just this record locally; no full re-fetch
+                            doc["attendance"] = {
+                                "date": combined_dt,
+                                "status": new_status,
+                                "comment": new_comment
+                            }
+                            _bump_cached_version(student_id, doc.get(ATTENDANCE_VERSION, 0) + 1)
+                            st.session_state["edit_record_key"] = None
+                            mark_snapshot_stale()
+                            st.rerun(scope="fragment")
+                        else:
+                            st.error("❌ Failed to update attendance record.")
+
+                if cancel_btn:
+                    st.session_state["edit_record_key"] = None
+                    st.rerun(scope="fragment")
+def _session_change_base(doc):
+    att = doc.get("attendance", {})
+    return {
+        "attendance_session_id": doc["attendance_session_id"],
+        "student_id": doc.get("student_id"),
+        "date": att.get("date"),
+        "status": att.get("status"),
+        "comment": att.get("comment"),
+    }
+
+
+def _bump_cached_version(student_id, new_version):
+    """
+    After a successful write, every cached row of this student is at the new
+    attendance version (the rows share one document), so later edits aren't
+    flagged stale.
+    """
+    for r in st.session_state.get("attendance_records") or []:
+        if r.get("student_id") == student_id:
+            r[ATTENDANCE_VERSION] = new_version
+
+
+def _reload_after_conflict(err):
+    """Someone else changed the student record first: reload everything and say so."""
+    st.session_state["attendance_conflict"] = str(err)
+    st.session_state["attendance_records"] = None
+    st.rerun()
+
+
+#####################
+# PAGE: Take Attendance
+#####################
+
+   
+def show_missed_counts():
+    st.subheader("Missed Counts for All Students")
+
+    # Only fetch missed data once or if the user requests a refresh
+    if "missed_counts" not in st.session_state:
+        st.session_state["missed_counts"] = None
+
+    if st.session_state["missed_counts"] is None:
+        try:
+            # Determine if user is admin or instructor
+            is_admin = st.session_state.get("is_admin", False)
+            
+            if is_admin:
+                # Admin sees all programs
+                missed_data = get_missed_counts_for_all_students()
+            else:
+                # Instructor sees only permitted program IDs
+                permitted_ids = st.session_state.get("instructor_program_ids", [])
+                missed_data = get_missed_counts_for_all_students(program_ids=permitted_ids)
+            
+            # Build a dict {program_id -> program_name} from Postgres for easy display
+            prog_map = {p["program_id"]: p["program_name"] for p in list_programs()}
+
+            # Insert a "program_name" field for display
+            for m in missed_data:
+                pid = m.get("program_id", 0)
+                m["program_name"] = prog_map.get(pid, f"Program ID={pid}")
+
+            # Cache the result in session state
+            st.session_state["missed_counts"] = missed_data
+
+        except Exception as e:
+            st.error(f"Error fetching missed counts: {e}")
+            st.session_state["missed_counts"] = []
+
+    # Actually display the missed counts data
+    data = st.session_state["missed_counts"]
+    if not data:
+        st.info("No missed data found.")
+        return
+
+    import pandas as pd
+    from streamlit_extras.dataframe_explorer import dataframe_explorer
+
+    # Convert to DataFrame for exploration
+    MissedCountsdf = pd.DataFrame(data)
+
+    # Use the streamlit_extras.dataframe_explorer
+    MissedCountsdf_output = dataframe_explorer(MissedCountsdf)
+    MissedCounts_dataframe = pd.DataFrame(MissedCountsdf_output)
+
+    if MissedCounts_dataframe.empty:
+        st.info("No data selected in the explorer.")
+    else:
+        st.dataframe(MissedCounts_dataframe, use_container_width=True)
+
+def show_last_week_attendance():
+    """
+    Display the logs for the last 7 days only,
+    reusing a similar approach to show_attendance_logs().
+    """
+    if st.session_state["attendance_records"] is None:
+        try:
+            # Use the new function from students_db
+            records = get_attendance_subdocs_last_week()
+
+            # If you're also filtering by instructor's permitted IDs:
+            is_admin = st.session_state.get("is_admin", False)
+            if not is_admin:
+                permitted_ids = st.session_state.get("instructor_program_ids", [])
+                records = [r for r in records if r.get("program_id") in permitted_ids]
+
+            # Optionally label them with program names, similar to show_attendance_logs
+            prog_map = {p["program_id"]: p["program_name"] for p in list_programs()}
+            for r in records:
+                pid = r.get("program_id", 0)
+                r["program_name"] = prog_map.get(pid, f"Program ID={pid}")
+
+            st.session_state["attendance_records"] = records
+
+        except Exception as e:
+            st.error(f"Error: {e}")
+            st.session_state["attendance_records"] = []
+
+    # Now we display them
+    logs = st.session_state["attendance_records"]
+    st.subheader("Attendance from the Last 7 Days")
+    if not logs:
+        st.write("No attendance records found for the last 7 days.")
+        return
+
+    # Edits for the whole page are diffed and saved in one bulk write
+    prog_map = {p["program_id"]: p["program_name"] for p in list_programs()}
+    _attendance_edit_grid(logs, prog_map, key="last_week_grid")
+
+
+def _attendance_edit_grid(logs, prog_map, key):
+    """
+    Edit a page of attendance records in one st.data_editor.
+
+    On save the grid is diffed against the rows as they were loaded and all
+    changes -- status, comment, date moves and deletions -- go to Mongo in a
+    single bulk_write. Rows someone else changed in the meantime are skipped
+    and reported as conflicts.
+    """
+    import pandas as pd
+
+    result = st.session_state.pop(f"{key}_result", None)
+    if result:
+        if result["applied"]:
+            st.success(f"✅ Saved {result['applied']} change(s).")
+        if result["conflicts"]:
+            st.warning(
+                "⚠️ These records were changed by someone else since you loaded them and were not saved "
+                "(the grid now shows their current values):\n\n"
+                + "\n".join(f"- {c}" for c in result["conflicts"])
+            )
+
+    skip, limit = paginate(len(logs), key=key)
+    page = logs[skip:skip + limit]
+
+    loaded = pd.DataFrame([{
+        "Name": doc.get("name", ""),
+        "Program": prog_map.get(doc.get("program_id", 0), f"Program ID={doc.get('program_id', 0)}"),
+        "Date": doc.get("attendance", {}).get("date"),
+        "Status": doc.get("attendance", {}).get("status", ""),
+        "Comment": doc.get("attendance", {}).get("comment") or "",
+        "Delete": False,
+    } for doc in page])
+    loaded["Date"] = pd.to_datetime(loaded["Date"], errors="coerce")
+
+    # A new editor key after each save so the grid starts from the fresh rows
+    version = st.session_state.get(f"{key}_version", 0)
+    with st.form(f"{key}_form"):
+        edited = st.data_editor(
+            loaded,
+            key=f"{key}_editor_{version}_{skip}",
+            use_container_width=True,
+            hide_index=True,
+            disabled=["Name", "Program"],
+            column_config={
+                "Date": st.column_config.DatetimeColumn("Date", format="YYYY-MM-DD HH:mm", required=True),
+                "Status": st.column_config.SelectboxColumn(
+                    "Status", options=["Present", "Late", "Absent", "Excused"], required=True
+                ),
+                "Comment": st.column_config.TextColumn("Comment"),
+                "Delete": st.column_config.CheckboxColumn("Delete", help="Remove this record on save"),
+            },
+        )
+        submitted = st.form_submit_button("💾 Save Changes")
+
+    if not submitted:
+        return
+
+    changes = []
+    for i, doc in enumerate(page):
+        att = doc.get("attendance", {})
+        before, after = loaded.iloc[i], edited.iloc[i]
+        change = {
+            "student_id": doc.get("student_id"),
+            "date": att.get("date"),
+            "status": att.get("status"),
+            "comment": att.get("comment"),
+        }
+        if doc.get("attendance_session_id"):
+            change["attendance_session_id"] = doc["attendance_session_id"]
+        if after["Delete"]:
+            change["delete"] = True
+        else:
+            if pd.notna(after["Date"]) and after["Date"] != before["Date"]:
+                change["new_date"] = after["Date"].to_pydatetime()
+            if after["Status"] != before["Status"]:
+                change["new_status"] = after["Status"]
+            if (after["Comment"] or "") != before["Comment"]:
+                change["new_comment"] = after["Comment"] or ""
+            if not any(k in change for k in ("new_date", "new_status", "new_comment")):
+                continue
+        changes.append((doc, change))
+
+    if not changes:
+        st.info("No changes to save.")
+        return
+
+    with st.spinner(f"Saving {len(changes)} change(s)..."):
+        # Class-session records are edited in their session document; the
+        # rest go through one bulk_write
+        session_changes = [c for _, c in changes if "attendance_session_id" in c]
+        result = bulk_apply_attendance_changes([c for _, c in changes if "attendance_session_id" not in c])
+        for c in session_changes:
+            if apply_session_change(c):
+                result["applied"] += 1
+            else:
+                result["conflicts"].append(c)
+
+    conflict_ids = {id(c) for c in result["conflicts"]}
+    if result["conflicts"]:
+        # Someone else got there first; reload so the grid shows what's stored now
+        st.session_state["attendance_records"] = None
+    else:
+        # Everything applied: patch the cached rows instead of re-fetching
+        deleted = [doc for doc, c in changes if c.get("delete")]
+        for doc, c in changes:
+            if not c.get("delete"):
+                doc["attendance"] = {
+                    "date": c.get("new_date", c["date"]),
+                    "status": c.get("new_status", c["status"]),
+                    "comment": c.get("new_comment", c["comment"]),
+                }
+        if deleted:
+            records = st.session_state.get("attendance_records") or []
+            st.session_state["attendance_records"] = [r for r in records if not any(r is d for d in deleted)]
+        # Each embedded change was its own update bumping the attendance version
+        bumps = {}
+        for doc, c in changes:
+            if "attendance_session_id" not in c:
+                version_before, count = bumps.get(c["student_id"], (doc.get(ATTENDANCE_VERSION, 0), 0))
+                bumps[c["student_id"]] = (version_before, count + 1)
+        for student_id, (version_before, count) in bumps.items():
+            _bump_cached_version(student_id, version_before + count)
+
+    if result["applied"]:
+        mark_snapshot_stale()
+    st.session_state[f"{key}_version"] = version + 1
+    st.session_state[f"{key}_result"] = {
+        "applied": result["applied"],
+        "conflicts": [
+            f"{doc.get('name', '')} on {c['date']}" for doc, c in changes if id(c) in conflict_ids
+        ],
+    }
+    st.rerun()
@@ -0,0 +1,807 @@
+# views/schedules.py
+
+from datetime import datetime, time, date, timedelta
+
+import streamlit as st
+from dateutil import parser
+
+from instructors_db import list_programs
+from schedules_db import (
+    create_schedule, list_schedules_by_program, update_schedule, notify_schedule_change,
+    delete_schedule, get_schedule, VersionConflict, ScheduleConflict, count_documents_for_schedules
+)
+from schedule_conflicts import audit_conflicts
+from sessions_db import sessions_between
+from request_log_db import run_idempotent
+from views.common import form_token
+
+
+#####################
+# PAGE: Manage Schedules
+#####################
+
+def _format_time_12h(time_obj):
+    """Format a time object or datetime string to 12-hour format."""
+    if not time_obj:
+        return "N/A"
+    
+    if isinstance(time_obj, str):
+        try:
+            time_obj = parser.parse(time_obj)
+        except:
+            return time_obj  # Return as-is if parsing fails
+    
+    if hasattr(time_obj, 'strftime'):
+        return time_obj.strftime("%a, %b %d, %Y %I:%M %p").replace(" 0", " ").replace(" AM", "am").replace(" PM", "pm")
+    return str(time_obj)
+
+def count_documents_for_schedule(schedule_id):
+    """Count documents associated with a schedule."""
+    return count_documents_for_schedules((str(schedule_id),)).get(str(schedule_id), 0)
+
+def _create_and_notify(doc, program_id, allow_conflicts=False):
+    """Create a schedule and email the program; returns the new schedule ID."""
+    new_id = create_schedule(doc, allow_conflicts=allow_conflicts)
+    notify_schedule_change(program_id, doc, event_type="created")
+    return new_id
+
+
+def _show_schedule_conflicts(conflicts, limit=10):
+    """List what a schedule would double-book."""
+    st.error(f"❌ {ScheduleConflict(conflicts)}")
+    for c in conflicts[:limit]:
+        what = "Instructor" if c["kind"] == "instructor" else f"Location \"{c['location']}\""
+        st.write(
+            f"- {what} is already booked {_format_time_12h(c['other_start'])} → "
+            f"{c['other_end'].strftime('%I:%M %p').lstrip('0')} by **{c['other_title']}**"
+        )
+    if len(conflicts) > limit:
+        st.write(f"...and {len(conflicts) - limit} more.")
+    st.info("Tick **Allow double-booking** to save it anyway.")
+
+
+def page_manage_schedules():
+    """
+    Page for an instructor (or admin) to create, view, edit, and delete schedules,
+    with a streamlined recurrence pattern selection for "One-Time" or "Weekly."
+    Includes integration with document management.
+    """
+    # Initialize edit state if not already done
+    if "editing_schedule_id" not in st.session_state:
+        st.session_state["editing_schedule_id"] = None
+        
+    # Initialize document management navigation state
+    if "navigate_to_documents" not in st.session_state:
+        st.session_state["navigate_to_documents"] = False
+    if "selected_schedule_for_docs" not in st.session_state:
+        st.session_state["selected_schedule_for_docs"] = None
+    
+    # Check if navigation to documents is requested
+    if st.session_state["navigate_to_documents"]:
+        # Reset navigation flag
+        st.session_state["navigate_to_documents"] = False
+        # Navigate to document management page
+        page_manage_documents()
+        return
+
+    # 1) Check login
+    instructor_id = st.session_state.get("instructor_id", None)
+    is_admin = st.session_state.get("is_admin", False)
+    if not instructor_id and not is_admin:
+        st.error("🔒 You must be logged in as an instructor or admin to manage schedules.")
+        return
+
+    # 2) Build a program map from Postgres
+    all_programs = list_programs()
+    prog_map = {p["program_id"]: p["program_name"] for p in all_programs}
+
+    # 3) Determine which program IDs this user can manage
+    if is_admin:
+        program_id_options = list(prog_map.keys())
+        user_type = "Administrator"
+    else:
+        program_id_options = st.session_state.get("instructor_program_ids", [])
+        if not program_id_options:
+            st.warning("⚠️ You have no assigned programs. Contact an admin for access.")
+            return
+        user_type = "Instructor"
+
+    st.header("📅 Manage Class Schedules")
+    st.write(f"*Logged in as: {user_type}*")
+    
+    # Help expander
+    with st.expander("ℹ️ How to manage schedules", expanded=False):
+        st.markdown("""
+        ### Managing Class Schedules:
+        - **Create a New Schedule**: Add a one-time or recurring class schedule
+        - **View Existing Schedules**: See all schedules for your assigned programs
+        - **Edit Schedules**: Update details of existing schedules
+        - **Manage Documents**: Upload and manage documents for a class (up to 5 per class)
+        - **Delete Schedules**: Remove schedules that are no longer needed
+        
+        Only instructors who created a schedule (or admins) can edit or delete it.
+        """)
+
+    # --------------------------------------------------------------------------
+    # A) Create a New Schedule
+    # --------------------------------------------------------------------------
+    with st.expander("➕ Create a New Schedule", expanded=True):
+        st.subheader("Create a New Class Schedule")
+        
+        if program_id_options:
+            selected_prog_id = st.selectbox(
+                "Select Program",
+                options=program_id_options,
+                format_func=lambda pid: f"{prog_map.get(pid, f'Unknown')} (ID: {pid})",
+                key="select_program_for_new_schedule",
+                help="Choose which program this schedule will belong to"
+            )
+        else:
+            st.warning("⚠️ No assigned programs available.")
+            return
+
+        # Create column layout for better organization
+        col1, col2 = st.columns(2)
+        
+        # Basic fields
+        with col1:
+            title = st.text_input("Class Title *", "", key="new_schedule_title", 
+                                 help="Enter a descriptive title for this class")
+        
+        with col2:
+            # ***** Recurrence radio: Only "One-Time" or "Weekly" *****
+            recurrence_choice = st.radio(
+                "Recurrence Pattern",
+                ["One-Time", "Weekly"],  # "Monthly" removed
+                horizontal=True,
+                help="Choose how often this session occurs"
+            )
+        
+        notes = st.text_area("Additional Notes/Description", key="new_schedule_notes",
+                            help="Add any relevant details about this class")
+
+        # We'll store location/time/days in these variables
+        location = ""
+        days_times = []
+        start_dt = None
+        end_dt = None
+
+        # --------- One-Time vs Weekly (Monthly lines are commented out) ---------
+        st.write("---")
+        if recurrence_choice == "One-Time":
+            st.subheader("📆 One-Time Session Details")
+            
+            col_date, col_loc = st.columns(2)
+            with col_date:
+                chosen_date = st.date_input("Class Date", value=date.today(), 
+                                          help="Select the date when this class will occur")
+            
+            with col_loc:
+                location = st.text_input("Location", placeholder="Zoom link or room number",
+                                       help="Enter where this class will take place")
+            
+            col_start, col_end = st.columns(2)
+            with col_start:
+                start_t = st.time_input("Start Time", value=time(9, 0),
+                                      help="Select when the class begins")
+                st.write(f"Class begins at: **{start_t.strftime('%I:%M %p').lstrip('0')}**")
+            
+            with col_end:
+                end_t = st.time_input("End Time", value=time(10, 0),
+                                    help="Select when the class ends")
+                st.write(f"Class ends at: **{end_t.strftime('%I:%M %p').lstrip('0')}**")
+
+        elif recurrence_choice == "Weekly":
+            st.subheader("🔄 Weekly Recurring Schedule")
+            st.write("Select which days of the week this class meets, and specify times for each day.")
+            
+            selected_days = st.multiselect(
+                "Days of Week",
+                ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+                help="Select all days when this class meets weekly"
+            )
+            
+            if not selected_days:
+                st.info("👆 Please select at least one day of the week above")
+            
+            for d in selected_days:
+                with st.container():
+                    st.write(f"**📆 {d} Schedule**")
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        start_for_day = st.time_input(
+                            f"{d} Start Time",
+                            value=time(9, 0),
+                            key=f"{d}_start_time",
+                            help=f"When does the class start on {d}?"
+                        )
+                        st.write(f"Starts at: **{start_for_day.strftime('%I:%M %p').lstrip('0')}**")
+                        
+                        end_for_day = st.time_input(
+                            f"{d} End Time",
+                            value=time(10, 0),
+                            key=f"{d}_end_time",
+                            help=f"When does the class end on {d}?"
+                        )
+                        st.write(f"Ends at: **{end_for_day.strftime('%I:%M %p').lstrip('0')}**")
+                    
+                    with col2:
+                        loc_for_day = st.text_input(
+                            f"Location for {d}",
+                            placeholder="Zoom link or room number",
+                            key=f"{d}_loc",
+                            help=f"Where does the class meet on {d}?"
+                        )
+                    
+                    days_times.append({
+                        "day": d,
+                        "start_time": str(start_for_day),
+                        "end_time": str(end_for_day),
+                        "location": loc_for_day
+                    })
+                    
+                    # Add a separator between days
+                    if d != selected_days[-1]:
+                        st.write("---")
+
+        # -------------- "Create Schedule" button --------------
+        st.write("---")
+        create_col1, create_col2 = st.columns([3, 1])
+        
+        with create_col1:
+            allow_conflicts = st.checkbox(
+                "Allow double-booking",
+                key="new_schedule_allow_conflicts",
+                help="Save even if the instructor or location is already booked at that time"
+            )
+
+        with create_col2:
+            create_button = st.button("✅ Create Schedule", 
+                                     help="Save this schedule to the database")
+        
+        create_token = form_token("create_schedule", create_button)
+
+        if create_button:
+            # Validate inputs
+            if not title.strip():
+                st.error("❌ Class title is required")
+            elif recurrence_choice == "Weekly" and not days_times:
+                st.error("❌ Please select at least one day of the week")
+            else:
+                with st.spinner("Creating schedule..."):
+                    if recurrence_choice == "One-Time":
+                        start_dt = datetime.combine(chosen_date, start_t)
+                        end_dt = datetime.combine(chosen_date, end_t)
+                        doc = {
+                            "instructor_id": instructor_id,
+                            "program_id": selected_prog_id,
+                            "title": title,
+                            "recurrence": "None",  # internally store as "None"
+                            "notes": notes,
+                            "start_datetime": start_dt,
+                            "end_datetime": end_dt,
+                            "days_times": [],
+                            "location": location,
+                            "created_by_username": st.session_state.get("instructor_username", "Admin"),
+                            "created_at": datetime.utcnow()
+                        }
+                    else:  # "Weekly" only
+                        doc = {
+                            "instructor_id": instructor_id,
+                            "program_id": selected_prog_id,
+                            "title": title,
+                            "recurrence": "Weekly",
+                            "notes": notes,
+                            "days_times": days_times,
+                            "start_datetime": None,
+                            "end_datetime": None,
+                            "created_by_username": st.session_state.get("instructor_username", "Admin"),
+                            "created_at": datetime.utcnow()
+                        }
+
+                    # A replayed submit returns the first schedule's ID; no new
+                    # document and no second round of notification emails
+                    try:
+                        new_id = run_idempotent(create_token, _create_and_notify, doc, selected_prog_id,
+                                                allow_conflicts=allow_conflicts)
+                    except ScheduleConflict as e:
+                        _show_schedule_conflicts(e.conflicts)
+                    else:
+                        st.success(f"✅ Created schedule with ID: {new_id}")
+                        st.rerun()
+
+    # --------------------------------------------------------------------------
+    # B) Upcoming sessions, straight from the expanded Sessions collection
+    # --------------------------------------------------------------------------
+    with st.expander("🗓️ Upcoming Sessions (next 7 days)", expanded=False):
+        today_start = datetime.combine(date.today(), time.min)
+        upcoming = sessions_between(today_start, today_start + timedelta(days=7), program_ids=program_id_options)
+        if upcoming:
+            st.dataframe(
+                [
+                    {
+                        "When": f"{_format_time_12h(s['start'])} – {s['end'].strftime('%I:%M %p').lstrip('0')}",
+                        "Class": s.get("title", ""),
+                        "Program": prog_map.get(s.get("program_id"), s.get("program_id")),
+                        "Location": s.get("location") or "Not specified",
+                    }
+                    for s in upcoming
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No sessions scheduled in the next 7 days.")
+
+    if is_admin:
+        with st.expander("🔍 Double-Booking Audit", expanded=False):
+            st.caption("Checks every upcoming session for an instructor or location booked twice at once.")
+            if st.button("Run Audit", key="run_conflict_audit"):
+                with st.spinner("Checking all upcoming sessions..."):
+                    found = audit_conflicts(program_ids=program_id_options)
+                if not found:
+                    st.success("✅ No double-bookings found.")
+                else:
+                    st.warning(f"⚠️ Found {len(found)} double-booking(s).")
+                    st.dataframe(
+                        [
+                            {
+                                "Type": c["kind"].title(),
+                                "Who/Where": (c["first"].get("location") if c["kind"] == "location"
+                                              else c["first"].get("instructor_id")),
+                                "When": _format_time_12h(c["second"]["start"]),
+                                "Class": c["first"].get("title", ""),
+                                "Clashes With": c["second"].get("title", ""),
+                            }
+                            for c in found
+                        ],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+    # --------------------------------------------------------------------------
+    # C) Show Existing Schedules
+    # --------------------------------------------------------------------------
+    st.write("---")
+    st.subheader("📋 Existing Schedules")
+    
+    # Fetch schedules
+    with st.spinner("Loading schedules..."):
+        schedules_for_programs = list_schedules_by_program(program_id_options)
+
+    if not schedules_for_programs:
+        st.info("📌 No schedules found for your assigned programs.")
+        return
+    
+    # Add program filter if there are multiple programs
+    unique_programs = list(set(sch.get("program_id") for sch in schedules_for_programs))
+    if len(unique_programs) > 1:
+        filter_options = [None] + unique_programs
+        selected_filter = st.selectbox(
+            "Filter by Program:",
+            options=filter_options,
+            format_func=lambda pid: "All Programs" if pid is None else prog_map.get(pid, f"Unknown (ID: {pid})"),
+            help="Choose a specific program to view only its schedules"
+        )
+        
+        if selected_filter is not None:
+            schedules_for_programs = [sch for sch in schedules_for_programs if sch.get("program_id") == selected_filter]
+    
+    # Add a count of schedules
+    st.write(f"Showing {len(schedules_for_programs)} schedules")
+
+    # Document counts for every visible schedule in one query
+    doc_counts = count_documents_for_schedules(tuple(str(sch["_id"]) for sch in schedules_for_programs))
+    
+    # Process each schedule
+    for idx, sch in enumerate(schedules_for_programs):
+        # Each schedule card is a fragment: edits re-render only that card
+        _render_schedule_card(sch, prog_map, is_admin, instructor_id, doc_counts.get(str(sch["_id"]), 0))
+        
+        # Add a separator between schedules
+        if idx < len(schedules_for_programs) - 1:
+            st.write("---")
+
+
+@st.fragment
+def _render_schedule_card(sch, prog_map, is_admin, instructor_id, doc_count=0):
+    """
+    One schedule card (view / edit / delete) as an isolated fragment.
+    Saving re-queries only this schedule and updates `sch` in place.
+    """
+    if sch.get("_deleted"):
+        return
+
+    sid = sch["_id"]
+    conflict_msg = st.session_state.pop(f"schedule_conflict_{sid}", None)
+    if conflict_msg:
+        st.error(f"⚠️ {conflict_msg} Your changes were not saved; the card now shows the latest version.")
+    pid = sch.get("program_id", None)
+    prog_name = prog_map.get(pid, f"Unknown (ID={pid})")
+    
+    # Check if this schedule is being edited
+    is_editing = st.session_state["editing_schedule_id"] == sid
+    
+    # Determine who can edit this schedule
+    schedule_creator = sch.get("instructor_id")
+    user_can_edit = is_admin or (schedule_creator == instructor_id)
+    
+    # Color background based on recurrence type
+    bg_color = "transparent"  # no background color
+    
+    # Create an expander for each schedule, auto-expanded if being edited
+    with st.expander(f"**{sch.get('title', '')}** | {prog_name} | {sch.get('recurrence', 'None').replace('None', 'One-Time')}", expanded=is_editing):
+        if not is_editing:
+            # Normal view mode
+            col_info, col_actions = st.columns([3, 1])
+            
+            with col_info:
+                # Use HTML for better formatting with background color
+                st.markdown(f"""
+                <div style="padding: 10px; border-radius: 5px; background-color: {bg_color};">
+                    <strong>Title:</strong> {sch.get('title', '')}<br>
+                    <strong>Program:</strong> {prog_name}<br>
+                    <strong>Recurrence:</strong> {sch.get('recurrence', 'None').replace('None', 'One-Time')}<br>
+                    <strong>Notes:</strong> {sch.get('notes', '')}
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Created/Updated information
+                created_by = sch.get("created_by_username", "N/A")
+                created_at = sch.get("created_at", "N/A")
+                updated_by = sch.get("updated_by_username", "N/A")
+                updated_at = sch.get("updated_at", "N/A")
+
+                st.write(f"**Created by:** {created_by} at {created_at}")
+                if updated_by != "N/A":
+                    st.write(f"**Last Updated by:** {updated_by} at {updated_at}")
+                
+                # Show schedule details based on recurrence type
+                if sch.get("recurrence") == "None":
+                    # One-time schedule
+                    start_text = _format_time_12h(sch.get("start_datetime"))
+                    end_text = _format_time_12h(sch.get("end_datetime"))
+                    st.write(f"**Date/Time:** {start_text} → {end_text}")
+                    if sch.get("location"):
+                        st.write(f"**Location:** {sch['location']}")
+                elif sch.get("recurrence") == "Weekly":
+                    # Weekly schedule
+                    dt_list = sch.get("days_times", [])
+                    if dt_list:
+                        st.write("**Weekly Schedule:**")
+                        for d_obj in dt_list:
+                            day = d_obj["day"]
+                            s_24 = d_obj["start_time"]
+                            e_24 = d_obj["end_time"]
+                            s_12 = _format_time_12h(s_24)
+                            e_12 = _format_time_12h(e_24)
+                            loc = d_obj.get("location", "")
+                            st.write(f"- **{day}:** {s_12} → {e_12}, Location: {loc}")
+                
+                # Show document count for this schedule
+                if doc_count > 0:
+                    st.write(f"**📚 Documents:** {doc_count}/5 reference materials uploaded")
+            
+            # Action buttons column
+            with col_actions:
+                if user_can_edit:
+                    st.write("**Actions:**")
+                    
+                    # Edit button
+                    if st.button("✏️ Edit", key=f"btn_edit_{sid}", 
+                               help=f"Edit this schedule"):
+                        st.session_state["editing_schedule_id"] = sid
+                        st.rerun(scope="fragment")
+                    
+                    # Documents button - NEW
+                    if st.button("📚 Documents", key=f"btn_docs_{sid}", 
+                              help=f"Manage documents for this class"):
+                        # Set the selected schedule and navigation flags
+                        st.session_state["selected_schedule_for_docs"] = sid
+                        st.session_state["navigate_to_documents"] = True
+                        st.rerun()
+                    
+                    # Delete button (two-step confirmation kept in session state)
+                    if st.session_state.get("schedule_delete_candidate") == sid:
+                        st.warning(f"⚠️ Are you sure you want to delete this schedule?")
+                        col_cancel, col_confirm = st.columns(2)
+                        
+                        with col_cancel:
+                            if st.button("Cancel", key=f"cancel_delete_{sid}"):
+                                st.session_state["schedule_delete_candidate"] = None
+                                st.rerun(scope="fragment")
+                                
+                        with col_confirm:
+                            if st.button("Confirm Delete", key=f"confirm_delete_{sid}"):
+                                with st.spinner("Deleting schedule..."):
+                                    if delete_schedule(sid):
+                                        st.session_state["schedule_delete_candidate"] = None
+                                        sch["_deleted"] = True
+                                        st.rerun(scope="fragment")
+                                    else:
+                                        st.error("❌ Delete failed or no such schedule.")
+                    elif st.button("🗑️ Delete", key=f"btn_delete_{sid}", 
+                               help=f"Delete this schedule"):
+                        st.session_state["schedule_delete_candidate"] = sid
+                        st.rerun(scope="fragment")
+                else:
+                    st.info("ℹ️ You can view this schedule but cannot edit or delete it.")
+        else:
+            # Edit mode within the expander
+            schedule_doc = sch
+            if not schedule_doc:
+                st.error("❌ Schedule not found or not authorized.")
+                return
+
+            st.subheader(f"✏️ Edit Schedule")
+            
+            old_title = schedule_doc.get("title", "")
+            old_notes = schedule_doc.get("notes", "")
+            old_recurrence = schedule_doc.get("recurrence", "None")
+            old_location = schedule_doc.get("location", "")
+            old_days_times = schedule_doc.get("days_times", [])
+            old_program_id = schedule_doc.get("program_id", None)
+            
+            # Show program information
+            st.write(f"**Program:** {prog_map.get(old_program_id, f'Unknown (ID={old_program_id})')}")
+            
+            # Basic fields
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                new_title = st.text_input(
+                    "Title *",
+                    value=old_title,
+                    key=f"edit_title_{sid}",
+                    help="Class title"
+                )
+            
+            with col2:
+                new_recurrence = st.selectbox(
+                    "Recurrence",
+                    ["None", "Weekly"],  # Removed "Monthly"
+                    index=["None", "Weekly"].index(old_recurrence),
+                    key=f"edit_recurrence_{sid}",
+                    help="How often this class occurs"
+                )
+            
+            new_notes = st.text_area(
+                "Notes",
+                value=old_notes,
+                key=f"edit_notes_{sid}",
+                help="Additional information about this class"
+            )
+            
+            st.write("---")
+            
+            # Time and location fields based on recurrence type
+            if new_recurrence == "None":
+                st.subheader("📆 One-Time Session Details")
+                
+                existing_start = schedule_doc.get("start_datetime")
+                existing_end = schedule_doc.get("end_datetime")
+
+                if isinstance(existing_start, str):
+                    existing_start = parser.parse(existing_start)
+                if isinstance(existing_end, str):
+                    existing_end = parser.parse(existing_end)
+
+                start_date_val = existing_start.date() if existing_start else date.today()
+                start_time_val = existing_start.time() if existing_start else time(9, 0)
+                end_date_val = existing_end.date() if existing_end else date.today()
+                end_time_val = existing_end.time() if existing_end else time(10, 0)
+
+                col_date, col_loc = st.columns(2)
+                with col_date:
+                    edited_start_date = st.date_input(
+                        "Date",
+                        value=start_date_val,
+                        key=f"edit_start_date_{sid}",
+                        help="When this class occurs"
+                    )
+                
+                with col_loc:
+                    edited_location = st.text_input(
+                        "Location",
+                        value=old_location,
+                        key=f"edit_location_{sid}",
+                        help="Where this class meets"
+                    )
+                
+                col_start, col_end = st.columns(2)
+                with col_start:
+                    edited_start_time = st.time_input(
+                        "Start Time",
+                        value=start_time_val,
+                        key=f"edit_start_time_{sid}",
+                        help="When class begins"
+                    )
+                    st.write(f"Starts at: **{edited_start_time.strftime('%I:%M %p').lstrip('0')}**")
+                
+                with col_end:
+                    edited_end_time = st.time_input(
+                        "End Time",
+                        value=end_time_val,
+                        key=f"edit_end_time_{sid}",
+                        help="When class ends"
+                    )
+                    st.write(f"Ends at: **{edited_end_time.strftime('%I:%M %p').lstrip('0')}**")
+                
+                # Maintain same date for start and end
+                edited_end_date = edited_start_date
+                new_days_times = []
+                
+            else:  # Weekly recurrence
+                st.subheader("🔄 Weekly Schedule")
+                
+                old_selected_days = [d["day"] for d in old_days_times]
+                selected_days = st.multiselect(
+                    "Days of Week",
+                    ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+                    default=old_selected_days,
+                    key=f"edit_selected_days_{sid}",
+                    help="Which days this class meets each week"
+                )
+                
+                if not selected_days:
+                    st.info("👆 Please select at least one day of the week")
+
+                new_days_times = []
+                for d in selected_days:
+                    existing = next((x for x in old_days_times if x["day"] == d), None)
+                    default_start = time(9, 0)
+                    default_end = time(10, 0)
+                    default_loc = ""
+
+                    if existing:
+                        if "start_time" in existing:
+                            try:
+                                hh, mm, ss = existing["start_time"].split(":")
+                                default_start = time(int(hh), int(mm))
+                            except:
+                                pass
+                        if "end_time" in existing:
+                            try:
+                                hh, mm, ss = existing["end_time"].split(":")
+                                default_end = time(int(hh), int(mm))
+                            except:
+                                pass
+                        default_loc = existing.get("location", "")
+
+                    with st.container():
+                        st.write(f"**📆 {d} Schedule**")
+                        col_a, col_b = st.columns(2)
+
+                        with col_a:
+                            new_start = st.time_input(
+                                f"{d} Start Time",
+                                value=default_start,
+                                key=f"{sid}_{d}_start_key",
+                                help=f"When class starts on {d}"
+                            )
+                            st.write(f"Starts at: **{new_start.strftime('%I:%M %p').lstrip('0')}**")
+
+                            new_end = st.time_input(
+                                f"{d} End Time",
+                                value=default_end,
+                                key=f"{sid}_{d}_end_key",
+                                help=f"When class ends on {d}"
+                            )
+                            st.write(f"Ends at: **{new_end.strftime('%I:%M %p').lstrip('0')}**")
+
+                        with col_b:
+                            new_loc = st.text_input(
+                                f"Location for {d}",
+                                value=default_loc,
+                                key=f"{sid}_{d}_loc_key",
+                                help=f"Where class meets on {d}"
+                            )
+
+                        new_days_times.append({
+                            "day": d,
+                            "start_time": str(new_start),
+                            "end_time": str(new_end),
+                            "location": new_loc
+                        })
+                        
+                        # Add separator between days
+                        if d != selected_days[-1]:
+                            st.write("---")
+                
+                edited_location = None
+            
+            # Bottom buttons
+            st.write("---")
+            st.checkbox(
+                "Allow double-booking",
+                key=f"edit_allow_conflicts_{sid}",
+                help="Save even if the instructor or location is already booked at that time"
+            )
+
+            save_col, cancel_col = st.columns(2)
+
+            # Save Changes button
+            with save_col:
+                if st.button("💾 Save Changes", key=f"save_changes_btn_{sid}"):
+                    # Validate inputs
+                    if not new_title.strip():
+                        st.error("❌ Class title is required")
+                    elif new_recurrence != "None" and not new_days_times:
+                        st.error("❌ Please select at least one day of the week")
+                    else:
+                        with st.spinner("Updating schedule..."):
+                            updates = {
+                                "title": new_title,
+                                "recurrence": new_recurrence,
+                                "notes": new_notes,
+                                "updated_by_username": st.session_state.get("username", "Unknown"),
+                                "updated_at": datetime.utcnow()
+                            }
+
+                            if new_recurrence == "None":
+                                updates["days_times"] = []
+                                s_dt = datetime.combine(edited_start_date, edited_start_time)
+                                e_dt = datetime.combine(edited_end_date, edited_end_time)
+                                updates["start_datetime"] = s_dt
+                                updates["end_datetime"] = e_dt
+                                updates["location"] = edited_location
+                            else:
+                                updates["days_times"] = new_days_times
+                                updates["start_datetime"] = None
+                                updates["end_datetime"] = None
+                                updates.pop("location", None)
+
+                            try:
+                                success = update_schedule(
+                                    sid, updates, expected_version=sch.get("_v", 0),
+                                    allow_conflicts=st.session_state.get(f"edit_allow_conflicts_{sid}", False),
+                                    current=sch
+                                )
+                            except ScheduleConflict as e:
+                                _show_schedule_conflicts(e.conflicts)
+                                return
+                            except VersionConflict as e:
+                                # Someone else saved first: show their version, not ours
+                                st.session_state[f"schedule_conflict_{sid}"] = str(e)
+                                fresh = get_schedule(sid)
+                                if fresh:
+                                    sch.update(fresh)
+                                else:
+                                    sch["_deleted"] = True
+                                st.session_state["editing_schedule_id"] = None
+                                st.rerun(scope="fragment")
+                            if success:
+                                st.success("✅ Schedule updated successfully.")
+
+                                # Build a doc for the notification email
+                                updated_doc = {
+                                    "program_id": old_program_id,
+                                    "title": new_title,
+                                    "recurrence": new_recurrence,
+                                    "notes": new_notes,
+                                    "days_times": new_days_times if new_recurrence != "None" else [],
+                                    "location": edited_location if new_recurrence == "None" else None,
+                                }
+                                notify_schedule_change(
+                                    program_id=old_program_id,
+                                    schedule_doc=updated_doc,
+                                    event_type="updated"
+                                )
+
+                                # Re-query only this schedule for the card
+                                fresh = get_schedule(sid)
+                                if fresh:
+                                    sch.update(fresh)
+                            else:
+                                st.error("❌ No changes made, or update failed.")
+
+                            st.session_state["editing_schedule_id"] = None
+                            st.rerun(scope="fragment")
+            
+            with cancel_col:
+                if st.button("❌ Cancel", key=f"cancel_edit_btn_{sid}"):
+                    # Remove the editing flag from session state
+                    st.session_state["editing_schedule_id"] = None
+                    st.success("✅ Edit canceled")
+                    st.rerun(scope="fragment")
@@ -0,0 +1,161 @@
+# views/settings.py
+
+import streamlit as st
+
+from instructors_db import (
+    list_instructors, authenticate_instructor, update_instructor_password, get_instructor_email
+)
+from digests import (
+    NOTIFICATION_MODES, DIGEST_THRESHOLD, DIGEST_MAX_AGE, get_notification_mode, set_notification_mode
+)
+
+
+def page_my_settings():
+    st.header("My Settings")
+
+    # If no one is logged in, block access:
+    if not (st.session_state.get("is_admin") or st.session_state.get("instructor_logged_in")):
+        st.error("You must be logged in to access My Settings.")
+        return
+
+    # Let’s do a radio for the two actions:
+    setting_choice = st.radio(
+        "Choose an action",
+        ["Logout","Change My Password","Notifications"],
+        horizontal=True
+    )
+
+    if setting_choice == "Change My Password":
+        _render_change_password()
+    elif setting_choice == "Notifications":
+        _render_notification_preferences()
+    else:
+        _render_logout_button()
+
+
+def _render_change_password():
+    st.subheader("Change My Password")
+
+    # If no instructor is logged in, or if user is admin-only (no instructor ID), block it
+    if not st.session_state.get("instructor_logged_in"):
+        st.info("Only an instructor can change a password here.")
+        return
+
+    old_pass = st.text_input("Old Password", type="password")
+    new_pass = st.text_input("New Password", type="password")
+    confirm_pass = st.text_input("Confirm New Password", type="password")
+
+    if st.button("Update Password"):
+        # ... do your re-auth check, then update_instructor_password logic ...        
+        # Find username from session
+        username = None
+        all_instr = list_instructors()
+        for instr in all_instr:
+            if instr["instructor_id"] == st.session_state.instructor_id:
+                username = instr["username"]
+                break
+
+        if not username:
+            st.error("Could not find your instructor record. Contact admin.")
+            return
+
+        auth_result = authenticate_instructor(username, old_pass)
+        if not auth_result:
+            st.error("Old password is incorrect.")
+            return
+        if new_pass != confirm_pass:
+            st.error("New passwords do not match.")
+            return
+
+        update_instructor_password(st.session_state.instructor_id, new_pass)
+        st.success("Password updated successfully!")
+
+
+def _render_notification_preferences():
+    st.subheader("Email Notifications")
+    st.caption(
+        f"Digest collects notifications into one email, sent once {DIGEST_THRESHOLD} are waiting "
+        f"or after {int(DIGEST_MAX_AGE.total_seconds() // 3600)} hours."
+    )
+
+    if st.session_state.get("instructor_logged_in"):
+        email = get_instructor_email(st.session_state.instructor_id)
+        if not email:
+            st.info("No email address is on file for your account.")
+            return
+        st.write(f"Notifications for **{email}**")
+    elif st.session_state.get("is_admin"):
+        # Students don't log in, so the admin sets their preference by address
+        email = st.text_input("Email address (student or instructor)").strip()
+        if not email:
+            return
+    else:
+        return
+
+    labels = {"immediate": "Immediately (one email each)", "digest": "Digest (combined email)"}
+    current = get_notification_mode(email)
+    mode = st.radio(
+        "Deliver notifications",
+        NOTIFICATION_MODES,
+        index=NOTIFICATION_MODES.index(current),
+        format_func=labels.get,
+        key=f"notification_mode_{email}"
+    )
+    if st.button("Save Preference"):
+        if set_notification_mode(email, mode):
+            st.success(f"Notifications for {email} will be delivered: {labels[mode].lower()}.")
+
+
+def _render_logout_button():
+    st.subheader("Logout")
+    st.write("Click below to log out from the system.")
+
+    if st.button("Logout Now"):
+        st.session_state.is_admin = False
+        st.session_state.instructor_logged_in = False
+        st.session_state.instructor_id = None
+        st.session_state.instructor_role = None
+        st.session_state.instructor_username = None
+        st.session_state.menu_choice = "Home"
+
+        st.success("You have been logged out.")
+        st.rerun()
+
+#####################
+# PAGE: Instructor Password Change
+#####################
+def page_instructor_change_password():
+    col_left, col_center, col_right = st.columns([1, 5, 1])
+
+    with col_center:
+        st.header("Change My Password")
+
+        if not st.session_state.get("instructor_logged_in"):
+            st.error("You must be logged in as an instructor to change your password.")
+            return
+
+        old_pass = st.text_input("Old Password", type="password")
+        new_pass = st.text_input("New Password", type="password")
+        confirm_pass = st.text_input("Confirm New Password", type="password")
+
+        if st.button("Update Password"):
+            # Re-auth to check old_pass
+            username = None
+            all_instr = list_instructors()
+            for instr in all_instr:
+                if instr["instructor_id"] == st.session_state.instructor_id:
+                    username = instr["username"]
+                    break
+            if not username:
+                st.error("Could not find your instructor record. Contact admin.")
+                return
+            auth_result = authenticate_instructor(username, old_pass)
+            if not auth_result:
+                st.error("Old password is incorrect.")
+                return
+            if new_pass != confirm_pass:
+                st.error("New passwords do not match.")
+                return
+
+            update_instructor_password(st.session_state.instructor_id, new_pass)
+            st.success("Password updated successfully!")